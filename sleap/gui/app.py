@@ -20,10 +20,15 @@ from PySide2.QtWidgets import QMessageBox
 from sleap.skeleton import Skeleton
 from sleap.instance import Instance
 from sleap.io.dataset import Labels
+from sleap.io.format.adaptor import OperationCancelled
 from sleap.info.summary import StatisticSeries
+from sleap.info.feature_suggestions import clear_stage_cache
 from sleap.gui.commands import CommandContext, UpdateTopic
 from sleap.gui.widgets.video import QtVideoPlayer
-from sleap.gui.widgets.slider import set_slider_marks_from_labels
+from sleap.gui.widgets.slider import (
+    set_slider_marks_from_labels,
+    update_slider_marks_for_frame,
+)
 from sleap.gui.dataviews import (
     GenericTableView,
     VideosTableModel,
@@ -36,6 +41,7 @@ from sleap.gui.dataviews import (
 
 from sleap.gui.dialogs.filedialog import FileDialog
 from sleap.gui.dialogs.formbuilder import YamlFormWidget
+from sleap.gui.dialogs.progress import run_with_progress
 from sleap.gui.shortcuts import Shortcuts
 from sleap.gui.dialogs.shortcuts import ShortcutDialog
 from sleap.gui.state import GuiState
@@ -82,6 +88,7 @@ class MainWindow(QMainWindow):
         self._child_windows = dict()
 
         self.overlays = dict()
+        self._statistic_series = None
 
         self.state.connect("filename", self.setWindowTitle)
 
@@ -148,6 +155,10 @@ class MainWindow(QMainWindow):
                 # accept event (closes window)
                 event.accept()
 
+        if event.isAccepted():
+            # Free frame images cached for generating suggestions.
+            clear_stage_cache()
+
     @property
     def labels(self):
         return self.state["labels"]
@@ -193,7 +204,12 @@ class MainWindow(QMainWindow):
                 self.state["frame_idx"] = 0
 
         self.state.connect(
-            "video", callbacks=[switch_frame, lambda x: self.updateSeekbarMarks()]
+            "video",
+            callbacks=[
+                switch_frame,
+                lambda x: self.updateSeekbarMarks(),
+                lambda x: self.setSeekbarHeader(self.state["seekbar_header"]),
+            ],
         )
 
     def _create_color_manager(self):
@@ -466,6 +482,11 @@ class MainWindow(QMainWindow):
                 self.commands.newInstance(init_method=method_key[0])
 
         labelMenu = self.menuBar().addMenu("Labels")
+        add_menu_item(labelMenu, "undo", "Undo", self.commands.undo)
+        add_menu_item(labelMenu, "redo", "Redo", self.commands.redo)
+
+        labelMenu.addSeparator()
+
         add_menu_item(
             labelMenu, "add instance", "Add Instance", new_instance_menu_action
         )
@@ -913,6 +934,8 @@ class MainWindow(QMainWindow):
         self._menu_actions["transpose"].setEnabled(has_multiple_instances)
 
         self._menu_actions["save"].setEnabled(has_unsaved_changes)
+        self._menu_actions["undo"].setEnabled(self.commands.can_undo)
+        self._menu_actions["redo"].setEnabled(self.commands.can_redo)
 
         self._menu_actions["next video"].setEnabled(has_multiple_videos)
         self._menu_actions["prev video"].setEnabled(has_multiple_videos)
@@ -947,6 +970,11 @@ class MainWindow(QMainWindow):
                     return True
             return False
 
+        if _has_topic([UpdateTopic.project_instances, UpdateTopic.tracks]):
+            # Labels may have changed in frames other than the current one.
+            if "trails" in self.overlays:
+                self.overlays["trails"].clear_cache()
+
         if _has_topic(
             [
                 UpdateTopic.frame,
@@ -957,15 +985,16 @@ class MainWindow(QMainWindow):
         ):
             self.plotFrame()
 
-        if _has_topic(
-            [
-                UpdateTopic.frame,
-                UpdateTopic.project_instances,
-                UpdateTopic.tracks,
-                UpdateTopic.suggestions,
-            ]
+        if UpdateTopic.frame in what and not _has_topic([UpdateTopic.tracks]):
+            # Edits to the current frame only need marks for that frame updated.
+            self.updateSeekbarMarks(frame_idx=self.state["frame_idx"])
+            self.updateSeekbarHeader(frame_idx=self.state["frame_idx"])
+        elif _has_topic(
+            [UpdateTopic.project_instances, UpdateTopic.tracks, UpdateTopic.suggestions]
         ):
             self.updateSeekbarMarks()
+            if _has_topic([UpdateTopic.project_instances, UpdateTopic.tracks]):
+                self.updateSeekbarHeader()
 
         if _has_topic(
             [UpdateTopic.frame, UpdateTopic.project_instances, UpdateTopic.tracks]
@@ -975,6 +1004,10 @@ class MainWindow(QMainWindow):
         if _has_topic([UpdateTopic.video]):
             self.videosTable.model().items = self.labels.videos
 
+            # Frame images cached for generating suggestions may be for videos
+            # which are no longer in project.
+            clear_stage_cache()
+
         if _has_topic([UpdateTopic.skeleton]):
             self.skeletonNodesTable.model().items = self.state["skeleton"]
             self.skeletonEdgesTable.model().items = self.state["skeleton"]
@@ -990,7 +1023,18 @@ class MainWindow(QMainWindow):
             self.instancesTable.model().items = self.state["labeled_frame"]
 
         if _has_topic([UpdateTopic.suggestions]):
-            self.suggestionsTable.model().items = self.labels.suggestions
+            if UpdateTopic.project_instances in what and UpdateTopic.all not in what:
+                # Editing instances doesn't change the list of suggestions, so
+                # we just need to update rows (for current frame, if possible).
+                if UpdateTopic.frame in what:
+                    video, frame_idx = self.state["video"], self.state["frame_idx"]
+                    self.suggestionsTable.model().update_items(
+                        lambda item: item.video == video and item.frame_idx == frame_idx
+                    )
+                else:
+                    self.suggestionsTable.model().update_rows()
+            else:
+                self.suggestionsTable.model().items = self.labels.suggestions
 
         if _has_topic([UpdateTopic.project_instances, UpdateTopic.suggestions]):
             # update count of suggested frames w/ labeled instances
@@ -1110,8 +1154,16 @@ class MainWindow(QMainWindow):
             has_loaded = True
         else:
             try:
-                labels = Labels.load_file(filename, video_search=gui_video_callback)
+                labels = run_with_progress(
+                    Labels.load_file,
+                    message=f"Loading {os.path.basename(filename)}...",
+                    kwargs=dict(filename=filename),
+                    main_thread_kwargs=dict(video_search=gui_video_callback),
+                    parent=self,
+                )
                 has_loaded = True
+            except OperationCancelled:
+                pass
             except ValueError as e:
                 print(e)
                 QMessageBox(text=f"Unable to load {filename}.").exec_()
@@ -1165,39 +1217,80 @@ class MainWindow(QMainWindow):
             "New Track", self.commands.addTrack, Qt.CTRL + Qt.Key_0
         )
 
-    def updateSeekbarMarks(self):
-        """Updates marks on seekbar."""
-        set_slider_marks_from_labels(
-            self.player.seekbar, self.labels, self.state["video"], self.color_manager
-        )
+    def updateSeekbarMarks(self, frame_idx: Optional[int] = None):
+        """Updates marks on seekbar.
+
+        Args:
+            frame_idx: If given, only update the marks affected by changes to
+                this frame in the current video. Otherwise update all marks.
+        """
+        if frame_idx is not None:
+            update_slider_marks_for_frame(
+                self.player.seekbar,
+                self.labels,
+                self.state["video"],
+                frame_idx,
+                self.color_manager,
+            )
+        else:
+            set_slider_marks_from_labels(
+                self.player.seekbar,
+                self.labels,
+                self.state["video"],
+                self.color_manager,
+            )
 
     def setSeekbarHeader(self, graph_name):
         """Updates graph shown in seekbar header."""
-        data_obj = StatisticSeries(self.labels)
-        header_functions = {
-            "Point Displacement (sum)": data_obj.get_point_displacement_series,
-            "Point Displacement (max)": data_obj.get_point_displacement_series,
-            "Primary Point Displacement (sum)": data_obj.get_primary_point_displacement_series,
-            "Primary Point Displacement (max)": data_obj.get_primary_point_displacement_series,
-            "Instance Score (sum)": data_obj.get_instance_score_series,
-            "Instance Score (min)": data_obj.get_instance_score_series,
-            "Point Score (sum)": data_obj.get_point_score_series,
-            "Point Score (min)": data_obj.get_point_score_series,
-            "Number of predicted points": data_obj.get_point_count_series,
+        header_series = {
+            "Point Displacement (sum)": "point_displacement",
+            "Point Displacement (max)": "point_displacement",
+            "Primary Point Displacement (sum)": "primary_point_displacement",
+            "Primary Point Displacement (max)": "primary_point_displacement",
+            "Instance Score (sum)": "instance_score",
+            "Instance Score (min)": "instance_score",
+            "Point Score (sum)": "point_score",
+            "Point Score (min)": "point_score",
+            "Number of predicted points": "point_count",
         }
 
-        if graph_name == "None":
+        if graph_name in (None, "None"):
             self.player.seekbar.clearHeader()
         else:
-            if graph_name in header_functions:
-                kwargs = dict(video=self.state["video"])
+            if graph_name in header_series:
+                kwargs = dict(video=self.state["video"], name=header_series[graph_name])
                 reduction_name = re.search("\((sum|max|min)\)", graph_name)
                 if reduction_name is not None:
                     kwargs["reduction"] = reduction_name.group(1)
-                series = header_functions[graph_name](**kwargs)
+                series = self.statistic_series.get_series_arrays(**kwargs)
                 self.player.seekbar.setHeaderSeries(series)
             else:
-                print(f"Could not find function for {header_functions}")
+                print(f"Could not find function for {header_series}")
+
+    def updateSeekbarHeader(self, frame_idx: Optional[int] = None):
+        """Updates statistics for seekbar header graph and redraws it.
+
+        Args:
+            frame_idx: If given, only this frame in the current video has
+                changed. Otherwise all cached statistics are recomputed.
+        """
+        if frame_idx is not None:
+            self.statistic_series.update_frames(self.state["video"], [frame_idx])
+        else:
+            self.statistic_series.invalidate()
+
+        if self.state["seekbar_header"] not in (None, "None"):
+            self.setSeekbarHeader(self.state["seekbar_header"])
+
+    @property
+    def statistic_series(self) -> StatisticSeries:
+        """Returns cached statistics for labels in the GUI."""
+        if (
+            self._statistic_series is None
+            or self._statistic_series.labels is not self.labels
+        ):
+            self._statistic_series = StatisticSeries(self.labels)
+        return self._statistic_series
 
     def _frames_for_prediction(self):
         """Builds options for frames on which to run inference.
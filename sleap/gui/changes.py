@@ -0,0 +1,541 @@
+"""
+Module for recording edits to labels so that they can be undone and redone.
+
+Each command which edits labels records the differences it made (instances
+added or removed, point values changed, track assignments changed) rather
+than a copy of the labels, so applying or reverting a change only takes time
+proportional to the size of the edit.
+
+The same history is used to determine whether there are unsaved changes and,
+when possible, exactly which frames have changed since the last save.
+
+Example: ::
+
+   >>> stack = ChangeStack()
+   >>> stack.push(ChangeSet(name="add", changes=[InstancesAdded(items)]))
+   >>> stack.undo(labels)
+   >>> stack.redo(labels)
+
+"""
+
+from typing import Iterable, List, Optional, Set, Tuple
+
+import attr
+import numpy as np
+
+from numpy.lib.recfunctions import structured_to_unstructured
+
+from sleap.instance import Instance, LabeledFrame, Track
+from sleap.io.dataset import Labels
+from sleap.io.video import Video
+from sleap.rangelist import RangeList
+
+FrameKey = Tuple[Video, int]
+InstanceItem = Tuple[LabeledFrame, Instance, int]
+
+# Rough per-object cost (in bytes) of keeping a reference to an instance or
+# frame in the history, used to enforce the memory cap.
+OBJECT_REF_BYTES = 64
+
+
+def _add_instances(
+    labels: Labels, items: List[InstanceItem], frames: List[LabeledFrame]
+):
+    """Adds instances back into frames (at original position in frame)."""
+    for lf in frames:
+        labels.append(lf)
+    # Insert in order of position so positions are valid when we insert.
+    for lf, instance, index in sorted(items, key=lambda item: item[2]):
+        labels.add_instance(lf, instance, index=index)
+
+
+def _remove_instances(
+    labels: Labels, items: List[InstanceItem], frames: List[LabeledFrame]
+):
+    """Removes instances from frames (and frames which become empty)."""
+    for lf, instance, _ in items:
+        labels.remove_instance(lf, instance)
+    for lf in frames:
+        labels.remove(lf)
+
+
+def _set_tracks(labels: Labels, items: List[Tuple[LabeledFrame, Instance]], tracks):
+    """Sets tracks on instances, updating track occupancy for each frame."""
+    for (lf, instance), track in zip(items, tracks):
+        old_track = instance.track
+        instance.track = track
+
+        occupancy = labels.get_track_occupancy(lf.video)
+        frame_range = (lf.frame_idx, lf.frame_idx + 1)
+        if old_track in occupancy and not lf.find(track=old_track):
+            occupancy[old_track].remove(frame_range)
+        occupancy.setdefault(track, RangeList()).insert(frame_range)
+
+
+def _frame_keys(frames: Iterable[LabeledFrame]) -> Set[FrameKey]:
+    return {(lf.video, lf.frame_idx) for lf in frames}
+
+
+@attr.s(auto_attribs=True, eq=False)
+class InstancesAdded:
+    """
+    Instances which were added to labeled frames.
+
+    Attributes:
+        items: List of (labeled frame, instance, index in frame) tuples.
+        new_frames: Labeled frames which were added to labels along with
+            the instances.
+    """
+
+    items: List[InstanceItem]
+    new_frames: List[LabeledFrame] = attr.ib(factory=list)
+
+    @property
+    def frames(self) -> Optional[Set[FrameKey]]:
+        """The (video, frame index) keys for the frames which changed."""
+        return _frame_keys(lf for lf, _, _ in self.items)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by change."""
+        return OBJECT_REF_BYTES * (len(self.items) + len(self.new_frames))
+
+    def apply(self, labels: Labels):
+        _add_instances(labels, self.items, self.new_frames)
+
+    def revert(self, labels: Labels):
+        _remove_instances(labels, self.items, self.new_frames)
+
+
+@attr.s(auto_attribs=True, eq=False)
+class InstancesRemoved:
+    """
+    Instances which were removed from labeled frames.
+
+    Attributes:
+        items: List of (labeled frame, instance, index in frame) tuples,
+            where index is the position of instance before it was removed.
+        removed_frames: Labeled frames which were removed from labels once
+            they no longer had any instances.
+    """
+
+    items: List[InstanceItem]
+    removed_frames: List[LabeledFrame] = attr.ib(factory=list)
+
+    @property
+    def frames(self) -> Optional[Set[FrameKey]]:
+        """The (video, frame index) keys for the frames which changed."""
+        return _frame_keys(lf for lf, _, _ in self.items)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by change."""
+        return OBJECT_REF_BYTES * (len(self.items) + len(self.removed_frames))
+
+    def apply(self, labels: Labels):
+        _remove_instances(labels, self.items, self.removed_frames)
+
+    def revert(self, labels: Labels):
+        _add_instances(labels, self.items, self.removed_frames)
+
+
+@attr.s(auto_attribs=True, eq=False)
+class PointsChanged:
+    """
+    Changes to values (x, y, visible, complete) of points in an instance.
+
+    Only the rows of the points array which changed are stored.
+
+    Attributes:
+        instance: The instance with changed points.
+        node_inds: Indexes (in skeleton) of nodes with changed points.
+        old_points: Point values for these nodes before the change.
+        new_points: Point values for these nodes after the change.
+    """
+
+    instance: Instance
+    node_inds: np.ndarray
+    old_points: np.ndarray
+    new_points: np.ndarray
+
+    @classmethod
+    def snapshot(cls, instance: Instance) -> np.ndarray:
+        """Returns copy of point values, for passing to :meth:`diff`."""
+        return instance.get_points_array(copy=False, full=True).copy()
+
+    @classmethod
+    def diff(
+        cls, instance: Instance, old_points: np.ndarray
+    ) -> Optional["PointsChanged"]:
+        """
+        Returns change from snapshot to current points, or None if no change.
+
+        Args:
+            instance: The instance.
+            old_points: The points from :meth:`snapshot` before the edit.
+        """
+        points = instance.get_points_array(copy=False, full=True)
+        if len(points) != len(old_points):
+            raise ValueError("Cannot diff points for instance with new nodes.")
+
+        old_vals = structured_to_unstructured(old_points, dtype=np.float64)
+        new_vals = structured_to_unstructured(points, dtype=np.float64)
+        changed = (old_vals != new_vals) & ~(np.isnan(old_vals) & np.isnan(new_vals))
+        node_inds = np.flatnonzero(changed.any(axis=1))
+
+        if not len(node_inds):
+            return None
+
+        return cls(
+            instance=instance,
+            node_inds=node_inds,
+            old_points=old_points[node_inds].copy(),
+            new_points=points[node_inds].copy(),
+        )
+
+    @property
+    def frames(self) -> Optional[Set[FrameKey]]:
+        """The (video, frame index) keys for the frames which changed."""
+        if self.instance.frame is None:
+            return None
+        return _frame_keys([self.instance.frame])
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by change."""
+        return (
+            self.node_inds.nbytes
+            + self.old_points.nbytes
+            + self.new_points.nbytes
+            + OBJECT_REF_BYTES
+        )
+
+    def apply(self, labels: Labels):
+        points = self.instance.get_points_array(copy=False, full=True)
+        points[self.node_inds] = self.new_points
+
+    def revert(self, labels: Labels):
+        points = self.instance.get_points_array(copy=False, full=True)
+        points[self.node_inds] = self.old_points
+
+
+@attr.s(auto_attribs=True, eq=False)
+class TracksChanged:
+    """
+    Changes to tracks assigned to instances.
+
+    Attributes:
+        items: List of (labeled frame, instance) tuples.
+        old_tracks: Track for each instance before the change.
+        new_tracks: Track for each instance after the change.
+    """
+
+    items: List[Tuple[LabeledFrame, Instance]]
+    old_tracks: List[Optional[Track]]
+    new_tracks: List[Optional[Track]]
+
+    @classmethod
+    def snapshot(
+        cls, labels: Labels, video: Video, frame_range: Tuple[int, int]
+    ) -> List[Tuple[LabeledFrame, Instance, Optional[Track]]]:
+        """
+        Returns tracks for instances in range, for passing to :meth:`diff`.
+
+        Args:
+            labels: The labels.
+            video: The video with frames in which tracks will be changed.
+            frame_range: Tuple of (start, end) frame indexes.
+        """
+        return [
+            (lf, instance, instance.track)
+            for lf in labels.find(video, frame_idx=range(*frame_range))
+            for instance in lf
+        ]
+
+    @classmethod
+    def diff(
+        cls, snapshot: List[Tuple[LabeledFrame, Instance, Optional[Track]]]
+    ) -> Optional["TracksChanged"]:
+        """Returns change from snapshot to current tracks, or None if no change."""
+        changed = [
+            (lf, instance, old_track)
+            for lf, instance, old_track in snapshot
+            if instance.track is not old_track
+        ]
+
+        if not changed:
+            return None
+
+        return cls(
+            items=[(lf, instance) for lf, instance, _ in changed],
+            old_tracks=[old_track for _, _, old_track in changed],
+            new_tracks=[instance.track for _, instance, _ in changed],
+        )
+
+    @property
+    def frames(self) -> Optional[Set[FrameKey]]:
+        """The (video, frame index) keys for the frames which changed."""
+        return _frame_keys(lf for lf, _ in self.items)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by change."""
+        return OBJECT_REF_BYTES * 3 * len(self.items)
+
+    def apply(self, labels: Labels):
+        _set_tracks(labels, self.items, self.new_tracks)
+
+    def revert(self, labels: Labels):
+        _set_tracks(labels, self.items, self.old_tracks)
+
+
+@attr.s(auto_attribs=True, eq=False)
+class TrackAdded:
+    """A new track which was added to labels for a video."""
+
+    video: Video
+    track: Track
+
+    @property
+    def frames(self) -> Optional[Set[FrameKey]]:
+        """None, since this changes list of tracks rather than frames."""
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by change."""
+        return OBJECT_REF_BYTES
+
+    def apply(self, labels: Labels):
+        labels.add_track(self.video, self.track)
+
+    def revert(self, labels: Labels):
+        labels.tracks.remove(self.track)
+        labels.get_track_occupancy(self.video).pop(self.track, None)
+
+
+@attr.s(auto_attribs=True, eq=False)
+class TrackRenamed:
+    """Change to the name of a track."""
+
+    track: Track
+    old_name: str
+    new_name: str
+
+    @property
+    def frames(self) -> Optional[Set[FrameKey]]:
+        """None, since this changes list of tracks rather than frames."""
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by change."""
+        return OBJECT_REF_BYTES
+
+    def apply(self, labels: Labels):
+        self.track.name = self.new_name
+
+    def revert(self, labels: Labels):
+        self.track.name = self.old_name
+
+
+@attr.s(auto_attribs=True, eq=False)
+class ChangeSet:
+    """
+    All the changes made by a single command.
+
+    Attributes:
+        name: The name of the command (or other description of changes).
+        changes: List of changes, in the order in which they were made.
+        topics: The `UpdateTopic` items to signal after the changes are
+            undone or redone.
+        undoable: Whether changes can be undone. This is False if the
+            command made changes to labels which weren't recorded.
+    """
+
+    name: str = ""
+    changes: list = attr.ib(factory=list)
+    topics: list = attr.ib(factory=list)
+    undoable: bool = True
+
+    @property
+    def frames(self) -> Optional[Set[FrameKey]]:
+        """The (video, frame index) keys for changed frames, or None if unknown."""
+        if not self.undoable:
+            return None
+        frames = set()
+        for change in self.changes:
+            change_frames = change.frames
+            if change_frames is None:
+                return None
+            frames.update(change_frames)
+        return frames
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by changes."""
+        return sum(change.nbytes for change in self.changes)
+
+    def apply(self, labels: Labels):
+        for change in self.changes:
+            change.apply(labels)
+
+    def revert(self, labels: Labels):
+        for change in reversed(self.changes):
+            change.revert(labels)
+
+
+@attr.s(auto_attribs=True, eq=False)
+class ChangeStack:
+    """
+    History of changes to labels, with support for undo/redo.
+
+    Attributes:
+        max_bytes: Approximate memory cap for stored changes. The oldest
+            changes are discarded (and can no longer be undone) when the
+            cap is exceeded.
+    """
+
+    max_bytes: int = 64 * 1024 * 1024
+    _entries: List[ChangeSet] = attr.ib(factory=list)
+    _cursor: int = 0
+    _savepoint: Optional[int] = 0
+    _nbytes: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by stored changes."""
+        return self._nbytes
+
+    @property
+    def has_changes(self) -> bool:
+        """Whether there are changes since the last savepoint."""
+        return self._cursor != self._savepoint
+
+    @property
+    def can_undo(self) -> bool:
+        return self._cursor > 0 and self._entries[self._cursor - 1].undoable
+
+    @property
+    def can_redo(self) -> bool:
+        return self._cursor < len(self._entries)
+
+    @property
+    def undo_name(self) -> str:
+        """Name of change set which would be undone."""
+        return self._entries[self._cursor - 1].name if self.can_undo else ""
+
+    @property
+    def redo_name(self) -> str:
+        """Name of change set which would be redone."""
+        return self._entries[self._cursor].name if self.can_redo else ""
+
+    def push(self, change_set: ChangeSet):
+        """Adds changes which have just been made (discarding any redo)."""
+        for discarded in self._entries[self._cursor :]:
+            self._nbytes -= discarded.nbytes
+        del self._entries[self._cursor :]
+
+        if self._savepoint is not None and self._savepoint > self._cursor:
+            # Saved state can no longer be reached by undo or redo.
+            self._savepoint = None
+
+        self._entries.append(change_set)
+        self._cursor += 1
+        self._nbytes += change_set.nbytes
+
+        # Discard oldest changes to stay within memory cap.
+        while self._nbytes > self.max_bytes and len(self._entries) > 1:
+            discarded = self._entries.pop(0)
+            self._nbytes -= discarded.nbytes
+            self._cursor -= 1
+            if self._savepoint is not None:
+                self._savepoint = self._savepoint - 1 if self._savepoint else None
+
+    def undo(self, labels: Labels) -> Optional[ChangeSet]:
+        """Reverts most recent changes, returning them (or None)."""
+        if not self.can_undo:
+            return None
+        self._cursor -= 1
+        change_set = self._entries[self._cursor]
+        change_set.revert(labels)
+        return change_set
+
+    def redo(self, labels: Labels) -> Optional[ChangeSet]:
+        """Applies most recently undone changes, returning them (or None)."""
+        if not self.can_redo:
+            return None
+        change_set = self._entries[self._cursor]
+        change_set.apply(labels)
+        self._cursor += 1
+        return change_set
+
+    def savepoint(self):
+        """Marks current state as saved."""
+        self._savepoint = self._cursor
+
+    def clear(self):
+        """Removes all changes (and marks current state as saved)."""
+        self._entries = []
+        self._cursor = 0
+        self._savepoint = 0
+        self._nbytes = 0
+
+    def changed_frames(self) -> Optional[Set[FrameKey]]:
+        """
+        Returns frames which changed since last savepoint.
+
+        This can be used to only write changed frames, e.g., when saving
+        incrementally.
+
+        Returns:
+            Set of (video, frame index) tuples, or None if we can't determine
+            which frames have changed (e.g., if changes were made which can't
+            be undone, or if saved state is no longer in the history), in
+            which case all frames should be treated as changed.
+        """
+        if self._savepoint is None:
+            return None
+
+        start, end = sorted((self._savepoint, self._cursor))
+        frames = set()
+        for change_set in self._entries[start:end]:
+            change_frames = change_set.frames
+            if change_frames is None:
+                return None
+            frames.update(change_frames)
+        return frames
+
+
+def remove_instances(
+    labels: Labels, lf_inst_list: List[Tuple[LabeledFrame, Instance]]
+) -> Optional[InstancesRemoved]:
+    """
+    Removes instances (and any frames left empty), recording the change.
+
+    Args:
+        labels: The labels.
+        lf_inst_list: List of (labeled frame, instance) tuples to remove.
+
+    Returns:
+        The `InstancesRemoved` change, or None if there was nothing to remove.
+    """
+    if not lf_inst_list:
+        return None
+
+    items = [(lf, inst, lf.instances.index(inst)) for lf, inst in lf_inst_list]
+    removed_frames = []
+
+    for lf, inst in lf_inst_list:
+        labels.remove_instance(lf, inst, in_transaction=True)
+        if not lf.instances:
+            labels.remove(lf)
+            removed_frames.append(lf)
+
+    # Update caches since we skipped doing this after each deletion
+    labels.update_cache()
+
+    return InstancesRemoved(items=items, removed_frames=removed_frames)
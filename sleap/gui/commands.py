@@ -9,7 +9,7 @@ import os
 from abc import ABC
 from enum import Enum
 from pathlib import PurePath
-from typing import Callable, Dict, Iterator, List, Optional, Type, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Type, Tuple
 
 import numpy as np
 
@@ -17,18 +17,32 @@ from PySide2 import QtCore, QtWidgets
 
 from PySide2.QtWidgets import QMessageBox
 
+from sleap.gui.changes import (
+    ChangeSet,
+    ChangeStack,
+    InstancesAdded,
+    InstancesRemoved,
+    PointsChanged,
+    TrackAdded,
+    TrackRenamed,
+    TracksChanged,
+    remove_instances,
+)
 from sleap.gui.dialogs.delete import DeleteDialog
 from sleap.skeleton import Skeleton
 from sleap.instance import Instance, PredictedInstance, Point, Track, LabeledFrame
 from sleap.io.video import Video
 from sleap.io.dataset import Labels
+from sleap.io.format.adaptor import OperationCancelled
 from sleap.gui.dialogs.importvideos import ImportVideos
 from sleap.gui.dialogs.filedialog import FileDialog
 from sleap.gui.dialogs.missingfiles import MissingFilesDialog
 from sleap.gui.dialogs.merge import MergeDialog
 from sleap.gui.dialogs.message import MessageDialog
+from sleap.gui.dialogs.progress import run_with_progress
 from sleap.gui.suggestions import VideoFrameSuggestions
 from sleap.gui.state import GuiState
+from sleap.util import replace_file_when_done
 
 
 OPEN_IN_NEW = True
@@ -54,10 +68,13 @@ class AppCommand(ABC):
         topics: List of `UpdateTopic` items. Override this to indicate what
             should be updated after command is executed.
         does_edits: Whether command will modify data that could be saved.
+        undoable: Whether command records all of its edits (using
+            :meth:`CommandContext.record_change`) so they can be undone.
     """
 
     topics = []
     does_edits = False
+    undoable = False
 
     def execute(self, context: "CommandContext", params=None):
         """Entry point for running command.
@@ -114,11 +131,17 @@ class AppCommand(ABC):
 
         Don't override this method!
         """
-        cls.do_action(context, params)
+        if cls.does_edits:
+            started = context.changestack_start(cls.__name__, cls.topics, cls.undoable)
+            try:
+                cls.do_action(context, params)
+            finally:
+                if started:
+                    context.changestack_end()
+        else:
+            cls.do_action(context, params)
         if cls.topics:
             context.signal_update(cls.topics)
-        if cls.does_edits:
-            context.changestack_push(cls.__name__)
 
 
 @attr.s(auto_attribs=True)
@@ -142,7 +165,8 @@ class CommandContext(object):
     app: "MainWindow"
 
     update_callback: Optional[Callable] = None
-    _change_stack: List = attr.ib(default=attr.Factory(list))
+    _change_stack: ChangeStack = attr.ib(default=attr.Factory(ChangeStack))
+    _pending_changes: Optional[ChangeSet] = attr.ib(default=None, init=False)
 
     @classmethod
     def from_labels(cls, labels: Labels):
@@ -160,25 +184,128 @@ class CommandContext(object):
         if callable(self.update_callback):
             self.update_callback(what)
 
+    def changestack_start(
+        self, name: str, topics: List[UpdateTopic] = None, undoable: bool = True
+    ) -> bool:
+        """
+        Starts recording changes made by command.
+
+        If we're already recording changes (e.g., a command executed by
+        another command), then changes are added to the outer command.
+
+        Args:
+            name: The name of the command.
+            topics: `UpdateTopic` items to signal after undo or redo.
+            undoable: Whether the command records all of its changes.
+
+        Returns:
+            True if we started recording, False if already recording.
+        """
+        if self._pending_changes is not None:
+            self._pending_changes.topics.extend(topics or [])
+            self._pending_changes.undoable &= undoable
+            return False
+
+        self._pending_changes = ChangeSet(
+            name=name, topics=list(topics or []), undoable=undoable
+        )
+        return True
+
+    def changestack_end(self):
+        """Finishes recording changes and adds them to stack of changes."""
+        change_set = self._pending_changes
+        if change_set is None:
+            return
+        self._pending_changes = None
+
+        # Commands which record their changes but didn't change anything
+        # don't need to be added to the stack.
+        if change_set.undoable and not change_set.changes:
+            return
+
+        self._change_stack.push(change_set)
+        self.state["has_changes"] = self._change_stack.has_changes
+
+    def record_change(self, change):
+        """
+        Records change (with data needed to undo it) made by current command.
+
+        Args:
+            change: The change, e.g., `InstancesAdded` or `PointsChanged`.
+                If None, then nothing is recorded.
+        """
+        if change is None:
+            return
+        if self._pending_changes is not None:
+            self._pending_changes.changes.append(change)
+        else:
+            self._change_stack.push(ChangeSet(changes=[change]))
+            self.state["has_changes"] = self._change_stack.has_changes
+
     def changestack_push(self, change: str = ""):
-        """Adds to stack of changes made by user."""
-        # Currently the change doesn't store any data, and we're only using this
-        # to determine if there are unsaved changes. Eventually we could use this
-        # to support undo/redo.
-        self._change_stack.append(change)
-        # print(len(self._change_stack))
+        """Adds to stack of changes made by user which can't be undone."""
+        if self._pending_changes is not None:
+            self._pending_changes.undoable = False
+        else:
+            self._change_stack.push(ChangeSet(name=change, undoable=False))
         self.state["has_changes"] = True
 
     def changestack_savepoint(self):
         """Marks that project was just saved."""
-        self.changestack_push("SAVE")
+        self._change_stack.savepoint()
         self.state["has_changes"] = False
 
     def changestack_clear(self):
         """Clears stack of changes."""
-        self._change_stack = list()
+        self._change_stack.clear()
         self.state["has_changes"] = False
 
+    @property
+    def can_undo(self) -> bool:
+        return self._change_stack.can_undo
+
+    @property
+    def can_redo(self) -> bool:
+        return self._change_stack.can_redo
+
+    def changed_frames(self) -> Optional[Set[Tuple[Video, int]]]:
+        """
+        Returns (video, frame index) for frames changed since last save.
+
+        Returns None if we can't determine which frames changed, in which case
+        all frames should be treated as changed.
+        """
+        return self._change_stack.changed_frames()
+
+    def undo(self):
+        """Undoes most recent changes."""
+        self._undo_or_redo(self._change_stack.undo)
+
+    def redo(self):
+        """Redoes most recently undone changes."""
+        self._undo_or_redo(self._change_stack.redo)
+
+    def _undo_or_redo(self, func: Callable):
+        if self._pending_changes is not None:
+            return
+        change_set = func(self.labels)
+        if change_set is None:
+            return
+
+        # Selected instance may have been removed.
+        self.state["instance"] = None
+        self.state["has_changes"] = self._change_stack.has_changes
+
+        # Changes may be to frames other than the current frame, in which case
+        # we update everything for the project (e.g., all suggestion rows)
+        # rather than just for the current frame.
+        topics = [topic for topic in change_set.topics if topic != UpdateTopic.frame]
+        topics.append(UpdateTopic.project_instances)
+        current_frame = (self.state["video"], self.state["frame_idx"])
+        if change_set.frames is not None and change_set.frames <= {current_frame}:
+            topics.append(UpdateTopic.frame)
+        self.signal_update(topics)
+
     def execute(self, command: Type[AppCommand], **kwargs):
         """Execute command in this context, passing named arguments."""
         command().execute(context=self, params=kwargs)
@@ -385,13 +512,17 @@ class CommandContext(object):
         )
 
     def setPointLocations(
-        self, instance: Instance, nodes_locations: Dict["Node", Tuple[int, int]]
+        self,
+        instance: Instance,
+        nodes_locations: Dict["Node", Tuple[int, int]],
+        complete_nodes: Optional[List["Node"]] = None,
     ):
-        """Sets locations for node(s) for an instance."""
+        """Sets locations for node(s) for an instance (and marks complete)."""
         self.execute(
             SetInstancePointLocations,
             instance=instance,
             nodes_locations=nodes_locations,
+            complete_nodes=complete_nodes,
         )
 
     def setInstancePointVisibility(
@@ -683,15 +814,50 @@ class ImportAnalysisFile(AppCommand):
 
 class SaveProjectAs(AppCommand):
     @staticmethod
-    def _try_save(context, labels: Labels, filename: str):
-        """Helper function which attempts save and handles errors."""
+    def _try_save(
+        context,
+        labels: Labels,
+        filename: str,
+        changed_frames: Optional[Set[Tuple[Video, int]]] = None,
+    ):
+        """
+        Helper function which attempts save and handles errors.
+
+        If `changed_frames` is given, we first try to update the existing file
+        in place with just these frames (if the file format supports this).
+        """
+        from sleap.io.format.hdf5 import LabelsV1Adaptor
+
         success = False
+        basename = os.path.basename(filename)
         try:
-            Labels.save_file(labels=labels, filename=filename)
+            saved = False
+            if changed_frames is not None:
+                saved = run_with_progress(
+                    LabelsV1Adaptor.write_changed_frames,
+                    message=f"Saving {basename}...",
+                    kwargs=dict(
+                        filename=filename, labels=labels, changed_frames=changed_frames
+                    ),
+                    parent=context.app,
+                )
+            if not saved:
+                # Save to temporary file and then replace the original, so that
+                # failed or cancelled saves don't leave the original incomplete.
+                with replace_file_when_done(filename) as tmp_filename:
+                    run_with_progress(
+                        Labels.save_file,
+                        message=f"Saving {basename}...",
+                        kwargs=dict(labels=labels, filename=tmp_filename),
+                        parent=context.app,
+                    )
             success = True
             # Mark savepoint in change stack
             context.changestack_savepoint()
 
+        except OperationCancelled:
+            pass
+
         except Exception as e:
             message = f"An error occured when attempting to save:\n {e}\n\n"
             message += "Try saving your project with a different filename or in a different format."
@@ -761,6 +927,22 @@ class ExportAnalysisFile(AppCommand):
 
 
 class SaveProject(SaveProjectAs):
+    @classmethod
+    def do_action(cls, context: CommandContext, params: dict):
+        from sleap.io.format.hdf5 import LabelsV1Adaptor
+
+        filename = params["filename"]
+
+        # If we're saving over the file we loaded (or last saved), just
+        # write the frames which have changed.
+        changed_frames = None
+        is_same_file = filename == context.state["filename"]
+        if is_same_file and LabelsV1Adaptor().can_write_filename(filename):
+            changed_frames = context.changed_frames()
+
+        if cls._try_save(context, context.state["labels"], filename, changed_frames):
+            context.state["filename"] = filename
+
     @classmethod
     def ask(cls, context: CommandContext, params: dict) -> bool:
         if context.state["filename"] is not None:
@@ -1089,16 +1271,19 @@ class AddVideo(EditCommand):
 
 
 class ReplaceVideo(EditCommand):
-    topics = [UpdateTopic.video]
+    topics = [UpdateTopic.video, UpdateTopic.frame]
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
         new_paths = params["new_video_paths"]
 
-        for video, new_path in zip(context.labels.videos, new_paths):
-            if new_path != video.backend.filename:
-                video.backend.filename = new_path
-                video.backend.reset()
+        # Don't load frames while backends are changing, and drop frames cached
+        # from the old video files.
+        with context.app.player.pausedFrameLoading():
+            for video, new_path in zip(context.labels.videos, new_paths):
+                if new_path != video.backend.filename:
+                    video.backend.filename = new_path
+                    video.backend.reset()
 
     @staticmethod
     def ask(context: CommandContext, params: dict) -> bool:
@@ -1303,6 +1488,7 @@ class DeleteEdge(EditCommand):
 
 class InstanceDeleteCommand(EditCommand):
     topics = [UpdateTopic.project_instances]
+    undoable = True
 
     @staticmethod
     def get_frame_instance_list(context: CommandContext, params: dict):
@@ -1335,16 +1521,7 @@ class InstanceDeleteCommand(EditCommand):
     @staticmethod
     def _do_deletion(context: CommandContext, lf_inst_list: List[int]):
         # Delete the instances
-        for lf, inst in lf_inst_list:
-            context.labels.remove_instance(lf, inst, in_transaction=True)
-            if not lf.instances:
-                context.labels.remove(lf)
-
-        # Update caches since we skipped doing this after each deletion
-        context.labels.update_cache()
-
-        # Update visuals
-        context.changestack_push("delete instances")
+        context.record_change(remove_instances(context.labels, lf_inst_list))
 
     @classmethod
     def do_action(cls, context: CommandContext, params: dict):
@@ -1509,6 +1686,7 @@ class DeleteFrameLimitPredictions(InstanceDeleteCommand):
 
 class TransposeInstances(EditCommand):
     topics = [UpdateTopic.project_instances, UpdateTopic.tracks]
+    undoable = True
 
     @classmethod
     def do_action(cls, context: CommandContext, params: dict):
@@ -1521,9 +1699,13 @@ class TransposeInstances(EditCommand):
         old_track, new_track = instances[0].track, instances[1].track
         if old_track is not None and new_track is not None:
             frame_range = (context.state["frame_idx"], context.state["video"].frames)
+            tracks = TracksChanged.snapshot(
+                context.labels, context.state["video"], frame_range
+            )
             context.labels.track_swap(
                 context.state["video"], new_track, old_track, frame_range
             )
+            context.record_change(TracksChanged.diff(tracks))
 
     @classmethod
     def ask_and_do(cls, context: CommandContext, params: dict):
@@ -1555,6 +1737,7 @@ class TransposeInstances(EditCommand):
 
 class DeleteSelectedInstance(EditCommand):
     topics = [UpdateTopic.frame, UpdateTopic.project_instances, UpdateTopic.suggestions]
+    undoable = True
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
@@ -1562,7 +1745,10 @@ class DeleteSelectedInstance(EditCommand):
         if selected_inst is None:
             return
 
-        context.labels.remove_instance(context.state["labeled_frame"], selected_inst)
+        lf = context.state["labeled_frame"]
+        index = lf.instances.index(selected_inst)
+        context.labels.remove_instance(lf, selected_inst)
+        context.record_change(InstancesRemoved(items=[(lf, selected_inst, index)]))
 
 
 class DeleteSelectedInstanceTrack(EditCommand):
@@ -1571,6 +1757,7 @@ class DeleteSelectedInstanceTrack(EditCommand):
         UpdateTopic.tracks,
         UpdateTopic.suggestions,
     ]
+    undoable = True
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
@@ -1579,29 +1766,48 @@ class DeleteSelectedInstanceTrack(EditCommand):
             return
 
         track = selected_inst.track
-        context.labels.remove_instance(context.state["labeled_frame"], selected_inst)
+        lf = context.state["labeled_frame"]
+        removed = [(lf, selected_inst, lf.instances.index(selected_inst))]
 
         if track is not None:
             # remove any instance on this track
             for lf in context.labels.find(context.state["video"]):
-                track_instances = filter(lambda inst: inst.track == track, lf.instances)
-                for inst in track_instances:
-                    context.labels.remove_instance(lf, inst)
+                for index, inst in enumerate(lf.instances):
+                    if inst.track == track and inst is not selected_inst:
+                        removed.append((lf, inst, index))
+
+        # Get all positions (for undo) before removing any instances, since
+        # removing an instance shifts the positions of later instances in frame.
+        for lf, inst, _ in removed:
+            context.labels.remove_instance(lf, inst)
+
+        context.record_change(InstancesRemoved(items=removed))
 
 
 class DeleteDialogCommand(EditCommand):
     topics = [
         UpdateTopic.project_instances,
     ]
+    undoable = True
 
-    @staticmethod
-    def ask_and_do(context: CommandContext, params: dict):
-        if DeleteDialog(context).exec_():
-            context.signal_update([UpdateTopic.project_instances])
+    @classmethod
+    def ask_and_do(cls, context: CommandContext, params: dict):
+        # The dialog deletes the instances (and records the change) when
+        # accepted, so record changes as part of this command while it's open.
+        started = context.changestack_start(cls.__name__, cls.topics, cls.undoable)
+        try:
+            accepted = DeleteDialog(context).exec_()
+        finally:
+            if started:
+                context.changestack_end()
+
+        if accepted:
+            context.signal_update(cls.topics)
 
 
 class AddTrack(EditCommand):
     topics = [UpdateTopic.tracks]
+    undoable = True
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
@@ -1612,12 +1818,14 @@ class AddTrack(EditCommand):
         new_track = Track(spawned_on=context.state["frame_idx"], name=str(next_number))
 
         context.labels.add_track(context.state["video"], new_track)
+        context.record_change(TrackAdded(video=context.state["video"], track=new_track))
 
         context.execute(SetSelectedInstanceTrack, new_track=new_track)
 
 
 class SetSelectedInstanceTrack(EditCommand):
     topics = [UpdateTopic.tracks]
+    undoable = True
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
@@ -1631,6 +1839,11 @@ class SetSelectedInstanceTrack(EditCommand):
         # When setting track for an instance that doesn't already have a track set,
         # just set for selected instance.
         if old_track is None:
+            tracks = TracksChanged.snapshot(
+                context.labels,
+                context.state["video"],
+                (context.state["frame_idx"], context.state["frame_idx"] + 1),
+            )
             # Move anything already in the new track out of it
             new_track_instances = context.labels.find_track_occupancy(
                 video=context.state["video"],
@@ -1663,21 +1876,30 @@ class SetSelectedInstanceTrack(EditCommand):
                 )
 
             # Do the swap
+            tracks = TracksChanged.snapshot(
+                context.labels, context.state["video"], frame_range
+            )
             context.labels.track_swap(
                 context.state["video"], new_track, old_track, frame_range
             )
 
+        context.record_change(TracksChanged.diff(tracks))
+
         # Make sure the originally selected instance is still selected
         context.state["instance"] = selected_instance
 
 
 class SetTrackName(EditCommand):
     topics = [UpdateTopic.tracks, UpdateTopic.frame]
+    undoable = True
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
         track = params["track"]
         name = params["name"]
+        context.record_change(
+            TrackRenamed(track=track, old_name=track.name, new_name=name)
+        )
         track.name = name
 
 
@@ -1686,16 +1908,24 @@ class GenerateSuggestions(EditCommand):
 
     @classmethod
     def do_action(cls, context: CommandContext, params: dict):
+        def show_suggestions(suggestions):
+            # Called in GUI thread as suggestions for each video are generated
+            context.labels.set_suggestions(suggestions)
+            context.signal_update(cls.topics)
 
-        win = MessageDialog("Generating list of suggested frames...", context.app)
-
-        new_suggestions = VideoFrameSuggestions.suggest(
-            labels=context.labels, params=params
-        )
-
-        context.labels.set_suggestions(new_suggestions)
-
-        win.hide()
+        # Generate suggestions in background so GUI shows progress (and can
+        # show suggestions for each video as soon as they're ready).
+        try:
+            run_with_progress(
+                VideoFrameSuggestions.suggest_by_video,
+                message="Generating list of suggested frames...",
+                kwargs=dict(params=params, labels=context.labels),
+                main_thread_kwargs=dict(results_callback=show_suggestions),
+                parent=context.app,
+            )
+        except OperationCancelled:
+            # Keep suggestions for videos which were already done
+            pass
 
 
 class MergeProject(EditCommand):
@@ -1733,6 +1963,7 @@ class MergeProject(EditCommand):
 
 class AddInstance(EditCommand):
     topics = [UpdateTopic.frame, UpdateTopic.project_instances, UpdateTopic.suggestions]
+    undoable = True
 
     @staticmethod
     def get_previous_frame_index(context: CommandContext) -> Optional[int]:
@@ -1872,10 +2103,20 @@ class AddInstance(EditCommand):
             new_instance.track = copy_instance.track
 
         # Add the instance
-        context.labels.add_instance(context.state["labeled_frame"], new_instance)
-
-        if context.state["labeled_frame"] not in context.labels.labels:
-            context.labels.append(context.state["labeled_frame"])
+        lf = context.state["labeled_frame"]
+        context.labels.add_instance(lf, new_instance)
+
+        new_frames = []
+        if lf not in context.labels.labels:
+            context.labels.append(lf)
+            new_frames.append(lf)
+
+        context.record_change(
+            InstancesAdded(
+                items=[(lf, new_instance, lf.instances.index(new_instance))],
+                new_frames=new_frames,
+            )
+        )
 
 
 class SetInstancePointLocations(EditCommand):
@@ -1890,19 +2131,28 @@ class SetInstancePointLocations(EditCommand):
         nodes_locations: A dictionary of data to set
         * keys are nodes (or node names)
         * values are (x, y) coordinate tuples.
+        complete_nodes: Nodes (or node names) to mark as complete, i.e.,
+            checked by user (optional).
     """
 
     topics = []
+    undoable = True
 
     @classmethod
     def do_action(cls, context: "CommandContext", params: dict):
         instance = params["instance"]
         nodes_locations = params["nodes_locations"]
+        complete_nodes = params.get("complete_nodes") or []
 
+        old_points = PointsChanged.snapshot(instance)
         for node, (x, y) in nodes_locations.items():
             if node in instance:
                 instance[node].x = x
                 instance[node].y = y
+        for node in complete_nodes:
+            if node in instance:
+                instance[node].complete = True
+        context.record_change(PointsChanged.diff(instance, old_points))
 
 
 class SetInstancePointVisibility(EditCommand):
@@ -1919,6 +2169,7 @@ class SetInstancePointVisibility(EditCommand):
     """
 
     topics = []
+    undoable = True
 
     @classmethod
     def do_action(cls, context: "CommandContext", params: dict):
@@ -1926,18 +2177,23 @@ class SetInstancePointVisibility(EditCommand):
         node = params["node"]
         visible = params["visible"]
 
+        old_points = PointsChanged.snapshot(instance)
         instance[node].visible = visible
+        context.record_change(PointsChanged.diff(instance, old_points))
 
 
 class AddMissingInstanceNodes(EditCommand):
     topics = [UpdateTopic.frame]
+    undoable = True
 
     @classmethod
     def do_action(cls, context: CommandContext, params: dict):
         instance = params["instance"]
         visible = params.get("visible", False)
 
+        old_points = PointsChanged.snapshot(instance)
         cls.add_best_nodes(context, instance, visible)
+        context.record_change(PointsChanged.diff(instance, old_points))
 
     @classmethod
     def add_best_nodes(cls, context, instance, visible):
@@ -2027,6 +2283,7 @@ class AddMissingInstanceNodes(EditCommand):
 
 class AddUserInstancesFromPredictions(EditCommand):
     topics = [UpdateTopic.frame, UpdateTopic.project_instances]
+    undoable = True
 
     @staticmethod
     def make_instance_from_predicted_instance(
@@ -2070,5 +2327,15 @@ class AddUserInstancesFromPredictions(EditCommand):
             )
 
         # Add the instances
+        lf = context.state["labeled_frame"]
         for new_instance in new_instances:
-            context.labels.add_instance(context.state["labeled_frame"], new_instance)
+            context.labels.add_instance(lf, new_instance)
+
+        if new_instances:
+            context.record_change(
+                InstancesAdded(
+                    items=[
+                        (lf, inst, lf.instances.index(inst)) for inst in new_instances
+                    ]
+                )
+            )
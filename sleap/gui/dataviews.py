@@ -7,8 +7,6 @@ from PySide2 import QtCore, QtWidgets, QtGui
 import numpy as np
 import os
 
-from operator import itemgetter
-
 from typing import Any, Callable, Dict, List, Optional, Type
 
 from sleap.gui.state import GuiState
@@ -19,9 +17,54 @@ from sleap.instance import LabeledFrame, Instance
 from sleap.skeleton import Skeleton
 
 
+def string_safe_sort_keys(values: list) -> np.ndarray:
+    """
+    Returns array of keys for sorting values which may not all be numbers.
+
+    Values are converted to float if possible; strings which aren't numbers
+    (e.g., "") are sorted before all numbers, and other values (e.g., tuples)
+    are sorted as they are.
+    """
+    keys = []
+    for val in values:
+        try:
+            keys.append(float(val))
+        except ValueError:
+            keys.append(-np.inf)
+        except TypeError:
+            keys.append(val)
+
+    if all(isinstance(key, float) for key in keys):
+        return np.array(keys, dtype=float)
+
+    key_array = np.empty(len(keys), dtype=object)
+    for i, key in enumerate(keys):
+        key_array[i] = key
+    return key_array
+
+
+def stable_argsort(keys: np.ndarray, reverse: bool = False) -> np.ndarray:
+    """
+    Returns indices which (stably) sort keys.
+
+    Items with equal keys keep their relative order, in both ascending and
+    reverse (descending) order, as for `list.sort`.
+    """
+    if keys.dtype != object:
+        return np.argsort(-keys if reverse else keys, kind="stable")
+    return np.array(
+        sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse), dtype=int
+    )
+
+
 class GenericTableModel(QtCore.QAbstractTableModel):
     """Generic table model to show a list of properties for some items.
 
+    The data shown for each row is built (by `item_to_data`, if the subclass
+    defines it) only when the row is first needed, and rows are added to the
+    model in batches as the view scrolls (see `canFetchMore` and `fetchMore`),
+    so that tables for large projects can be shown quickly.
+
     Args:
         properties: The list of property names (table columns).
         items: The list of items with said properties (rows).
@@ -29,6 +72,7 @@ class GenericTableModel(QtCore.QAbstractTableModel):
     """
 
     properties = None
+    fetch_batch_size: int = 500
 
     def __init__(
         self,
@@ -48,27 +92,23 @@ class GenericTableModel(QtCore.QAbstractTableModel):
 
     @property
     def items(self):
-        """Gets or sets list of items to show in table."""
-        return self._data
+        """Gets or sets list of items to show in table.
+
+        Getting the items returns the original items (in table order); data
+        for rows is only built as rows are shown.
+        """
+        return self.original_items
 
     @items.setter
     def items(self, obj):
-        if not obj:
-            self._data = []
-            return
-
-        self.obj = obj
-        item_list = self.object_to_items(obj)
-
         self.beginResetModel()
-        if hasattr(self, "item_to_data"):
-            self._data = []
-            for item in item_list:
-                item_data = self.item_to_data(obj, item)
-                item_data["_original_item"] = item
-                self._data.append(item_data)
-        else:
-            self._data = item_list
+        self.obj = obj
+        self._original_items = list(self.object_to_items(obj)) if obj else []
+        self._item_data = [None] * len(self._original_items)
+        self._order = np.arange(len(self._original_items))
+        self._item_rows = None
+        self._sort_values = dict()
+        self._loaded_row_count = min(len(self._order), self.fetch_batch_size)
         self.endResetModel()
 
     @property
@@ -76,10 +116,90 @@ class GenericTableModel(QtCore.QAbstractTableModel):
         """
         Gets the original items (rather than the dictionary we build from it).
         """
-        try:
-            return [datum["_original_item"] for datum in self._data]
-        except:
-            return self._data
+        return [self._original_items[item_idx] for item_idx in self._order]
+
+    def get_item(self, row: int) -> Any:
+        """Returns the original item shown in given row."""
+        return self._original_items[self._order[row]]
+
+    def get_item_row(self, item: Any) -> int:
+        """
+        Returns row for given item, loading rows into model up to that row.
+
+        Raises:
+            ValueError: If item isn't in table.
+        """
+        item_idx = self._original_items.index(item)
+        if self._item_rows is None:
+            self._item_rows = np.empty(len(self._order), dtype=int)
+            self._item_rows[self._order] = np.arange(len(self._order))
+        row = int(self._item_rows[item_idx])
+        self.fetch_to_row(row)
+        return row
+
+    def _get_item_data(self, item_idx: int) -> Any:
+        """Returns (cached) data for item with given index in item list."""
+        item_data = self._item_data[item_idx]
+        if item_data is None:
+            item = self._original_items[item_idx]
+            if hasattr(self, "item_to_data"):
+                item_data = self.item_to_data(self.obj, item)
+                item_data["_original_item"] = item
+            else:
+                item_data = item
+            self._item_data[item_idx] = item_data
+        return item_data
+
+    def _get_row_data(self, row: int) -> Any:
+        """Returns data for given row."""
+        return self._get_item_data(self._order[row])
+
+    def update_rows(self, rows: Optional[List[int]] = None):
+        """
+        Rebuilds data for given rows without resetting the model.
+
+        Use this when properties of items have changed but the list of items
+        hasn't.
+
+        Args:
+            rows: The rows to update; if None, then all rows are updated.
+        """
+        if rows is None:
+            rows = range(len(self._order))
+
+        rows = [row for row in rows if 0 <= row < len(self._order)]
+        if not rows:
+            return
+
+        for row in rows:
+            self._item_data[self._order[row]] = None
+        self._sort_values = dict()
+
+        # Only rows loaded into model need to be redrawn.
+        loaded_rows = [row for row in rows if row < self._loaded_row_count]
+        if loaded_rows:
+            self.dataChanged.emit(
+                self.index(min(loaded_rows), 0),
+                self.index(max(loaded_rows), self.columnCount() - 1),
+            )
+
+    def update_items(self, match: Callable[[Any], bool]) -> int:
+        """
+        Rebuilds data for items matching given function.
+
+        Args:
+            match: Function which takes item and returns whether to update it.
+
+        Returns:
+            Number of rows updated.
+        """
+        rows = [
+            row
+            for row, item_idx in enumerate(self._order)
+            if match(self._original_items[item_idx])
+        ]
+        self.update_rows(rows)
+        return len(rows)
 
     def get_item_color(self, item: Any, key: str):
         """Virtual method, returns color for given item."""
@@ -96,8 +216,8 @@ class GenericTableModel(QtCore.QAbstractTableModel):
         if idx >= self.rowCount():
             return None
 
-        item = self.items[idx]
         if role == QtCore.Qt.DisplayRole:
+            item = self._get_row_data(idx)
             if isinstance(item, dict) and key in item:
                 return item[key]
 
@@ -105,7 +225,7 @@ class GenericTableModel(QtCore.QAbstractTableModel):
                 return getattr(item, key)
 
         elif role == QtCore.Qt.ForegroundRole:
-            return self.get_item_color(self.original_items[idx], key)
+            return self.get_item_color(self.get_item(idx), key)
 
         return None
 
@@ -122,8 +242,31 @@ class GenericTableModel(QtCore.QAbstractTableModel):
         return False
 
     def rowCount(self, parent=None):
-        """Overrides Qt method, returns number of rows (items)."""
-        return len(self._data)
+        """Overrides Qt method, returns number of rows loaded into model."""
+        if parent is not None and parent.isValid():
+            return 0
+        return self._loaded_row_count
+
+    def canFetchMore(self, parent=None):
+        """Overrides Qt method, returns whether there are rows to load."""
+        if parent is not None and parent.isValid():
+            return False
+        return self._loaded_row_count < len(self._order)
+
+    def fetchMore(self, parent=None):
+        """Overrides Qt method, loads next batch of rows into model."""
+        if parent is not None and parent.isValid():
+            return
+        self.fetch_to_row(self._loaded_row_count + self.fetch_batch_size - 1)
+
+    def fetch_to_row(self, row: int):
+        """Loads rows into model up to (and including) given row."""
+        row = min(row, len(self._order) - 1)
+        if row < self._loaded_row_count:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), self._loaded_row_count, row)
+        self._loaded_row_count = row + 1
+        self.endInsertRows()
 
     def columnCount(self, parent=None):
         """Overrides Qt method, returns number of columns (attributes)."""
@@ -142,6 +285,43 @@ class GenericTableModel(QtCore.QAbstractTableModel):
 
         return None
 
+    def get_sort_values(self, prop: str) -> list:
+        """
+        Returns value of property for each item (in item list order).
+
+        Subclasses can override this to get values for sorting without
+        building all the data shown in table.
+        """
+        values = []
+        for item_idx in range(len(self._original_items)):
+            item_data = self._get_item_data(item_idx)
+            if isinstance(item_data, dict):
+                values.append(item_data[prop])
+            else:
+                values.append(getattr(item_data, prop))
+        return values
+
+    def get_sort_keys(self, prop: str, *other_props: str) -> np.ndarray:
+        """
+        Returns (cached) array of sort keys for each item (in item list order).
+
+        Values of single property which can be converted to float are sorted
+        as numbers (and other strings before any numbers); when sorting on
+        multiple properties, we sort on tuples of the raw values.
+        """
+        props = (prop,) + other_props
+        if props not in self._sort_values:
+            if other_props:
+                keys = np.empty(len(self._original_items), dtype=object)
+                for item_idx, key in enumerate(
+                    zip(*[self.get_sort_values(p) for p in props])
+                ):
+                    keys[item_idx] = key
+            else:
+                keys = string_safe_sort_keys(self.get_sort_values(prop))
+            self._sort_values[props] = keys
+        return self._sort_values[props]
+
     def sort(
         self,
         column_idx: int,
@@ -151,29 +331,27 @@ class GenericTableModel(QtCore.QAbstractTableModel):
         prop = self.properties[column_idx]
         reverse = order == QtCore.Qt.SortOrder.DescendingOrder
 
-        sort_function = itemgetter(prop)
+        props = (prop,)
         if prop in ("video", "frame"):
             if "video" in self.properties and "frame" in self.properties:
-                sort_function = itemgetter("video", "frame")
+                props = ("video", "frame")
 
-        def string_safe_sort(x):
-            sort_val = sort_function(x)
-            try:
-                return float(sort_val)
-            except ValueError:
-                return -np.inf
-            except TypeError:
-                return sort_val
+        keys = self.get_sort_keys(*props)
 
         self.beginResetModel()
-        self._data.sort(key=string_safe_sort, reverse=reverse)
+        self._set_order(self._order[stable_argsort(keys[self._order], reverse)])
         self.endResetModel()
 
+    def _set_order(self, order: np.ndarray):
+        """Sets order of items (rows) in table."""
+        self._order = order
+        self._item_rows = None
+
     def get_from_idx(self, index: QtCore.QModelIndex):
         """Gets item from QModelIndex."""
         if not index.isValid():
             return None, None
-        item = self.original_items[index.row()]
+        item = self.get_item(index.row())
         key = self.properties[index.column()]
         return item, key
 
@@ -245,18 +423,24 @@ class GenericTableView(QtWidgets.QTableView):
         if not item:
             return
 
-        idx = self.model().original_items.index(item)
+        idx = self.model().get_item_row(item)
         table_row_idx = self.model().createIndex(idx, 0)
         self.setCurrentIndex(table_row_idx)
 
         if self.row_name:
             self.state[self.name_prefix + self.row_name] = item
 
+    def selectRow(self, row: int):
+        """Selects row, first loading rows into model up to that row."""
+        if row is not None and row >= 0:
+            self.model().fetch_to_row(row)
+        super(GenericTableView, self).selectRow(row)
+
     def getSelectedRowItem(self):
         idx = self.currentIndex()
         if not idx.isValid():
             return None
-        return self.model().original_items[idx.row()]
+        return self.model().get_item(idx.row())
 
 
 class VideosTableModel(GenericTableModel):
@@ -370,13 +554,17 @@ class LabeledFrameTableModel(GenericTableModel):
 class SuggestionsTableModel(GenericTableModel):
     properties = ("video", "frame", "group", "labeled", "mean score")
 
+    def _video_string(self, video) -> str:
+        labels = self.context.labels
+        return f"{labels.videos.index(video)+1}: {os.path.basename(video.filename)}"
+
     def item_to_data(self, obj, item):
         labels = self.context.labels
         item_dict = dict()
 
         item_dict["SuggestionFrame"] = item
 
-        video_string = f"{labels.videos.index(item.video)+1}: {os.path.basename(item.video.filename)}"
+        video_string = self._video_string(item.video)
 
         item_dict["group"] = str(item.group + 1) if item.group is not None else ""
         item_dict["group_int"] = item.group if item.group is not None else -1
@@ -400,7 +588,28 @@ class SuggestionsTableModel(GenericTableModel):
 
         return item_dict
 
-    def sort(self, column_idx: int, order: QtCore.Qt.SortOrder):
+    def get_sort_values(self, prop: str) -> list:
+        """
+        Returns values for sorting without building data for unseen rows.
+        """
+        items = self._original_items
+        if prop == "video":
+            video_strings = {
+                video: self._video_string(video)
+                for video in set(item.video for item in items)
+            }
+            return [video_strings[item.video] for item in items]
+        if prop == "frame":
+            return [int(item.frame_idx) + 1 for item in items]
+        if prop == "group_int":
+            return [item.group if item.group is not None else -1 for item in items]
+        return super(SuggestionsTableModel, self).get_sort_values(prop)
+
+    def sort(
+        self,
+        column_idx: int,
+        order: QtCore.Qt.SortOrder = QtCore.Qt.SortOrder.AscendingOrder,
+    ):
         """Sorts table by given column and order."""
         prop = self.properties[column_idx]
         reverse = order == QtCore.Qt.SortOrder.DescendingOrder
@@ -408,44 +617,35 @@ class SuggestionsTableModel(GenericTableModel):
         if prop != "group":
             super(SuggestionsTableModel, self).sort(column_idx, order)
         else:
+            # Use group_int (int) instead of group (str).
+            group_ints = self.get_sort_keys("group_int")
+            order = self._order[stable_argsort(group_ints[self._order])]
 
-            if not reverse:
-                # Use group_int (int) instead of group (str).
-                self.beginResetModel()
-                self._data.sort(key=itemgetter("group_int"))
-                self.endResetModel()
-
-            else:
+            if reverse:
                 # Instead of a reverse sort order on groups, we'll interleave the
                 # items so that we get the earliest item from each group, then the
                 # second item from each group, and so on.
 
-                # Make a decorated list of items with positions in group (plus the
-                # secondary sort keys: group, video, and frame)
-                self._data.sort(key=itemgetter("group_int"))
-                decorated_data = []
-                last_group = object()
-                for item in self._data:
-                    if last_group != item["group_int"]:
-                        group_i = 0
-                    decorated_data.append(
-                        (group_i, item["group_int"], item["video"], item["frame"], item)
-                    )
-                    last_group = item["group_int"]
-                    group_i += 1
-
-                # Sort decorated list
-                decorated_data.sort()
-
-                # Undecorate the list and update table
-                self.beginResetModel()
-                self._data = [item for (*_, item) in decorated_data]
-                self.endResetModel()
+                # Find position of each item in its group, then sort on that
+                # (plus the secondary sort keys: group, video, and frame).
+                groups = group_ints[order]
+                group_starts = np.flatnonzero(np.diff(groups, prepend=np.nan) != 0)
+                group_sizes = np.diff(group_starts, append=len(groups))
+                group_i = np.arange(len(groups)) - np.repeat(group_starts, group_sizes)
+
+                video_frame_keys = self.get_sort_keys("video", "frame")[order]
+                decorated_keys = np.empty(len(order), dtype=object)
+                for i in range(len(order)):
+                    decorated_keys[i] = (group_i[i], groups[i], *video_frame_keys[i])
+                order = order[stable_argsort(decorated_keys)]
+
+            self.beginResetModel()
+            self._set_order(order)
+            self.endResetModel()
 
         # Update order in project (so order can be saved and affects what we
         # consider previous/next suggestion for navigation).
-        resorted_suggestions = [item["SuggestionFrame"] for item in self._data]
-        self.context.labels.set_suggestions(resorted_suggestions)
+        self.context.labels.set_suggestions(self.original_items)
 
 
 class SkeletonNodeModel(QtCore.QStringListModel):
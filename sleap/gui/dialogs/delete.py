@@ -1,3 +1,4 @@
+from sleap.gui.changes import remove_instances
 from sleap.gui.dialogs import formbuilder
 
 from PySide2 import QtCore, QtWidgets
@@ -183,17 +184,8 @@ class DeleteDialog(QtWidgets.QDialog):
         self._delete(lf_inst_list)
 
     def _delete(self, lf_inst_list):
-        # Delete the instances
-        for lf, inst in lf_inst_list:
-            self.context.labels.remove_instance(lf, inst, in_transaction=True)
-            if not lf.instances:
-                self.context.labels.remove(lf)
-
-        # Update caches since we skipped doing this after each deletion
-        self.context.labels.update_cache()
-
-        # Log update
-        self.context.changestack_push("delete instances")
+        # Delete the instances (and log update so it can be undone)
+        self.context.record_change(remove_instances(self.context.labels, lf_inst_list))
 
 
 if __name__ == "__main__":
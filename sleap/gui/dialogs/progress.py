@@ -0,0 +1,156 @@
+"""
+Module for running slow operations in a worker thread with progress dialog.
+
+The function runs in a background thread while the main thread keeps the GUI
+responsive and shows progress. The progress dialog is window-modal, and user
+input is held back until the dialog is shown, so the labels can't be edited
+while they're being saved or loaded.
+
+Example: ::
+
+   >>> labels = run_with_progress(
+   ...     Labels.load_file,
+   ...     message="Loading project...",
+   ...     kwargs=dict(filename=filename),
+   ...     main_thread_kwargs=dict(video_search=gui_video_callback),
+   ... )
+
+"""
+
+import functools
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from PySide2 import QtCore, QtWidgets
+
+
+def run_with_progress(
+    func: Callable,
+    message: str,
+    kwargs: Optional[Dict[str, Any]] = None,
+    main_thread_kwargs: Optional[Dict[str, Callable]] = None,
+    parent: Optional[QtWidgets.QWidget] = None,
+    poll_interval: float = 0.05,
+) -> Any:
+    """
+    Runs function in worker thread while showing (cancellable) progress.
+
+    Args:
+        func: The function to run. This will be called with keyword args
+            from `kwargs` and `main_thread_kwargs`, plus `progress_callback`,
+            a function which takes (done, total) counts and returns -1 if
+            the user has cancelled (as expected by the file format adaptors).
+        message: The message to show in progress dialog.
+        kwargs: Keyword arguments for func.
+        main_thread_kwargs: Keyword arguments for func which are callables
+            that must run in the main (GUI) thread, e.g., callbacks which
+            show dialogs. The worker thread will wait for each call.
+        parent: Parent widget for progress dialog.
+        poll_interval: How often (in seconds) to check on the worker thread
+            when there are no events from it.
+
+    Raises:
+        Any exception raised by func (e.g., `OperationCancelled` from file
+        format adaptors if user cancelled).
+
+    Returns:
+        The value returned by func.
+    """
+    # Messages from the worker thread to the main thread.
+    events = queue.Queue()
+    cancelled = threading.Event()
+
+    def progress_callback(done: int, total: int) -> Optional[int]:
+        events.put(("progress", (done, total)))
+        if cancelled.is_set():
+            # -1 signals user cancellation
+            return -1
+
+    def in_main_thread(callback: Callable) -> Callable:
+        @functools.wraps(callback)
+        def call_from_worker(*args, **kw):
+            result_queue = queue.Queue(maxsize=1)
+            call = functools.partial(callback, *args, **kw)
+            events.put(("call", (call, result_queue)))
+            result, exception = result_queue.get()
+            if exception is not None:
+                raise exception
+            return result
+
+        return call_from_worker
+
+    func_kwargs = dict(kwargs or dict())
+    for key, callback in (main_thread_kwargs or dict()).items():
+        func_kwargs[key] = in_main_thread(callback) if callable(callback) else callback
+    func_kwargs["progress_callback"] = progress_callback
+
+    def work():
+        try:
+            events.put(("done", (func(**func_kwargs), None)))
+        except BaseException as e:
+            events.put(("done", (None, e)))
+
+    worker = threading.Thread(target=work, daemon=True)
+    worker.start()
+
+    progress = QtWidgets.QProgressDialog(message, "Cancel", 0, 0, parent)
+    progress.setMinimumWidth(300)
+    progress.setMinimumDuration(500)
+    progress.setAutoReset(False)
+    progress.setAutoClose(False)
+    progress.setWindowModality(QtCore.Qt.WindowModal)
+
+    app = QtWidgets.QApplication.instance()
+    result, exception = None, None
+    finished = False
+
+    while not finished:
+        if progress.isVisible():
+            app.processEvents()
+        else:
+            # The dialog is only shown if the function takes a while; until then
+            # don't handle user input (which could otherwise edit the labels).
+            app.processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
+
+        if progress.wasCanceled() and not cancelled.is_set():
+            cancelled.set()
+            progress.setLabelText("Cancelling...")
+
+        try:
+            event, data = events.get(timeout=poll_interval)
+        except queue.Empty:
+            continue
+
+        # Handle all queued events, but only show the latest progress.
+        latest_progress = None
+        while True:
+            if event == "progress":
+                latest_progress = data
+            elif event == "call":
+                call, result_queue = data
+                try:
+                    result_queue.put((call(), None))
+                except Exception as e:
+                    result_queue.put((None, e))
+            elif event == "done":
+                result, exception = data
+                finished = True
+
+            try:
+                event, data = events.get_nowait()
+            except queue.Empty:
+                break
+
+        if latest_progress is not None and not finished:
+            done, total = latest_progress
+            progress.setMaximum(total)
+            progress.setValue(min(done, total))
+
+    worker.join()
+    progress.close()
+
+    if exception is not None:
+        raise exception
+
+    return result
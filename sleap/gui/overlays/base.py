@@ -4,6 +4,7 @@ from PySide2 import QtWidgets
 
 import attr
 import numpy as np
+from collections import OrderedDict
 from typing import Sequence, Union
 
 from sleap.io.video import Video
@@ -14,14 +15,45 @@ from sleap.nn.inference import VisualPredictor
 
 @attr.s(auto_attribs=True)
 class ModelData:
+    """
+    Datasource which runs model on frames to get outputs (e.g., confmaps).
+
+    Model outputs are cached for the most recently used frames, so we don't
+    need to run the model again when going back to a frame.
+
+    Attributes:
+        predictor: The `VisualPredictor` for running model.
+        video: The video with frames for model input.
+        output_scale: Ratio of image size to model output size.
+        adjust_vals: Whether to clip model output to [0, 1].
+        cache_size: Maximum number of frames for which to cache outputs.
+    """
+
     predictor: VisualPredictor
     video: Video
     do_rescale: bool = False
     output_scale: float = 1.0
     adjust_vals: bool = True
+    cache_size: int = 64
+    _cache: OrderedDict = attr.ib(factory=OrderedDict, init=False, repr=False)
 
     def __getitem__(self, i: int):
         """Data data for frame i from predictor."""
+        if i in self._cache:
+            self._cache.move_to_end(i)
+            frame_result, self.output_scale = self._cache[i]
+            return frame_result
+
+        frame_result = self._predict(i)
+
+        self._cache[i] = (frame_result, self.output_scale)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return frame_result
+
+    def _predict(self, i: int):
+        """Returns model output for frame i."""
         # Get predictions for frame i
         frame_result = self.predictor.predict(VideoReader(self.video, [i]))
 
@@ -10,6 +10,7 @@ from PySide2 import QtWidgets, QtCore, QtGui
 
 import numpy as np
 import qimage2ndarray
+from typing import Sequence
 
 from sleap.gui.overlays.base import DataOverlay, h5_colors
 
@@ -37,7 +38,8 @@ class ConfMapsPlot(QtWidgets.QGraphicsObject):
     Returns:
         None.
 
-    When initialized, creates one child ConfMapPlot item for each channel.
+    When initialized, colorizes all the channels into a single image and
+    creates a child QGraphicsPixmapItem to show this image.
     """
 
     def __init__(
@@ -54,14 +56,17 @@ class ConfMapsPlot(QtWidgets.QGraphicsObject):
                 QtGui.QPen("yellow")
             )
 
-        for channel in range(self.frame.shape[2]):
-            if show is None or channel in show:
-                color_map = h5_colors[channel % len(h5_colors)]
+        channels = [
+            channel
+            for channel in range(self.frame.shape[2])
+            if show is None or channel in show
+        ]
+        colors = [h5_colors[channel % len(h5_colors)] for channel in channels]
 
-                # Add QGraphicsPixmapItem as child object
-                ConfMapPlot(
-                    confmap=self.frame[..., channel], color=color_map, parent=self
-                )
+        image = colorize_confmaps(self.frame[..., channels], colors)
+        QtWidgets.QGraphicsPixmapItem(
+            QtGui.QPixmap(qimage2ndarray.array2qimage(image)), parent=self
+        )
 
     def boundingRect(self) -> QtCore.QRectF:
         """Method required by Qt.
@@ -83,9 +88,6 @@ class ConfMapPlot(QtWidgets.QGraphicsPixmapItem):
 
     Returns:
         None.
-
-    Note:
-        In most cases this should only be called by ConfMapsPlot.
     """
 
     def __init__(
@@ -109,22 +111,7 @@ class ConfMapPlot(QtWidgets.QGraphicsPixmapItem):
         if self.confmap is None:
             return
 
-        # Get image data
-        frame = self.confmap
-
-        # Colorize single-channel overlap
-        if np.ptp(frame) <= 1.0:
-            frame_a = (frame * 255).astype(np.uint8)
-            frame_r = (frame * self.color_map[0]).astype(np.uint8)
-            frame_g = (frame * self.color_map[1]).astype(np.uint8)
-            frame_b = (frame * self.color_map[2]).astype(np.uint8)
-        else:
-            frame_a = (frame).astype(np.uint8)
-            frame_r = (frame * (self.color_map[0] / 255.0)).astype(np.uint8)
-            frame_g = (frame * (self.color_map[1] / 255.0)).astype(np.uint8)
-            frame_b = (frame * (self.color_map[2] / 255.0)).astype(np.uint8)
-
-        frame_composite = np.dstack((frame_r, frame_g, frame_b, frame_a))
+        frame_composite = colorize_confmaps(self.confmap[..., None], [self.color_map])
 
         # Convert ndarray to QImage
         image = qimage2ndarray.array2qimage(frame_composite)
@@ -132,6 +119,57 @@ class ConfMapPlot(QtWidgets.QGraphicsPixmapItem):
         return image
 
 
+def colorize_confmaps(confmaps: np.ndarray, colors: Sequence) -> np.ndarray:
+    """Colorizes confidence maps into a single RGBA image.
+
+    Each channel is shown in its color with opacity given by the confidence
+    map value, and channels are composited in order (i.e., as if each channel
+    were a separate image drawn on top of the previous channels).
+
+    Args:
+        confmaps: (height, width, channels) array of confidence maps. Channels
+            with values outside [0, 1] are assumed to be in [0, 255].
+        colors: List with (r, g, b) color for each channel.
+
+    Returns:
+        (height, width, 4) uint8 array with RGBA image.
+    """
+    confmaps = np.asarray(confmaps, dtype=np.float32)
+    height, width, n_channels = confmaps.shape
+
+    # Scale channels to [0, 1]
+    if confmaps.size:
+        ranges = np.ptp(confmaps.reshape(-1, n_channels), axis=0)
+    else:
+        ranges = np.zeros(n_channels)
+    channel_scales = np.where(ranges <= 1.0, 1.0, 1 / 255.0)
+    alphas = np.clip(confmaps * channel_scales.astype(np.float32), 0, 1)
+
+    # Composite (premultiplied) colors and alpha for all channels
+    colors = np.asarray(colors, dtype=np.float32).reshape(-1, 3)
+    premultiplied = np.zeros((height, width, 3), dtype=np.float32)
+    alpha = np.zeros((height, width), dtype=np.float32)
+    for channel in range(n_channels):
+        channel_alpha = alphas[..., channel]
+        transmittance = (1 - channel_alpha)[..., None]
+        premultiplied *= transmittance
+        premultiplied += (channel_alpha ** 2)[..., None] * colors[channel]
+        alpha *= transmittance[..., 0]
+        alpha += channel_alpha
+
+    rgb = np.divide(
+        premultiplied,
+        alpha[..., None],
+        out=np.zeros_like(premultiplied),
+        where=alpha[..., None] > 0,
+    )
+
+    image = np.empty((height, width, 4), dtype=np.uint8)
+    image[..., :3] = np.clip(rgb, 0, 255)
+    image[..., 3] = np.clip(alpha * 255, 0, 255)
+    return image
+
+
 def show_confmaps_from_h5(filename, input_format="channels_last", standalone=False):
     """Demo function."""
     from sleap.io.video import HDF5Video
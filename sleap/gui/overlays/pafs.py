@@ -127,7 +127,6 @@ class QuiverPlot(QtWidgets.QGraphicsObject):
             self._add_arrows()
 
     def _add_arrows(self, min_length=0.01):
-        points = []
         if self.field_x is not None and self.field_y is not None:
 
             raw_delta_yx = np.stack((self.field_y, self.field_x), axis=-1)
@@ -173,21 +172,24 @@ class QuiverPlot(QtWidgets.QGraphicsObject):
             p2_x = x2 - u_dx * arrow_head_size + u_dy * arrow_head_size
             p2_y = y2 - u_dy * arrow_head_size - u_dx * arrow_head_size
 
-            # Build list of QPointF objects for faster drawing
-            y_x_pairs = itertools.product(
-                range(delta_yx.shape[0]), range(delta_yx.shape[1])
+            # Build list of QPointF objects (line segment endpoints for the
+            # arrow shaft and both sides of arrow head) for faster drawing
+            show = line_length > min_length
+            x2, y2 = x2[show], y2[show]
+            points = np.stack(
+                [
+                    np.stack([loc_x[show], loc_y[show]], axis=-1),
+                    np.stack([x2, y2], axis=-1),
+                    np.stack([p1_x[show], p1_y[show]], axis=-1),
+                    np.stack([x2, y2], axis=-1),
+                    np.stack([p2_x[show], p2_y[show]], axis=-1),
+                    np.stack([x2, y2], axis=-1),
+                ],
+                axis=1,
+            )
+            self.points = list(
+                itertools.starmap(QtCore.QPointF, points.reshape(-1, 2).tolist())
             )
-            for y, x in y_x_pairs:
-                x1, y1 = loc_x[y, x], loc_y[y, x]
-
-                if line_length[y, x] > min_length:
-                    points.append((x1, y1))
-                    points.append((x2[y, x], y2[y, x]))
-                    points.append((p1_x[y, x], p1_y[y, x]))
-                    points.append((x2[y, x], y2[y, x]))
-                    points.append((p2_x[y, x], p2_y[y, x]))
-                    points.append((x2[y, x], y2[y, x]))
-            self.points = list(itertools.starmap(QtCore.QPointF, points))
 
     def _decimate(self, image: np.array, box: int):
         height = width = box
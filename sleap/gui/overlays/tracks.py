@@ -7,8 +7,9 @@ from sleap.io.video import Video
 from sleap.prefs import prefs
 
 import attr
+import numpy as np
 
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from PySide2 import QtCore, QtGui
 
@@ -37,6 +38,17 @@ class TrackTrailOverlay:
     player: "QtVideoPlayer" = None
     trail_length: int = 0
     show: bool = True
+    _frame_points: Dict[int, Tuple["LabeledFrame", list]] = attr.ib(
+        factory=dict, init=False, repr=False
+    )
+    _frame_points_video: Optional[Video] = attr.ib(default=None, init=False, repr=False)
+
+    def clear_cache(self):
+        """Clears points cached for frames in trail.
+
+        Call this after changes to labels other than edits in current frame.
+        """
+        self._frame_points = dict()
 
     def get_track_trails(self, frame_selection: Iterable["LabeledFrame"]):
         """Get data needed to draw track trail.
@@ -53,46 +65,84 @@ class TrackTrailOverlay:
         all_track_trails = dict()
 
         if not frame_selection:
-            return
+            return all_track_trails
 
         nodes = self.labels.skeletons[0].nodes
         if len(nodes) > MAX_NODES_IN_TRAIL:
             nodes = nodes[:MAX_NODES_IN_TRAIL]
 
+        # Gather (visible, xy) arrays for each track across trail frames.
+        track_points = dict()
         for frame in frame_selection:
+            for track, visible, xy in self._get_frame_points(frame, nodes):
+                if track not in track_points:
+                    track_points[track] = ([], [])
+                track_points[track][0].append(visible)
+                track_points[track][1].append(xy)
+
+        for track, (visible, xy) in track_points.items():
+            visible = np.stack(visible)  # (frames, nodes)
+            xy = np.stack(xy)  # (frames, nodes, 2)
+
+            # Invisible points repeat last location of node so that we can
+            # easily calculate trail length (since we adjust opacity).
+            frame_inds = np.arange(len(visible))[:, None]
+            last_visible = np.maximum.accumulate(
+                np.where(visible, frame_inds, -1), axis=0
+            )
+
+            trails = []
+            for node_i in range(len(nodes)):
+                inds = last_visible[:, node_i]
+                points = xy[inds[inds >= 0], node_i].tolist()
+                trails.append(list(map(tuple, points)))
+            all_track_trails[track] = trails
+
+        return all_track_trails
+
+    def _get_frame_points(
+        self, frame: "LabeledFrame", nodes: List["Node"]
+    ) -> List[Tuple[Track, np.ndarray, np.ndarray]]:
+        """
+        Returns (track, visible, xy) arrays for tracked instances in frame.
+
+        Points are cached per frame (while the frame is in the trail) so
+        that moving through frames only requires reading the new frame.
+        """
+        if frame.video is not self._frame_points_video:
+            self._frame_points = dict()
+            self._frame_points_video = frame.video
 
-            for inst in frame:
-                if inst.track is not None:
-                    if inst.track not in all_track_trails:
-                        all_track_trails[inst.track] = [[] for _ in range(len(nodes))]
+        cached = self._frame_points.get(frame.frame_idx, None)
+        if cached is not None and cached[0] is frame:
+            return cached[1]
 
-                    # loop through all nodes
-                    for node_i, node in enumerate(nodes):
+        frame_points = []
+        for inst in frame:
+            if inst.track is None:
+                continue
 
-                        if node in inst.nodes and inst[node].visible:
-                            point = (inst[node].x, inst[node].y)
+            node_inds = [
+                inst.skeleton.node_to_index(node) if node in inst.nodes else -1
+                for node in nodes
+            ]
+            node_inds = np.array(node_inds, dtype=int)
+            has_node = node_inds >= 0
 
-                        # Add last location of node so that we can easily
-                        # calculate trail length (since we adjust opacity).
-                        elif len(all_track_trails[inst.track][node_i]):
-                            point = all_track_trails[inst.track][node_i][-1]
-                        else:
-                            point = None
+            points = inst.get_points_array(copy=False, full=True)[node_inds]
+            visible = has_node & points["visible"]
+            xy = np.stack([points["x"], points["y"]], axis=1)
 
-                        if point is not None:
-                            all_track_trails[inst.track][node_i].append(point)
+            frame_points.append((inst.track, visible, xy))
 
-        return all_track_trails
+        self._frame_points[frame.frame_idx] = (frame, frame_points)
+        return frame_points
 
     def get_frame_selection(self, video: Video, frame_idx: int):
         """
         Return `LabeledFrame` objects to include in trail for specified frame.
         """
-
-        frame_selection = self.labels.find(video, range(0, frame_idx + 1))
-        frame_selection.sort(key=lambda x: x.frame_idx)
-
-        return frame_selection[-self.trail_length :]
+        return self.labels.find_frames_up_to(video, frame_idx, self.trail_length)
 
     def get_tracks_in_frame(
         self, video: Video, frame_idx: int, include_trails: bool = False
@@ -131,6 +181,14 @@ class TrackTrailOverlay:
 
         frame_selection = self.get_frame_selection(video, frame_idx)
 
+        # The current frame may have been edited, so always read it again,
+        # and don't keep points for frames which are no longer in trail.
+        self._frame_points.pop(frame_idx, None)
+        trail_frame_idxs = {frame.frame_idx for frame in frame_selection}
+        for cached_frame_idx in list(self._frame_points.keys()):
+            if cached_frame_idx not in trail_frame_idxs:
+                del self._frame_points[cached_frame_idx]
+
         all_track_trails = self.get_track_trails(frame_selection)
 
         for track, trails in all_track_trails.items():
@@ -6,7 +6,7 @@ import attr
 import numpy as np
 import random
 
-from typing import List, Optional, Union
+from typing import Callable, List, Optional, Union
 
 from sleap.io.video import Video
 from sleap.info.feature_suggestions import (
@@ -35,8 +35,10 @@ class VideoFrameSuggestions(object):
     * image features (raw images/brisk -> pca -> k-means)
     * prediction_score (frames with number of instances below specified score)
 
-    Each of algorithm method should accept `labels`; other parameters will be
-    passed from the `params` dict given to :meth:`suggest`.
+    Each of algorithm method should accept `labels` and `videos` (the videos
+    for which to generate suggestions, or None for all videos in `labels`);
+    other parameters will be passed from the `params` dict given to
+    :meth:`suggest`.
     """
 
     @classmethod
@@ -69,16 +71,75 @@ class VideoFrameSuggestions(object):
             print(f"No {method} method found for generating suggestions.")
             return []
 
+    @classmethod
+    def suggest_by_video(
+        cls,
+        params: dict,
+        labels: "Labels",
+        results_callback: Optional[Callable] = None,
+        progress_callback: Optional[Callable] = None,
+    ) -> List[SuggestionFrame]:
+        """
+        Generates suggestions one video at a time.
+
+        This allows us to show results as they're generated, e.g., when
+        generating suggestions in a background thread.
+
+        Args:
+            params: A dictionary with params for generating suggestions (as
+                for :meth:`suggest`).
+            labels: A `Labels` object for which we are generating suggestions.
+            results_callback: Function which is called with list of all
+                suggestions so far, after suggestions for each video.
+            progress_callback: Function which is called with count of videos
+                done and total count of videos. Returning -1 cancels.
+
+        Raises:
+            OperationCancelled: If cancelled by progress callback.
+
+        Returns:
+            List of `SuggestionFrame` objects.
+        """
+        from sleap.io.format.adaptor import report_progress
+
+        method = str.replace(params["method"], " ", "_")
+        merge_videos = params.get("merge_video_features", "") == "across all videos"
+
+        if method == "image_features" and merge_videos:
+            # Features are clustered across all videos, so we can't split.
+            video_lists = [list(labels.videos)]
+        else:
+            video_lists = [[video] for video in labels.videos]
+
+        suggestions = []
+        for i, videos in enumerate(video_lists):
+            report_progress(progress_callback, i, len(video_lists))
+
+            suggestions.extend(
+                cls.suggest(params=dict(params, videos=videos), labels=labels)
+            )
+
+            if callable(results_callback):
+                results_callback(list(suggestions))
+
+        report_progress(progress_callback, len(video_lists), len(video_lists))
+        return suggestions
+
     # Functions corresponding to "method" param
 
     @classmethod
     def basic_sample_suggestion_method(
-        cls, labels, per_video: int = 20, sampling_method: str = "random", **kwargs
+        cls,
+        labels,
+        per_video: int = 20,
+        sampling_method: str = "random",
+        videos: Optional[List[Video]] = None,
+        **kwargs,
     ):
         """Method to generate suggestions by taking strides through video."""
         suggestions = []
 
-        for video in labels.videos:
+        for video in labels.videos if videos is None else videos:
             if sampling_method == "stride":
                 vid_suggestions = list(
                     range(0, video.frames, video.frames // per_video)
@@ -106,6 +167,7 @@ class VideoFrameSuggestions(object):
         pca_components,
         n_clusters,
         per_cluster,
+        videos: Optional[List[Video]] = None,
         **kwargs,
     ):
         """
@@ -114,6 +176,8 @@ class VideoFrameSuggestions(object):
         This is a wrapper for `feature_suggestion_pipeline` implemented in
         `sleap.info.feature_suggestions`.
         """
+        if videos is None:
+            videos = labels.videos
 
         brisk_threshold = kwargs.get("brisk_threshold", 80)
         vocab_size = kwargs.get("vocab_size", 20)
@@ -132,15 +196,30 @@ class VideoFrameSuggestions(object):
 
         if merge_video_features == "across all videos":
             # Run single pipeline with all videos
-            return pipeline.get_suggestion_frames(videos=labels.videos)
+            return pipeline.get_suggestion_frames(videos=videos)
+        elif len(videos) == 1:
+            # Run pipeline for single video here, so that results from slow
+            # pipeline stages are cached for next time.
+            video = videos[0]
+            group_offset = labels.videos.index(video) * n_clusters
+            return pipeline.get_suggestion_frames(
+                videos=[video], group_offset=group_offset
+            )
         else:
             # Run pipeline separately (in parallel) for each video
-            suggestions = ParallelFeaturePipeline.run(pipeline, labels.videos)
+            suggestions = ParallelFeaturePipeline.run(pipeline, videos)
 
             return suggestions
 
     @classmethod
-    def prediction_score(cls, labels: "Labels", score_limit, instance_limit, **kwargs):
+    def prediction_score(
+        cls,
+        labels: "Labels",
+        score_limit,
+        instance_limit,
+        videos: Optional[List[Video]] = None,
+        **kwargs,
+    ):
         """
         Method to generate suggestions for proofreading frames with low score.
         """
@@ -148,7 +227,7 @@ class VideoFrameSuggestions(object):
         instance_limit = int(instance_limit)
 
         suggestions = []
-        for video in labels.videos:
+        for video in labels.videos if videos is None else videos:
             suggestions.extend(
                 cls._prediction_score_video(video, labels, score_limit, instance_limit)
             )
@@ -185,7 +264,12 @@ class VideoFrameSuggestions(object):
 
     @classmethod
     def velocity(
-        cls, labels: "Labels", node: Union[int, str], threshold: float, **kwargs
+        cls,
+        labels: "Labels",
+        node: Union[int, str],
+        threshold: float,
+        videos: Optional[List[Video]] = None,
+        **kwargs,
     ):
         """
         Finds frames for proofreading with high node velocity.
@@ -200,7 +284,7 @@ class VideoFrameSuggestions(object):
                 node_name = ""
 
         suggestions = []
-        for video in labels.videos:
+        for video in labels.videos if videos is None else videos:
             suggestions.extend(cls._velocity_video(video, labels, node_name, threshold))
         return suggestions
 
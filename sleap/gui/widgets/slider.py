@@ -4,12 +4,15 @@ Drop-in replacement for QSlider with additional features.
 
 from PySide2 import QtCore, QtWidgets, QtGui
 from PySide2.QtGui import QPen, QBrush, QColor, QKeyEvent, QPolygonF, QPainterPath
+from PySide2.QtGui import QPixmap
 
 from sleap.gui.color import ColorManager
 
 import attr
 import itertools
+import math
 import numpy as np
+import qimage2ndarray
 from enum import Enum
 from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
@@ -117,6 +120,163 @@ class SliderMark:
         return height
 
 
+class SliderMarkStore:
+    """
+    Column-oriented storage of slider marks for drawing and lookup.
+
+    Marks are kept as numpy arrays of their values, rows, types and colors so
+    that the slider can draw them into a pixel-binned image and find marks by
+    value without iterating over (or creating scene items for) each mark.
+    Tick marks aren't stored here since they're drawn as individual items.
+
+    Marks are added to a pending list and only merged into the arrays when the
+    arrays are needed, so adding many marks one at a time is cheap.
+    """
+
+    # Types of marks in the order in which they're drawn (last is on top).
+    types_order = (
+        "tick_column",
+        "track",
+        "simple_thin",
+        "predicted",
+        "open",
+        "filled",
+        "simple",
+    )
+
+    def __init__(self):
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self.flush().marks)
+
+    def clear(self):
+        """Removes all marks."""
+        self._pending = []
+        self.marks = np.empty(0, dtype=object)
+        self.mark_ids = np.empty(0, dtype=np.int64)
+        self.vals = np.empty(0, dtype=np.float64)
+        self.end_vals = np.empty(0, dtype=np.float64)
+        self.rows = np.empty(0, dtype=np.int64)
+        self.types = np.empty(0, dtype=np.int64)
+        self.track_ids = np.empty(0, dtype=np.int64)
+        self.colors = np.empty((0, 4), dtype=np.uint8)
+
+    def add(self, marks: Iterable[SliderMark]):
+        """Adds marks to the store."""
+        self._pending.extend(marks)
+
+    def flush(self) -> "SliderMarkStore":
+        """Merges pending marks into the arrays and returns the store."""
+        if not self._pending:
+            return self
+
+        marks = self._pending
+        self._pending = []
+
+        color_cache = dict()
+
+        def rgba(mark):
+            color = mark.color
+            key = color if isinstance(color, str) else tuple(color)
+            if key not in color_cache:
+                color_cache[key] = mark.QColor.getRgb()
+            return color_cache[key]
+
+        new_marks = np.empty(len(marks), dtype=object)
+        new_marks[:] = marks
+        self.marks = np.concatenate([self.marks, new_marks])
+        self.mark_ids = np.concatenate(
+            [self.mark_ids, np.array([id(mark) for mark in marks], dtype=np.int64)]
+        )
+        self.vals = np.concatenate(
+            [self.vals, np.array([mark.val for mark in marks], dtype=np.float64)]
+        )
+        self.end_vals = np.concatenate(
+            [
+                self.end_vals,
+                np.array(
+                    [
+                        mark.val if mark.end_val is None else mark.end_val
+                        for mark in marks
+                    ],
+                    dtype=np.float64,
+                ),
+            ]
+        )
+        self.rows = np.concatenate(
+            [
+                self.rows,
+                np.array(
+                    [-1 if mark.row is None else mark.row for mark in marks],
+                    dtype=np.int64,
+                ),
+            ]
+        )
+        self.types = np.concatenate(
+            [
+                self.types,
+                np.array(
+                    [self.types_order.index(mark.type) for mark in marks],
+                    dtype=np.int64,
+                ),
+            ]
+        )
+        self.track_ids = np.concatenate(
+            [
+                self.track_ids,
+                np.array(
+                    [0 if mark.track is None else id(mark.track) for mark in marks],
+                    dtype=np.int64,
+                ),
+            ]
+        )
+        self.colors = np.concatenate(
+            [
+                self.colors,
+                np.array([rgba(mark) for mark in marks], dtype=np.uint8).reshape(-1, 4),
+            ]
+        )
+        return self
+
+    def remove(self, marks: Iterable[SliderMark]):
+        """Removes marks from the store."""
+        self.flush()
+        remove_ids = np.array([id(mark) for mark in marks], dtype=np.int64)
+        keep = ~np.isin(self.mark_ids, remove_ids)
+        for key in (
+            "marks",
+            "mark_ids",
+            "vals",
+            "end_vals",
+            "rows",
+            "types",
+            "track_ids",
+            "colors",
+        ):
+            setattr(self, key, getattr(self, key)[keep])
+
+    def type_mask(self, mark_type: str) -> np.ndarray:
+        """Returns boolean mask of marks with the given type."""
+        return self.flush().types == self.types_order.index(mark_type)
+
+    def get_marks_at_val(self, val: float) -> List[SliderMark]:
+        """Returns marks at value (or with track range containing value)."""
+        self.flush()
+        is_track = self.type_mask("track")
+        is_column = self.type_mask("tick_column")
+        at_val = ((self.vals == val) & ~is_column) | (
+            is_track & (self.vals <= val) & (val < self.end_vals)
+        )
+        return list(self.marks[at_val])
+
+    def get_track_marks(self, tracks: Iterable["Track"]) -> List[SliderMark]:
+        """Returns the track marks for the given tracks."""
+        track_ids = np.array([id(track) for track in tracks], dtype=np.int64)
+        in_tracks = self.type_mask("track") & np.isin(self.track_ids, track_ids)
+        return list(self.marks[in_tracks])
+
+
 class VideoSlider(QtWidgets.QGraphicsView):
     """Drop-in replacement for QSlider with additional features.
 
@@ -223,6 +383,13 @@ class VideoSlider(QtWidgets.QGraphicsView):
         self.zoom_box.setBrush(QColor(80, 80, 80, 64))
         self.zoom_box.hide()
 
+        # All marks other than tick marks are drawn into a single image with
+        # one column per pixel of the visible part of the slider.
+        self._mark_store = SliderMarkStore()
+        self._marks_image = self.scene.addPixmap(QPixmap())
+        self._marks_image.setZValue(1)
+        self.track_rows = dict()
+
         self.scene.setBackgroundBrush(QBrush(QColor(200, 200, 200)))
 
         self.clearSelection()
@@ -236,6 +403,7 @@ class VideoSlider(QtWidgets.QGraphicsView):
         pen.setCosmetic(True)
         self.poly = self.scene.addPath(QPainterPath(), pen, self.select_box.brush())
         self.headerSeries = dict()
+        self._header_frame_idxs, self._header_vals = get_series_arrays([])
         self._draw_header()
 
     # Methods to match API for QSlider
@@ -274,6 +442,7 @@ class VideoSlider(QtWidgets.QGraphicsView):
         x = self._toPos(self.value())
         self.handle.setPos(x, 0)
 
+        # Only tick marks have their own items, other marks are drawn as image.
         for mark in self._mark_items.keys():
 
             if mark.type == "track":
@@ -302,6 +471,114 @@ class VideoSlider(QtWidgets.QGraphicsView):
 
             self._mark_items[mark].setRect(rect)
 
+        self._draw_marks()
+
+    def _get_visible_x_range(self) -> Tuple[int, int]:
+        """Returns the range of x positions in the visible part of the slider."""
+        visible_rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        x_start = max(0, int(math.floor(visible_rect.left())))
+        x_end = min(
+            int(math.ceil(visible_rect.right())) + 1,
+            int(math.ceil(self.box_rect.width())) + 1,
+        )
+        return x_start, max(x_start + 1, x_end)
+
+    def _get_track_vertical_pos_array(self, rows: np.ndarray) -> np.ndarray:
+        """Vectorized version of `_get_track_vertical_pos` for raw track rows."""
+        rows_per_later_cols = self._max_tracks_stacked - self._track_stack_skip_count
+        rows_down = (rows - self._max_tracks_stacked) % rows_per_later_cols
+        return np.where(
+            rows < self._max_tracks_stacked,
+            rows * self._track_height,
+            self._track_height * (self._track_stack_skip_count + rows_down),
+        )
+
+    @staticmethod
+    def _columns_mask(starts: np.ndarray, stops: np.ndarray, width: int) -> np.ndarray:
+        """Returns mask of image columns covered by any [start, stop) range."""
+        starts = np.clip(starts, 0, width)
+        stops = np.clip(stops, 0, width)
+        nonempty = stops > starts
+        diff = np.zeros(width + 1, dtype=np.int64)
+        np.add.at(diff, starts[nonempty], 1)
+        np.add.at(diff, stops[nonempty], -1)
+        return np.cumsum(diff[:-1]) > 0
+
+    def _draw_marks(self):
+        """Draws all marks other than tick marks into the marks image.
+
+        Marks are binned into image columns (one for each pixel in the visible
+        part of the slider), so drawing time depends on the number of marks and
+        pixels rather than on the number of items in the scene.
+        """
+        x_start, x_end = self._get_visible_x_range()
+        width = x_end - x_start
+        container_height = self.box_rect.height() - self._header_height
+        height = max(1, int(container_height))
+        image = np.zeros((height, width, 4), dtype=np.uint8)
+
+        store = self._mark_store.flush()
+        if len(store.marks):
+            # Map values to image columns (same as _toPos with center=True)
+            scale = self._slider_width / max(1, self._val_max - self._val_min)
+            offset = self.handle.rect().width() / 2.0 - x_start
+            cols = np.floor((store.vals - self._val_min) * scale + offset)
+            cols = cols.astype(np.int64)
+
+            for mark_type in SliderMarkStore.types_order:
+                is_type = store.type_mask(mark_type)
+                if not np.any(is_type):
+                    continue
+
+                type_cols = cols[is_type]
+                type_colors = store.colors[is_type]
+                example_mark = SliderMark(mark_type, val=0)
+                mark_height = int(example_mark.get_height(container_height))
+                top = example_mark.top_pad
+
+                if mark_type == "track":
+                    widths = np.maximum(
+                        2, np.ceil((store.end_vals - store.vals)[is_type] * scale)
+                    ).astype(np.int64)
+                    rows = store.rows[is_type]
+                    tops = top + self._get_track_vertical_pos_array(rows)
+                    for row in np.unique(rows):
+                        in_row = rows == row
+                        mask = self._columns_mask(
+                            type_cols[in_row], type_cols[in_row] + widths[in_row], width
+                        )
+                        row_top = tops[in_row][0]
+                        image[row_top : row_top + mark_height, mask] = type_colors[
+                            in_row
+                        ][0]
+
+                elif mark_height > 0:
+                    mark_width = example_mark.visual_width
+                    starts = type_cols - mark_width // 2
+                    if mark_type == "open":
+                        # Only draw the outline of the mark
+                        edges = self._columns_mask(
+                            starts, starts + 1, width
+                        ) | self._columns_mask(
+                            starts + mark_width, starts + mark_width + 1, width
+                        )
+                        inside = self._columns_mask(
+                            starts + 1, starts + mark_width, width
+                        )
+                        image[top : top + mark_height, edges] = type_colors[0]
+                        image[top, inside] = type_colors[0]
+                        image[top + mark_height - 1, inside] = type_colors[0]
+                    else:
+                        # Thin marks have no width but are drawn as 1-px lines
+                        stops = np.maximum(starts + mark_width, starts + 1)
+                        mask = self._columns_mask(starts, stops, width)
+                        image[top : top + mark_height, mask] = type_colors[0]
+
+        self._marks_image.setPixmap(
+            QPixmap.fromImage(qimage2ndarray.array2qimage(image))
+        )
+        self._marks_image.setPos(x_start, self._header_height + 1)
+
     def _get_min_max_slider_heights(self):
         tracks = self._track_rows
         if tracks == 0:
@@ -597,6 +874,7 @@ class VideoSlider(QtWidgets.QGraphicsView):
             for item in self._mark_labels.values():
                 self.scene.removeItem(item)
 
+        self._mark_store.clear()
         self._marks = set()  # holds mark position
         self._mark_items = dict()  # holds visual Qt object for plotting mark
         self._mark_labels = dict()
@@ -616,10 +894,13 @@ class VideoSlider(QtWidgets.QGraphicsView):
         self._add_tick_marks()
 
         if marks is not None:
-            for mark in marks:
-                if not isinstance(mark, SliderMark):
-                    mark = SliderMark("simple", mark)
-                self.addMark(mark, update=False)
+            self.addMarks(
+                [
+                    mark if isinstance(mark, SliderMark) else SliderMark("simple", mark)
+                    for mark in marks
+                ],
+                update=False,
+            )
 
         self._update_visual_positions()
 
@@ -663,9 +944,30 @@ class VideoSlider(QtWidgets.QGraphicsView):
         if mark in self._mark_items:
             self.scene.removeItem(self._mark_items[mark])
             del self._mark_items[mark]
+        elif mark in self._marks:
+            self._mark_store.remove([mark])
         if mark in self._marks:
             self._marks.remove(mark)
 
+    def removeMarks(self, marks: Iterable[SliderMark], update: bool = True):
+        """Removes multiple marks, redrawing the slider once.
+
+        Args:
+            marks: The marks to remove.
+            update: Whether to redraw slider without the marks.
+        """
+        marks = [mark for mark in marks if mark in self._marks]
+        tick_marks = [mark for mark in marks if mark in self._mark_items]
+        for mark in tick_marks:
+            self.removeMark(mark)
+
+        other_marks = [mark for mark in marks if mark not in tick_marks]
+        self._mark_store.remove(other_marks)
+        self._marks.difference_update(other_marks)
+
+        if update:
+            self._draw_marks()
+
     def getMarks(self, type: str = ""):
         """Returns list of marks."""
         if type:
@@ -691,6 +993,13 @@ class VideoSlider(QtWidgets.QGraphicsView):
 
         self._marks.add(new_mark)
 
+        if new_mark.type != "tick":
+            # Marks other than ticks are drawn into the marks image.
+            self._mark_store.add([new_mark])
+            if update:
+                self._draw_marks()
+            return
+
         v_top_pad = self._header_height + 1
         v_bottom_pad = 1
         v_top_pad += new_mark.top_pad
@@ -734,6 +1043,22 @@ class VideoSlider(QtWidgets.QGraphicsView):
         if update:
             self._update_visual_positions()
 
+    def addMarks(self, new_marks: Iterable[SliderMark], update: bool = True):
+        """Adds multiple marked values to the slider, redrawing it once.
+
+        Args:
+            new_marks: The marks to add.
+            update: Whether to redraw slider with new marks.
+
+        Returns:
+            None.
+        """
+        for new_mark in new_marks:
+            self.addMark(new_mark, update=False)
+
+        if update:
+            self._draw_marks()
+
     def _get_track_column_row(self, raw_row: int) -> Tuple[int, int]:
         """
         Returns the column and row for a given track index.
@@ -776,15 +1101,24 @@ class VideoSlider(QtWidgets.QGraphicsView):
 
     # Methods for header graph
 
-    def setHeaderSeries(self, series: Optional[Dict[int, float]] = None):
+    def setHeaderSeries(
+        self,
+        series: Optional[
+            Union[Dict[int, float], np.ndarray, Tuple[np.ndarray, np.ndarray]]
+        ] = None,
+    ):
         """Show header graph with specified series.
 
         Args:
-            series: {frame number: series value} dict.
+            series: {frame number: series value} dict, array with value for
+                each frame, or tuple of (frame numbers, values) arrays.
         Returns:
             None.
         """
         self.headerSeries = [] if series is None else series
+        self._header_frame_idxs, self._header_vals = get_series_arrays(
+            self.headerSeries
+        )
         self._header_height = self._header_label_height + self._header_graph_height
         self._draw_header()
         self._update_slider_height()
@@ -792,47 +1126,24 @@ class VideoSlider(QtWidgets.QGraphicsView):
     def clearHeader(self):
         """Remove header graph from slider."""
         self.headerSeries = []
+        self._header_frame_idxs, self._header_vals = get_series_arrays([])
         self._header_height = self._header_label_height
         self._update_slider_height()
 
-    def _get_header_series_len(self):
-        if hasattr(self.headerSeries, "keys"):
-            series_frame_max = max(self.headerSeries.keys())
-        else:
-            series_frame_max = len(self.headerSeries)
-        return series_frame_max
-
-    @property
-    def _header_series_items(self):
-        """Yields (frame idx, val) for header series items."""
-        if hasattr(self.headerSeries, "items"):
-            for key, val in self.headerSeries.items():
-                yield key, val
-        else:
-            for key in range(len(self.headerSeries)):
-                val = self.headerSeries[key]
-                yield key, val
-
     def _draw_header(self):
         """Draws the header graph."""
-        if len(self.headerSeries) == 0 or self._header_height == 0:
+        if len(self._header_frame_idxs) == 0 or self._header_height == 0:
             self.poly.setPath(QPainterPath())
             return
 
-        series_frame_max = self._get_header_series_len()
+        series_frame_max = self._header_frame_idxs[-1]
 
+        # Downsample to (at most) one value per pixel of slider.
         step = series_frame_max // int(self._slider_width)
         step = max(step, 1)
-        count = series_frame_max // step * step
-
-        sampled = np.full((count), 0.0, dtype=np.float)
-
-        for key, val in self._header_series_items:
-            if key < count:
-                sampled[key] = val
-
-        sampled = np.max(sampled.reshape(count // step, step), axis=1)
-        series = {i * step: sampled[i] for i in range(count // step)}
+        sampled_idxs, sampled = downsample_series(
+            self._header_frame_idxs, self._header_vals, step
+        )
 
         series_min = np.min(sampled) - 1
         series_max = np.max(sampled)
@@ -843,14 +1154,17 @@ class VideoSlider(QtWidgets.QGraphicsView):
 
         step_chart = False  # use steps rather than smooth line
 
-        points = []
-        points.append((self._toPos(0, center=True), toYPos(series_min)))
-        for idx, val in series.items():
-            points.append((self._toPos(idx, center=True), toYPos(val)))
-            if step_chart:
-                points.append((self._toPos(idx + step, center=True), toYPos(val)))
+        xs = self._toPos(sampled_idxs.astype(np.float64), center=True)
+        ys = toYPos(sampled)
+        if step_chart:
+            end_xs = self._toPos((sampled_idxs + step).astype(np.float64), center=True)
+            xs = np.stack([xs, end_xs], 1)
+            ys = np.stack([ys, ys], 1)
+
+        points = [(self._toPos(0, center=True), toYPos(series_min))]
+        points.extend(zip(xs.ravel().tolist(), ys.ravel().tolist()))
         points.append(
-            (self._toPos(max(series.keys()) + 1, center=True), toYPos(series_min))
+            (self._toPos(sampled_idxs[-1] + 1, center=True), toYPos(series_min))
         )
 
         # Convert to list of QtCore.QPointF objects
@@ -885,12 +1199,19 @@ class VideoSlider(QtWidgets.QGraphicsView):
         val = self._toVal(x)
 
         # snap to nearby mark within handle
-        mark_vals = [mark.val for mark in self._marks]
+        mark_vals = np.concatenate(
+            [
+                self._mark_store.flush().vals,
+                [mark.val for mark in self._mark_items.keys()],
+            ]
+        )
         handle_left = self._toVal(x - self.handle.rect().width() / 2)
         handle_right = self._toVal(x + self.handle.rect().width() / 2)
-        marks_in_handle = [
-            mark for mark in mark_vals if handle_left < mark < handle_right
-        ]
+        marks_in_handle = (
+            np.unique(mark_vals[(handle_left < mark_vals) & (mark_vals < handle_right)])
+            .astype(np.int64)
+            .tolist()
+        )
         if marks_in_handle:
             marks_in_handle.sort(key=lambda m: (abs(m - val), m > val))
             val = marks_in_handle[0]
@@ -961,12 +1282,11 @@ class VideoSlider(QtWidgets.QGraphicsView):
         if val is None:
             return []
 
-        return [
-            mark
-            for mark in self._marks
-            if (mark.val == val and mark.type not in ("tick", "tick_column"))
-            or (mark.type == "track" and mark.val <= val < mark.end_val)
-        ]
+        return self._mark_store.get_marks_at_val(val)
+
+    def getTrackMarks(self, tracks: Iterable["Track"]) -> List[SliderMark]:
+        """Returns the track marks for the given tracks."""
+        return self._mark_store.get_track_marks(tracks)
 
     def isMarkedVal(self, val: int) -> bool:
         """Returns whether value has mark."""
@@ -1168,6 +1488,11 @@ class VideoSlider(QtWidgets.QGraphicsView):
     def leaveEvent(self, event):
         self.unsetCursor()
 
+    def scrollContentsBy(self, dx: int, dy: int):
+        """Override method to redraw marks for newly visible part of slider."""
+        super(VideoSlider, self).scrollContentsBy(dx, dy)
+        self._draw_marks()
+
     def keyPressEvent(self, event):
         """Catch event and emit signal so something else can handle event."""
         self._update_cursor_for_event(event)
@@ -1267,27 +1592,18 @@ def set_slider_marks_from_labels(
     lfs = labels.find(video)
 
     slider_marks = []
-    track_row = 0
 
     # Add marks with track
     track_occupancy = labels.get_track_occupancy(video)
-    for track in labels.tracks:
-        if track in track_occupancy and not track_occupancy[track].is_empty:
-            if track_row > 0 and slider._is_track_in_new_column(track_row):
-                slider_marks.append(
-                    SliderMark("tick_column", val=track_occupancy[track].start)
-                )
-            for occupancy_range in track_occupancy[track].list:
-                slider_marks.append(
-                    SliderMark(
-                        "track",
-                        val=occupancy_range[0],
-                        end_val=occupancy_range[1],
-                        row=track_row,
-                        color=color_manager.get_track_color(track),
-                    )
-                )
-            track_row += 1
+    track_rows = get_slider_track_rows(labels, video)
+    for track, track_row in track_rows.items():
+        if track_row > 0 and slider._is_track_in_new_column(track_row):
+            slider_marks.append(
+                SliderMark("tick_column", val=track_occupancy[track].start)
+            )
+        slider_marks.extend(
+            make_track_marks(track, track_row, track_occupancy[track], color_manager)
+        )
 
     # Frames with instance without track
     untracked_frames = set()
@@ -1305,29 +1621,142 @@ def set_slider_marks_from_labels(
     all_simple_frames.update(user_labeled)
 
     for frame_idx in all_simple_frames:
-        if frame_idx in suggested_frames:
-            if frame_idx in user_labeled:
-                # suggested frame with user labeled instances
-                mark_type = SemanticMarkType.suggested_with_user
-            elif frame_idx in labeled_marks:
-                # suggested frame with only predicted instances
-                mark_type = SemanticMarkType.suggested_with_predicted
-            else:
-                # suggested frame without any instances
-                mark_type = SemanticMarkType.suggested_with_nothing
-        elif frame_idx in user_labeled:
-            # frame with user labeled instances
-            mark_type = SemanticMarkType.user
-        else:
-            # no user instances, predicted instance without track identity
-            mark_type = SemanticMarkType.predicted_no_track
+        mark_type = get_frame_mark_type(
+            is_suggested=frame_idx in suggested_frames,
+            is_user_labeled=frame_idx in user_labeled,
+            is_labeled=frame_idx in labeled_marks,
+        )
+        slider_marks.append(SliderMark(mark_type.value, val=frame_idx))
 
-        mark_type = mark_type.value
+    slider.track_rows = track_rows
+    slider.setNumberOfTracks(len(track_rows))  # total number of tracks to show
+    slider.setMarks(slider_marks)
 
-        slider_marks.append(SliderMark(mark_type, val=frame_idx))
 
-    slider.setNumberOfTracks(track_row)  # total number of tracks to show
-    slider.setMarks(slider_marks)
+def update_slider_marks_for_frame(
+    slider: VideoSlider,
+    labels: "Labels",
+    video: "Video",
+    frame_idx: int,
+    color_manager: Optional[ColorManager] = None,
+):
+    """
+    Updates slider marks after the instances in a single frame have changed.
+
+    Only the mark for the frame and the marks of tracks which have (or had)
+    instances in the frame are replaced. If the set of tracks shown in the
+    slider has changed, all the marks are rebuilt with
+    `set_slider_marks_from_labels`.
+
+    Args:
+        slider: the slider we're updating
+        labels: the dataset with tracks and labeled frames
+        video: the video for which to show marks
+        frame_idx: the index of the frame that changed
+
+    Returns:
+        None
+    """
+    if color_manager is None:
+        color_manager = ColorManager(labels=labels)
+
+    track_rows = get_slider_track_rows(labels, video)
+    if track_rows != slider.track_rows:
+        set_slider_marks_from_labels(slider, labels, video, color_manager)
+        return
+
+    # Find marks for this frame and for tracks in the frame (before the change)
+    old_marks = [
+        mark for mark in slider.getMarksAtVal(frame_idx) if mark.type != "track"
+    ]
+    changed_tracks = {
+        mark.track for mark in slider.getMarksAtVal(frame_idx) if mark.type == "track"
+    }
+
+    lfs = labels.find(video, frame_idx)
+    lf = lfs[0] if lfs else None
+    if lf is not None:
+        changed_tracks.update({inst.track for inst in lf.instances})
+    changed_tracks.discard(None)
+
+    old_marks.extend(slider.getTrackMarks(changed_tracks))
+
+    # Make new marks for this frame and the changed tracks
+    new_marks = []
+    track_occupancy = labels.get_track_occupancy(video)
+    for track in changed_tracks:
+        new_marks.extend(
+            make_track_marks(
+                track, track_rows[track], track_occupancy[track], color_manager
+            )
+        )
+
+    is_suggested = frame_idx in labels.get_video_suggestions(video)
+    is_user_labeled = lf is not None and len(lf.user_instances) > 0
+    is_untracked = lf is not None and any(inst.track is None for inst in lf.instances)
+    if is_suggested or is_user_labeled or is_untracked:
+        mark_type = get_frame_mark_type(
+            is_suggested=is_suggested,
+            is_user_labeled=is_user_labeled,
+            is_labeled=lf is not None,
+        )
+        new_marks.append(SliderMark(mark_type.value, val=frame_idx))
+
+    slider.removeMarks(old_marks, update=False)
+    slider.addMarks(new_marks)
+
+
+def get_slider_track_rows(labels: "Labels", video: "Video") -> Dict["Track", int]:
+    """Returns the slider row for each track with instances in the video."""
+    track_occupancy = labels.get_track_occupancy(video)
+    track_rows = dict()
+    for track in labels.tracks:
+        if track in track_occupancy and not track_occupancy[track].is_empty:
+            track_rows[track] = len(track_rows)
+    return track_rows
+
+
+def make_track_marks(
+    track: "Track",
+    track_row: int,
+    occupancy: "RangeList",
+    color_manager: ColorManager,
+) -> List[SliderMark]:
+    """Returns slider marks for each range of frames occupied by a track."""
+    color = color_manager.get_track_color(track)
+    return [
+        SliderMark(
+            "track",
+            val=occupancy_range[0],
+            end_val=occupancy_range[1],
+            row=track_row,
+            track=track,
+            color=color,
+        )
+        for occupancy_range in occupancy.list
+    ]
+
+
+def get_frame_mark_type(
+    is_suggested: bool, is_user_labeled: bool, is_labeled: bool
+) -> SemanticMarkType:
+    """Returns the type of mark to show for a frame."""
+    if is_suggested:
+        if is_user_labeled:
+            # suggested frame with user labeled instances
+            return SemanticMarkType.suggested_with_user
+        elif is_labeled:
+            # suggested frame with only predicted instances
+            return SemanticMarkType.suggested_with_predicted
+        else:
+            # suggested frame without any instances
+            return SemanticMarkType.suggested_with_nothing
+    elif is_user_labeled:
+        # frame with user labeled instances
+        return SemanticMarkType.user
+    else:
+        # no user instances, predicted instance without track identity
+        return SemanticMarkType.predicted_no_track
 
 
 if __name__ == "__main__":
@@ -1344,3 +1773,70 @@ if __name__ == "__main__":
     window.show()
 
     app.exec_()
+
+
+def get_series_arrays(
+    series: Union[Dict[int, float], np.ndarray, Tuple[np.ndarray, np.ndarray]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts series to (frame indices, values) arrays sorted by frame index.
+
+    Args:
+        series: {frame number: series value} dict, array/list with value for
+            each frame, or tuple of (frame numbers, values) arrays.
+
+    Returns:
+        Tuple of (frame_idxs, values) arrays.
+    """
+    if hasattr(series, "keys"):
+        frame_idxs = np.fromiter(series.keys(), dtype=np.int64, count=len(series))
+        vals = np.fromiter(series.values(), dtype=np.float64, count=len(series))
+    elif isinstance(series, tuple):
+        frame_idxs = np.asarray(series[0], dtype=np.int64)
+        vals = np.asarray(series[1], dtype=np.float64)
+    else:
+        vals = np.asarray(series, dtype=np.float64)
+        frame_idxs = np.arange(len(vals))
+
+    if np.any(np.diff(frame_idxs) < 0):
+        order = np.argsort(frame_idxs, kind="stable")
+        frame_idxs, vals = frame_idxs[order], vals[order]
+
+    return frame_idxs, vals
+
+
+def downsample_series(
+    frame_idxs: np.ndarray, vals: np.ndarray, step: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsamples series by taking max value in consecutive bins of frames.
+
+    Frames which aren't in series count as zero.
+
+    Args:
+        frame_idxs: Sorted frame indices for series.
+        vals: Series value for each frame index.
+        step: Number of frames in each bin.
+
+    Returns:
+        Tuple of (bin start frame indices, max value in bin) arrays, with
+        bins covering frames from 0 through the last frame in series.
+    """
+    bins = frame_idxs // step
+    bin_count = (bins[-1] + 1) if len(bins) else 0
+
+    sampled = np.zeros(bin_count)
+    if len(bins):
+        bin_starts = np.flatnonzero(np.diff(bins, prepend=-1))
+        bin_vals = np.fmax.reduceat(vals, bin_starts)
+        bin_vals = np.nan_to_num(bin_vals)
+
+        # Bins missing any frames also include zeros for those frames.
+        bin_sizes = np.diff(np.append(bin_starts, len(bins)))
+        bin_frames = np.minimum(step, frame_idxs[-1] + 1 - bins[bin_starts] * step)
+        is_full = bin_sizes == bin_frames
+        bin_vals[~is_full] = np.maximum(bin_vals[~is_full], 0)
+
+        sampled[bins[bin_starts]] = bin_vals
+
+    return np.arange(bin_count) * step, sampled
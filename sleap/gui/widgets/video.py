@@ -11,7 +11,8 @@ Example usage:
     >>> vp.addInstance(instance=my_instance, color=(r, g, b))
 
 """
-from collections import deque
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 
 
 # FORCE_REQUESTS controls whether we emit a signal to process frame requests
@@ -39,7 +40,9 @@ from PySide2.QtGui import QKeyEvent, QMouseEvent, QKeySequence
 from PySide2.QtCore import Qt, QRectF, QPointF, QMarginsF, QLineF
 
 import atexit
+import contextlib
 import math
+import threading
 import time
 import numpy as np
 
@@ -66,6 +69,80 @@ from sleap.gui.shortcuts import Shortcuts
 import qimage2ndarray
 
 
+class FrameImageCache:
+    """
+    Least-recently-used cache of frame images with a memory budget.
+
+    Images are keyed by (video, frame_idx). When adding an image pushes the
+    total size of the cached images over `max_bytes`, the least recently used
+    images are evicted. Access is thread-safe so that images can be added from
+    worker threads.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._n_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._images
+
+    @property
+    def n_bytes(self) -> int:
+        """Total size in bytes of the images in the cache."""
+        return self._n_bytes
+
+    def get(self, key) -> Optional[QImage]:
+        """Returns cached image (marking it as recently used), or None."""
+        with self._lock:
+            qimage = self._images.get(key, None)
+            if qimage is not None:
+                self._images.move_to_end(key)
+            return qimage
+
+    def put(self, key, qimage: QImage):
+        """Adds image to cache, evicting the least recently used if needed."""
+        with self._lock:
+            if key in self._images:
+                self._n_bytes -= self._images.pop(key).byteCount()
+            self._images[key] = qimage
+            self._n_bytes += qimage.byteCount()
+
+            # Always keep the most recent image, even if it's over budget.
+            while self._n_bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._n_bytes -= evicted.byteCount()
+
+    def clear(self):
+        """Removes all images from the cache."""
+        with self._lock:
+            self._images.clear()
+            self._n_bytes = 0
+
+
+def load_frame_qimage(video: Video, frame_idx: int) -> Optional[QImage]:
+    """Loads a frame from video and converts it to a `QImage`.
+
+    Returns:
+        The `QImage`, or None if the frame couldn't be loaded.
+    """
+    try:
+        frame = video.get_frame(frame_idx)
+    except Exception:
+        return None
+
+    if frame is None:
+        return None
+
+    # Convert ndarray to QImage
+    return qimage2ndarray.array2qimage(frame)
+
+
 class LoadImageWorker(QtCore.QObject):
     """
     Object to load video frames in background thread.
@@ -84,6 +161,13 @@ class LoadImageWorker(QtCore.QObject):
     a single frame at a time; this helps us not get a bunch of older frame
     requests running concurrently.
 
+    Loaded frames are kept as `QImage` objects in a `FrameImageCache`. After
+    each request, frames in a window ahead of (in the direction that the user
+    is moving) and behind the requested frame are decoded into the cache by a
+    pool of worker threads, so that stepping through the video usually only
+    needs a cache lookup. The window sizes, cache budget and number of worker
+    threads are set by preferences.
+
     Once the frame loads, the `QImage` is sent via the `result` signal.
     (Qt handles the cross-thread communication if we use signals.)
     """
@@ -103,6 +187,19 @@ class LoadImageWorker(QtCore.QObject):
         self._processing_mutex = QtCore.QMutex()
         self._recent_load_times = deque(maxlen=5)
 
+        # Decoded frames and the pool of threads for prefetching them.
+        self.prefetch_ahead = prefs["prefetch frames ahead"]
+        self.prefetch_behind = prefs["prefetch frames behind"]
+        self.cache = FrameImageCache(
+            max_bytes=int(prefs["frame cache size (MB)"] * 1024 * 1024)
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, prefs["frame loading threads"])
+        )
+        self._prefetching = dict()
+        self._last_frame_idx = None
+        self._direction = 1
+
         # Connect signal to processing function so that we can add processing
         # event to event queue from the request handler.
         self.process.connect(self.doProcessing)
@@ -124,6 +221,7 @@ class LoadImageWorker(QtCore.QObject):
         # Maybe we had to wait to acquire the lock, so make sure there are still
         # frames to load
         if not self.load_queue:
+            self._processing_mutex.unlock()
             return
 
         # Get the most recent request and clear all the others, since there's no
@@ -131,12 +229,22 @@ class LoadImageWorker(QtCore.QObject):
         frame_idx = self.load_queue[-1]
         self.load_queue = []
 
-        try:
+        video = self.video
+        key = (video, frame_idx)
+        qimage = self.cache.get(key)
 
+        if qimage is None:
             t0 = time.time()
 
-            # Get image data
-            frame = self.video.get_frame(frame_idx)
+            # Wait for the frame if it's already being prefetched, otherwise
+            # load it here.
+            future = self._prefetching.get(key, None)
+            if future is not None and not future.cancel():
+                qimage = future.result()
+            else:
+                qimage = load_frame_qimage(video, frame_idx)
+                if qimage is not None:
+                    self.cache.put(key, qimage)
 
             self._recent_load_times.append(time.time() - t0)
 
@@ -145,19 +253,95 @@ class LoadImageWorker(QtCore.QObject):
             avg_load_time = sum(self._recent_load_times) / len(self._recent_load_times)
             self._force_request_wait_time = avg_load_time
 
-        except Exception as e:
-            frame = None
+        # Start prefetching before releasing the lock, so that prefetch jobs
+        # can't be started while loading is paused (see `paused`).
+        self.prefetch(video, frame_idx)
 
         # Release the lock so other threads can start processing frame requests
         self._processing_mutex.unlock()
 
-        if frame is not None:
-            # Convert ndarray to QImage
-            qimage = qimage2ndarray.array2qimage(frame)
-
+        if qimage is not None:
             # Emit result
             self.result.emit(qimage)
 
+    def prefetch(self, video: Video, frame_idx: int):
+        """Starts loading the frames around `frame_idx` into the cache.
+
+        Frames are loaded in order of distance from `frame_idx`, starting with
+        the frames ahead in the direction of the most recent movement. Frames
+        that were queued for earlier requests and are no longer in the window
+        are cancelled.
+        """
+        if video is None:
+            return
+
+        if self._last_frame_idx is not None and frame_idx != self._last_frame_idx:
+            self._direction = 1 if frame_idx > self._last_frame_idx else -1
+        self._last_frame_idx = frame_idx
+
+        ahead = [
+            frame_idx + self._direction * i for i in range(1, self.prefetch_ahead + 1)
+        ]
+        behind = [
+            frame_idx - self._direction * i for i in range(1, self.prefetch_behind + 1)
+        ]
+        window = [(video, idx) for idx in ahead + behind if 0 <= idx < video.frames]
+
+        # Drop finished and stale prefetch jobs.
+        window_keys = set(window)
+        for key, future in list(self._prefetching.items()):
+            if future.done() or (key not in window_keys and future.cancel()):
+                del self._prefetching[key]
+
+        for key in window:
+            if key not in self._prefetching and key not in self.cache:
+                self._prefetching[key] = self._executor.submit(
+                    self._load_into_cache, key
+                )
+
+    def _load_into_cache(self, key) -> Optional[QImage]:
+        video, frame_idx = key
+        qimage = load_frame_qimage(video, frame_idx)
+        if qimage is not None:
+            self.cache.put(key, qimage)
+        return qimage
+
+    def _cancel_prefetch(self, wait_running: bool = False):
+        """Cancels queued prefetch jobs (optionally waiting for running jobs)."""
+        for future in self._prefetching.values():
+            future.cancel()
+        if wait_running:
+            wait(list(self._prefetching.values()))
+        self._prefetching = dict()
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Context in which no frames are loaded and the cache is emptied.
+
+        Use this when replacing or resetting the backend of a video, so that
+        frames aren't read from the backend while it changes and frames from
+        the old backend aren't shown afterwards.
+        """
+        self._processing_mutex.lock()
+        try:
+            self._cancel_prefetch(wait_running=True)
+            self.cache.clear()
+            self._last_frame_idx = None
+            yield
+        finally:
+            self.cache.clear()
+            self._processing_mutex.unlock()
+
+    def clear_cache(self):
+        """Cancels prefetching and removes all frames from the cache."""
+        with self.paused():
+            pass
+
+    def shutdown(self):
+        """Cancels queued prefetch jobs and stops the worker threads."""
+        self._cancel_prefetch()
+        self._executor.shutdown(wait=False)
+
     def request(self, frame_idx):
         # Add request to the queue so that we can just process the most recent.
         self.load_queue.append(frame_idx)
@@ -274,6 +458,7 @@ class QtVideoPlayer(QWidget):
             self.load_video(video)
 
     def cleanup(self):
+        self._video_image_loader.shutdown()
         self._loader_thread.quit()
         self._loader_thread.wait()
 
@@ -384,6 +569,9 @@ class QtVideoPlayer(QWidget):
 
         self.video = video
 
+        # Cached frames may be stale if the video backend has changed.
+        self._video_image_loader.clear_cache()
+
         # Is this necessary?
         self.view.scene.setSceneRect(0, 0, video.width, video.height)
 
@@ -395,6 +583,13 @@ class QtVideoPlayer(QWidget):
         if plot:
             self.plot()
 
+    def pausedFrameLoading(self):
+        """Returns context in which no frames are loaded (see `LoadImageWorker.paused`).
+
+        Cached frames are cleared, so this should be used when changing video backends.
+        """
+        return self._video_image_loader.paused()
+
     def reset(self):
         """ Reset viewer by removing all video data.
         """
@@ -434,6 +629,9 @@ class QtVideoPlayer(QWidget):
         """
         # Check if instance is an Instance (or subclass of Instance)
         if issubclass(type(instance), Instance):
+            if hasattr(instance, "score") and "layer" not in kwargs:
+                # Predicted instances are drawn by single item for all instances
+                kwargs["layer"] = self.view.instances_layer
             instance = QtInstance(instance=instance, player=self, **kwargs)
         if type(instance) != QtInstance:
             return
@@ -738,6 +936,7 @@ class GraphicsView(QGraphicsView):
         self.scene.setBackgroundBrush(QBrush(QColor(Qt.black)))
 
         self._pixmapHandle = None
+        self._instances_layer = None
 
         self.setRenderHint(QPainter.Antialiasing)
 
@@ -768,11 +967,25 @@ class GraphicsView(QGraphicsView):
             pixmap = self._pixmapHandle.pixmap()
 
         self.scene.clear()
+        self._instances_layer = None
 
         if self._pixmapHandle:
             # add the pixmap back
             self._pixmapHandle = self._add_pixmap(pixmap)
 
+    @property
+    def instances_layer(self) -> "QtInstancesLayer":
+        """
+        Returns item which draws (predicted) instances in batch.
+
+        The item is added to the scene the first time it's needed after the
+        scene is cleared.
+        """
+        if self._instances_layer is None:
+            self._instances_layer = QtInstancesLayer(player=self.player)
+            self.scene.addItem(self._instances_layer)
+        return self._instances_layer
+
     def _add_pixmap(self, pixmap):
         """Adds a pixmap to the scene and transforms it to midpoint coordinates."""
         pixmap_graphics_item = self.scene.addPixmap(pixmap)
@@ -1377,11 +1590,16 @@ class QtNode(QGraphicsEllipseItem):
         x = self.scenePos().x()
         y = self.scenePos().y()
 
+        # Node which user changed has been checked by user, so mark complete.
         context = self._parent_instance.player.context
         if user_change and context:
             context.setPointLocations(
-                self._parent_instance.instance, {self.node.name: (x, y)}
+                self._parent_instance.instance,
+                {self.node.name: (x, y)},
+                complete_nodes=[self.node.name],
             )
+        elif user_change:
+            self.point.complete = True
         self.show()
 
         if self.point.visible:
@@ -1440,14 +1658,13 @@ class QtNode(QGraphicsEllipseItem):
                 super(QtNode, self).mousePressEvent(event)
                 self.updatePoint()
 
-            self.point.complete = True  # FIXME: move to command
+            # Node is marked as complete when mouse is released.
         elif event.button() == Qt.RightButton:
             # Right-click to toggle node as missing from this instance
             self.toggleVisibility()
             # Disable contextual menu for right clicks on node
             self.player.is_menu_enabled = False
 
-            self.point.complete = True  # FIXME: move to command
             self.updatePoint(user_change=True)
         elif event.button() == Qt.MidButton:
             pass
@@ -1473,7 +1690,9 @@ class QtNode(QGraphicsEllipseItem):
             self.parentObject().mouseReleaseEvent(event)
             self.parentObject().setSelected(False)
             self.parentObject().setFlag(QGraphicsItem.ItemIsMovable, False)
-            self.parentObject().updatePoints(user_change=True)
+            self.parentObject().updatePoints(
+                user_change=True, complete_nodes=[self.node.name]
+            )
         else:
             super(QtNode, self).mouseReleaseEvent(event)
             self.updatePoint(user_change=True)
@@ -1646,10 +1865,15 @@ class QtInstance(QGraphicsObject):
     When instantiated, it creates `QtNode`, `QtEdge`, and
     `QtNodeLabel` items as children of itself.
 
+    If a `QtInstancesLayer` is given for a predicted instance, then the nodes
+    and edges are drawn by the layer (together with those of other instances)
+    rather than by child items, unless the instance is selected.
+
     Args:
         instance: The :class:`Instance` to show.
         markerRadius: Radius of nodes.
         show_non_visible: Whether to show "non-visible" nodes/edges.
+        layer: The `QtInstancesLayer` for drawing predicted instance.
     """
 
     def __init__(
@@ -1658,6 +1882,7 @@ class QtInstance(QGraphicsObject):
         player: Optional[QtVideoPlayer] = None,
         markerRadius=4,
         show_non_visible=True,
+        layer: Optional["QtInstancesLayer"] = None,
         *args,
         **kwargs,
     ):
@@ -1666,6 +1891,8 @@ class QtInstance(QGraphicsObject):
         self.skeleton = instance.skeleton
         self.instance = instance
         self.predicted = hasattr(instance, "score")
+        self.layer = layer if self.predicted else None
+        self._in_layer = False
 
         color_manager = self.player.color_manager
         color = color_manager.get_item_color(self.instance)
@@ -1723,11 +1950,27 @@ class QtInstance(QGraphicsObject):
             )
         self.track_label.setHtml(instance_label_text)
 
+        # Update size of box so it includes all the nodes/edges
+        self.updateBox()
+
+        if self.layer is not None:
+            self.layer.addInstance(self)
+            self._in_layer = True
+        else:
+            self._addPointItems()
+
+    @property
+    def in_layer(self) -> bool:
+        """Whether nodes and edges are drawn by `QtInstancesLayer`."""
+        return self._in_layer
+
+    def _addPointItems(self):
+        """Adds child items for nodes, edges, and node labels."""
         # Add nodes
         for (node, point) in self.instance.nodes_points:
             node_item = QtNode(
                 parent=self,
-                player=player,
+                player=self.player,
                 node=node,
                 point=point,
                 predicted=self.predicted,
@@ -1743,7 +1986,7 @@ class QtInstance(QGraphicsObject):
             if src in self.nodes and dst in self.nodes:
                 edge_item = QtEdge(
                     parent=self,
-                    player=player,
+                    player=self.player,
                     src=self.nodes[src],
                     dst=self.nodes[dst],
                     show_non_visible=self.show_non_visible,
@@ -1764,10 +2007,40 @@ class QtInstance(QGraphicsObject):
                 node.callbacks.append(node_label.adjustPos)
                 node.callbacks.append(self.updateBox)
 
-        # Update size of box so it includes all the nodes/edges
-        self.updateBox()
+    def _removePointItems(self):
+        """Removes child items for nodes, edges, and node labels."""
+        items = list(self.labels.values()) + self.edges + list(self.nodes.values())
+        for item in items:
+            item.setParentItem(None)
+            if item.scene() is not None:
+                item.scene().removeItem(item)
 
-    def updatePoints(self, complete: bool = False, user_change: bool = False):
+        self.nodes = {}
+        self.edges = []
+        self.labels = {}
+
+    def _setInLayer(self, in_layer: bool):
+        """Moves drawing of nodes and edges to/from `QtInstancesLayer`."""
+        if self.layer is None or in_layer == self._in_layer:
+            return
+
+        self._in_layer = in_layer
+        if in_layer:
+            self._removePointItems()
+            self.layer.addInstance(self)
+        else:
+            self.layer.removeInstance(self)
+            self._addPointItems()
+            self.updatePoints()
+            self.showEdges(self.edges_shown)
+            self.showLabels(self.labels_shown)
+
+    def updatePoints(
+        self,
+        complete: bool = False,
+        user_change: bool = False,
+        complete_nodes: Optional[List[str]] = None,
+    ):
         """
         Updates data and display for all points in skeleton.
 
@@ -1778,11 +2051,24 @@ class QtInstance(QGraphicsObject):
                 attribute.
             user_change: Whether method is called because of change made by
                 user.
+            complete_nodes: Names of nodes to mark as complete (if not
+                marking all nodes as complete).
 
         Returns:
             None.
         """
 
+        # Instances drawn in layer are predicted, so can't be changed by user.
+        if self._in_layer:
+            self.setPos(0, 0)
+            self.setRotation(0)
+            self.updateBox()
+            self.layer.updateInstance(self)
+            return
+
+        if complete:
+            complete_nodes = [node_item.node.name for node_item in self.nodes.values()]
+
         # Update the position for each node
         context = self.player.context
         if user_change and context:
@@ -1793,13 +2079,16 @@ class QtInstance(QGraphicsObject):
                 )
                 for node_item in self.nodes.values()
             }
-            context.setPointLocations(self.instance, new_data)
+            context.setPointLocations(
+                self.instance, new_data, complete_nodes=complete_nodes
+            )
+        elif complete_nodes:
+            for node_item in self.nodes.values():
+                if node_item.node.name in complete_nodes:
+                    node_item.point.complete = True
 
         for node_item in self.nodes.values():
             node_item.setPos(node_item.point.x, node_item.point.y)
-            if complete:
-                # FIXME: move to command
-                node_item.point.complete = True
         # Wait to run callbacks until all nodes are updated
         # Otherwise the label positions aren't correct since
         # they depend on the edge vectors to old node positions.
@@ -1817,14 +2106,14 @@ class QtInstance(QGraphicsObject):
 
     def getPointsBoundingRect(self) -> QRectF:
         """Returns a rect which contains all the nodes in the skeleton."""
-        points = [node.point for node in self.nodes.values()]
-        top_left = QPointF(
-            min((point.x for point in points)), min((point.y for point in points))
-        )
-        bottom_right = QPointF(
-            max((point.x for point in points)), max((point.y for point in points))
-        )
-        rect = QRectF(top_left, bottom_right)
+        points = self.instance.get_points_array()
+        points = points[~np.isnan(points).any(axis=1)]
+        if len(points) == 0:
+            return QRectF()
+
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        rect = QRectF(QPointF(x0, y0), QPointF(x1, y1))
         return rect
 
     def updateBox(self, *args, **kwargs):
@@ -1886,6 +2175,8 @@ class QtInstance(QGraphicsObject):
     def selected(self, selected: bool):
         """Sets select-state for instance."""
         self._selected = selected
+        # Selected instance gets its own items for nodes and edges
+        self._setInLayer(not selected)
         # Update the selection box for this skeleton instance
         self.updateBox()
 
@@ -1911,6 +2202,9 @@ class QtInstance(QGraphicsObject):
         for edge in self.edges:
             op = edge.full_opacity if show else 0
             edge.setOpacity(op)
+        if self._in_layer and show != self.edges_shown:
+            self.edges_shown = show
+            self.layer.updateInstance(self)
         self.edges_shown = show
 
     def boundingRect(self):
@@ -1924,6 +2218,290 @@ class QtInstance(QGraphicsObject):
         pass
 
 
+class QtInstancesLayer(QGraphicsObject):
+    """
+    QGraphicsObject which draws the nodes and edges for many instances.
+
+    Creating `QtNode`, `QtEdge` (etc.) items for every node and edge is slow
+    when there are many instances in a frame, so the nodes and edges for
+    (non-interactive) predicted instances are instead drawn by this single
+    item from stacked arrays of points for all the instances.
+
+    Each `QtInstance` in the layer still handles selection, bounding box, and
+    labels for its instance.
+
+    Args:
+        player: The `QtVideoPlayer` in which the layer is shown.
+        markerRadius: Radius of nodes (in pixels on screen).
+    """
+
+    def __init__(
+        self,
+        player: Optional[QtVideoPlayer] = None,
+        markerRadius: float = 4,
+        *args,
+        **kwargs,
+    ):
+        super(QtInstancesLayer, self).__init__(*args, **kwargs)
+        self.player = player
+        self.markerRadius = markerRadius
+        self.instances: List["QtInstance"] = []
+
+        self._styles = dict()
+        self._instance_styles = dict()
+        self._points_rect = QRectF()
+        self._margin = 0
+        self._needs_rebuild = False
+        self._edge_paths = []
+        self._node_groups = []
+        self._node_paths = dict()
+
+        # Show predicted instances behind non-predicted ones
+        self.setZValue(1)
+        self.setAcceptedMouseButtons(Qt.NoButton)
+
+    def addInstance(self, qt_instance: "QtInstance"):
+        """Adds instance to be drawn by layer."""
+        self.instances.append(qt_instance)
+        self.updateInstance(qt_instance)
+
+    def removeInstance(self, qt_instance: "QtInstance"):
+        """Removes instance from layer."""
+        if qt_instance in self.instances:
+            self.instances.remove(qt_instance)
+        self._needs_rebuild = True
+        self.update()
+
+    def updateInstance(self, qt_instance: "QtInstance"):
+        """Updates layer after points for instance have changed."""
+        self.prepareGeometryChange()
+        self._points_rect = self._points_rect.united(
+            qt_instance.getPointsBoundingRect()
+        )
+        self._margin = self._screen_to_scene(self.markerRadius * 2)
+        self._needs_rebuild = True
+        self.update()
+
+    def _screen_to_scene(self, length: float) -> float:
+        """Converts length in pixels on screen to scene units."""
+        if self.player is None:
+            return length
+        scale = self.player.view.transform().m11()
+        return length / scale if scale else length
+
+    @property
+    def _zoom_factor(self) -> float:
+        return self.player.view.zoomFactor if self.player is not None else 1
+
+    @property
+    def _edge_style(self) -> str:
+        if self.player is None:
+            return ""
+        return self.player.state.get("edge style", default="").lower()
+
+    def _get_style_id(self, color, pen_width: float) -> int:
+        """Returns int id for (color, pen width) pair."""
+        key = (tuple(color), pen_width)
+        if key not in self._styles:
+            self._styles[key] = len(self._styles)
+        return self._styles[key]
+
+    def _get_instance_style(self, qt_instance: "QtInstance"):
+        """
+        Returns (cached) style ids for nodes and edges of instance.
+
+        Returns:
+            Tuple with array of style id for each node in skeleton, and array
+            with (source node index, destination node index, style id) rows
+            for edges.
+        """
+        if qt_instance not in self._instance_styles:
+            color_manager = self.player.color_manager
+            instance = qt_instance.instance
+            skeleton = instance.skeleton
+
+            node_styles = np.array(
+                [
+                    self._get_style_id(
+                        color_manager.get_item_color(node, instance),
+                        color_manager.get_item_pen_width(node, instance),
+                    )
+                    for node in skeleton.nodes
+                ],
+                dtype=int,
+            )
+
+            edges = []
+            for src, dst in skeleton.edges:
+                edge_pair = (src, dst)
+                style_id = self._get_style_id(
+                    color_manager.get_item_color(edge_pair, instance),
+                    color_manager.get_item_pen_width(edge_pair, instance),
+                )
+                edges.append(
+                    (skeleton.node_to_index(src), skeleton.node_to_index(dst), style_id)
+                )
+            edges = np.array(edges, dtype=int).reshape(-1, 3)
+
+            self._instance_styles[qt_instance] = (node_styles, edges)
+
+        return self._instance_styles[qt_instance]
+
+    def _rebuild(self):
+        """Rebuilds the stacked arrays and paths used for drawing."""
+        xy = []
+        visible = []
+        show = []
+        node_styles = []
+        edges = []
+        node_offset = 0
+
+        for qt_instance in self.instances:
+            instance_node_styles, instance_edges = self._get_instance_style(qt_instance)
+            points = qt_instance.instance.get_points_array(copy=False, full=True)
+            instance_xy = np.stack([points["x"], points["y"]], axis=1)
+            instance_visible = points["visible"].astype(bool)
+
+            xy.append(instance_xy)
+            visible.append(instance_visible)
+            show.append(
+                ~np.isnan(instance_xy).any(axis=1)
+                & (instance_visible | qt_instance.show_non_visible)
+            )
+            node_styles.append(instance_node_styles)
+            if qt_instance.edges_shown:
+                edges.append(instance_edges + [node_offset, node_offset, 0])
+            node_offset += len(instance_xy)
+
+        if not xy:
+            self._edge_paths = []
+            self._node_groups = []
+            self._node_paths = dict()
+            return
+
+        xy = np.concatenate(xy)
+        visible = np.concatenate(visible)
+        show = np.concatenate(show)
+        node_styles = np.concatenate(node_styles)
+        edges = np.concatenate(edges) if edges else np.zeros((0, 3), dtype=int)
+
+        style_colors = {style_id: key for key, style_id in self._styles.items()}
+
+        # Group nodes by style and visibility
+        self._node_groups = []
+        for style_id in np.unique(node_styles[show]):
+            color, pen_width = style_colors[style_id]
+            pen = QPen(QColor(*color), pen_width)
+            pen.setCosmetic(True)
+            for is_visible in (True, False):
+                group_mask = show & (node_styles == style_id) & (visible == is_visible)
+                if np.any(group_mask):
+                    radius = self.markerRadius if is_visible else self.markerRadius / 2
+                    self._node_groups.append((pen, radius, xy[group_mask]))
+        self._node_paths = dict()
+
+        # Group edges by style and opacity (edges to non-visible nodes are
+        # drawn with less opacity)
+        src, dst = edges[:, 0], edges[:, 1]
+        edges_present = ~np.isnan(xy[src]).any(axis=1) & ~np.isnan(xy[dst]).any(axis=1)
+        edges_visible = visible[src] & visible[dst]
+        edges_show = edges_present & (edges_visible | show[src] & show[dst])
+
+        is_wedge = self._edge_style == "wedge"
+        self._edge_paths = []
+        for style_id in np.unique(edges[edges_show, 2]):
+            color, pen_width = style_colors[style_id]
+            pen = QPen(QColor(*color), pen_width)
+            pen.setCosmetic(True)
+            brush = QBrush(QColor(*color, a=128)) if is_wedge else QBrush(Qt.NoBrush)
+            for is_visible, opacity in ((True, 1), (False, 0.5)):
+                group_mask = (
+                    edges_show
+                    & (edges[:, 2] == style_id)
+                    & (edges_visible == is_visible)
+                )
+                if not np.any(group_mask):
+                    continue
+                path = self._make_edges_path(
+                    xy[src[group_mask]], xy[dst[group_mask]], visible[src[group_mask]]
+                )
+                self._edge_paths.append((pen, brush, opacity, path))
+
+    def _make_edges_path(
+        self, src_xy: np.ndarray, dst_xy: np.ndarray, src_visible: np.ndarray
+    ) -> QPainterPath:
+        """Returns path with lines (or wedges) from source to destination."""
+        path = QPainterPath()
+        if self._edge_style == "wedge":
+            # Wedge is as wide as (half) the source node, as for `QtEdge`
+            half_widths = np.where(src_visible, 1, 0.5) * (
+                self.markerRadius / self._zoom_factor / 2
+            )
+            vectors = dst_xy - src_xy
+            lengths = np.linalg.norm(vectors, axis=1)
+            lengths[lengths == 0] = 1
+            normals = np.stack([vectors[:, 1], -vectors[:, 0]], axis=1)
+            normals *= (half_widths / lengths)[:, None]
+            for (x0, y0), (x1, y1), (nx, ny) in zip(src_xy, dst_xy, normals):
+                path.addPolygon(
+                    QPolygonF(
+                        [
+                            QPointF(x0 + nx, y0 + ny),
+                            QPointF(x1, y1),
+                            QPointF(x0 - nx, y0 - ny),
+                            QPointF(x0 + nx, y0 + ny),
+                        ]
+                    )
+                )
+        else:
+            for (x0, y0), (x1, y1) in zip(src_xy, dst_xy):
+                path.moveTo(x0, y0)
+                path.lineTo(x1, y1)
+        return path
+
+    def _get_node_paths(self, scale: float):
+        """Returns (cached) paths for drawing nodes at given scale."""
+        if scale not in self._node_paths:
+            node_paths = []
+            for pen, radius, xy in self._node_groups:
+                # Nodes have fixed size on screen (like `QtNode`, which ignores
+                # transformations), so radius depends on scale.
+                scene_radius = radius / scale
+                path = QPainterPath()
+                for x, y in xy:
+                    path.addEllipse(QPointF(x, y), scene_radius, scene_radius)
+                node_paths.append((pen, path))
+            self._node_paths = {scale: node_paths}
+        return self._node_paths[scale]
+
+    def boundingRect(self):
+        """Method required by Qt to determine bounding rect for item."""
+        if self._points_rect.isNull():
+            return QRectF()
+        margin = self._margin
+        return self._points_rect.marginsAdded(QMarginsF(margin, margin, margin, margin))
+
+    def paint(self, painter, option, widget=None):
+        """Method required by Qt, draws nodes and edges for all instances."""
+        if self._needs_rebuild:
+            self._rebuild()
+            self._needs_rebuild = False
+
+        for pen, brush, opacity, path in self._edge_paths:
+            painter.setOpacity(opacity)
+            painter.setPen(pen)
+            painter.setBrush(brush)
+            painter.drawPath(path)
+        painter.setOpacity(1)
+
+        scale = painter.worldTransform().m11() or 1
+        # Predicted nodes are filled with translucent gray
+        painter.setBrush(QBrush(QColor(128, 128, 128, 128)))
+        for pen, path in self._get_node_paths(scale):
+            painter.setPen(pen)
+            painter.drawPath(path)
+
+
 class QtTextWithBackground(QGraphicsTextItem):
     """
     Inherits methods/behavior of `QGraphicsTextItem`, but with background box.
@@ -0,0 +1,233 @@
+"""
+Command line utility which times saving and loading labels files.
+
+Labels with predicted instances are generated for each project size, so
+this doesn't need any data files. For example: ::
+
+   python -m sleap.info.benchmark_io --frames 1000 10000 100000
+
+Use `--json` to time loading JSON labels files (with and without creating
+labeled frames in bulk) rather than saving .slp files.
+"""
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from sleap.instance import LabeledFrame, PredictedInstance, Track
+from sleap.io.dataset import Labels
+from sleap.io.video import Video
+from sleap.skeleton import Skeleton
+
+
+def make_labels(
+    num_frames: int, num_instances: int = 2, num_nodes: int = 10, seed: int = 0
+) -> Labels:
+    """
+    Generates labels with predicted instances.
+
+    Args:
+        num_frames: Number of labeled frames.
+        num_instances: Number of instances (each with its own track) per frame.
+        num_nodes: Number of nodes in skeleton.
+        seed: Seed for random point locations and scores.
+
+    Returns:
+        The generated `Labels`.
+    """
+    rng = np.random.RandomState(seed)
+
+    skeleton = Skeleton("benchmark")
+    skeleton.add_nodes([f"node{i}" for i in range(num_nodes)])
+    for i in range(num_nodes - 1):
+        skeleton.add_edge(f"node{i}", f"node{i + 1}")
+
+    video = Video.from_filename("benchmark.mp4")
+    tracks = [Track(spawned_on=0, name=f"track{i}") for i in range(num_instances)]
+
+    points = rng.uniform(0, 1024, size=(num_frames, num_instances, num_nodes, 2))
+    scores = rng.uniform(size=(num_frames, num_instances, num_nodes))
+
+    labeled_frames = [
+        LabeledFrame(
+            video=video,
+            frame_idx=frame_idx,
+            instances=[
+                PredictedInstance.from_arrays(
+                    points=points[frame_idx, i],
+                    point_confidences=scores[frame_idx, i],
+                    instance_score=float(scores[frame_idx, i].mean()),
+                    skeleton=skeleton,
+                    track=tracks[i],
+                )
+                for i in range(num_instances)
+            ],
+        )
+        for frame_idx in range(num_frames)
+    ]
+
+    return Labels(labeled_frames=labeled_frames, tracks=tracks)
+
+
+def time_call(func: Callable, repeats: int = 3) -> float:
+    """Returns the shortest time (in seconds) it took to call function."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark_save(
+    frame_counts: List[int],
+    num_instances: int = 2,
+    num_nodes: int = 10,
+    repeats: int = 3,
+) -> List[Dict[str, float]]:
+    """
+    Times saving labels as .slp files for a range of project sizes.
+
+    Args:
+        frame_counts: Number of labeled frames for each project size.
+        num_instances: Number of instances per frame.
+        num_nodes: Number of nodes in skeleton.
+        repeats: Number of times to save each project (we report fastest).
+
+    Returns:
+        List with dict of results for each project size.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "benchmark.slp")
+        for num_frames in frame_counts:
+            labels = make_labels(num_frames, num_instances, num_nodes)
+
+            save_time = time_call(lambda: Labels.save_file(labels, filename), repeats)
+
+            # Save again after loading, when points share a single buffer.
+            loaded_labels = Labels.load_file(filename)
+            resave_time = time_call(
+                lambda: Labels.save_file(loaded_labels, filename), repeats
+            )
+
+            results.append(
+                dict(
+                    frames=num_frames,
+                    instances=num_frames * num_instances,
+                    save=save_time,
+                    save_loaded=resave_time,
+                    file_mb=os.path.getsize(filename) / 1e6,
+                )
+            )
+    return results
+
+
+def benchmark_json_load(
+    frame_counts: List[int],
+    num_instances: int = 2,
+    num_nodes: int = 10,
+    repeats: int = 3,
+) -> List[Dict[str, float]]:
+    """
+    Times loading JSON labels files for a range of project sizes.
+
+    We time loading the whole file with the streaming parser and bulk frame
+    creation (as used by `Labels.load_file`), and also parsing the whole file
+    and then structuring each labeled frame with cattr.
+
+    Args:
+        frame_counts: Number of labeled frames for each project size.
+        num_instances: Number of instances per frame.
+        num_nodes: Number of nodes in skeleton.
+        repeats: Number of times to load each project (we report fastest).
+
+    Returns:
+        List with dict of results for each project size.
+    """
+    from sleap.io.format.labels_json import LabelsJsonAdaptor
+    from sleap.util import json_loads
+
+    def load_with_cattr(filename: str) -> Labels:
+        with open(filename, "r") as f:
+            return LabelsJsonAdaptor.from_json_data(json_loads(f.read()), bulk=False)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "benchmark.json")
+        for num_frames in frame_counts:
+            labels = make_labels(num_frames, num_instances, num_nodes)
+            Labels.save_file(labels, filename)
+
+            results.append(
+                dict(
+                    frames=num_frames,
+                    instances=num_frames * num_instances,
+                    load=time_call(lambda: Labels.load_file(filename), repeats),
+                    load_cattr=time_call(lambda: load_with_cattr(filename), repeats),
+                    file_mb=os.path.getsize(filename) / 1e6,
+                )
+            )
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--frames",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="Number of labeled frames for each project size",
+    )
+    parser.add_argument(
+        "--instances", type=int, default=2, help="Number of instances per frame"
+    )
+    parser.add_argument(
+        "--nodes", type=int, default=10, help="Number of nodes in skeleton"
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Number of times to repeat each save"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Time loading JSON rather than saving"
+    )
+    args = parser.parse_args()
+
+    kwargs = dict(num_instances=args.instances, num_nodes=args.nodes)
+
+    if args.json:
+        results = benchmark_json_load(args.frames, repeats=args.repeats, **kwargs)
+
+        print(
+            f"{'frames':>10} {'instances':>10} {'load (s)':>10} "
+            f"{'cattr (s)':>10} {'file (MB)':>10}"
+        )
+        for result in results:
+            print(
+                f"{result['frames']:>10} {result['instances']:>10} "
+                f"{result['load']:>10.3f} {result['load_cattr']:>10.3f} "
+                f"{result['file_mb']:>10.1f}"
+            )
+        return
+
+    results = benchmark_save(args.frames, repeats=args.repeats, **kwargs)
+
+    print(
+        f"{'frames':>10} {'instances':>10} {'save (s)':>10} "
+        f"{'resave (s)':>11} {'file (MB)':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['frames']:>10} {result['instances']:>10} "
+            f"{result['save']:>10.3f} {result['save_loaded']:>11.3f} "
+            f"{result['file_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
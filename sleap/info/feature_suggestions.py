@@ -9,6 +9,8 @@ import itertools
 import logging
 import numpy as np
 import random
+import threading
+from collections import OrderedDict
 from time import time
 from typing import Dict, List, Optional, Tuple
 
@@ -25,6 +27,52 @@ from sleap.io.video import Video
 
 logger = logging.getLogger(__name__)
 
+# How much memory (in bytes) results from expensive pipeline stages (loading
+# frame images and generating features) can use, so that the pipeline can be
+# run again with different PCA/k-means params without repeating these stages.
+STAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+_stage_cache = OrderedDict()
+_stage_cache_lock = threading.Lock()
+
+
+def _get_stage_nbytes(stack: "ItemStack") -> int:
+    return 0 if stack.data is None else stack.data.nbytes
+
+
+def get_cached_stage(key: tuple) -> Optional["ItemStack"]:
+    """Returns copy of cached `ItemStack` for pipeline stage, or None."""
+    with _stage_cache_lock:
+        stack = _stage_cache.get(key, None)
+        if stack is None:
+            return None
+        _stage_cache.move_to_end(key)
+        return stack.copy()
+
+
+def cache_stage(key: tuple, stack: "ItemStack"):
+    """
+    Adds copy of `ItemStack` after pipeline stage to cache.
+
+    The least recently used results are removed when the cache uses more than
+    `STAGE_CACHE_MAX_BYTES` (and results which use more aren't cached).
+    """
+    if _get_stage_nbytes(stack) > STAGE_CACHE_MAX_BYTES:
+        return
+    with _stage_cache_lock:
+        _stage_cache[key] = stack.copy()
+        _stage_cache.move_to_end(key)
+        total_nbytes = sum(map(_get_stage_nbytes, _stage_cache.values()))
+        while total_nbytes > STAGE_CACHE_MAX_BYTES:
+            _, removed = _stage_cache.popitem(last=False)
+            total_nbytes -= _get_stage_nbytes(removed)
+
+
+def clear_stage_cache():
+    """Removes all cached pipeline stage results."""
+    with _stage_cache_lock:
+        _stage_cache.clear()
+
 
 @attr.s(auto_attribs=True)
 class BriskVec:
@@ -368,6 +416,21 @@ class ItemStack(object):
             return None
         return self.group_sets[-1]
 
+    def copy(self) -> "ItemStack":
+        """
+        Returns copy of stack which can be modified without changing this one.
+
+        The data array is shared, since the stack methods replace (rather than
+        modify) the data.
+        """
+        return attr.evolve(
+            self,
+            items=list(self.items),
+            ownership=None if self.ownership is None else list(self.ownership),
+            meta=list(self.meta),
+            group_sets=list(self.group_sets),
+        )
+
     def get_item_data_idxs(self, item):
         """Returns indexes of rows in data which belong to item."""
         item_idx = self.items.index(item)
@@ -558,8 +621,26 @@ class FeatureSuggestionPipeline(object):
     brisk_threshold: int = 40
     vocab_size: int = 20
     frame_data: Optional[ItemStack] = None
+    use_cache: bool = True
+    _stage_key: Optional[tuple] = attr.ib(default=None, init=False, repr=False)
 
     def run_disk_stage(self, videos):
+        # We don't use cached results if frames are sampled randomly, since we
+        # should get a new sample each time.
+        use_cache = self.use_cache and self.sample_method != "random"
+        self._stage_key = None
+        if use_cache:
+            self._stage_key = (
+                "disk",
+                tuple(videos),
+                self.per_video,
+                self.sample_method,
+                self.scale,
+            )
+            self.frame_data = get_cached_stage(self._stage_key)
+            if self.frame_data is not None:
+                return
+
         self.frame_data = ItemStack()
 
         # Make the list of frames, sampling from each video
@@ -571,13 +652,23 @@ class FeatureSuggestionPipeline(object):
         # Load the frame images
         self.frame_data.get_raw_images(scale=self.scale)
 
-    def run_processing_state(self):
-        if self.frame_data is None:
-            raise ValueError(
-                "Processing state called before disk stage (frame_data is None)"
+        if use_cache:
+            cache_stage(self._stage_key, self.frame_data)
+
+    def run_feature_stage(self):
+        """Generates feature data for each frame (from frame images)."""
+        feature_key = None
+        if self.use_cache and self._stage_key is not None:
+            feature_key = self._stage_key + (
+                self.feature_type,
+                self.brisk_threshold,
+                self.vocab_size,
             )
+            features = get_cached_stage(feature_key)
+            if features is not None:
+                self.frame_data = features
+                return
 
-        # Generate feature data for each frame
         if self.feature_type == "brisk":
             # Get bag of features vector for each image from brisk descriptors
             # for brisk keypoints on each image.
@@ -594,6 +685,18 @@ class FeatureSuggestionPipeline(object):
             # Flatten the raw image matrix for each image
             self.frame_data.flatten()
 
+        if feature_key is not None:
+            cache_stage(feature_key, self.frame_data)
+
+    def run_processing_state(self):
+        if self.frame_data is None:
+            raise ValueError(
+                "Processing state called before disk stage (frame_data is None)"
+            )
+
+        # Generate feature data for each frame
+        self.run_feature_stage()
+
         # Transform data using PCA
         self.frame_data.pca(n_components=self.n_components)
 
@@ -618,6 +721,7 @@ class FeatureSuggestionPipeline(object):
 
     def reset(self):
         self.frame_data = None
+        self._stage_key = None
 
     def get_suggestion_frames(self, videos, group_offset=0):
         return self.run(videos).to_suggestion_frames(group_offset)
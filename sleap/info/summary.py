@@ -3,15 +3,45 @@ Module for getting a series which gives some statistic based on labeling
 data for each frame of some labeled video.
 """
 
+import warnings
+
 import attr
 import numpy as np
 
-from typing import Callable, Dict
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from sleap.instance import Track
 from sleap.io.dataset import Labels
 from sleap.io.video import Video
 
 
+@attr.s(auto_attribs=True)
+class _FrameStatisticRows:
+    """
+    Per-instance arrays extracted from a single labeled frame.
+
+    Attributes:
+        track_ids: (n_instances,) ids for instance tracks (-1 for no track).
+        predicted: (n_instances,) whether each instance is predicted.
+        instance_scores: (n_instances,) instance scores (NaN for user).
+        points: (n_instances, n_nodes, 2) point coordinates, with
+            invisible points set to NaN.
+        labeled: (n_instances, n_nodes) whether coordinates are set.
+        point_scores: (n_instances, n_nodes) point scores (NaN for user).
+    """
+
+    track_ids: np.ndarray
+    predicted: np.ndarray
+    instance_scores: np.ndarray
+    points: np.ndarray
+    labeled: np.ndarray
+    point_scores: np.ndarray
+
+    @property
+    def n_nodes(self) -> int:
+        return self.points.shape[1]
+
+
 @attr.s(auto_attribs=True)
 class StatisticSeries:
     """
@@ -20,20 +50,133 @@ class StatisticSeries:
     Each method returns a series which is a dictionary in which keys
     are frame index and value are some numerical value for the frame.
 
+    Point and instance data are extracted once per labeled frame and the
+    per-frame statistics are computed for the whole video at once as
+    numpy columns. Both are cached per video; call :meth:`update_frames`
+    after editing frames (or :meth:`invalidate` after larger changes) so
+    that only the changed frames are extracted and recomputed again.
+
     Args:
         labels: The :class:`Labels` for which to calculate series.
     """
 
     labels: Labels
+    _frame_rows: Dict[Video, Dict[int, _FrameStatisticRows]] = attr.ib(
+        factory=dict, init=False
+    )
+    _columns: Dict[Video, Dict[str, np.ndarray]] = attr.ib(factory=dict, init=False)
+    _track_ids: Dict[Track, int] = attr.ib(factory=dict, init=False)
+    _tracks: List[Track] = attr.ib(factory=list, init=False)
+
+    def invalidate(self, video: Optional[Video] = None):
+        """Clears cached data for video (or all videos if not specified)."""
+        if video is None:
+            self._frame_rows = dict()
+            self._columns = dict()
+        else:
+            self._frame_rows.pop(video, None)
+            self._columns.pop(video, None)
+
+    def update_frames(self, video: Video, frame_idxs: Iterable[int]):
+        """
+        Updates cached data after frames in video have changed.
+
+        Args:
+            video: The :class:`Video` with changed frames.
+            frame_idxs: Indices of frames which were changed, added or
+                removed.
+
+        Returns:
+            None.
+        """
+        if video not in self._frame_rows:
+            # Nothing cached yet, so it will be built when needed.
+            return
+
+        video_rows = self._frame_rows[video]
+        frame_idxs = np.unique(np.array(list(frame_idxs), dtype=int))
+        for frame_idx in frame_idxs.tolist():
+            lfs = self.labels.find(video, frame_idx)
+            if lfs:
+                video_rows[frame_idx] = self._get_frame_rows(lfs[0])
+            else:
+                video_rows.pop(frame_idx, None)
+
+        columns = self._columns.get(video)
+        if columns is None:
+            return
+
+        # Point displacement depends on the previous labeled frame, so the
+        # labeled frames right after the changed frames need new values too.
+        old_idxs = columns["frame_idx"]
+        keep = ~np.isin(old_idxs, frame_idxs)
+        changed_idxs = np.array(
+            [frame_idx for frame_idx in frame_idxs.tolist() if frame_idx in video_rows],
+            dtype=int,
+        )
+        labeled_idxs = np.union1d(old_idxs[keep], changed_idxs)
+        next_pos = np.searchsorted(labeled_idxs, frame_idxs, side="right")
+        update_idxs = np.union1d(
+            changed_idxs, labeled_idxs[next_pos[next_pos < len(labeled_idxs)]]
+        )
+        keep &= ~np.isin(old_idxs, update_idxs)
+
+        update_columns = self._compute_columns(video, update_idxs, labeled_idxs)
+        insert_pos = np.searchsorted(old_idxs[keep], update_idxs)
+        self._columns[video] = {
+            key: np.insert(column[keep], insert_pos, update_columns[key])
+            for key, column in columns.items()
+        }
+
+    def get_columns(self, video: Video) -> Dict[str, np.ndarray]:
+        """
+        Returns per-frame statistic columns for all labeled frames in video.
+
+        Args:
+            video: The :class:`Video` for which to calculate statistics.
+
+        Returns:
+            Dictionary of arrays with one row per labeled frame, sorted by
+            frame index. "frame_idx" holds the frame indices; the other keys
+            are "point_count", "point_score_{sum,min}",
+            "instance_score_{sum,min}" and "point_displacement_{sum,mean,max}".
+        """
+        if video not in self._columns:
+            self._columns[video] = self._compute_columns(video)
+        return self._columns[video]
+
+    def get_series_arrays(
+        self, video: Video, name: str, reduction: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns a series as (frame indices, values) arrays.
+
+        Args:
+            video: The :class:`Video` for which to calculate statistic.
+            name: Name of the series, i.e., "point_count", "point_score",
+                "instance_score", "point_displacement" or
+                "primary_point_displacement".
+            reduction: Name of reduction (see the corresponding `get_*_series`
+                method for options).
+
+        Returns:
+            Tuple of (frame_idxs, values) arrays.
+        """
+        if name == "primary_point_displacement":
+            values = self.get_primary_point_displacement_series(
+                video, reduction=reduction or "sum"
+            )
+            return np.arange(len(values)), values
+
+        column = name if reduction is None else f"{name}_{reduction}"
+        columns = self.get_columns(video)
+        if column not in columns:
+            raise ValueError(f"Unknown statistic series: {column}")
+        return columns["frame_idx"], columns[column]
 
     def get_point_count_series(self, video: Video) -> Dict[int, float]:
         """Get series with total number of labeled points in each frame."""
-        series = dict()
-
-        for lf in self.labels.find(video):
-            val = sum(len(inst.points) for inst in lf if hasattr(inst, "score"))
-            series[lf.frame_idx] = val
-        return series
+        return self._as_series(*self.get_series_arrays(video, "point_count"))
 
     def get_point_score_series(
         self, video: Video, reduction: str = "sum"
@@ -49,19 +192,7 @@ class StatisticSeries:
         Returns:
             The series dictionary (see class docs for details)
         """
-        reduce_funct = dict(sum=sum, min=lambda x: min(x, default=0))[reduction]
-
-        series = dict()
-
-        for lf in self.labels.find(video):
-            val = reduce_funct(
-                point.score
-                for inst in lf
-                for point in inst.points
-                if hasattr(inst, "score")
-            )
-            series[lf.frame_idx] = val
-        return series
+        return self._as_series(*self.get_series_arrays(video, "point_score", reduction))
 
     def get_instance_score_series(self, video, reduction="sum") -> Dict[int, float]:
         """Get series with statistic of instance scores in each frame.
@@ -75,14 +206,9 @@ class StatisticSeries:
         Returns:
             The series dictionary (see class docs for details)
         """
-        reduce_funct = dict(sum=sum, min=lambda x: min(x, default=0))[reduction]
-
-        series = dict()
-
-        for lf in self.labels.find(video):
-            val = reduce_funct(inst.score for inst in lf if hasattr(inst, "score"))
-            series[lf.frame_idx] = val
-        return series
+        return self._as_series(
+            *self.get_series_arrays(video, "instance_score", reduction)
+        )
 
     def get_point_displacement_series(self, video, reduction="sum") -> Dict[int, float]:
         """
@@ -102,17 +228,9 @@ class StatisticSeries:
         Returns:
             The series dictionary (see class docs for details)
         """
-        reduce_funct = dict(sum=np.sum, mean=np.nanmean, max=np.max)[reduction]
-
-        series = dict()
-
-        last_lf = None
-        for lf in self.labels.find(video):
-            val = self._calculate_frame_velocity(lf, last_lf, reduce_funct)
-            last_lf = lf
-            if not np.isnan(val):
-                series[lf.frame_idx] = val  # len(lf.instances)
-        return series
+        return self._as_series(
+            *self.get_series_arrays(video, "point_displacement", reduction)
+        )
 
     def get_primary_point_displacement_series(
         self, video, reduction="sum", primary_node=None
@@ -143,43 +261,55 @@ class StatisticSeries:
             print(f"Unable to locate node {primary_node} so using node 0")
             primary_node_idx = 0
 
-        last_frame_idx = video.num_frames - 1
-        location_matrix = np.full(
-            (last_frame_idx + 1, track_count, 2), np.nan, dtype=np.float
-        )
-        last_track_pos = np.full((track_count, 2), 0, dtype=np.float)
+        frame_count = video.num_frames
+        rows, inst_frame_idxs = self._get_instance_table(video)
 
-        has_seen_track_idx = set()
-
-        for frame_idx in range(last_frame_idx + 1):
-            lfs = self.labels.find(video, frame_idx)
+        # Map instances to the index of their track in the labels.
+        labels_track_inds = {track: i for i, track in enumerate(self.labels.tracks)}
+        track_inds = np.array(
+            [labels_track_inds.get(track, -1) for track in self._tracks] + [-1]
+        )[rows.track_ids]
 
-            # Start by setting all track positions to where they were last,
-            # so that we won't get "jumps" when an instance is missing for
-            # some frames.
-            location_matrix[frame_idx] = last_track_pos
-
-            # Now update any positions we do have for the frame
-            if lfs:
-                lf = lfs[0]
-                for inst in lf.instances:
-                    if inst.track is not None:
-                        track_idx = self.labels.tracks.index(inst.track)
-                        if track_idx < track_count:
-                            point = inst.points_array[primary_node_idx, :2]
-                            location_matrix[frame_idx, track_idx] = point
-
-                            if not np.all(np.isnan(point)):
-                                # Keep track of where this track was last.
-                                last_track_pos[track_idx] = point
-
-                                # If this is the first time we've seen this
-                                # track, then use initial location for all
-                                # previous frames so first occurrence doesn't
-                                # have high displacement.
-                                if track_idx not in has_seen_track_idx:
-                                    location_matrix[:frame_idx, track_idx] = point
-                                    has_seen_track_idx.add(track_idx)
+        inst_mask = (
+            (track_inds >= 0)
+            & (track_inds < track_count)
+            & (inst_frame_idxs < frame_count)
+        )
+        if rows.n_nodes > primary_node_idx:
+            points = rows.points[inst_mask, primary_node_idx]
+        else:
+            points = np.full((np.count_nonzero(inst_mask), 2), np.nan)
+        frame_inds = inst_frame_idxs[inst_mask]
+        track_inds = track_inds[inst_mask]
+
+        observed_points = np.full((frame_count, track_count, 2), np.nan)
+        observed_points[frame_inds, track_inds] = points
+        observed = np.zeros((frame_count, track_count), dtype=bool)
+        observed[frame_inds, track_inds] = True
+        valid = observed & ~np.all(np.isnan(observed_points), axis=2)
+
+        # Carry each track's last valid position forward so that we won't get
+        # "jumps" when an instance is missing for some frames.
+        last_valid = np.where(valid, np.arange(frame_count)[:, None], -1)
+        last_valid = np.maximum.accumulate(last_valid, axis=0)
+        track_grid = np.broadcast_to(np.arange(track_count), last_valid.shape)
+        location_matrix = observed_points[np.maximum(last_valid, 0), track_grid]
+
+        # Before the first occurrence of a track, use its initial location so
+        # first occurrence doesn't have high displacement (or zero if the track
+        # never has a valid location).
+        has_valid = valid.any(axis=0)
+        first_points = observed_points[valid.argmax(axis=0), np.arange(track_count)]
+        first_points[~has_valid] = 0
+        before_first = last_valid < 0
+        location_matrix[before_first] = np.broadcast_to(
+            first_points, location_matrix.shape
+        )[before_first]
+
+        # Observed instances without a valid location stay as they are (after
+        # the first occurrence of the track).
+        invalid_observed = observed & ~valid & (~before_first | ~has_valid)
+        location_matrix[invalid_observed] = observed_points[invalid_observed]
 
         # Calculate the displacements. Note these will be offset by 1 frame
         # since we're starting from frame 1 rather than 0.
@@ -196,30 +326,211 @@ class StatisticSeries:
         return result
 
     @staticmethod
-    def _calculate_frame_velocity(
-        lf: "LabeledFrame", last_lf: "LabeledFrame", reduce_function: Callable
-    ) -> float:
+    def _as_series(frame_idxs: np.ndarray, values: np.ndarray) -> Dict[int, float]:
+        return dict(zip(frame_idxs.tolist(), values.tolist()))
+
+    def _get_track_id(self, track: Optional[Track]) -> int:
+        if track is None:
+            return -1
+        if track not in self._track_ids:
+            self._track_ids[track] = len(self._tracks)
+            self._tracks.append(track)
+        return self._track_ids[track]
+
+    def _get_frame_rows(self, lf: "LabeledFrame") -> _FrameStatisticRows:
+        """Extracts arrays for instances in labeled frame."""
+        instances = lf.instances
+        n_nodes = max((len(inst.skeleton.nodes) for inst in instances), default=0)
+
+        rows = _FrameStatisticRows(
+            track_ids=np.array(
+                [self._get_track_id(inst.track) for inst in instances], dtype=int
+            ),
+            predicted=np.array([hasattr(inst, "score") for inst in instances], bool),
+            instance_scores=np.array(
+                [getattr(inst, "score", np.nan) for inst in instances], dtype=float
+            ),
+            points=np.full((len(instances), n_nodes, 2), np.nan),
+            labeled=np.zeros((len(instances), n_nodes), dtype=bool),
+            point_scores=np.full((len(instances), n_nodes), np.nan),
+        )
+
+        for i, inst in enumerate(instances):
+            points = inst.get_points_array(copy=False, full=True)
+            inst_nodes = len(points)
+            xy = np.stack([points["x"], points["y"]], axis=1)
+            rows.labeled[i, :inst_nodes] = ~np.any(np.isnan(xy), axis=1)
+            xy[~points["visible"]] = np.nan
+            rows.points[i, :inst_nodes] = xy
+            if "score" in points.dtype.names:
+                rows.point_scores[i, :inst_nodes] = points["score"]
+
+        return rows
+
+    def _get_instance_table(
+        self, video: Video, frame_idxs: Optional[np.ndarray] = None
+    ) -> Tuple[_FrameStatisticRows, np.ndarray]:
+        """
+        Returns arrays for instances in video, sorted by frame index.
+
+        Args:
+            video: The :class:`Video` with the instances.
+            frame_idxs: Sorted indices of labeled frames to include. If not
+                specified, all labeled frames in video are included.
+
+        Returns:
+            Tuple of concatenated :class:`_FrameStatisticRows` and array
+            with frame index for each instance.
+        """
+        if video not in self._frame_rows:
+            self._frame_rows[video] = {
+                lf.frame_idx: self._get_frame_rows(lf) for lf in self.labels.find(video)
+            }
+        video_rows = self._frame_rows[video]
+
+        if frame_idxs is None:
+            frame_idxs = sorted(video_rows.keys())
+        else:
+            frame_idxs = frame_idxs.tolist()
+        frame_rows = [video_rows[frame_idx] for frame_idx in frame_idxs]
+        n_nodes = max((rows.n_nodes for rows in frame_rows), default=0)
+
+        def concat(field, fill, node_dims=0):
+            arrays = []
+            for rows in frame_rows:
+                array = getattr(rows, field)
+                pad = n_nodes - rows.n_nodes
+                if node_dims and pad:
+                    pad_width = [(0, 0)] * array.ndim
+                    pad_width[1] = (0, pad)
+                    array = np.pad(array, pad_width, constant_values=fill)
+                arrays.append(array)
+            if not arrays:
+                return None
+            return np.concatenate(arrays)
+
+        n_instances = [len(rows.track_ids) for rows in frame_rows]
+        inst_frame_idxs = np.repeat(np.array(frame_idxs, dtype=int), n_instances)
+
+        if inst_frame_idxs.size == 0:
+            table = _FrameStatisticRows(
+                track_ids=np.zeros(0, dtype=int),
+                predicted=np.zeros(0, dtype=bool),
+                instance_scores=np.zeros(0),
+                points=np.zeros((0, n_nodes, 2)),
+                labeled=np.zeros((0, n_nodes), dtype=bool),
+                point_scores=np.zeros((0, n_nodes)),
+            )
+        else:
+            table = _FrameStatisticRows(
+                track_ids=concat("track_ids", -1),
+                predicted=concat("predicted", False),
+                instance_scores=concat("instance_scores", np.nan),
+                points=concat("points", np.nan, node_dims=1),
+                labeled=concat("labeled", False, node_dims=1),
+                point_scores=concat("point_scores", np.nan, node_dims=1),
+            )
+        return table, inst_frame_idxs
+
+    def _compute_columns(
+        self,
+        video: Video,
+        frame_idxs: Optional[np.ndarray] = None,
+        labeled_idxs: Optional[np.ndarray] = None,
+    ) -> Dict[str, np.ndarray]:
         """
-        Calculate total point displacement between two given frames.
+        Computes per-frame statistic columns for video.
 
         Args:
-            lf: The :class:`LabeledFrame` for which we want velocity
-            last_lf: The frame from which to calculate displacement.
-            reduce_function: Numpy function (e.g., np.sum, np.nanmean)
-                is applied to *point* displacement, and then those
-                instance values are summed for the whole frame.
+            video: The :class:`Video` for which to calculate statistics.
+            frame_idxs: Sorted indices of labeled frames for which to compute
+                columns. If not specified, columns are computed for all
+                labeled frames in video.
+            labeled_idxs: Sorted indices of all labeled frames in video.
+                Required when frame_idxs is specified.
 
         Returns:
-            The total velocity for instances in frame.
-        """
-        val = 0
-        for inst in lf:
-            if last_lf is not None:
-                last_inst = last_lf.find(track=inst.track)
-                if last_inst:
-                    points_a = inst.points_array
-                    points_b = last_inst[0].points_array
-                    point_dist = np.linalg.norm(points_a - points_b, axis=1)
-                    inst_dist = reduce_function(point_dist)
-                    val += inst_dist if not np.isnan(inst_dist) else 0
-        return val
+            Dictionary of columns (see :meth:`get_columns`).
+        """
+        if frame_idxs is None:
+            rows, inst_frame_idxs = self._get_instance_table(video)
+            frame_idxs = np.array(sorted(self._frame_rows[video].keys()), dtype=int)
+            table_idxs = frame_idxs
+        else:
+            # Include the previous labeled frame of each frame for displacement.
+            prev_pos = np.searchsorted(labeled_idxs, frame_idxs) - 1
+            table_idxs = np.union1d(frame_idxs, labeled_idxs[prev_pos[prev_pos >= 0]])
+            rows, inst_frame_idxs = self._get_instance_table(video, table_idxs)
+
+        columns = self._compute_table_columns(rows, inst_frame_idxs, table_idxs)
+        if len(table_idxs) != len(frame_idxs):
+            selected = np.isin(table_idxs, frame_idxs)
+            columns = {key: column[selected] for key, column in columns.items()}
+        return columns
+
+    def _compute_table_columns(
+        self,
+        rows: _FrameStatisticRows,
+        inst_frame_idxs: np.ndarray,
+        frame_idxs: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """Computes statistic columns for each frame in instance table."""
+        frame_count = len(frame_idxs)
+        inst_frame_inds = np.searchsorted(frame_idxs, inst_frame_idxs)
+
+        def frame_sum(inst_vals):
+            return np.bincount(inst_frame_inds, inst_vals, minlength=frame_count)
+
+        def frame_min(inst_vals):
+            result = np.full(frame_count, np.inf)
+            np.minimum.at(result, inst_frame_inds, inst_vals)
+            result[np.isinf(result)] = 0
+            return result
+
+        columns = dict(frame_idx=frame_idxs)
+
+        # Point and instance scores are only counted for predicted instances.
+        predicted = rows.predicted
+        labeled = rows.labeled & predicted[:, None]
+        point_scores = np.where(labeled, rows.point_scores, 0)
+        inst_scores = np.where(predicted, rows.instance_scores, 0)
+
+        columns["point_count"] = frame_sum(np.sum(labeled, axis=1))
+        columns["point_score_sum"] = frame_sum(np.sum(point_scores, axis=1))
+        columns["point_score_min"] = frame_min(
+            np.min(np.where(labeled, rows.point_scores, np.inf), axis=1, initial=np.inf)
+        )
+        columns["instance_score_sum"] = frame_sum(inst_scores)
+        columns["instance_score_min"] = frame_min(
+            np.where(predicted, rows.instance_scores, np.inf)
+        )
+
+        # Match each instance to the first instance with the same track in the
+        # previous labeled frame.
+        track_span = len(self._tracks) + 1
+        inst_keys = inst_frame_inds * track_span + rows.track_ids + 1
+        unique_keys, first_inds = np.unique(inst_keys, return_index=True)
+        prev_keys = inst_keys - track_span
+        match_pos = np.minimum(
+            np.searchsorted(unique_keys, prev_keys), max(len(unique_keys) - 1, 0)
+        )
+        has_match = (inst_frame_inds > 0) & (unique_keys[match_pos] == prev_keys)
+        matched_inds = first_inds[match_pos[has_match]]
+
+        point_dists = np.linalg.norm(
+            rows.points[has_match] - rows.points[matched_inds], axis=2
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            inst_dists = dict(
+                sum=np.sum(point_dists, axis=1),
+                mean=np.nanmean(point_dists, axis=1),
+                max=np.max(point_dists, axis=1, initial=-np.inf),
+            )
+        for reduction, dists in inst_dists.items():
+            dists[~np.isfinite(dists)] = 0
+            inst_vals = np.zeros(len(inst_frame_inds))
+            inst_vals[has_match] = dists
+            columns[f"point_displacement_{reduction}"] = frame_sum(inst_vals)
+
+        return columns
@@ -6,12 +6,16 @@ empty frames from the beginning and end of video, although
 `--all-frames` argument will make it include empty frames from beginning
 of video.
 
+Each file has data for a single video. If the project has multiple videos,
+we write a separate file for each video.
+
 The HDF5 file has these datasets:
 
 * "track_occupancy"     shape: tracks * frames
 * "tracks"              shape: frames * nodes * 2 * tracks
 * "track_names"         shape: tracks
-* "node_names"         shape: nodes
+* "node_names"          shape: nodes
+* "video_path"          (if video has a filename)
 
 Note: the datasets are stored column-major as expected by MATLAB.
 """
@@ -21,9 +25,15 @@ import re
 import h5py as h5
 import numpy as np
 
-from typing import Any, Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 from sleap.io.dataset import Labels
+from sleap.io.video import Video
+
+# Approximate size of blocks of point location matrix to build in memory at
+# a time when writing file.
+CHUNK_BYTES = 64 * 1024 * 1024
 
 
 def get_tracks_as_np_strings(labels: Labels) -> List[np.string_]:
@@ -36,8 +46,97 @@ def get_nodes_as_np_strings(labels: Labels) -> List[np.string_]:
     return [np.string_(node.name) for node in labels.skeletons[0].nodes]
 
 
+def get_video_instance_data(
+    labels: Labels, video: Video
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Gets frame, track and point data for all instances in video as arrays.
+
+    Args:
+        labels: The :class:`Labels` from which to get data.
+        video: The :class:`Video` for which to get data.
+
+    Returns:
+        tuple of three arrays:
+
+        * frame index for each instance, shape (instances,)
+        * track index (in `labels.tracks`) for each instance, shape (instances,)
+        * point locations for each instance, shape (instances, nodes, 2)
+    """
+    node_count = len(labels.skeletons[0].nodes)
+
+    # We could use lf.instances.index(inst) for instances without tracks but
+    # then we'd need to calculate the number of "tracks" based on the max
+    # number of instances in any frame, so for now we'll assume that there's
+    # a single instance if we aren't using tracks.
+    track_idx_map = {track: i for i, track in enumerate(labels.tracks)}
+    track_idx_map[None] = 0
+
+    lf_instances = [(lf, inst) for lf in labels.find(video) for inst in lf.instances]
+
+    frame_idxs = np.array([lf.frame_idx for lf, _ in lf_instances], dtype=np.int64)
+    track_idxs = np.array(
+        [track_idx_map[inst.track] for _, inst in lf_instances], dtype=np.int64
+    )
+    if lf_instances:
+        points = np.stack(
+            [inst.points_array for _, inst in lf_instances], axis=0
+        ).astype(np.float32)
+    else:
+        points = np.zeros((0, node_count, 2), dtype=np.float32)
+
+    return frame_idxs, track_idxs, points
+
+
+def get_frame_range(frame_idxs: np.ndarray, all_frames: bool) -> Tuple[int, int]:
+    """
+    Returns first frame index and frame count for output matrices.
+
+    Args:
+        frame_idxs: Frame index for each instance.
+        all_frames: If True, then output starts from first frame of video.
+            Otherwise, it starts from first frame with labeling data.
+
+    Returns:
+        Tuple of (first frame index, frame count). Count includes unlabeled
+        frames between first and last labeled frames.
+    """
+    if not len(frame_idxs):
+        return 0, 0
+
+    first_frame_idx = 0 if all_frames else int(np.min(frame_idxs))
+    frame_count = int(np.max(frame_idxs)) - first_frame_idx + 1
+
+    return first_frame_idx, frame_count
+
+
+def fill_occupancy_and_points_matrices(
+    occupancy_matrix: np.ndarray,
+    locations_matrix: np.ndarray,
+    frame_idxs: np.ndarray,
+    track_idxs: np.ndarray,
+    points: np.ndarray,
+):
+    """
+    Scatters instance data into occupancy and point location matrices.
+
+    Args:
+        occupancy_matrix: Matrix with shape (tracks, frames) to fill.
+        locations_matrix: Matrix with shape (frames, nodes, 2, tracks) to fill.
+        frame_idxs: Frame index (i.e., column in matrix) for each instance.
+        track_idxs: Track index (i.e., row in matrix) for each instance.
+        points: Point locations for each instance, shape (instances, nodes, 2).
+
+    Returns:
+        None; matrices are modified in place. If there are multiple instances
+        for the same frame and track, then the last instance is used.
+    """
+    occupancy_matrix[track_idxs, frame_idxs] = 1
+    locations_matrix[frame_idxs, :, :, track_idxs] = points
+
+
 def get_occupancy_and_points_matrices(
-    labels: Labels, all_frames: bool
+    labels: Labels, all_frames: bool, video: Optional[Video] = None
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Builds numpy matrices with track occupancy and point location data.
@@ -48,6 +147,8 @@ def get_occupancy_and_points_matrices(
             will line up with columns in the output. Otherwise,
             there will only be columns for the frames between the
             first and last frames with labeling data.
+        video: The :class:`Video` for which to get data. If None, then the
+            first video in labels is used.
 
     Returns:
         tuple of two matrices:
@@ -55,17 +156,14 @@ def get_occupancy_and_points_matrices(
         * occupancy matrix with shape (tracks, frames)
         * point location matrix with shape (frames, nodes, 2, tracks)
     """
+    if video is None:
+        video = labels.videos[0]
+
     track_count = len(labels.tracks) or 1
     node_count = len(labels.skeletons[0].nodes)
 
-    frame_idxs = [lf.frame_idx for lf in labels]
-    frame_idxs.sort()
-
-    first_frame_idx = 0 if all_frames else frame_idxs[0]
-
-    frame_count = (
-        frame_idxs[-1] - first_frame_idx + 1
-    )  # count should include unlabeled frames
+    frame_idxs, track_idxs, points = get_video_instance_data(labels, video)
+    first_frame_idx, frame_count = get_frame_range(frame_idxs, all_frames)
 
     # Desired MATLAB format:
     # "track_occupancy"     tracks * frames
@@ -74,24 +172,16 @@ def get_occupancy_and_points_matrices(
 
     occupancy_matrix = np.zeros((track_count, frame_count), dtype=np.uint8)
     locations_matrix = np.full(
-        (frame_count, node_count, 2, track_count), np.nan, dtype=float
+        (frame_count, node_count, 2, track_count), np.nan, dtype=np.float32
     )
 
-    for lf, inst in [(lf, inst) for lf in labels for inst in lf.instances]:
-        frame_i = lf.frame_idx - first_frame_idx
-        if inst.track is None:
-            # We could use lf.instances.index(inst) but then we'd need
-            # to calculate the number of "tracks" based on the max number of
-            # instances in any frame, so for now we'll assume that there's
-            # a single instance if we aren't using tracks.
-            track_i = 0
-        else:
-            track_i = labels.tracks.index(inst.track)
-
-        occupancy_matrix[track_i, frame_i] = 1
-
-        inst_points = inst.points_array
-        locations_matrix[frame_i, ..., track_i] = inst_points
+    fill_occupancy_and_points_matrices(
+        occupancy_matrix,
+        locations_matrix,
+        frame_idxs - first_frame_idx,
+        track_idxs,
+        points,
+    )
 
     return occupancy_matrix, locations_matrix
 
@@ -171,7 +261,187 @@ def write_occupancy_file(
     print(f"Saved as {output_path}")
 
 
-def main(labels: Labels, output_path: str, all_frames: bool = True):
+def write_streamed_analysis_file(
+    output_path: str,
+    track_names: List,
+    node_names: List,
+    frame_idxs: np.ndarray,
+    track_idxs: np.ndarray,
+    points: np.ndarray,
+    all_frames: bool = True,
+    video_path: str = "",
+    chunk_bytes: int = CHUNK_BYTES,
+):
+    """
+    Writes analysis HDF5 file from instance data, one block of frames at a time.
+
+    The point location matrix is never fully built in memory, so this works
+    for very long videos. Datasets are chunked and compressed, and (as in
+    :func:`write_occupancy_file`) transposed for MATLAB.
+
+    Args:
+        output_path: Path of HDF5 file.
+        track_names: List of track names.
+        node_names: List of node names.
+        frame_idxs: Frame index for each instance.
+        track_idxs: Track index for each instance.
+        points: Point locations for each instance, shape (instances, nodes, 2).
+        all_frames: If True, then includes zeros so that frame index
+            will line up with columns in the output.
+        video_path: Path to the video, saved in file if given.
+        chunk_bytes: Approximate size of block of point location matrix
+            which we build in memory at a time.
+
+    Returns:
+        None
+    """
+    track_count = max(len(track_names), 1)
+    node_count = points.shape[1] if points.ndim == 3 else len(node_names)
+
+    first_frame_idx, frame_count = get_frame_range(frame_idxs, all_frames)
+    frame_idxs = frame_idxs - first_frame_idx
+
+    # Remove unoccupied tracks and re-index the remaining tracks.
+    occupied_track_mask = np.zeros(track_count, dtype=bool)
+    occupied_track_mask[track_idxs] = True
+    if len(frame_idxs) and np.sum(~occupied_track_mask):
+        print(f"ignoring {np.sum(~occupied_track_mask)} empty tracks")
+
+        track_names = [
+            name for name, occupied in zip(track_names, occupied_track_mask) if occupied
+        ]
+        track_idxs = (np.cumsum(occupied_track_mask) - 1)[track_idxs]
+        track_count = int(np.sum(occupied_track_mask))
+
+    # Sort instances by frame (keeping order within frame) so we can find the
+    # instances for each block of frames.
+    order = np.argsort(frame_idxs, kind="stable")
+    frame_idxs, track_idxs, points = frame_idxs[order], track_idxs[order], points[order]
+
+    block_frames = max(1, chunk_bytes // (node_count * 2 * track_count * 4))
+
+    def make_dataset(f, key, shape, dtype, **kwargs):
+        if all(shape):
+            return f.create_dataset(
+                key,
+                shape=shape,
+                dtype=dtype,
+                chunks=True,
+                compression="gzip",
+                compression_opts=9,
+                **kwargs,
+            )
+        return f.create_dataset(key, shape=shape, dtype=dtype, **kwargs)
+
+    with h5.File(output_path, "w") as f:
+        f.create_dataset("track_names", data=track_names)
+        f.create_dataset("node_names", data=node_names)
+        if video_path:
+            f.create_dataset("video_path", data=video_path)
+
+        # Transpose since MATLAB expects column-major
+        occupancy_ds = make_dataset(
+            f, "track_occupancy", (frame_count, track_count), np.uint8
+        )
+        tracks_ds = make_dataset(
+            f,
+            "tracks",
+            (track_count, 2, node_count, frame_count),
+            np.float32,
+            fillvalue=np.nan,
+        )
+
+        for block_start in range(0, frame_count, block_frames):
+            block_end = min(block_start + block_frames, frame_count)
+            inst_start, inst_end = np.searchsorted(frame_idxs, (block_start, block_end))
+
+            occupancy_block = np.zeros(
+                (track_count, block_end - block_start), dtype=np.uint8
+            )
+            locations_block = np.full(
+                (block_end - block_start, node_count, 2, track_count),
+                np.nan,
+                dtype=np.float32,
+            )
+            fill_occupancy_and_points_matrices(
+                occupancy_block,
+                locations_block,
+                frame_idxs[inst_start:inst_end] - block_start,
+                track_idxs[inst_start:inst_end],
+                points[inst_start:inst_end],
+            )
+
+            occupancy_ds[block_start:block_end] = np.transpose(occupancy_block)
+            tracks_ds[..., block_start:block_end] = np.transpose(locations_block)
+
+        print(f"track_occupancy: {occupancy_ds.shape}")
+        print(f"tracks: {tracks_ds.shape}")
+
+    print(f"Saved as {output_path}")
+
+
+def _write_video_analysis_file(kwargs: Dict[str, Any]) -> str:
+    """Helper for writing analysis files in worker process."""
+    write_streamed_analysis_file(**kwargs)
+    return kwargs["output_path"]
+
+
+def _get_video_path(video: Video) -> str:
+    filename = getattr(video.backend, "filename", "")
+    return filename if isinstance(filename, str) else ""
+
+
+def get_video_analysis_kwargs(
+    labels: Labels, video: Video, output_path: str, all_frames: bool
+) -> Dict[str, Any]:
+    """Gets arguments for :func:`write_streamed_analysis_file` for video."""
+    frame_idxs, track_idxs, points = get_video_instance_data(labels, video)
+    return dict(
+        output_path=output_path,
+        track_names=get_tracks_as_np_strings(labels),
+        node_names=get_nodes_as_np_strings(labels),
+        frame_idxs=frame_idxs,
+        track_idxs=track_idxs,
+        points=points,
+        all_frames=all_frames,
+        video_path=_get_video_path(video),
+    )
+
+
+def get_video_output_path(output_path: str, video_idx: int, video: Video) -> str:
+    """
+    Returns path for analysis file for one of multiple videos.
+
+    For example, "labels.analysis.h5" and video 1 ("fly.mp4") gives
+    "labels.001_fly.analysis.h5".
+    """
+    match = re.match(r"(.*?)((\.analysis|\.tracking)?\.h5)$", output_path)
+    base_path, suffix = match.groups()[:2] if match else (output_path, ".h5")
+    video_name = os.path.splitext(os.path.basename(_get_video_path(video)))[0]
+    return f"{base_path}.{video_idx:03d}_{video_name}{suffix}"
+
+
+def get_analysis_output_paths(labels: Labels, output_path: str) -> List[str]:
+    """
+    Returns path of analysis file for each video in labels.
+
+    If there's a single video, this is just the output path, otherwise we
+    make a path for each video (see :func:`get_video_output_path`).
+    """
+    if len(labels.videos) == 1:
+        return [output_path]
+    return [
+        get_video_output_path(output_path, video_idx, video)
+        for video_idx, video in enumerate(labels.videos)
+    ]
+
+
+def main(
+    labels: Labels,
+    output_path: str,
+    all_frames: bool = True,
+    video: Optional[Video] = None,
+):
     """
     Writes HDF5 file with matrices of track occupancy and coordinates.
 
@@ -182,28 +452,108 @@ def main(labels: Labels, output_path: str, all_frames: bool = True):
             will line up with columns in the output. Otherwise,
             there will only be columns for the frames between the
             first and last frames with labeling data.
+        video: The :class:`Video` for which to write data. If None, then
+            the first video in labels is used.
 
     Returns:
         None
     """
-    track_names = get_tracks_as_np_strings(labels)
+    if video is None:
+        video = labels.videos[0]
 
-    occupancy_matrix, locations_matrix = get_occupancy_and_points_matrices(
-        labels, all_frames
+    write_streamed_analysis_file(
+        **get_video_analysis_kwargs(labels, video, output_path, all_frames)
     )
 
-    track_names, occupancy_matrix, locations_matrix = remove_empty_tracks_from_matrices(
-        track_names, occupancy_matrix, locations_matrix
-    )
 
-    data_dict = dict(
-        track_names=track_names,
-        node_names=get_nodes_as_np_strings(labels),
-        tracks=locations_matrix,
-        track_occupancy=occupancy_matrix,
-    )
+def write_all_videos(
+    labels: Labels,
+    output_path: str,
+    all_frames: bool = True,
+    processes: Optional[int] = None,
+) -> List[str]:
+    """
+    Writes HDF5 analysis file for each video in labels.
+
+    Data for each video is gathered in this process and then files are
+    written (which is mostly time spent compressing data) in parallel by a
+    pool of processes.
+
+    Args:
+        labels: The :class:`Labels` from which to get data.
+        output_path: Path of HDF5 file to create. If there are multiple
+            videos, we'll use this to make path for each video (see
+            :func:`get_video_output_path`).
+        all_frames: See :func:`main`.
+        processes: Number of worker processes. If None, we'll use number
+            of CPUs (or number of videos, if smaller). If 1, then files are
+            written in this process.
+
+    Returns:
+        List of paths of files which were written.
+    """
+    if len(labels.videos) == 1:
+        main(labels, output_path, all_frames=all_frames)
+        return [output_path]
+
+    videos_kwargs = [
+        get_video_analysis_kwargs(labels, video, video_output_path, all_frames)
+        for video, video_output_path in zip(
+            labels.videos, get_analysis_output_paths(labels, output_path)
+        )
+    ]
+
+    processes = min(processes or os.cpu_count() or 1, len(videos_kwargs))
+    if processes <= 1:
+        return [_write_video_analysis_file(kwargs) for kwargs in videos_kwargs]
 
-    write_occupancy_file(output_path, data_dict, transpose=True)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(_write_video_analysis_file, videos_kwargs))
+
+
+def write_all_videos_from_slp(
+    filename: str, output_path: str, all_frames: bool = True
+) -> List[str]:
+    """
+    Writes HDF5 analysis file for each video in SLEAP labels (.slp) file.
+
+    This gives the same files as :func:`write_all_videos`, but rather than
+    loading the labels, we read the instance data for one video at a time
+    straight from the labels file. This uses much less time and memory for
+    large prediction files.
+
+    Args:
+        filename: Path of .slp labels file.
+        output_path: Path of HDF5 file to create (see
+            :func:`write_all_videos`).
+        all_frames: See :func:`main`.
+
+    Returns:
+        List of paths of files which were written.
+    """
+    from sleap.io.format.filehandle import FileHandle
+    from sleap.io.format.hdf5 import LabelsV1Adaptor
+
+    with FileHandle(filename) as file:
+        labels = LabelsV1Adaptor.read_headers(file)
+        output_paths = get_analysis_output_paths(labels, output_path)
+
+        for video, video_output_path in zip(labels.videos, output_paths):
+            frame_idxs, track_idxs, points = LabelsV1Adaptor.read_video_instance_data(
+                file, labels, video
+            )
+            write_streamed_analysis_file(
+                output_path=video_output_path,
+                track_names=get_tracks_as_np_strings(labels),
+                node_names=get_nodes_as_np_strings(labels),
+                frame_idxs=frame_idxs,
+                track_idxs=track_idxs,
+                points=points,
+                all_frames=all_frames,
+                video_path=_get_video_path(video),
+            )
+
+    return output_paths
 
 
 if __name__ == "__main__":
@@ -227,4 +577,4 @@ if __name__ == "__main__":
     output_path = re.sub("(\.json(\.zip)?|\.h5|\.slp)$", "", args.data_path)
     output_path = output_path + ".tracking.h5"
 
-    main(labels, output_path=output_path, all_frames=args.all_frames)
+    write_all_videos(labels, output_path=output_path, all_frames=args.all_frames)
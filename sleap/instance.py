@@ -163,6 +163,10 @@ PredictedPoint = attr.s(
 )(PredictedPoint)
 
 
+# Dtypes for viewing x and y fields of points as (N, 2) arrays (by point dtype).
+_XY_DTYPES = dict()
+
+
 class PointArray(np.recarray):
     """
     PointArray is a sub-class of numpy recarray which stores
@@ -233,9 +237,42 @@ class PointArray(np.recarray):
             A point array with all elements set to Point()
         """
         p = cls(size)
-        p[:] = cls._record_type()
+        p[:] = cls._get_default_row()
         return p
 
+    @classmethod
+    def _get_default_row(cls) -> np.ndarray:
+        """Returns (cached) array with single point set to default values."""
+        # Check the class itself (not parent classes), since each has its own.
+        if "_default_row" not in cls.__dict__:
+            cls._default_row = np.array(
+                [tuple(cls._record_type())], dtype=cls._record_type.dtype
+            )
+        return cls._default_row
+
+    def get_xy_view(self) -> np.ndarray:
+        """
+        Returns (N, 2) array of x and y coordinates without copying.
+
+        Changing values in the returned array changes the points.
+        """
+        data = self.view(np.ndarray)
+        xy_dtype = _XY_DTYPES.get(data.dtype, None)
+        if xy_dtype is None:
+            x_offset = data.dtype.fields["x"][1]
+            if data.dtype.fields["y"][1] != x_offset + 8:
+                raise ValueError("Point array does not have adjacent x and y fields.")
+            xy_dtype = np.dtype(
+                {
+                    "names": ["xy"],
+                    "formats": [("f8", 2)],
+                    "offsets": [x_offset],
+                    "itemsize": data.dtype.itemsize,
+                }
+            )
+            _XY_DTYPES[data.dtype] = xy_dtype
+        return data.view(xy_dtype)["xy"]
+
     def __getitem__(self, indx: int) -> "Point":
         """Get point by its index in the array."""
         obj = super(np.recarray, self).__getitem__(indx)
@@ -306,6 +343,35 @@ class PredictedPointArray(PointArray):
         return v
 
 
+def _set_points_from_arrays(
+    parray: PointArray, points: np.ndarray, scores: Optional[np.ndarray] = None
+):
+    """
+    Sets points (and scores) in point array from arrays.
+
+    Args:
+        parray: The point array to update (with a row for each skeleton node).
+        points: Array of shape (n_nodes, 2) with x and y for each node. Nodes
+            with NaN for either coordinate are left as missing.
+        scores: Array of shape (n_nodes,) with scores (for predicted points).
+
+    Returns:
+        None
+    """
+    points = np.asarray(points, dtype="float64").reshape(-1, 2)
+    count = min(len(parray), len(points))
+    if scores is not None:
+        scores = np.asarray(scores, dtype="float64").reshape(-1)
+        count = min(count, len(scores))
+
+    idxs = np.flatnonzero(~np.isnan(points[:count]).any(axis=1))
+    data = parray.view(np.ndarray)
+    data["x"][idxs] = points[idxs, 0]
+    data["y"][idxs] = points[idxs, 1]
+    if scores is not None:
+        data["score"][idxs] = scores[idxs]
+
+
 @attr.s(slots=True, cmp=False)
 class Track:
     """
@@ -784,11 +850,11 @@ class Instance:
             if full:
                 parray = structured_to_unstructured(self._points)
             else:
-                parray = structured_to_unstructured(self._points[["x", "y"]])
+                parray = self._points.get_xy_view().copy()
 
             # Note that invisible_as_nan assumes copy is True.
             if invisible_as_nan:
-                parray[~self._points.visible] = math.nan
+                parray[~self._points.view(np.ndarray)["visible"]] = math.nan
 
             return parray
 
@@ -858,14 +924,9 @@ class Instance:
         Returns:
             A new Instance.
         """
-        predicted_points = dict()
-        for point, node_name in zip(points, skeleton.node_names):
-            if np.isnan(point).any():
-                continue
-
-            predicted_points[node_name] = Point(x=point[0], y=point[1])
-
-        return cls(points=predicted_points, skeleton=skeleton, track=track)
+        parray = cls._point_array_type.make_default(len(skeleton.nodes))
+        _set_points_from_arrays(parray, points)
+        return cls(points=parray, skeleton=skeleton, track=track)
 
 
 @attr.s(cmp=False, slots=True)
@@ -954,19 +1015,11 @@ class PredictedInstance(Instance):
         Returns:
             A new PredictedInstance.
         """
-        predicted_points = dict()
-        for point, confidence, node_name in zip(
-            points, point_confidences, skeleton.node_names
-        ):
-            if np.isnan(point).any():
-                continue
-
-            predicted_points[node_name] = PredictedPoint(
-                x=point[0], y=point[1], score=confidence
-            )
+        parray = PredictedPointArray.make_default(len(skeleton.nodes))
+        _set_points_from_arrays(parray, points, point_confidences)
 
         return cls(
-            points=predicted_points,
+            points=parray,
             skeleton=skeleton,
             score=instance_score,
             track=track,
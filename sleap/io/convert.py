@@ -36,76 +36,370 @@ Note: the datasets are stored column-major as expected by MATLAB.
 This means that if you're working with the file in Python you may want to
 first transpose the datasets so they matche the shapes described above.
 
+Analysis files are written straight from .slp files, without loading all the
+labeled frames and instances.
+
+Batch conversion:
+
+You can give multiple input paths (or glob patterns, e.g., "preds/*.slp"),
+or use `--manifest` with a text file which lists one input path per line
+(relative paths are relative to the manifest). Use `--jobs` to convert files
+in parallel and `--worker-memory` to limit the memory used by each worker.
+Outputs which are newer than their input are skipped unless you use
+`--overwrite`.
+
 """
 
 import argparse
+import glob
+import multiprocessing
 import os
 import re
+import sys
+from typing import List, Optional, Text, Tuple
+
+import h5py
 
 from sleap import Labels
 
+# Number of files each worker process converts before it's replaced by a new
+# process (so that memory used for one file isn't held for later files).
+FILES_PER_WORKER = 10
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("input_path", help="Path to input file.")
-    parser.add_argument(
-        "-o", "--output", default="", help="Path to output file (optional)."
-    )
-    parser.add_argument(
-        "--format",
-        default="slp",
-        help="Output format. Default ('slp') is SLEAP dataset; "
-        "'analysis' results in analysis.h5 file; "
-        "'h5' or 'json' results in SLEAP dataset "
-        "with specified file format.",
-    )
-    parser.add_argument(
-        "--video", default="", help="Path to video (if needed for conversion)."
+
+def get_default_output_path(input_path: str, format: str = "slp") -> str:
+    """Returns output path used when none is given for input and format."""
+    if format == "analysis":
+        output_path = re.sub(r"(\.json(\.zip)?|\.h5|\.slp)$", "", input_path)
+        return output_path + ".analysis.h5"
+    return f"{input_path}.{format}"
+
+
+def is_up_to_date(input_path: str, output_paths: List[str]) -> bool:
+    """Returns whether all the output files exist and are newer than input."""
+    input_mtime = os.path.getmtime(input_path)
+    return all(
+        os.path.exists(path) and os.path.getmtime(path) >= input_mtime
+        for path in output_paths
     )
 
-    args = parser.parse_args()
 
-    video_callback = Labels.make_video_callback([os.path.dirname(args.input_path)])
+def load_labels(input_path: str, video: Text = "") -> Labels:
+    """Loads labels from SLEAP dataset, or other format if it's not."""
+    video_callback = Labels.make_video_callback([os.path.dirname(input_path)])
     try:
-        labels = Labels.load_file(args.input_path, video_search=video_callback)
+        return Labels.load_file(input_path, video_search=video_callback)
     except TypeError:
         print("Input file isn't SLEAP dataset so attempting other importers...")
         from sleap.io.format import read
 
-        video_path = args.video if args.video else None
+        video_path = video if video else None
 
-        labels = read(
-            args.input_path,
+        return read(
+            input_path,
             for_object="labels",
             as_format="*",
             video_search=video_callback,
             video=video_path,
         )
 
-    if args.format == "analysis":
-        from sleap.info.write_tracking_h5 import main as write_analysis
 
-        if args.output:
-            output_path = args.output
+def convert_file(
+    input_path: str,
+    output_path: Text = "",
+    format: str = "slp",
+    video: Text = "",
+    overwrite: bool = True,
+) -> List[str]:
+    """
+    Converts file with labels to another format.
+
+    Args:
+        input_path: Path to input file.
+        output_path: Path to output file. If empty, we use the default path
+            (see :func:`get_default_output_path`).
+        format: Output format, "analysis" for analysis HDF5 file(s),
+            otherwise SLEAP dataset with this extension (unless output path
+            is given, in which case its extension determines the format).
+        video: Path to video (if needed for conversion).
+        overwrite: If False, then we skip writing outputs which are newer
+            than the input file.
+
+    Returns:
+        List of paths of files which were written (empty if skipped).
+    """
+    output_path = output_path or get_default_output_path(input_path, format)
+
+    if format == "analysis":
+        from sleap.info.write_tracking_h5 import (
+            get_analysis_output_paths,
+            write_all_videos,
+            write_all_videos_from_slp,
+        )
+
+        if input_path.endswith(".slp") and h5py.is_hdf5(input_path):
+            if not overwrite:
+                from sleap.io.format.filehandle import FileHandle
+                from sleap.io.format.hdf5 import LabelsV1Adaptor
+
+                with FileHandle(input_path) as file:
+                    headers = LabelsV1Adaptor.read_headers(file)
+                output_paths = get_analysis_output_paths(headers, output_path)
+                if is_up_to_date(input_path, output_paths):
+                    return []
+
+            return write_all_videos_from_slp(
+                input_path, output_path=output_path, all_frames=True
+            )
+
+        labels = load_labels(input_path, video)
+        output_paths = get_analysis_output_paths(labels, output_path)
+        if not overwrite and is_up_to_date(input_path, output_paths):
+            return []
+        return write_all_videos(labels, output_path=output_path, all_frames=True)
+
+    if not overwrite and is_up_to_date(input_path, [output_path]):
+        return []
+
+    labels = load_labels(input_path, video)
+    print(f"Output SLEAP dataset: {output_path}")
+    Labels.save_file(labels, output_path)
+    return [output_path]
+
+
+def get_input_paths(
+    patterns: List[str], manifest_path: Optional[str] = None
+) -> List[str]:
+    """
+    Gets list of input paths from paths/glob patterns and manifest file.
+
+    Args:
+        patterns: Input paths, which can be glob patterns.
+        manifest_path: Path to text file which lists one input path (or glob
+            pattern) per line. Empty lines and lines starting with "#" are
+            ignored, and relative paths are relative to the manifest.
+
+    Returns:
+        List of input paths (without duplicates).
+    """
+    patterns = list(patterns)
+    if manifest_path:
+        manifest_dir = os.path.dirname(manifest_path)
+        with open(manifest_path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    patterns.append(os.path.join(manifest_dir, line))
+
+    input_paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            input_paths.extend(sorted(glob.glob(pattern)))
         else:
-            output_path = args.input_path
-            output_path = re.sub("(\.json(\.zip)?|\.h5|\.slp)$", "", output_path)
-            output_path = output_path + ".analysis.h5"
+            input_paths.append(pattern)
+
+    # Remove duplicates but keep order.
+    return list(dict.fromkeys(input_paths))
+
+
+def _init_worker(worker_memory: Optional[int]):
+    """Limits the memory which worker process can use (if supported)."""
+    if worker_memory:
+        try:
+            import psutil
+            import resource
+
+            # Memory budget is on top of what the process already uses, which
+            # includes all the (shared) memory from parent process.
+            limit = psutil.Process().memory_info().vms + worker_memory
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            print("Unable to limit memory for conversion worker.")
 
-        write_analysis(labels, output_path=output_path, all_frames=True)
 
-    elif args.output:
-        print(f"Output SLEAP dataset: {args.output}")
-        Labels.save_file(labels, args.output)
+def _convert_file_safely(kwargs: dict) -> Tuple[str, List[str], Optional[str]]:
+    """Helper for converting file in worker process."""
+    try:
+        return kwargs["input_path"], convert_file(**kwargs), None
+    except MemoryError:
+        return kwargs["input_path"], [], "Not enough memory"
+    except Exception as e:
+        return kwargs["input_path"], [], f"{type(e).__name__}: {e}"
+
+
+def convert_files(
+    input_paths: List[str],
+    format: str = "slp",
+    output_dir: Text = "",
+    video: Text = "",
+    overwrite: bool = False,
+    jobs: int = 1,
+    worker_memory: Optional[int] = None,
+) -> List[Tuple[str, List[str], Optional[str]]]:
+    """
+    Converts multiple files, possibly in parallel.
 
-    elif args.format in ("slp", "h5", "json"):
-        output_path = f"{args.input_path}.{args.format}"
-        print(f"Output SLEAP dataset: {output_path}")
-        Labels.save_file(labels, output_path)
+    Failures are reported in results (rather than raised) so that the other
+    files are still converted.
+
+    Args:
+        input_paths: Paths to input files.
+        format: Output format (see :func:`convert_file`).
+        output_dir: Directory for output files. If empty, each output is
+            saved next to its input.
+        video: Path to video (if needed for conversion).
+        overwrite: If False, then we skip outputs newer than their input.
+        jobs: Number of worker processes. If 1, then files are converted in
+            this process.
+        worker_memory: Memory (in bytes) which each worker can use. We also
+            limit the number of workers so they fit in available memory.
+
+    Returns:
+        List with (input path, output paths, error message or None) for each
+        input file. Output paths are empty if file was skipped or failed.
+    """
+    kwargs_list = []
+    for input_path in input_paths:
+        output_path = get_default_output_path(input_path, format)
+        if output_dir:
+            output_path = os.path.join(output_dir, os.path.basename(output_path))
+        kwargs_list.append(
+            dict(
+                input_path=input_path,
+                output_path=output_path,
+                format=format,
+                video=video,
+                overwrite=overwrite,
+            )
+        )
 
+    if worker_memory:
+        import psutil
+
+        available_memory = psutil.virtual_memory().available
+        jobs = min(jobs, max(1, available_memory // worker_memory))
+
+    jobs = max(1, min(jobs, len(kwargs_list)))
+
+    results = []
+    if jobs == 1:
+        iter_results = map(_convert_file_safely, kwargs_list)
+        pool = None
     else:
+        pool = multiprocessing.Pool(
+            processes=jobs,
+            initializer=_init_worker,
+            initargs=(worker_memory,),
+            maxtasksperchild=FILES_PER_WORKER,
+        )
+        iter_results = pool.imap_unordered(_convert_file_safely, kwargs_list)
+
+    try:
+        for input_path, output_paths, error in iter_results:
+            if error:
+                print(f"Failed to convert {input_path}: {error}")
+            elif output_paths:
+                print(f"Converted {input_path}")
+            else:
+                print(f"Skipped {input_path} (outputs are up to date)")
+            results.append((input_path, output_paths, error))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "input_path",
+        nargs="*",
+        help="Path to input file (or multiple paths/glob patterns for batch).",
+    )
+    parser.add_argument(
+        "-o", "--output", default="", help="Path to output file (optional)."
+    )
+    parser.add_argument(
+        "--format",
+        default="slp",
+        help="Output format. Default ('slp') is SLEAP dataset; "
+        "'analysis' results in analysis.h5 file; "
+        "'h5' or 'json' results in SLEAP dataset "
+        "with specified file format.",
+    )
+    parser.add_argument(
+        "--video", default="", help="Path to video (if needed for conversion)."
+    )
+    parser.add_argument(
+        "--manifest",
+        default="",
+        help="Text file listing input paths (one per line) for batch conversion.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="",
+        help="Directory for output files in batch conversion (optional).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of files to convert in parallel in batch conversion.",
+    )
+    parser.add_argument(
+        "--worker-memory",
+        type=float,
+        default=0,
+        help="Memory (in GB) each parallel worker can use (optional).",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Convert files in batch even if outputs are up to date.",
+    )
+
+    args = parser.parse_args()
+
+    input_paths = get_input_paths(args.input_path, args.manifest)
+    if not input_paths:
+        parser.error("No input files given.")
+
+    is_batch = len(input_paths) > 1 or args.manifest or args.output_dir
+    if args.format not in ("analysis", "slp", "h5", "json") and (
+        is_batch or not args.output
+    ):
         print("You didn't specify how to convert the file.")
         print(args)
+        return
+
+    if not is_batch:
+        convert_file(input_paths[0], args.output, args.format, video=args.video)
+        return
+
+    if args.output:
+        parser.error("Use --output-dir (rather than --output) for batch conversion.")
+
+    results = convert_files(
+        input_paths,
+        format=args.format,
+        output_dir=args.output_dir,
+        video=args.video,
+        overwrite=args.overwrite,
+        jobs=args.jobs,
+        worker_memory=int(args.worker_memory * 1024 ** 3) or None,
+    )
+
+    failed = [input_path for input_path, _, error in results if error]
+    print(
+        f"Converted {sum(bool(outputs) for _, outputs, _ in results)}, "
+        f"skipped {sum(not outputs and not error for _, outputs, error in results)}, "
+        f"failed {len(failed)} of {len(results)} files."
+    )
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
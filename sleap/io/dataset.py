@@ -31,6 +31,7 @@ If the filename has a supported extension (e.g., ".slp", ".h5", ".json") then
 the file will be saved in the corresponding format. You can also specify the
 default extension to use if none is provided in the filename.
 """
+import bisect
 import itertools
 import os
 from collections import MutableSequence
@@ -86,6 +87,7 @@ class LabelsDataCache:
             self._frame_idx_map = dict()
             self._track_occupancy = dict()
             self._frame_count_cache = dict()
+            self._sorted_frame_idxs = dict()
 
             for video in self.labels.videos:
                 self._lf_by_video[video] = [
@@ -103,6 +105,11 @@ class LabelsDataCache:
             if new_vid not in self._frame_idx_map:
                 self._frame_idx_map[new_vid] = dict()
             self._lf_by_video[new_vid].append(new_frame)
+            if (
+                new_vid in self._sorted_frame_idxs
+                and new_frame.frame_idx not in self._frame_idx_map[new_vid]
+            ):
+                bisect.insort(self._sorted_frame_idxs[new_vid], new_frame.frame_idx)
             self._frame_idx_map[new_vid][new_frame.frame_idx] = new_frame
 
     def find_frames(
@@ -129,13 +136,35 @@ class LabelsDataCache:
                 return None
             return self._lf_by_video[video]
 
+    def find_frames_up_to(
+        self, video: Video, frame_idx: int, count: Optional[int] = None
+    ) -> List[LabeledFrame]:
+        """Returns (last count) LabeledFrames at or before frame_idx, sorted."""
+        if video not in self._frame_idx_map:
+            return []
+
+        frame_idxs = self.get_sorted_frame_idxs(video)
+        end = bisect.bisect_right(frame_idxs, frame_idx)
+        start = 0 if count is None else max(0, end - count)
+
+        frame_idx_map = self._frame_idx_map[video]
+        return [frame_idx_map[idx] for idx in frame_idxs[start:end]]
+
+    def get_sorted_frame_idxs(self, video: Video) -> List[int]:
+        """Returns sorted list of labeled frame idxs (kept in sync with cache)."""
+        if video not in self._sorted_frame_idxs:
+            self._sorted_frame_idxs[video] = sorted(
+                self._frame_idx_map.get(video, dict()).keys()
+            )
+        return self._sorted_frame_idxs[video]
+
     def find_fancy_frame_idxs(self, video, from_frame_idx, reverse):
         """Returns a list of frame idxs, with optional start position/order."""
         if video not in self._frame_idx_map:
             return None
 
         # Get sorted list of frame indexes for this video
-        frame_idxs = sorted(self._frame_idx_map[video].keys())
+        frame_idxs = list(self.get_sorted_frame_idxs(video))
 
         # Find the next frame index after (before) the specified frame
         if not reverse:
@@ -193,6 +222,9 @@ class LabelsDataCache:
         if frame.video in self._frame_idx_map:
             if frame.frame_idx in self._frame_idx_map[frame.video]:
                 del self._frame_idx_map[frame.video][frame.frame_idx]
+                if frame.video in self._sorted_frame_idxs:
+                    frame_idxs = self._sorted_frame_idxs[frame.video]
+                    del frame_idxs[bisect.bisect_left(frame_idxs, frame.frame_idx)]
 
     def remove_video(self, video: Video):
         """Updates cache as needed."""
@@ -201,6 +233,8 @@ class LabelsDataCache:
             del self._lf_by_video[video]
         if video in self._frame_idx_map:
             del self._frame_idx_map[video]
+        if video in self._sorted_frame_idxs:
+            del self._sorted_frame_idxs[video]
 
     def track_swap(
         self,
@@ -688,6 +722,26 @@ class Labels(MutableSequence):
         for idx in frame_idxs:
             yield self._cache._frame_idx_map[video][idx]
 
+    def find_frames_up_to(
+        self, video: Video, frame_idx: int, count: Optional[int] = None
+    ) -> List[LabeledFrame]:
+        """
+        Finds labeled frames in video at or before given frame index.
+
+        This uses a sorted index of labeled frames, so the cost doesn't depend
+        on the frame index.
+
+        Args:
+            video: A :class:`Video` that is associated with the project.
+            frame_idx: The last frame index to include.
+            count: If given, only return this many frames (i.e., the labeled
+                frames closest to frame_idx).
+
+        Returns:
+            List of `LabeledFrame` objects, sorted by frame index.
+        """
+        return self._cache.find_frames_up_to(video, frame_idx, count)
+
     def find_first(
         self, video: Video, frame_idx: Optional[int] = None
     ) -> Optional[LabeledFrame]:
@@ -924,8 +978,17 @@ class Labels(MutableSequence):
         if not in_transaction:
             self._cache.remove_instance(frame, instance)
 
-    def add_instance(self, frame: LabeledFrame, instance: Instance):
-        """Adds instance to frame, updating track occupancy."""
+    def add_instance(
+        self, frame: LabeledFrame, instance: Instance, index: Optional[int] = None
+    ):
+        """Adds instance to frame, updating track occupancy.
+
+        Args:
+            frame: The :class:`LabeledFrame` to which we're adding instance.
+            instance: The :class:`Instance` to add.
+            index: Position in list of instances in frame. If None, then
+                instance is added at end of list.
+        """
         # Ensure that there isn't already an Instance with this track
         tracks_in_frame = [
             inst.track
@@ -935,7 +998,9 @@ class Labels(MutableSequence):
         if instance.track in tracks_in_frame:
             instance.track = None
 
-        frame.instances.append(instance)
+        if index is None:
+            index = len(frame.instances)
+        frame.insert(index, instance)
 
         self._cache.add_instance(frame, instance)
 
@@ -1455,7 +1520,12 @@ class Labels(MutableSequence):
         )
 
     def save_frame_data_imgstore(
-        self, output_dir: str = "./", format: str = "png", all_labels: bool = False
+        self,
+        output_dir: str = "./",
+        format: str = "png",
+        all_labels: bool = False,
+        resume: bool = False,
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
     ):
         """
         Write images for labeled frames from all videos to imgstore datasets.
@@ -1471,26 +1541,47 @@ class Labels(MutableSequence):
                 have not been tested.
             all_labels: Include any labeled frames, not just the frames
                 we'll use for training (i.e., those with `Instance` objects ).
+            resume: Whether to keep imgstores which were already completely
+                written (e.g., by an export which was interrupted).
+            progress_callback: Called with (done, total) number of frames
+                written for all videos; if it returns -1, the export is
+                cancelled.
+
+        Raises:
+            OperationCancelled: If cancelled by progress callback.
 
         Returns:
             A list of :class:`ImgStoreVideo` objects with the stored
             frames.
         """
+        # Get frames to write for all videos in a single pass over frames.
+        frame_nums = {video: [] for video in self.videos}
+        for lf in self.labeled_frames:
+            if lf.video in frame_nums and (all_labels or lf.has_user_instances):
+                frame_nums[lf.video].append(lf.frame_idx)
+
+        total = sum(map(len, frame_nums.values()))
+        done = 0
+
         # For each label
         imgstore_vids = []
         for v_idx, v in enumerate(self.videos):
-            frame_nums = [
-                lf.frame_idx
-                for lf in self.labeled_frames
-                if v == lf.video and (all_labels or lf.has_user_instances)
-            ]
+
+            def video_progress_callback(video_done, video_total, start=done):
+                if progress_callback is not None:
+                    return progress_callback(start + video_done, total)
 
             # Join with "/" instead of os.path.join() since we want
             # path to work on Windows and Posix systems
             frames_filename = output_dir + f"/frame_data_vid{v_idx}"
             vid = v.to_imgstore(
-                path=frames_filename, frame_numbers=frame_nums, format=format
+                path=frames_filename,
+                frame_numbers=frame_nums[v],
+                format=format,
+                resume=resume,
+                progress_callback=video_progress_callback,
             )
+            done += len(frame_nums[v])
 
             # Close the video for now
             vid.close()
@@ -1670,10 +1761,10 @@ class Labels(MutableSequence):
 
             # Frame index into the original images array
             frame_ind = lf.frame_idx
-            if hasattr(lf.video.backend, "_HDF5Video__original_to_current_frame_idx"):
-                frame_ind = lf.video.backend._HDF5Video__original_to_current_frame_idx[
+            if hasattr(lf.video.backend, "original_to_current_frame_idx"):
+                frame_ind = lf.video.backend.original_to_current_frame_idx(
                     lf.frame_idx
-                ]
+                )
 
             # Actual image data
             img = lf.image
@@ -1746,6 +1837,30 @@ class Labels(MutableSequence):
             f.create_dataset("peaks/channel", data=peak_channels)
             f.create_dataset("peaks/track", data=peak_tracks)
 
+    def export_training_data_tfrecords(
+        self, filename_prefix: Text, n_shards: int = 8, image_format: Text = "png"
+    ) -> Text:
+        """Exports images and points for training to sharded TFRecord files.
+
+        Args:
+            filename_prefix: Path prefix for the TFRecord shards and metadata file.
+            n_shards: Number of TFRecord files to split the examples across.
+            image_format: Image encoding to use: "png", "jpg" or "raw".
+
+        Returns:
+            Path to the metadata JSON file describing the exported shards.
+
+        Notes:
+            Unlike `export_training_data`, the exported data can be read entirely within
+            TensorFlow with `sleap.nn.data.providers.TFRecordReader`, which allows for
+            parallel reading without Python in the loop.
+        """
+        from sleap.nn.data.providers import write_tfrecords
+
+        return write_tfrecords(
+            self, filename_prefix, n_shards=n_shards, image_format=image_format
+        )
+
     def generate_training_data(
         self,
     ) -> Tuple[Union[np.ndarray, List[np.ndarray]], List[np.ndarray]]:
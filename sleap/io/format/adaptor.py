@@ -1,6 +1,6 @@
 import os
 from enum import Enum
-from typing import List
+from typing import Callable, List, Optional
 
 import attr
 
@@ -12,6 +12,36 @@ class SleapObjectType(Enum):
     labels = 1
 
 
+class OperationCancelled(Exception):
+    """Raised when a read/write is cancelled by its progress callback."""
+
+
+def report_progress(
+    progress_callback: Optional[Callable[[int, int], Optional[int]]],
+    done: int,
+    total: int,
+):
+    """
+    Reports progress of read/write to callback (if given).
+
+    Args:
+        progress_callback: Function called with (done, total) counts. If it
+            returns -1, this signals that the user cancelled.
+        done: Number of items processed so far.
+        total: Total number of items.
+
+    Raises:
+        OperationCancelled: If the callback signals cancellation.
+
+    Returns:
+        None.
+    """
+    if progress_callback is not None:
+        if progress_callback(done, total) == -1:
+            # -1 signals user cancellation
+            raise OperationCancelled()
+
+
 @attr.s(auto_attribs=True)
 class Adaptor(object):
     """
@@ -10,14 +10,113 @@ from sleap.instance import (
     PredictedPoint,
     Point,
 )
-from sleap.util import json_loads, json_dumps
+from sleap.util import json_loads, json_dumps, replace_file_when_done
 from sleap import Labels, Video
 
 import h5py
 import numpy as np
 import os
 
-from typing import Optional, Callable, List, Text, Union
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+    Callable,
+    List,
+    Text,
+    Tuple,
+    Union,
+)
+
+# Number of items (frames or instances) to process between progress reports.
+PROGRESS_INTERVAL = 10000
+
+# Fraction of instance rows which can be unused (i.e., not in any frame, which
+# happens when we save only the changed frames) before we compact the file.
+COMPACT_THRESHOLD = 0.5
+
+# FIXME: We can probably construct these from attrs fields
+# We will store Instances and PredcitedInstances in the same
+# table. instance_type=0 or Instance and instance_type=1 for
+# PredictedInstance, score will be ignored for Instances.
+INSTANCE_DTYPE = np.dtype(
+    [
+        ("instance_id", "i8"),
+        ("instance_type", "u1"),
+        ("frame_id", "u8"),
+        ("skeleton", "u4"),
+        ("track", "i4"),
+        ("from_predicted", "i8"),
+        ("score", "f4"),
+        ("point_id_start", "u8"),
+        ("point_id_end", "u8"),
+    ]
+)
+FRAME_DTYPE = np.dtype(
+    [
+        ("frame_id", "u8"),
+        ("video", "u4"),
+        ("frame_idx", "u8"),
+        ("instance_id_start", "u8"),
+        ("instance_id_end", "u8"),
+    ]
+)
+
+
+def _get_live_instance_mask(frames: np.ndarray, num_instances: int) -> np.ndarray:
+    """Returns mask for instance rows which belong to frames."""
+    counts = np.zeros(num_instances + 1, dtype="int64")
+    np.add.at(counts, frames["instance_id_start"].astype("int64"), 1)
+    np.add.at(counts, frames["instance_id_end"].astype("int64"), -1)
+    return np.cumsum(counts)[:num_instances] > 0
+
+
+def _get_range_indices(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Returns concatenated indices for each [start, end) range."""
+    starts = starts.astype("int64")
+    lengths = ends.astype("int64") - starts
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) - np.repeat(offsets - starts, lengths)
+
+
+def _concatenate_points(parrays: List[np.ndarray], dtype: np.dtype) -> np.ndarray:
+    """
+    Concatenates point arrays for instances.
+
+    This is much faster than `np.concatenate` for lots of small structured
+    arrays, since we don't need to check whether the dtypes can be promoted.
+    """
+    if not parrays:
+        return np.zeros(0, dtype=dtype)
+
+    if all(parray.dtype == dtype for parray in parrays):
+        return np.frombuffer(
+            b"".join([parray.tobytes() for parray in parrays]), dtype=dtype
+        )
+
+    return np.concatenate(parrays).astype(dtype, copy=False)
+
+
+def _write_rows(dset: h5py.Dataset, row_ids: List[int], rows: np.ndarray):
+    """Writes rows to dataset at (unique) ids, one write per contiguous run."""
+    if not len(row_ids):
+        return
+    row_ids = np.asarray(row_ids, dtype="int64")
+    order = np.argsort(row_ids, kind="stable")
+    row_ids, rows = row_ids[order], rows[order]
+    run_starts = np.flatnonzero(np.diff(row_ids) != 1) + 1
+    for run_ids, run_rows in zip(
+        np.split(row_ids, run_starts), np.split(rows, run_starts)
+    ):
+        dset[run_ids[0] : run_ids[-1] + 1] = run_rows
+
+
+def _append_rows(dset: h5py.Dataset, rows: np.ndarray):
+    """Appends rows to (resizable) dataset."""
+    if not len(rows):
+        return
+    dset.resize((dset.shape[0] + rows.shape[0]), axis=0)
+    dset[-rows.shape[0] :] = rows
 
 
 class LabelsV1Adaptor(format.adaptor.Adaptor):
@@ -126,6 +225,7 @@ class LabelsV1Adaptor(format.adaptor.Adaptor):
         file: format.filehandle.FileHandle,
         video_search: Union[Callable, List[Text], None] = None,
         match_to: Optional[Labels] = None,
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
         *args,
         **kwargs,
     ):
@@ -138,6 +238,12 @@ class LabelsV1Adaptor(format.adaptor.Adaptor):
         points_dset = f["points"][:]
         pred_points_dset = f["pred_points"][:]
 
+        # Skip instances which aren't in any frame, since these were left
+        # unused when saving only the changed frames.
+        live_instances = _get_live_instance_mask(frames_dset, len(instances_dset))
+        if np.all(live_instances):
+            live_instances = None
+
         # Shift the *non-predicted* points since these used to be saved with
         # a gridline coordinate system.
         if (file.format_id or 0) < 1.1:
@@ -162,9 +268,22 @@ class LabelsV1Adaptor(format.adaptor.Adaptor):
         # instance and the value is the index of the instance.
         from_predicted_lookup = {}
 
+        # Progress is reported by number of instances and frames created.
+        progress_total = len(instances_dset) + len(frames_dset)
+        format.adaptor.report_progress(progress_callback, 0, progress_total)
+
         # Create the instances
         instances = []
-        for i in instances_dset:
+        for instance_id, i in enumerate(instances_dset):
+            if instance_id % PROGRESS_INTERVAL == 0:
+                format.adaptor.report_progress(
+                    progress_callback, instance_id, progress_total
+                )
+
+            if live_instances is not None and not live_instances[instance_id]:
+                instances.append(None)
+                continue
+
             track = tracks[i["track"]]
             skeleton = labels.skeletons[i["skeleton"]]
 
@@ -190,6 +309,10 @@ class LabelsV1Adaptor(format.adaptor.Adaptor):
         for instance, from_predicted_idx in from_predicted_lookup.items():
             instance.from_predicted = instances[from_predicted_idx]
 
+        format.adaptor.report_progress(
+            progress_callback, len(instances_dset), progress_total
+        )
+
         # Create the labeled frames
         frames = [
             LabeledFrame(
@@ -207,8 +330,89 @@ class LabelsV1Adaptor(format.adaptor.Adaptor):
         # Do the stuff that should happen after we have labeled frames
         labels.update_cache()
 
+        format.adaptor.report_progress(
+            progress_callback, progress_total, progress_total
+        )
+
         return labels
 
+    @classmethod
+    def read_video_instance_data(
+        cls,
+        file: format.filehandle.FileHandle,
+        labels: Labels,
+        video: Video,
+        block_instances: int = PROGRESS_INTERVAL * 10,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Reads frame, track and point data for all instances in video.
+
+        This gives the same arrays as
+        :func:`sleap.info.write_tracking_h5.get_video_instance_data` but reads
+        them straight from the datasets in file (a block of points at a time),
+        without creating any labeled frames or instances.
+
+        Args:
+            file: The labels file.
+            labels: The `Labels` with headers from file (see `read_headers`).
+            video: The `Video` for which to read data.
+            block_instances: Number of instances to read points for at a time.
+
+        Returns:
+            tuple of three arrays:
+
+            * frame index for each instance, shape (instances,)
+            * track index (0 if no track) for each instance, shape (instances,)
+            * point locations for each instance (with NaN for points which
+              aren't visible), shape (instances, nodes, 2)
+        """
+        f = file.file
+        node_count = len(labels.skeletons[0].nodes)
+
+        frames = f["frames"][:]
+        frames = frames[frames["video"] == labels.videos.index(video)]
+        instance_starts = frames["instance_id_start"].astype("int64")
+        instance_ends = frames["instance_id_end"].astype("int64")
+        instance_ids = _get_range_indices(instance_starts, instance_ends)
+        instances = f["instances"][:][instance_ids]
+
+        frame_idxs = np.repeat(
+            frames["frame_idx"].astype("int64"), instance_ends - instance_starts
+        )
+        track_idxs = np.maximum(instances["track"].astype("int64"), 0)
+        points = np.full((len(instances), node_count, 2), np.nan, dtype=np.float32)
+
+        # Shift the *non-predicted* points since these used to be saved with
+        # a gridline coordinate system.
+        user_offset = 0.5 if (file.format_id or 0) < 1.1 else 0.0
+
+        for instance_type, key in ((0, "points"), (1, "pred_points")):
+            type_rows = np.flatnonzero(instances["instance_type"] == instance_type)
+            for block_start in range(0, len(type_rows), block_instances):
+                rows = type_rows[block_start : block_start + block_instances]
+                starts = instances["point_id_start"][rows].astype("int64")
+                lengths = np.minimum(
+                    instances["point_id_end"][rows].astype("int64") - starts,
+                    node_count,
+                )
+
+                # Read the range of points for block, then pick out points
+                # for each instance.
+                first_point = int(starts.min())
+                block = f[key][first_point : int((starts + lengths).max())]
+                point_ids = _get_range_indices(starts, starts + lengths) - first_point
+                node_idxs = _get_range_indices(np.zeros_like(lengths), lengths)
+                instance_rows = np.repeat(rows, lengths)
+
+                block_points = block[point_ids]
+                xy = np.stack([block_points["x"], block_points["y"]], axis=1)
+                if instance_type == 0:
+                    xy -= user_offset
+                xy[~block_points["visible"]] = np.nan
+                points[instance_rows, node_idxs] = xy
+
+        return frame_idxs, track_idxs, points
+
     @classmethod
     def write(
         cls,
@@ -217,15 +421,64 @@ class LabelsV1Adaptor(format.adaptor.Adaptor):
         append: bool = False,
         save_frame_data: bool = False,
         frame_data_format: str = "png",
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
     ):
-
+        """
+        Writes labels to HDF5 file.
+
+        Unless we're appending, labels are written to a temporary file which
+        then replaces any existing file, so the existing file is kept if
+        writing fails or is cancelled.
+
+        Args:
+            filename: The path of the file to write.
+            source_object: The `Labels` to write.
+            append: Whether to append labeled frames to existing file.
+            save_frame_data: Whether to save images for labeled frames in
+                the file.
+            frame_data_format: The image format to use if saving frame data.
+            progress_callback: Function called with (done, total) counts,
+                which can return -1 to cancel.
+
+        Returns:
+            None.
+        """
         labels = source_object
 
-        # Delete the file if it exists, we want to start from scratch since
-        # h5py truncates the file which seems to not actually delete data
-        # from the file. Don't if we are appending of course.
-        if os.path.exists(filename) and not append:
-            os.unlink(filename)
+        if append:
+            cls._write_file(
+                filename,
+                labels,
+                True,
+                save_frame_data,
+                frame_data_format,
+                progress_callback,
+            )
+            return
+
+        # We write to a new file since h5py truncates the file which seems to
+        # not actually delete data from the file.
+        with replace_file_when_done(filename) as tmp_filename:
+            cls._write_file(
+                tmp_filename,
+                labels,
+                False,
+                save_frame_data,
+                frame_data_format,
+                progress_callback,
+            )
+
+    @classmethod
+    def _write_file(
+        cls,
+        filename: str,
+        labels: Labels,
+        append: bool,
+        save_frame_data: bool,
+        frame_data_format: str,
+        progress_callback: Optional[Callable[[int, int], Optional[int]]],
+    ):
+        format.adaptor.report_progress(progress_callback, 0, len(labels))
 
         # Serialize all the meta-data to JSON.
         d = labels.to_dict(skip_labels=True)
@@ -292,60 +545,13 @@ class LabelsV1Adaptor(format.adaptor.Adaptor):
                 d = labels.to_dict(skip_labels=True)
 
             if not append:
-                # These items are stored in separate lists because the metadata
-                # group got to be too big.
-                for key in ("videos", "tracks", "suggestions"):
-                    # Convert for saving in hdf5 dataset
-                    data = [np.string_(json_dumps(item)) for item in d[key]]
-
-                    hdf5_key = f"{key}_json"
-
-                    # Save in its own dataset (e.g., videos_json)
-                    f.create_dataset(hdf5_key, data=data, maxshape=(None,))
-
-                    # Clear from dict since we don't want to save this in attribute
-                    d[key] = []
+                cls._write_json_lists(f, d)
 
             # Output the dict to JSON
             meta_group.attrs["json"] = np.string_(json_dumps(d))
 
-            # FIXME: We can probably construct these from attrs fields
-            # We will store Instances and PredcitedInstances in the same
-            # table. instance_type=0 or Instance and instance_type=1 for
-            # PredictedInstance, score will be ignored for Instances.
-            instance_dtype = np.dtype(
-                [
-                    ("instance_id", "i8"),
-                    ("instance_type", "u1"),
-                    ("frame_id", "u8"),
-                    ("skeleton", "u4"),
-                    ("track", "i4"),
-                    ("from_predicted", "i8"),
-                    ("score", "f4"),
-                    ("point_id_start", "u8"),
-                    ("point_id_end", "u8"),
-                ]
-            )
-            frame_dtype = np.dtype(
-                [
-                    ("frame_id", "u8"),
-                    ("video", "u4"),
-                    ("frame_idx", "u8"),
-                    ("instance_id_start", "u8"),
-                    ("instance_id_end", "u8"),
-                ]
-            )
-
-            num_instances = len(labels.all_instances)
-            max_skeleton_size = max([len(s.nodes) for s in labels.skeletons], default=0)
-
-            # Initialize data arrays for serialization
-            points = np.zeros(num_instances * max_skeleton_size, dtype=Point.dtype)
-            pred_points = np.zeros(
-                num_instances * max_skeleton_size, dtype=PredictedPoint.dtype
-            )
-            instances = np.zeros(num_instances, dtype=instance_dtype)
-            frames = np.zeros(len(labels), dtype=frame_dtype)
+            instance_dtype = INSTANCE_DTYPE
+            frame_dtype = FRAME_DTYPE
 
             # Pre compute some structures to make serialization faster
             skeleton_to_idx = {
@@ -359,13 +565,6 @@ class LabelsV1Adaptor(format.adaptor.Adaptor):
             video_to_idx = {
                 video: labels.videos.index(video) for video in labels.videos
             }
-            instance_type_to_idx = {Instance: 0, PredictedInstance: 1}
-
-            # Each instance we create will have and index in the dataset, keep track of
-            # these so we can quickly add from_predicted links on a second pass.
-            instance_to_idx = {}
-            instances_with_from_predicted = []
-            instances_from_predicted = []
 
             # If we are appending, we need look inside to see what frame, instance, and point
             # ids we need to start from. This gives us offsets to use.
@@ -380,101 +579,112 @@ class LabelsV1Adaptor(format.adaptor.Adaptor):
                 instance_id_offset = 0
                 frame_id_offset = 0
 
-            point_id = 0
-            pred_point_id = 0
-            instance_id = 0
-
-            for frame_id, label in enumerate(labels):
-                frames[frame_id] = (
-                    frame_id + frame_id_offset,
-                    video_to_idx[label.video],
-                    label.frame_idx,
-                    instance_id + instance_id_offset,
-                    instance_id + instance_id_offset + len(label.instances),
+            # Gather instances (and per-frame data) from all the labeled frames.
+            all_instances = []
+            frame_instance_counts = np.zeros(len(labels), dtype="int64")
+            frame_videos = np.zeros(len(labels), dtype="int64")
+            frame_idxs = np.zeros(len(labels), dtype="int64")
+
+            for start in range(0, len(labels), PROGRESS_INTERVAL):
+                format.adaptor.report_progress(progress_callback, start, len(labels))
+
+                chunk = labels.labeled_frames[start : start + PROGRESS_INTERVAL]
+                stop = start + len(chunk)
+                frame_instance_counts[start:stop] = [len(lf.instances) for lf in chunk]
+                frame_videos[start:stop] = [video_to_idx[lf.video] for lf in chunk]
+                frame_idxs[start:stop] = [lf.frame_idx for lf in chunk]
+                all_instances.extend(
+                    [instance for lf in chunk for instance in lf.instances]
                 )
-                for instance in label.instances:
-
-                    # Add this instance to our lookup structure we will need for from_predicted
-                    # links
-                    instance_to_idx[instance] = instance_id
-
-                    parray = instance.get_points_array(copy=False, full=True)
-                    instance_type = type(instance)
-
-                    # Check whether we are working with a PredictedInstance or an Instance.
-                    if instance_type is PredictedInstance:
-                        score = instance.score
-                        pid = pred_point_id + pred_point_id_offset
-                    else:
-                        score = np.nan
-                        pid = point_id + point_id_offset
-
-                        # Keep track of any from_predicted instance links, we will insert the
-                        # correct instance_id in the dataset after we are done.
-                        if instance.from_predicted:
-                            instances_with_from_predicted.append(instance_id)
-                            instances_from_predicted.append(instance.from_predicted)
-
-                    # Copy all the data
-                    instances[instance_id] = (
-                        instance_id + instance_id_offset,
-                        instance_type_to_idx[instance_type],
-                        frame_id,
-                        skeleton_to_idx[instance.skeleton],
-                        track_to_idx[instance.track],
-                        -1,
-                        score,
-                        pid,
-                        pid + len(parray),
-                    )
 
-                    # If these are predicted points, copy them to the predicted point array
-                    # otherwise, use the normal point array
-                    if type(parray) is PredictedPointArray:
-                        pred_points[
-                            pred_point_id : pred_point_id + len(parray)
-                        ] = parray
-                        pred_point_id = pred_point_id + len(parray)
-                    else:
-                        points[point_id : point_id + len(parray)] = parray
-                        point_id = point_id + len(parray)
+            # Gather per-instance data into columns.
+            num_instances = len(all_instances)
+            is_predicted = np.array(
+                [type(instance) is PredictedInstance for instance in all_instances],
+                dtype=bool,
+            )
+            parrays = [
+                instance.get_points_array(copy=False, full=True)
+                for instance in all_instances
+            ]
+            num_points = np.array([len(parray) for parray in parrays], dtype="int64")
+
+            # Each type of instance has its points stored in separate array, so
+            # find where each instance's points start within its array.
+            point_id_start = np.zeros(num_instances, dtype="int64")
+            for is_type, offset in (
+                (~is_predicted, point_id_offset),
+                (is_predicted, pred_point_id_offset),
+            ):
+                type_num_points = num_points[is_type]
+                point_id_start[is_type] = (
+                    np.cumsum(type_num_points) - type_num_points + offset
+                )
 
-                    instance_id = instance_id + 1
+            instances = np.zeros(num_instances, dtype=instance_dtype)
+            instances["instance_id"] = np.arange(num_instances) + instance_id_offset
+            instances["instance_type"] = is_predicted
+            instances["frame_id"] = np.repeat(
+                np.arange(len(labels)), frame_instance_counts
+            )
+            instances["skeleton"] = [
+                skeleton_to_idx[instance.skeleton] for instance in all_instances
+            ]
+            instances["track"] = [
+                track_to_idx[instance.track] for instance in all_instances
+            ]
+            instances["from_predicted"] = -1
+            instances["score"] = [
+                instance.score if predicted else np.nan
+                for instance, predicted in zip(all_instances, is_predicted)
+            ]
+            instances["point_id_start"] = point_id_start
+            instances["point_id_end"] = point_id_start + num_points
 
             # Add from_predicted links
-            for instance_id, from_predicted in zip(
-                instances_with_from_predicted, instances_from_predicted
-            ):
-                try:
-                    instances[instance_id]["from_predicted"] = instance_to_idx[
-                        from_predicted
-                    ]
-                except KeyError:
-                    # If we haven't encountered the from_predicted instance yet then don't save the link.
+            from_predicted_links = [
+                (instance_id, instance.from_predicted)
+                for instance_id, instance in enumerate(all_instances)
+                if not is_predicted[instance_id] and instance.from_predicted
+            ]
+            if from_predicted_links:
+                instance_to_idx = {
+                    instance: instance_id
+                    for instance_id, instance in enumerate(all_instances)
+                }
+                for instance_id, from_predicted in from_predicted_links:
+                    # If we haven't encountered the from_predicted instance then don't save the link.
                     # It’s possible for a user to create a regular instance from a predicted instance and then
                     # delete all predicted instances from the file, but in this case I don’t think there’s any reason
                     # to remember which predicted instance the regular instance came from.
-                    pass
+                    instances[instance_id]["from_predicted"] = instance_to_idx.get(
+                        from_predicted, -1
+                    )
 
-            # We pre-allocated our points array with max possible size considering the max
-            # skeleton size, drop any unused points.
-            points = points[0:point_id]
-            pred_points = pred_points[0:pred_point_id]
+            frame_instance_ends = np.cumsum(frame_instance_counts) + instance_id_offset
+            frames = np.zeros(len(labels), dtype=frame_dtype)
+            frames["frame_id"] = np.arange(len(labels)) + frame_id_offset
+            frames["video"] = frame_videos
+            frames["frame_idx"] = frame_idxs
+            frames["instance_id_start"] = frame_instance_ends - frame_instance_counts
+            frames["instance_id_end"] = frame_instance_ends
+
+            # Concatenate points (predicted points go in separate array).
+            points = _concatenate_points(
+                [parray for parray, pred in zip(parrays, is_predicted) if not pred],
+                Point.dtype,
+            )
+            pred_points = _concatenate_points(
+                [parray for parray, pred in zip(parrays, is_predicted) if pred],
+                PredictedPoint.dtype,
+            )
 
             # Create datasets if we need to
             if append and "points" in f:
-                f["points"].resize((f["points"].shape[0] + points.shape[0]), axis=0)
-                f["points"][-points.shape[0] :] = points
-                f["pred_points"].resize(
-                    (f["pred_points"].shape[0] + pred_points.shape[0]), axis=0
-                )
-                f["pred_points"][-pred_points.shape[0] :] = pred_points
-                f["instances"].resize(
-                    (f["instances"].shape[0] + instances.shape[0]), axis=0
-                )
-                f["instances"][-instances.shape[0] :] = instances
-                f["frames"].resize((f["frames"].shape[0] + frames.shape[0]), axis=0)
-                f["frames"][-frames.shape[0] :] = frames
+                _append_rows(f["points"], points)
+                _append_rows(f["pred_points"], pred_points)
+                _append_rows(f["instances"], instances)
+                _append_rows(f["frames"], frames)
             else:
                 f.create_dataset(
                     "points", data=points, maxshape=(None,), dtype=Point.dtype
@@ -491,3 +701,472 @@ class LabelsV1Adaptor(format.adaptor.Adaptor):
                 f.create_dataset(
                     "frames", data=frames, maxshape=(None,), dtype=frame_dtype
                 )
+
+        format.adaptor.report_progress(progress_callback, len(labels), len(labels))
+
+    @staticmethod
+    def _write_json_lists(f: h5py.File, d: dict):
+        """
+        Writes videos, tracks and suggestions from metadata dict to datasets.
+
+        These items are stored in separate lists because the metadata group
+        got to be too big. They're removed from the dict since we don't want
+        to also save them in the metadata attribute.
+        """
+        for key in ("videos", "tracks", "suggestions"):
+            # Convert for saving in hdf5 dataset
+            data = [np.string_(json_dumps(item)) for item in d[key]]
+
+            hdf5_key = f"{key}_json"
+
+            # Replace existing dataset since strings may be longer
+            if hdf5_key in f:
+                del f[hdf5_key]
+
+            # Save in its own dataset (e.g., videos_json)
+            f.create_dataset(hdf5_key, data=data, maxshape=(None,))
+
+            # Clear from dict since we don't want to save this in attribute
+            d[key] = []
+
+    @classmethod
+    def write_changed_frames(
+        cls,
+        filename: str,
+        labels: Labels,
+        changed_frames: Iterable[Tuple[Video, int]],
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
+    ) -> bool:
+        """
+        Updates existing file in place with just the frames that changed.
+
+        Rows for a changed frame are overwritten if it still has the same
+        number and type of instances (with the same number of points),
+        otherwise the row for the frame is removed and new rows are appended
+        (the old instance and point rows are left unused). Frames with links
+        to instances which are left unused are also written. The metadata is
+        always rewritten. If too much of the file is taken up by unused rows,
+        the file is compacted.
+
+        We can only do this if the file was written (or read) with the same
+        videos and skeletons, and with (a subset of) the same tracks, since
+        rows for unchanged frames refer to these by index.
+
+        Args:
+            filename: The path of the existing labels file.
+            labels: The `Labels` to write.
+            changed_frames: (video, frame index) for every frame which has
+                changed since labels were last read from or written to file.
+            progress_callback: Function called with (done, total) counts,
+                which can return -1 to cancel (before file is modified).
+
+        Returns:
+            True if file was updated, False if we can't update this file (in
+            which case it wasn't modified).
+        """
+        if not os.path.exists(filename):
+            return False
+
+        # Don't modify file while it's open as source of video frames.
+        for video in labels.videos:
+            video_filename = getattr(video.backend, "filename", None)
+            if video_filename and os.path.abspath(video_filename) == os.path.abspath(
+                filename
+            ):
+                return False
+
+        with h5py.File(filename, "a") as f:
+            for key in ("metadata", "frames", "instances", "points", "pred_points"):
+                if key not in f:
+                    return False
+
+            meta_group = f["metadata"]
+            if meta_group.attrs.get("format_id", 1.0) < cls.FORMAT_ID:
+                return False
+
+            old_dicts = json_loads(meta_group.attrs["json"].tostring().decode())
+            old_counts = dict()
+            for key in ("videos", "tracks"):
+                hdf5_key = f"{key}_json"
+                old_counts[key] = (
+                    len(f[hdf5_key]) if hdf5_key in f else len(old_dicts[key])
+                )
+            if (
+                len(old_dicts["skeletons"]) != len(labels.skeletons)
+                or old_counts["videos"] != len(labels.videos)
+                or old_counts["tracks"] > len(labels.tracks)
+            ):
+                return False
+
+            video_to_idx = {video: i for i, video in enumerate(labels.videos)}
+            skeleton_to_idx = {
+                skeleton: i for i, skeleton in enumerate(labels.skeletons)
+            }
+            track_to_idx = {track: i for i, track in enumerate(labels.tracks)}
+            track_to_idx[None] = -1
+            instance_type_to_idx = {Instance: 0, PredictedInstance: 1}
+
+            changed_keys = sorted(
+                {
+                    (video_to_idx[video], int(frame_idx))
+                    for video, frame_idx in changed_frames
+                    if video in video_to_idx
+                }
+            )
+
+            # Only chance to cancel, since we shouldn't stop partway through
+            # modifying the file.
+            format.adaptor.report_progress(progress_callback, 0, len(changed_keys))
+
+            frames = f["frames"][:]
+
+            # Look up rows for frames by video and frame index.
+            frame_keys = (frames["video"].astype("int64") << 40) + frames[
+                "frame_idx"
+            ].astype("int64")
+            key_rows = np.argsort(frame_keys, kind="stable")
+            sorted_keys = frame_keys[key_rows]
+
+            def get_row(video_idx: int, frame_idx: int) -> int:
+                key = (video_idx << 40) + frame_idx
+                i = np.searchsorted(sorted_keys, key)
+                if i < len(sorted_keys) and sorted_keys[i] == key:
+                    return int(key_rows[i])
+                return -1
+
+            # Look up rows for the frames which instance rows belong to (-1 if
+            # not in any frame). Ranges of instances for (non-empty) frames
+            # don't overlap.
+            instance_starts = frames["instance_id_start"].astype("int64")
+            instance_ends = frames["instance_id_end"].astype("int64")
+            start_rows = np.flatnonzero(instance_ends > instance_starts)
+            start_rows = start_rows[np.argsort(instance_starts[start_rows])]
+            sorted_starts = instance_starts[start_rows]
+
+            def get_instance_frame_rows(instance_ids: np.ndarray) -> np.ndarray:
+                i = np.searchsorted(sorted_starts, instance_ids, side="right") - 1
+                rows = start_rows[np.maximum(i, 0)] if len(start_rows) else i
+                found = (i >= 0) & (instance_ids < instance_ends[rows])
+                return np.where(found, rows, -1)
+
+            num_instances = len(f["instances"])
+            num_points = len(f["points"])
+            num_pred_points = len(f["pred_points"])
+            next_frame_id = int(frames["frame_id"].max()) + 1 if len(frames) else 0
+
+            # Decide where each instance in changed frames goes, as lists of
+            # (instance, instance id, frame id, point id) for instances which
+            # we overwrite and (instance, instance id, frame id) for new ones.
+            # Frames which change layout (or were removed) have their rows
+            # removed, which leaves their instance rows unused.
+            instance_to_id: Dict[Instance, int] = dict()
+            inplace = []
+            appended = []
+            new_frames = []
+            deleted_rows = []
+            from_predicted_ids = None
+
+            planned_keys = set()
+            pending_keys = changed_keys
+            while pending_keys:
+                unused_instance_ids = []
+                for video_idx, frame_idx in pending_keys:
+                    row = get_row(video_idx, frame_idx)
+                    found = labels.find(labels.videos[video_idx], frame_idx)
+                    lf = found[0] if found else None
+
+                    if lf is not None and row != -1:
+                        start = int(frames[row]["instance_id_start"])
+                        end = int(frames[row]["instance_id_end"])
+                        old_rows = f["instances"][start:end]
+
+                        # Overwrite rows if frame has same layout.
+                        if len(lf.instances) == len(old_rows) and all(
+                            instance_type_to_idx[type(instance)] == old["instance_type"]
+                            and len(instance.get_points_array(copy=False, full=True))
+                            == old["point_id_end"] - old["point_id_start"]
+                            for instance, old in zip(lf.instances, old_rows)
+                        ):
+                            for instance, old in zip(lf.instances, old_rows):
+                                instance_to_id[instance] = int(old["instance_id"])
+                                inplace.append(
+                                    (
+                                        instance,
+                                        int(old["instance_id"]),
+                                        int(old["frame_id"]),
+                                        int(old["point_id_start"]),
+                                    )
+                                )
+                            continue
+
+                    if row != -1:
+                        deleted_rows.append(row)
+                        unused_instance_ids.extend(
+                            range(
+                                int(frames[row]["instance_id_start"]),
+                                int(frames[row]["instance_id_end"]),
+                            )
+                        )
+
+                    if lf is None:
+                        continue
+
+                    # Append new rows for frame.
+                    frame_id = next_frame_id + len(new_frames)
+                    instance_id_start = num_instances + len(appended)
+                    for instance in lf.instances:
+                        instance_id = num_instances + len(appended)
+                        instance_to_id[instance] = instance_id
+                        appended.append((instance, instance_id, frame_id))
+                    new_frames.append(
+                        (
+                            frame_id,
+                            video_idx,
+                            frame_idx,
+                            instance_id_start,
+                            instance_id_start + len(lf.instances),
+                        )
+                    )
+
+                planned_keys.update(pending_keys)
+                pending_keys = []
+
+                # Links from instances in other frames to rows which are now
+                # unused have to be rewritten, so also write these frames. We
+                # find these from the links saved in the file.
+                if unused_instance_ids:
+                    if from_predicted_ids is None:
+                        from_predicted_ids = f["instances"]["from_predicted"]
+                    linked_rows = get_instance_frame_rows(
+                        np.flatnonzero(np.isin(from_predicted_ids, unused_instance_ids))
+                    )
+                    pending_keys = sorted(
+                        {
+                            (int(frames[row]["video"]), int(frames[row]["frame_idx"]))
+                            for row in np.unique(linked_rows[linked_rows != -1])
+                        }
+                        - planned_keys
+                    )
+
+            deleted_row_set = set(deleted_rows)
+
+            def get_instance_id(instance: Optional[Instance]) -> int:
+                if instance is None:
+                    return -1
+                if instance in instance_to_id:
+                    return instance_to_id[instance]
+
+                # Instance is in unchanged frame, so it's at same offset from
+                # the frame's first instance row.
+                lf = instance.frame
+                if lf is None or lf.video not in video_to_idx:
+                    return -1
+                row = get_row(video_to_idx[lf.video], lf.frame_idx)
+                if row == -1 or row in deleted_row_set:
+                    return -1
+                return int(frames[row]["instance_id_start"]) + lf.instances.index(
+                    instance
+                )
+
+            def get_instance_row(
+                instance: Instance, instance_id: int, frame_id: int, point_id: int
+            ) -> tuple:
+                instance_type = type(instance)
+                if instance_type is PredictedInstance:
+                    score = instance.score
+                    from_predicted = -1
+                else:
+                    score = np.nan
+                    from_predicted = get_instance_id(instance.from_predicted)
+
+                return (
+                    instance_id,
+                    instance_type_to_idx[instance_type],
+                    frame_id,
+                    skeleton_to_idx[instance.skeleton],
+                    track_to_idx[instance.track],
+                    from_predicted,
+                    score,
+                    point_id,
+                    point_id + len(instance.get_points_array(copy=False, full=True)),
+                )
+
+            # Build rows to overwrite.
+            inplace_instances = []
+            inplace_points = {Instance: ([], []), PredictedInstance: ([], [])}
+            for instance, instance_id, frame_id, point_id in inplace:
+                inplace_instances.append(
+                    get_instance_row(instance, instance_id, frame_id, point_id)
+                )
+                parray = instance.get_points_array(copy=False, full=True)
+                point_ids, point_rows = inplace_points[type(instance)]
+                point_ids.extend(range(point_id, point_id + len(parray)))
+                point_rows.append(parray)
+
+            # Build rows to append.
+            new_instances = []
+            new_points = {Instance: [], PredictedInstance: []}
+            next_point_id = {Instance: num_points, PredictedInstance: num_pred_points}
+            for instance, instance_id, frame_id in appended:
+                instance_type = type(instance)
+                new_instances.append(
+                    get_instance_row(
+                        instance, instance_id, frame_id, next_point_id[instance_type]
+                    )
+                )
+                parray = instance.get_points_array(copy=False, full=True)
+                new_points[instance_type].append(parray)
+                next_point_id[instance_type] += len(parray)
+
+            def as_array(rows: list, dtype: np.dtype) -> np.ndarray:
+                if not rows:
+                    return np.zeros(0, dtype=dtype)
+                if isinstance(rows[0], tuple):
+                    return np.array(rows, dtype=dtype)
+                return np.concatenate(rows).astype(dtype)
+
+            # Append new rows first, so file refers to complete data at
+            # each step.
+            _append_rows(f["points"], as_array(new_points[Instance], Point.dtype))
+            _append_rows(
+                f["pred_points"],
+                as_array(new_points[PredictedInstance], PredictedPoint.dtype),
+            )
+            _append_rows(f["instances"], as_array(new_instances, INSTANCE_DTYPE))
+
+            # Overwrite rows in place.
+            for instance_type, dset, dtype in (
+                (Instance, f["points"], Point.dtype),
+                (PredictedInstance, f["pred_points"], PredictedPoint.dtype),
+            ):
+                point_ids, point_rows = inplace_points[instance_type]
+                _write_rows(dset, point_ids, as_array(point_rows, dtype))
+            _write_rows(
+                f["instances"],
+                [instance_id for _, instance_id, _, _ in inplace],
+                as_array(inplace_instances, INSTANCE_DTYPE),
+            )
+
+            # Remove rows for frames which changed layout or were removed, and
+            # add rows for new frames. We only rewrite all the frame rows if
+            # we have to remove some (this leaves no rows which readers for
+            # earlier versions of format would need to skip).
+            if deleted_rows:
+                frames = np.concatenate(
+                    [
+                        np.delete(frames, deleted_rows),
+                        as_array(new_frames, FRAME_DTYPE),
+                    ]
+                )
+                f["frames"].resize((len(frames),))
+                f["frames"][:] = frames
+            else:
+                _append_rows(f["frames"], as_array(new_frames, FRAME_DTYPE))
+                frames = np.concatenate([frames, as_array(new_frames, FRAME_DTYPE)])
+
+            # Rewrite the metadata.
+            d = labels.to_dict(skip_labels=True)
+            cls._write_json_lists(f, d)
+            meta_group.attrs["json"] = np.string_(json_dumps(d))
+
+            # Count how many instance rows are no longer in any frame.
+            num_instances = len(f["instances"])
+            num_unused = num_instances - int(
+                np.sum(
+                    frames["instance_id_end"].astype("int64")
+                    - frames["instance_id_start"].astype("int64")
+                )
+            )
+
+        if num_unused > COMPACT_THRESHOLD * num_instances:
+            cls.compact(filename)
+
+        return True
+
+    @classmethod
+    def compact(cls, filename: str):
+        """
+        Rewrites file without rows left unused by saving changed frames.
+
+        The file is written to a temporary file which then replaces the
+        original, so this reclaims the space used by unused rows.
+
+        Args:
+            filename: The path of the labels file.
+
+        Returns:
+            None.
+        """
+        with replace_file_when_done(filename) as tmp_filename:
+            with h5py.File(filename, "r") as src, h5py.File(tmp_filename, "w") as dst:
+                frames = src["frames"][:]
+                instances = src["instances"][:]
+
+                live_instances = _get_live_instance_mask(frames, len(instances))
+
+                # Map old instance ids to new (-1 for removed instances).
+                new_instance_ids = np.full(len(instances) + 1, -1, dtype="int64")
+                new_instance_ids[:-1][live_instances] = np.arange(
+                    np.count_nonzero(live_instances)
+                )
+
+                # Each frame's instances are still contiguous, so we can
+                # count the remaining instances before its first instance.
+                num_before = np.concatenate(
+                    [[0], np.cumsum(live_instances, dtype="int64")]
+                )
+                starts = num_before[frames["instance_id_start"].astype("int64")]
+                ends = num_before[frames["instance_id_end"].astype("int64")]
+                frames["frame_id"] = np.arange(len(frames))
+                frames["instance_id_start"] = starts
+                frames["instance_id_end"] = ends
+
+                instances = instances[live_instances]
+                instances["instance_id"] = np.arange(len(instances))
+                frame_order = np.argsort(starts, kind="stable")
+                instances["frame_id"] = np.repeat(
+                    frame_order, (ends - starts)[frame_order]
+                )
+                instances["from_predicted"] = new_instance_ids[
+                    instances["from_predicted"]
+                ]
+
+                # Gather points for remaining instances.
+                point_data = dict()
+                for instance_type, key in ((0, "points"), (1, "pred_points")):
+                    is_type = instances["instance_type"] == instance_type
+                    point_starts = instances["point_id_start"][is_type]
+                    point_ends = instances["point_id_end"][is_type]
+                    lengths = point_ends.astype("int64") - point_starts.astype("int64")
+                    new_starts = np.cumsum(lengths) - lengths
+                    point_data[key] = src[key][:][
+                        _get_range_indices(point_starts, point_ends)
+                    ]
+                    instances["point_id_start"][is_type] = new_starts
+                    instances["point_id_end"][is_type] = new_starts + lengths
+
+                # Copy everything else (metadata, frame data, ...) as is.
+                for key, value in src.attrs.items():
+                    dst.attrs[key] = value
+                for key in src:
+                    if key not in ("frames", "instances", "points", "pred_points"):
+                        src.copy(key, dst)
+
+                dst.create_dataset(
+                    "points",
+                    data=point_data["points"],
+                    maxshape=(None,),
+                    dtype=Point.dtype,
+                )
+                dst.create_dataset(
+                    "pred_points",
+                    data=point_data["pred_points"],
+                    maxshape=(None,),
+                    dtype=PredictedPoint.dtype,
+                )
+                dst.create_dataset(
+                    "instances", data=instances, maxshape=(None,), dtype=INSTANCE_DTYPE
+                )
+                dst.create_dataset(
+                    "frames", data=frames, maxshape=(None,), dtype=FRAME_DTYPE
+                )
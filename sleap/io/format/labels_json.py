@@ -1,20 +1,29 @@
 import atexit
+import io
+import json
+import math
 import os
 import re
 import shutil
 import tempfile
 import zipfile
-from typing import Optional, Union, Dict, List, Callable, Text
+from typing import Any, Optional, Union, Dict, List, Callable, Text, TextIO, Tuple
 
+import attr
 import cattr
+import numpy as np
 
-from .adaptor import Adaptor, SleapObjectType
+from .adaptor import Adaptor, SleapObjectType, report_progress
 from .filehandle import FileHandle
 
 from sleap import Labels, Video
 from sleap.gui.suggestions import SuggestionFrame
 from sleap.instance import (
+    Instance,
     LabeledFrame,
+    PointArray,
+    PredictedInstance,
+    PredictedPointArray,
     Track,
     make_instance_cattr,
 )
@@ -22,6 +31,439 @@ from sleap.io.legacy import load_labels_json_old
 from sleap.skeleton import Node, Skeleton
 from sleap.util import json_loads, json_dumps, weak_filename_match
 
+# Number of labeled frames to deserialize between progress reports.
+PROGRESS_INTERVAL = 1000
+
+# Data types for columns of points gathered by `LabeledFrameBuilder`.
+POINT_COLUMN_DTYPES = ("int64", "int64", "float64", "float64", bool, bool, "float64")
+
+# Matches (possibly empty) JSON whitespace.
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Number of characters to read at a time when parsing JSON from a file.
+JSON_CHUNK_SIZE = 1024 * 1024
+
+# Number of characters at start and end of file to check for format_id.
+FORMAT_ID_PEEK_SIZE = 1024
+
+# Match format_id if it's the first or last item in the top-level object.
+FORMAT_ID_AT_START = re.compile(r'\s*{\s*"format_id"\s*:\s*([-+.eE0-9]+)')
+FORMAT_ID_AT_END = re.compile(r'"format_id"\s*:\s*([-+.eE0-9]+)\s*}\s*$')
+
+
+@attr.s(auto_attribs=True)
+class LabeledFrameBuilder:
+    """
+    Builds labeled frames in bulk from their (deserialized) JSON dicts.
+
+    As dicts are added, instance data and points are gathered into columns.
+    Objects are created once all the videos, skeletons, nodes and tracks have
+    been deserialized. The points for each type of instance go in a single
+    point array, and each instance gets a slice of this.
+
+    Attributes:
+        frame_videos: Video index for each frame.
+        frame_idxs: Frame index for each frame.
+        frame_instance_counts: Number of instances in each frame.
+        frame_instance_rows: Instance rows for all frames (in order).
+        instance_predicted: Whether each instance row is predicted.
+        instance_skeletons: Skeleton index for each instance row.
+        instance_tracks: Track index (-1 for None) for each instance row.
+        instance_scores: Score (for predicted) for each instance row.
+        instance_tracking_scores: Tracking score for each instance row.
+        instance_from_predicted: Row of from_predicted instance (or -1).
+    """
+
+    frame_videos: List[int] = attr.ib(factory=list)
+    frame_idxs: List[int] = attr.ib(factory=list)
+    frame_instance_counts: List[int] = attr.ib(factory=list)
+    frame_instance_rows: List[int] = attr.ib(factory=list)
+
+    instance_predicted: List[bool] = attr.ib(factory=list)
+    instance_skeletons: List[int] = attr.ib(factory=list)
+    instance_tracks: List[int] = attr.ib(factory=list)
+    instance_scores: List[float] = attr.ib(factory=list)
+    instance_tracking_scores: List[float] = attr.ib(factory=list)
+    instance_from_predicted: List[int] = attr.ib(factory=list)
+
+    # Points for recently added instances, as lists of
+    # (instance row, node index, x, y, visible, complete, score).
+    _point_lists: Tuple[List, ...] = attr.ib(
+        factory=lambda: tuple([] for _ in range(7))
+    )
+    # Points for earlier instances, converted to arrays.
+    _point_arrays: List[Tuple[np.ndarray, ...]] = attr.ib(factory=list)
+
+    def __len__(self):
+        """Returns number of frames added."""
+        return len(self.frame_idxs)
+
+    def add_frame(self, frame_dict: dict):
+        """Adds labeled frame from its JSON dict."""
+        instance_dicts = frame_dict.get("_instances", [])
+        self.frame_videos.append(int(frame_dict["video"]))
+        self.frame_idxs.append(int(frame_dict["frame_idx"]))
+        self.frame_instance_counts.append(len(instance_dicts))
+        for instance_dict in instance_dicts:
+            self.frame_instance_rows.append(self._add_instance(instance_dict))
+
+        # Convert points to arrays now and then, so that we don't keep lots
+        # of Python objects around.
+        if len(self._point_lists[0]) > PROGRESS_INTERVAL * 100:
+            self._flush_points()
+
+    def _add_instance(self, instance_dict: dict) -> int:
+        """Adds instance from its JSON dict, returns its row."""
+        row = len(self.instance_skeletons)
+        predicted = "score" in instance_dict
+        track = instance_dict.get("track", None)
+
+        self.instance_predicted.append(predicted)
+        self.instance_skeletons.append(int(instance_dict["skeleton"]))
+        self.instance_tracks.append(-1 if track is None else int(track))
+        self.instance_scores.append(instance_dict.get("score", 0.0))
+        tracking_score = instance_dict.get("tracking_score", 0.0)
+        self.instance_tracking_scores.append(tracking_score)
+        self.instance_from_predicted.append(-1)
+
+        rows, node_idxs, xs, ys, visibles, completes, scores = self._point_lists
+        for node_idx, point in (instance_dict.get("_points", None) or {}).items():
+            rows.append(row)
+            node_idxs.append(int(node_idx))
+            xs.append(point.get("x", math.nan))
+            ys.append(point.get("y", math.nan))
+            visibles.append(point.get("visible", True))
+            completes.append(point.get("complete", False))
+            scores.append(point.get("score", 0.0))
+
+        # The instance this was copied from is saved in full (rather than as
+        # a reference), so we'll create a separate object for it.
+        from_predicted = instance_dict.get("from_predicted", None)
+        if from_predicted is not None and not predicted:
+            self.instance_from_predicted[row] = self._add_instance(from_predicted)
+
+        return row
+
+    def _flush_points(self):
+        """Converts lists of points to arrays."""
+        if self._point_lists[0]:
+            self._point_arrays.append(
+                tuple(
+                    np.array(point_list, dtype=dtype)
+                    for point_list, dtype in zip(self._point_lists, POINT_COLUMN_DTYPES)
+                )
+            )
+        for point_list in self._point_lists:
+            point_list.clear()
+
+    def make_frames(
+        self,
+        videos: List[Video],
+        skeletons: List[Skeleton],
+        nodes: List[Node],
+        tracks: List[Track],
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
+    ) -> List[LabeledFrame]:
+        """
+        Creates the labeled frames (and their instances).
+
+        Args:
+            videos: The videos referenced (by index) in labeled frames.
+            skeletons: The skeletons referenced by instances.
+            nodes: The nodes referenced by points.
+            tracks: The tracks referenced by instances.
+            progress_callback: Called with (done, total) number of labeled
+                frames created; if it returns -1, this is cancelled.
+
+        Returns:
+            List of `LabeledFrame` objects.
+        """
+        self._flush_points()
+
+        num_instances = len(self.instance_skeletons)
+        predicted = np.array(self.instance_predicted, dtype=bool)
+        instance_skeletons = np.array(self.instance_skeletons, dtype="int64")
+        num_points = np.array(
+            [len(skeleton.nodes) for skeleton in skeletons], dtype="int64"
+        )[instance_skeletons]
+
+        # Find where each instance's points start in point array for its type.
+        point_starts = np.zeros(num_instances, dtype="int64")
+        for is_type in (~predicted, predicted):
+            type_num_points = num_points[is_type]
+            point_starts[is_type] = np.cumsum(type_num_points) - type_num_points
+
+        # Lookup table from node index to its position in each skeleton.
+        node_positions = np.full((len(skeletons), len(nodes) + 1), -1, dtype="int64")
+        for skeleton_idx, skeleton in enumerate(skeletons):
+            for node_idx, node in enumerate(nodes):
+                try:
+                    node_positions[skeleton_idx, node_idx] = skeleton.node_to_index(
+                        node
+                    )
+                except ValueError:
+                    pass
+
+        if self._point_arrays:
+            columns = [np.concatenate(column) for column in zip(*self._point_arrays)]
+        else:
+            columns = [np.zeros(0, dtype=dtype) for dtype in POINT_COLUMN_DTYPES]
+        # Keep the concatenated columns, so frames can be made again.
+        self._point_arrays = [tuple(columns)]
+        rows, node_idxs, xs, ys, visibles, completes, scores = columns
+
+        # Points for nodes which aren't in skeleton are skipped.
+        node_idxs = np.where(
+            (node_idxs >= 0) & (node_idxs < len(nodes)), node_idxs, len(nodes)
+        )
+        positions = node_positions[instance_skeletons[rows], node_idxs]
+        has_position = positions >= 0
+        point_predicted = predicted[rows]
+
+        point_buffers = dict()
+        for is_predicted, array_type in (
+            (False, PointArray),
+            (True, PredictedPointArray),
+        ):
+            buffer = array_type.make_default(
+                int(num_points[predicted == is_predicted].sum())
+            )
+            points_mask = has_position & (point_predicted == is_predicted)
+            point_ids = point_starts[rows[points_mask]] + positions[points_mask]
+            buffer["x"][point_ids] = xs[points_mask]
+            buffer["y"][point_ids] = ys[points_mask]
+            buffer["visible"][point_ids] = visibles[points_mask]
+            buffer["complete"][point_ids] = completes[points_mask]
+            if is_predicted:
+                buffer["score"][point_ids] = scores[points_mask]
+            point_buffers[is_predicted] = buffer
+
+        # Create the instances. Predicted instances are created first, since
+        # instances can refer to these.
+        instances = [None] * num_instances
+        for is_predicted in (True, False):
+            for row in np.flatnonzero(predicted == is_predicted):
+                start = point_starts[row]
+                kwargs = dict(
+                    skeleton=skeletons[self.instance_skeletons[row]],
+                    track=(
+                        tracks[self.instance_tracks[row]]
+                        if self.instance_tracks[row] != -1
+                        else None
+                    ),
+                    points=point_buffers[is_predicted][start : start + num_points[row]],
+                )
+                if is_predicted:
+                    instances[row] = PredictedInstance(
+                        score=self.instance_scores[row],
+                        tracking_score=self.instance_tracking_scores[row],
+                        **kwargs,
+                    )
+                else:
+                    from_predicted = self.instance_from_predicted[row]
+                    instances[row] = Instance(
+                        from_predicted=(
+                            instances[from_predicted] if from_predicted != -1 else None
+                        ),
+                        **kwargs,
+                    )
+
+        # Create the labeled frames.
+        frames = []
+        instance_rows = iter(self.frame_instance_rows)
+        for i, (video_idx, frame_idx, count) in enumerate(
+            zip(self.frame_videos, self.frame_idxs, self.frame_instance_counts)
+        ):
+            if i % PROGRESS_INTERVAL == 0:
+                report_progress(progress_callback, i, len(self))
+            frames.append(
+                LabeledFrame(
+                    video=videos[video_idx],
+                    frame_idx=frame_idx,
+                    instances=[instances[next(instance_rows)] for _ in range(count)],
+                )
+            )
+        report_progress(progress_callback, len(self), len(self))
+
+        return frames
+
+
+class _JsonStreamReader:
+    """
+    Reads JSON values one at a time from a text file.
+
+    Only the text for the values currently being parsed is held in memory,
+    which is about `chunk_size` characters unless a single value is larger.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: Optional[int] = None):
+        self._file = file
+        self._chunk_size = chunk_size or JSON_CHUNK_SIZE
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+
+    @property
+    def position(self) -> int:
+        """Number of characters parsed."""
+        return self._offset + self._pos
+
+    def _read_more(self, size: Optional[int] = None) -> bool:
+        """Reads more text into buffer, returns False if at end of file."""
+        if self._eof:
+            return False
+        chunk = self._file.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop the text we've already parsed.
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def peek(self) -> str:
+        """Returns next non-whitespace character (or empty string at end)."""
+        while True:
+            self._pos = JSON_WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._read_more():
+                return self._buffer[self._pos : self._pos + 1]
+
+    def expect(self, char: str):
+        """Skips next non-whitespace character, which must be `char`."""
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def read_value(self, keep_text: bool = False) -> Tuple[Any, Optional[str]]:
+        """
+        Reads next JSON value.
+
+        Args:
+            keep_text: Whether to also return the JSON text for the value.
+
+        Returns:
+            Tuple with value and its text (or None if `keep_text` is False).
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The value may continue past the text we've read. We read at
+                # least as much text again, so large values take linear time.
+                if self._read_more(max(self._chunk_size, len(self._buffer))):
+                    continue
+                raise
+            if end == len(self._buffer) and self._read_more():
+                # Values such as numbers may continue in the next chunk.
+                continue
+            text = self._buffer[self._pos : end] if keep_text else None
+            self._pos = end
+            return value, text
+
+
+def parse_json_stream(
+    json_file: Union[TextIO, str],
+    frame_builder: LabeledFrameBuilder,
+    progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
+) -> Dict[str, Any]:
+    """
+    Parses labels JSON, adding labeled frames to builder as they're parsed.
+
+    The file is read a chunk at a time and each labeled frame dict is only
+    kept until it's added to builder, so neither the whole text nor the whole
+    document as dicts and lists is held in memory.
+
+    Args:
+        json_file: The (text) file with JSON for the labels (which must be a
+            JSON object), or the JSON string.
+        frame_builder: `LabeledFrameBuilder` for the items in "labels".
+        progress_callback: Called with (done, total) number of characters
+            parsed; if it returns -1, parsing is cancelled.
+
+    Raises:
+        json.JSONDecodeError: If file isn't a valid JSON object.
+
+    Returns:
+        Dictionary with all other (top-level) items.
+    """
+    if isinstance(json_file, str):
+        total = len(json_file)
+        json_file = io.StringIO(json_file)
+    else:
+        # File size in bytes, which is at least the number of characters.
+        total = os.fstat(json_file.fileno()).st_size
+
+    reader = _JsonStreamReader(json_file)
+    dicts = dict()
+
+    def parse_items(end_char: str, parse_item: Callable):
+        """Parses comma-separated items until end char."""
+        if reader.peek() == end_char:
+            reader.expect(end_char)
+            return
+        while True:
+            parse_item()
+            if reader.peek() == end_char:
+                reader.expect(end_char)
+                return
+            reader.expect(",")
+
+    def parse_frame():
+        if len(frame_builder) % PROGRESS_INTERVAL == 0:
+            report_progress(progress_callback, min(reader.position, total), total)
+        frame_dict, _ = reader.read_value()
+        frame_builder.add_frame(frame_dict)
+
+    def parse_key_value():
+        if reader.peek() != '"':
+            raise reader.error("Expecting property name enclosed in double quotes")
+        key, _ = reader.read_value()
+        reader.expect(":")
+        if key == "labels" and reader.peek() == "[":
+            reader.expect("[")
+            parse_items("]", parse_frame)
+        else:
+            # Decode everything other than the labeled frames as usual.
+            _, text = reader.read_value(keep_text=True)
+            dicts[key] = json_loads(text)
+
+    report_progress(progress_callback, 0, total)
+    reader.expect("{")
+    parse_items("}", parse_key_value)
+    if reader.peek() != "":
+        raise reader.error("Extra data")
+    report_progress(progress_callback, total, total)
+
+    return dicts
+
+
+def _peek_format_id(filename: str) -> Optional[float]:
+    """
+    Returns format_id if it's the first or last item in labels JSON file.
+
+    This only reads the start and end of the file. We write format_id as the
+    last item, so this finds it for files we wrote.
+    """
+    with open(filename, "rb") as f:
+        head = f.read(FORMAT_ID_PEEK_SIZE).decode("utf-8", errors="ignore")
+        f.seek(max(0, os.fstat(f.fileno()).st_size - FORMAT_ID_PEEK_SIZE))
+        tail = f.read().decode("utf-8", errors="ignore")
+
+    match = FORMAT_ID_AT_START.match(head) or FORMAT_ID_AT_END.search(tail)
+    if match is None:
+        return None
+    try:
+        return float(match.group(1))
+    except ValueError:
+        return None
+
 
 class LabelsJsonAdaptor(Adaptor):
     FORMAT_ID = 1
@@ -51,9 +493,18 @@ class LabelsJsonAdaptor(Adaptor):
             # We can't check inside zip so assume it's correct
             return True
 
-        if not file.is_json:
+        # Only check the start and end of the file, since parsing all of it
+        # here would keep every labeled frame in memory as dicts while we
+        # read the file. If format_id isn't found at the start or end of the
+        # file, it's checked once the file is parsed.
+        try:
+            with open(file.filename, "r") as f:
+                start = f.read(FORMAT_ID_PEEK_SIZE)
+        except UnicodeDecodeError:
+            return False
+        if not start[JSON_WHITESPACE.match(start).end() :].startswith("{"):
             return False
-        if file.format_id not in (None, self.FORMAT_ID):
+        if _peek_format_id(file.filename) not in (None, self.FORMAT_ID):
             return False
         return True
 
@@ -72,6 +523,7 @@ class LabelsJsonAdaptor(Adaptor):
         file: FileHandle,
         video_search: Union[Callable, List[Text], None] = None,
         match_to: Optional[Labels] = None,
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
         *args,
         **kwargs,
     ) -> Labels:
@@ -94,6 +546,8 @@ class LabelsJsonAdaptor(Adaptor):
                 :class:`Labels` object. This ensures that the newly
                 instantiated :class:`Labels` can be merged without
                 duplicate matching objects (e.g., :class:`Video` objects ).
+            progress_callback: Called with (done, total) number of labeled
+                frames loaded; if it returns -1, loading is cancelled.
         Returns:
             A new :class:`Labels` object.
         """
@@ -151,11 +605,27 @@ class LabelsJsonAdaptor(Adaptor):
         # Open and parse the JSON in filename
         with open(filename, "r") as file:
 
-            # FIXME: Peek into the json to see if there is version string.
-            # We do this to tell apart old JSON data from leap_dev vs the
-            # newer format for sLEAP.
-            json_str = file.read()
-            dicts = json_loads(json_str)
+            # Parsing is first half of progress, creating objects is second.
+            total = 2 * max(os.fstat(file.fileno()).st_size, 1)
+
+            def parse_progress(done: int, _: int) -> Optional[int]:
+                return progress_callback(done, total)
+
+            def frames_progress(done: int, frames_total: int) -> Optional[int]:
+                return progress_callback(
+                    total // 2 + (total // 2) * done // max(frames_total, 1), total
+                )
+
+            # Labeled frames are added to builder as they're parsed.
+            frame_builder = LabeledFrameBuilder()
+            dicts = parse_json_stream(
+                file,
+                frame_builder,
+                progress_callback=parse_progress if progress_callback else None,
+            )
+
+            if dicts.get("format_id", cls.FORMAT_ID) != cls.FORMAT_ID:
+                raise TypeError(f"{filename} isn't a labels JSON file.")
 
             # If we have a version number, then it is new sLEAP format
             if "version" in dicts:
@@ -196,8 +666,13 @@ class LabelsJsonAdaptor(Adaptor):
                         raise FileNotFoundError
 
                 # Try to load the labels filename.
+                kwargs = dict(
+                    match_to=match_to,
+                    progress_callback=frames_progress if progress_callback else None,
+                    frame_builder=frame_builder,
+                )
                 try:
-                    labels = cls.from_json_data(dicts, match_to=match_to)
+                    labels = cls.from_json_data(dicts, **kwargs)
 
                 except FileNotFoundError:
 
@@ -211,7 +686,7 @@ class LabelsJsonAdaptor(Adaptor):
                         os.chdir(os.path.dirname(filename))
 
                     # Try again
-                    labels = cls.from_json_data(dicts, match_to=match_to)
+                    labels = cls.from_json_data(dicts, **kwargs)
 
                 except Exception as ex:
                     # Ok, we give up, where the hell are these videos!
@@ -233,6 +708,7 @@ class LabelsJsonAdaptor(Adaptor):
         compress: Optional[bool] = None,
         save_frame_data: bool = False,
         frame_data_format: str = "png",
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
     ):
         """
         Save a Labels instance to a JSON format.
@@ -268,12 +744,16 @@ class LabelsJsonAdaptor(Adaptor):
                  Note: 'h264/mkv' and 'avc1/mp4' require separate installation
                  of these codecs on your system. They are excluded from SLEAP
                  because of their GPL license.
+            progress_callback: Called with (done, total) steps of saving
+                (serializing and writing); if it returns -1, saving is
+                cancelled.
 
         Returns:
             None
         """
 
         labels = source_object
+        report_progress(progress_callback, 0, 2)
 
         if compress is None:
             compress = filename.endswith(".zip")
@@ -316,6 +796,8 @@ class LabelsJsonAdaptor(Adaptor):
             # Set file format version
             d["format_id"] = cls.FORMAT_ID
 
+            report_progress(progress_callback, 1, 2)
+
             if compress or save_frame_data:
 
                 # Ensure that filename ends with .json
@@ -333,9 +815,16 @@ class LabelsJsonAdaptor(Adaptor):
             else:
                 json_dumps(d, filename)
 
+        report_progress(progress_callback, 2, 2)
+
     @classmethod
     def from_json_data(
-        cls, data: Union[str, dict], match_to: Optional["Labels"] = None
+        cls,
+        data: Union[str, dict],
+        match_to: Optional["Labels"] = None,
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
+        frame_builder: Optional[LabeledFrameBuilder] = None,
+        bulk: bool = True,
     ) -> "Labels":
         """
         Create instance of class from data in dictionary.
@@ -349,6 +838,13 @@ class LabelsJsonAdaptor(Adaptor):
                 :class:`Labels` object. This ensures that the newly
                 instantiated :class:`Labels` can be merged without
                 duplicate matching objects (e.g., :class:`Video` objects ).
+            progress_callback: Called with (done, total) number of labeled
+                frames deserialized; if it returns -1, this is cancelled.
+            frame_builder: `LabeledFrameBuilder` with labeled frames which
+                were already parsed (used instead of "labels" in data).
+            bulk: Whether to create labeled frames in bulk with
+                `LabeledFrameBuilder`, rather than structuring each object
+                with cattr (which is much slower).
         Returns:
             A new :class:`Labels` object.
         """
@@ -458,7 +954,20 @@ class LabelsJsonAdaptor(Adaptor):
             provenance = dict()
 
         # If there is actual labels data, get it.
-        if "labels" in dicts:
+        if frame_builder is None and "labels" in dicts and bulk:
+            frame_builder = LabeledFrameBuilder()
+            for frame_dict in dicts["labels"]:
+                frame_builder.add_frame(frame_dict)
+
+        if frame_builder is not None:
+            labels = frame_builder.make_frames(
+                videos=videos,
+                skeletons=skeletons,
+                nodes=nodes,
+                tracks=tracks,
+                progress_callback=progress_callback,
+            )
+        elif "labels" in dicts:
             label_cattr = make_instance_cattr()
             label_cattr.register_structure_hook(
                 Skeleton, lambda x, type: skeletons[int(x)]
@@ -471,7 +980,18 @@ class LabelsJsonAdaptor(Adaptor):
                 Track, lambda x, type: None if x is None else tracks[int(x)]
             )
 
-            labels = label_cattr.structure(dicts["labels"], List[LabeledFrame])
+            # Deserialize in chunks so that we can report progress.
+            frame_dicts = dicts["labels"]
+            labels = []
+            for start in range(0, len(frame_dicts), PROGRESS_INTERVAL):
+                report_progress(progress_callback, start, len(frame_dicts))
+                labels.extend(
+                    label_cattr.structure(
+                        frame_dicts[start : start + PROGRESS_INTERVAL],
+                        List[LabeledFrame],
+                    )
+                )
+            report_progress(progress_callback, len(frame_dicts), len(frame_dicts))
         else:
             labels = []
 
@@ -1,6 +1,6 @@
 import numpy as np
 
-from typing import Union
+from typing import List, Union
 
 from sleap import Labels, Video, Skeleton
 from sleap.instance import PredictedInstance, LabeledFrame, Track
@@ -101,7 +101,15 @@ class SleapAnalysisAdaptor(Adaptor):
         return Labels(labeled_frames=frames)
 
     @classmethod
-    def write(cls, filename: str, source_object: Labels):
-        from sleap.info.write_tracking_h5 import main as write_analysis
+    def write(cls, filename: str, source_object: Labels) -> List[str]:
+        """Writes analysis file for each video in labels.
 
-        write_analysis(source_object, output_path=filename, all_frames=True)
+        If there are multiple videos, the filename is used to make a path for
+        each video (see :func:`sleap.info.write_tracking_h5.get_video_output_path`).
+
+        Returns:
+            List of paths of files which were written.
+        """
+        from sleap.info.write_tracking_h5 import write_all_videos
+
+        return write_all_videos(source_object, output_path=filename, all_frames=True)
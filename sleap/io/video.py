@@ -11,13 +11,22 @@ import attr
 import cattr
 import logging
 import multiprocessing
+import struct
+import threading
+import time
 
-from typing import Iterable, List, Optional, Tuple, Union
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Tuple, Union
 
+from sleap.io.videoindex import MediaVideoIndex
 from sleap.util import json_loads, json_dumps
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of frames to decode forward (rather than seek) to frame.
+GRAB_FORWARD_FRAMES = 32
+
 
 @attr.s(auto_attribs=True, cmp=False)
 class DummyVideo:
@@ -73,7 +82,10 @@ class HDF5Video:
 
         self.enable_source_video = True
         self._test_frame_ = None
-        self.__original_to_current_frame_idx = dict()
+        self.__original_frame_idxs = None
+        self.__current_frame_idxs = None
+        self.__needs_range_conversion = None
+        self.__file_h5 = None
         self.__dataset_h5 = None
         self.__tried_to_load = False
 
@@ -123,11 +135,13 @@ class HDF5Video:
             base_dataset_path = "/".join(self.dataset.split("/")[:-1])
             framenum_dataset = f"{base_dataset_path}/frame_numbers"
             if framenum_dataset in self.__file_h5:
-                original_idx_lists = self.__file_h5[framenum_dataset]
-                # Create map from idx in original video to idx in current
-                for current_idx in range(len(original_idx_lists)):
-                    original_idx = original_idx_lists[current_idx]
-                    self.__original_to_current_frame_idx[original_idx] = current_idx
+                # Read all the frame numbers at once and sort them, so we can
+                # map from idx in original video to idx in current dataset
+                # with a binary search.
+                original_idxs = self.__file_h5[framenum_dataset][:].astype(int)
+                order = np.argsort(original_idxs, kind="stable")
+                self.__original_frame_idxs = original_idxs[order]
+                self.__current_frame_idxs = order
 
             source_video_group = f"{base_dataset_path}/source_video"
             if source_video_group in self.__file_h5:
@@ -136,6 +150,11 @@ class HDF5Video:
                 )
                 self._source_video_ = Video.cattr().structure(d, Video)
 
+    def _ensure_loaded(self):
+        """Loads the dataset unless it's already loaded (and file is open)."""
+        if not self.__tried_to_load or not self.__file_h5:
+            self._load()
+
     @property
     def __dataset_h5(self) -> h5.Dataset:
         if self.__loaded_dataset is None and not self.__tried_to_load:
@@ -249,11 +268,10 @@ class HDF5Video:
         frame index here will not match the number of frames in video.
         """
         # Ensure that video is loaded since we'll need data from loading
-        self._load()
+        self._ensure_loaded()
 
-        if self.__original_to_current_frame_idx:
-            last_key = sorted(self.__original_to_current_frame_idx.keys())[-1]
-            return last_key
+        if self.__original_frame_idxs is not None and len(self.__original_frame_idxs):
+            return int(self.__original_frame_idxs[-1])
         return self.frames - 1
 
     def reset(self):
@@ -261,6 +279,102 @@ class HDF5Video:
         # TODO
         pass
 
+    def _map_frame_idxs(self, idxs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Maps frame indexes in original video to indexes in dataset.
+
+        Args:
+            idxs: Array of frame indexes in the original video.
+
+        Returns:
+            Tuple of (dataset indexes, found) arrays, where found is a boolean
+            mask for which indexes are in the dataset.
+        """
+        original_idxs = self.__original_frame_idxs
+        if original_idxs is None or not len(original_idxs):
+            return idxs, np.ones(len(idxs), dtype=bool)
+
+        # Use last match, so that if a frame was saved more than once we get
+        # the last copy.
+        pos = np.searchsorted(original_idxs, idxs, side="right") - 1
+        found = (pos >= 0) & (original_idxs[np.maximum(pos, 0)] == idxs)
+        return self.__current_frame_idxs[np.maximum(pos, 0)], found
+
+    def original_to_current_frame_idx(self, idx: int) -> Optional[int]:
+        """
+        Returns index in dataset for frame index in the original video.
+
+        Args:
+            idx: The frame index in the original video.
+
+        Returns:
+            The index in the dataset, or None if frame isn't in dataset.
+        """
+        self._ensure_loaded()
+        current_idxs, found = self._map_frame_idxs(np.array([idx], dtype=int))
+        return int(current_idxs[0]) if found[0] else None
+
+    def _read_frames(self, current_idxs: np.ndarray) -> np.ndarray:
+        """
+        Reads and decodes frames at given indexes in dataset.
+
+        Frames are read in sorted order as contiguous slices of dataset, and
+        encoded frames are decoded in parallel.
+        """
+        dataset = self.__dataset_h5
+        frame_count = dataset.shape[0]
+        current_idxs = np.where(
+            current_idxs < 0, current_idxs + frame_count, current_idxs
+        )
+        if np.any((current_idxs < 0) | (current_idxs >= frame_count)):
+            raise ValueError(f"Frame index out of range for {frame_count} frames.")
+
+        # Read each contiguous run of sorted (unique) indexes as a single slice.
+        unique_idxs, inverse = np.unique(current_idxs, return_inverse=True)
+        run_starts = np.flatnonzero(np.diff(unique_idxs) != 1) + 1
+        runs = np.split(unique_idxs, run_starts)
+        data = [dataset[run[0] : run[-1] + 1] for run in runs]
+
+        if dataset.attrs.get("format", ""):
+            encoded = [img for run_data in data for img in run_data]
+
+            def decode(img):
+                frame = cv2.imdecode(img, cv2.IMREAD_UNCHANGED)
+
+                # Add dimension for single channel (dropped by opencv).
+                if frame.ndim == 2:
+                    frame = frame[..., np.newaxis]
+                return frame
+
+            if len(encoded) > 1:
+                # OpenCV releases the GIL while decoding, so threads are enough.
+                workers = min(len(encoded), multiprocessing.cpu_count())
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    frames = list(executor.map(decode, encoded))
+            else:
+                frames = [decode(img) for img in encoded]
+            frames = np.stack(frames, axis=0)
+        else:
+            frames = np.concatenate(data, axis=0)
+
+        # Put the frames back in the requested order.
+        frames = frames[inverse]
+
+        if self.input_format == "channels_first":
+            frames = np.transpose(frames, (0, 3, 2, 1))
+
+        if self.convert_range:
+            # Check whether data is in [0, 1]-range once per dataset, rather
+            # than for every frame.
+            if self.__needs_range_conversion is None:
+                self.__needs_range_conversion = bool(
+                    frames.dtype.kind in "fb" and np.max(frames[0]) <= 1.0
+                )
+            if self.__needs_range_conversion:
+                frames = (frames * 255).astype(int)
+
+        return frames
+
     def get_frame(self, idx) -> np.ndarray:
         """
         Get a frame from the underlying HDF5 video data.
@@ -271,32 +385,41 @@ class HDF5Video:
         Returns:
             The numpy.ndarray representing the video frame data.
         """
-        # Ensure that video is loaded since we'll need data from loading
-        self._load()
+        return self.get_frames([idx])[0]
 
-        # If we only saved some frames from a video, map to idx in dataset.
-        if self.__original_to_current_frame_idx:
-            if idx in self.__original_to_current_frame_idx:
-                idx = self.__original_to_current_frame_idx[idx]
-            else:
-                return self._try_frame_from_source_video(idx)
+    def get_frames(self, idxs: Iterable[int]) -> np.ndarray:
+        """
+        Get multiple frames from the underlying HDF5 video data.
+
+        Args:
+            idxs: The indexes of the frames to get.
 
-        frame = self.__dataset_h5[idx]
+        Returns:
+            The frames as an array with shape (len(idxs), height, width, channels).
+        """
+        # Ensure that video is loaded since we'll need data from loading
+        self._ensure_loaded()
 
-        if self.__dataset_h5.attrs.get("format", ""):
-            frame = cv2.imdecode(frame, cv2.IMREAD_UNCHANGED)
+        idxs = np.asarray(idxs, dtype=int).reshape(-1)
+        if not len(idxs):
+            raise ValueError("No frame indexes specified.")
 
-            # Add dimension for single channel (dropped by opencv).
-            if frame.ndim == 2:
-                frame = frame[..., np.newaxis]
+        # If we only saved some frames from a video, map to idx in dataset.
+        current_idxs, found = self._map_frame_idxs(idxs)
 
-        if self.input_format == "channels_first":
-            frame = np.transpose(frame, (2, 1, 0))
+        if np.all(found):
+            return self._read_frames(current_idxs)
 
-        if self.convert_range and np.max(frame) <= 1.0:
-            frame = (frame * 255).astype(int)
+        # Get any frames not in dataset from the source video.
+        frames = [None] * len(idxs)
+        if np.any(found):
+            found_frames = self._read_frames(current_idxs[found])
+            for i, frame in zip(np.flatnonzero(found), found_frames):
+                frames[i] = frame
+        for i in np.flatnonzero(~found):
+            frames[i] = self._try_frame_from_source_video(int(idxs[i]))
 
-        return frame
+        return np.stack(frames, axis=0)
 
 
 @attr.s(auto_attribs=True, cmp=False)
@@ -307,6 +430,10 @@ class MediaVideo:
     This class provides bare minimum read only interface on top of
     OpenCV's VideoCapture class.
 
+    If the video has been indexed (see :meth:`build_index`), then we use the
+    index for the frame count and to seek to frames, which is exact even when
+    seeking with OpenCV isn't (e.g., for variable frame rate videos).
+
     Args:
         filename: The name of the file (.mp4, .avi, etc)
         grayscale: Whether the video is grayscale or not. "auto" means detect
@@ -325,6 +452,11 @@ class MediaVideo:
     _detect_grayscale = False
     _reader_ = None
     _test_frame_ = None
+    _index_ = None
+    _index_loaded_ = False
+
+    # Index of frame that reader will read next (only tracked with index).
+    _next_idx_ = None
 
     @property
     def __lock(self):
@@ -363,6 +495,87 @@ class MediaVideo:
     def __frames_float(self):
         return self.__reader.get(cv2.CAP_PROP_FRAME_COUNT)
 
+    @property
+    def index(self) -> Optional[MediaVideoIndex]:
+        """The frame index for video (or None if it hasn't been indexed)."""
+        if not self._index_loaded_:
+            if os.path.isfile(self.filename):
+                self._index_ = MediaVideoIndex.load(self.filename)
+            self._index_loaded_ = True
+        return self._index_
+
+    def build_index(
+        self,
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
+        save: bool = True,
+    ) -> MediaVideoIndex:
+        """
+        Indexes video (if not already indexed) and uses index to read frames.
+
+        Args:
+            progress_callback: Called with (done, total) number of frames
+                indexed; if it returns -1, indexing is cancelled.
+            save: Whether to save index file, so it's used whenever this
+                video file is opened.
+
+        Returns:
+            The index for video.
+        """
+        index = self.index
+        if index is None:
+            index = MediaVideoIndex.build(self.filename, progress_callback)
+            if save:
+                try:
+                    index.save(self.filename)
+                except OSError:
+                    logger.warning(f"Unable to save index for {self.filename}")
+
+        with self.__lock:
+            self._index_ = index
+            self._index_loaded_ = True
+            self._next_idx_ = None
+        return index
+
+    def __grab_indexed(self, idx: int) -> bool:
+        """Moves reader to frame using index, returns whether successful."""
+        index = self.index
+        reader = self.__reader
+        if idx < 0 or idx >= index.frames:
+            return False
+
+        # Decode forward from where we are if there's no seek point between
+        # here and the frame we want (so seeking wouldn't be any faster), or
+        # just retrieve the frame again if it's the last one we grabbed.
+        next_idx = self._next_idx_
+        if next_idx is None or not (index.get_seek_frame(idx) <= next_idx <= idx + 1):
+            # OpenCV seeks to the keyframe before the requested frame and then
+            # decodes forward, so we first try seeking straight to the frame.
+            # If we can't tell which frame we landed on, or we landed after
+            # the frame we want, then we seek to earlier seek points.
+            seek_idx = idx if index.has_timestamps else index.get_seek_frame(idx)
+            while True:
+                reader.set(cv2.CAP_PROP_POS_FRAMES, seek_idx)
+                if not reader.grab():
+                    self._next_idx_ = None
+                    return False
+
+                grabbed_idx = index.find_frame(reader.get(cv2.CAP_PROP_POS_MSEC))
+                if not index.has_timestamps or seek_idx == 0:
+                    grabbed_idx = seek_idx
+                if grabbed_idx is not None and grabbed_idx <= idx:
+                    break
+                seek_idx = index.get_seek_frame(seek_idx - 1)
+            next_idx = grabbed_idx + 1
+
+        self._next_idx_ = None
+        while next_idx <= idx:
+            if not reader.grab():
+                return False
+            next_idx += 1
+        self._next_idx_ = next_idx
+
+        return True
+
     @property
     def test_frame(self):
         # Load if not already loaded
@@ -400,6 +613,8 @@ class MediaVideo:
     @property
     def frames(self):
         """See :class:`Video`."""
+        if self.index is not None:
+            return self.index.frames
         return int(self.__frames_float)
 
     @property
@@ -428,15 +643,30 @@ class MediaVideo:
     def reset(self):
         """Reloads the video."""
         self._reader_ = None
+        self._index_ = None
+        self._index_loaded_ = False
+        self._next_idx_ = None
 
     def get_frame(self, idx: int, grayscale: bool = None) -> np.ndarray:
         """See :class:`Video`."""
 
         with self.__lock:
-            if self.__reader.get(cv2.CAP_PROP_POS_FRAMES) != idx:
-                self.__reader.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            if self.index is not None:
+                success = self.__grab_indexed(idx)
+                frame = self.__reader.retrieve()[1] if success else None
 
-            success, frame = self.__reader.read()
+            else:
+                success = True
+                pos = int(self.__reader.get(cv2.CAP_PROP_POS_FRAMES))
+                if pos < idx <= pos + GRAB_FORWARD_FRAMES:
+                    # Decoding forward to nearby frame is faster than seeking.
+                    for _ in range(idx - pos):
+                        success = success and self.__reader.grab()
+                elif pos != idx:
+                    self.__reader.set(cv2.CAP_PROP_POS_FRAMES, idx)
+
+                if success:
+                    success, frame = self.__reader.read()
 
         if not success or frame is None:
             raise KeyError(f"Unable to load frame {idx} from {self}.")
@@ -728,11 +958,139 @@ class ImgStoreVideo:
             self.__store = None
 
 
+# Imgstore formats which we can encode in parallel (as for cv2.imwrite).
+IMGSTORE_ENCODED_FORMATS = ("png", "jpg", "tif", "bmp")
+
+# Number of frames to read at a time when exporting frames.
+EXPORT_BATCH_SIZE = 64
+
+
+class _EncodedDirectoryImgStore(imgstore.stores.DirectoryImgStore):
+    """
+    DirectoryImgStore which can also be given images already encoded.
+
+    This lets us encode images in parallel, whereas the store itself has to
+    write images (and frame metadata) in order.
+    """
+
+    def _save_image(self, img, frame_number, frame_time):
+        if not isinstance(img, bytes):
+            return super()._save_image(img, frame_number, frame_time)
+
+        dest = os.path.join(
+            self._chunk_cdir,
+            "%06d.%s" % (self._frame_n % self._chunksize, self._format),
+        )
+        with open(dest, "wb") as f:
+            f.write(img)
+
+        self._save_image_metadata(frame_number, frame_time)
+
+
+# Imgstore saves the class name in metadata and uses it to open the store.
+_EncodedDirectoryImgStore.__name__ = imgstore.stores.DirectoryImgStore.__name__
+
+
+def _iter_export_frames(
+    video: "Video",
+    frame_numbers: List[int],
+    encode: Optional[Callable[[np.ndarray], bytes]] = None,
+) -> Iterable[Union[np.ndarray, bytes]]:
+    """
+    Yields frames from video (encoded if function given) in order.
+
+    Frames are read in batches (so backends can read these efficiently) and
+    encoded in parallel threads while we read the next batch.
+    """
+    if encode is None:
+        for start in range(0, len(frame_numbers), EXPORT_BATCH_SIZE):
+            batch = frame_numbers[start : start + EXPORT_BATCH_SIZE]
+            yield from video.get_frames(batch)
+        return
+
+    with ThreadPoolExecutor(max_workers=multiprocessing.cpu_count()) as executor:
+        pending = deque()
+        for start in range(0, len(frame_numbers), EXPORT_BATCH_SIZE):
+            batch = frame_numbers[start : start + EXPORT_BATCH_SIZE]
+            for frame in video.get_frames(batch):
+                pending.append(executor.submit(encode, frame))
+
+            # Only keep about one batch in memory while reading the next.
+            while len(pending) > EXPORT_BATCH_SIZE:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def _is_complete_imgstore(
+    path: str, frame_numbers: List[int], imgshape: Tuple[int, int, int], format: str
+) -> bool:
+    """Returns whether imgstore at path was fully written with given frames."""
+    # Imgstore removes lock file when the store is closed after writing.
+    if not os.path.isfile(os.path.join(path, "metadata.yaml")) or os.path.exists(
+        os.path.join(path, ".lock")
+    ):
+        return False
+
+    try:
+        store = imgstore.new_for_filename(path)
+        try:
+            return (
+                store.user_metadata.get("sleap_format", None) == format
+                and tuple(store.image_shape) == tuple(imgshape)
+                and list(store.get_frame_metadata()["frame_number"]) == frame_numbers
+            )
+        finally:
+            store.close()
+    except Exception:
+        return False
+
+
+def _read_image_size(filename: str) -> Optional[Tuple[int, int]]:
+    """
+    Reads (height, width) of PNG or JPEG image from file header.
+
+    Returns None for other formats, or if the size can't be read from header
+    (e.g., JPEG with Exif metadata, since OpenCV rotates these images using
+    the orientation tag).
+    """
+    try:
+        with open(filename, "rb") as f:
+            header = f.read(24)
+            if header[:8] == b"\x89PNG\r\n\x1a\n" and header[12:16] == b"IHDR":
+                width, height = struct.unpack(">II", header[16:24])
+                return height, width
+
+            if header[:2] != b"\xff\xd8":
+                return None
+            f.seek(2)
+            while True:
+                marker, segment_size = struct.unpack(">2sH", f.read(4))
+                if marker[0] != 0xFF or marker[1] == 0xFF:
+                    return None
+                if marker[1] == 0xE1:
+                    # APP1 segment (Exif)
+                    return None
+                if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                    # Start of frame segment: precision, height, width
+                    _, height, width = struct.unpack(">BHH", f.read(5))
+                    return height, width
+                f.seek(segment_size - 2, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
+
 @attr.s(auto_attribs=True, cmp=False)
 class SingleImageVideo:
     """
     Video wrapper for individual image files.
 
+    Decoded frames are kept in a least-recently-used cache. Multiple frames
+    requested with :meth:`get_frames` are decoded in parallel, and when frames
+    are read in order, the next few frames are decoded in background threads
+    (OpenCV releases the GIL while decoding).
+
     Args:
         filenames: Files to load as video.
     """
@@ -743,17 +1101,29 @@ class SingleImageVideo:
     width_: Optional[int] = attr.ib(default=None)
     channels_: Optional[int] = attr.ib(default=None)
 
+    # Maximum number of decoded frames to cache (0 to disable caching).
+    cache_size = 64
+
+    # Number of frames to decode ahead when frames are read in order.
+    read_ahead = 8
+
     def __attrs_post_init__(self):
         if not self.filename and self.filenames:
             self.filename = self.filenames[0]
         elif self.filename and not self.filenames:
             self.filenames = [self.filename]
 
-        self.__data = dict()
+        self.__cache = OrderedDict()
+        self.__pending = dict()
+        self.__executor = None
+        self.__last_idx = None
+        self.__lock = threading.Lock()
         self.test_frame_ = None
 
     def _load_idx(self, idx):
         img = cv2.imread(self._get_filename(idx))
+        if img is None:
+            raise KeyError(f"Unable to load frame {idx} from {self}.")
 
         if img.shape[2] == 3:
             # OpenCV channels are in BGR order, so we should convert to RGB
@@ -784,6 +1154,54 @@ class SingleImageVideo:
             if self.channels_ is None:
                 self.channels_ = self.test_frame.shape[2]
 
+    def _load_shape(self):
+        """Gets frame shape from image header if we can (else from frame)."""
+        size = _read_image_size(self._get_filename(0))
+        if size is None:
+            self._load_test_frame()
+            return
+
+        if self.height_ is None:
+            self.height_ = size[0]
+        if self.width_ is None:
+            self.width_ = size[1]
+        if self.channels_ is None:
+            # We read all images as color.
+            self.channels_ = 3
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(
+                max_workers=multiprocessing.cpu_count()
+            )
+        return self.__executor
+
+    def _get_cached(self, idx: int) -> Optional[np.ndarray]:
+        """Returns cached frame (or None), must be called with lock held."""
+        frame = self.__cache.get(idx, None)
+        if frame is not None:
+            self.__cache.move_to_end(idx)
+        return frame
+
+    def _add_to_cache(self, idx: int, frame: np.ndarray):
+        with self.__lock:
+            if self.cache_size <= 0:
+                return
+            self.__cache[idx] = frame
+            self.__cache.move_to_end(idx)
+            while len(self.__cache) > self.cache_size:
+                self.__cache.popitem(last=False)
+
+    def _start_read_ahead(self, idx: int):
+        """Starts decoding frames after idx in background threads."""
+        stop_idx = min(idx + 1 + self.read_ahead, self.frames)
+        with self.__lock:
+            for next_idx in range(idx + 1, stop_idx):
+                if next_idx not in self.__cache and next_idx not in self.__pending:
+                    self.__pending[next_idx] = self._get_executor().submit(
+                        self._load_idx, next_idx
+                    )
+
     def get_idx_from_filename(self, filename: str) -> int:
         try:
             return self.filenames.index(filename)
@@ -819,7 +1237,7 @@ class SingleImageVideo:
     def channels(self):
         """See :class:`Video`."""
         if self.channels_ is None:
-            self._load_test_frame()
+            self._load_shape()
 
         return self.channels_
 
@@ -827,7 +1245,7 @@ class SingleImageVideo:
     def width(self):
         """See :class:`Video`."""
         if self.width_ is None:
-            self._load_test_frame()
+            self._load_shape()
 
         return self.width_
 
@@ -839,7 +1257,7 @@ class SingleImageVideo:
     def height(self):
         """See :class:`Video`."""
         if self.height_ is None:
-            self._load_test_frame()
+            self._load_shape()
 
         return self.height_
 
@@ -850,19 +1268,85 @@ class SingleImageVideo:
     @property
     def dtype(self):
         """See :class:`Video`."""
-        return self.__data.dtype
+        # OpenCV reads color images as 8-bit.
+        return np.dtype("uint8")
 
     def reset(self):
         """Reloads the video."""
-        # TODO
-        pass
+        with self.__lock:
+            for future in self.__pending.values():
+                future.cancel()
+            self.__pending = dict()
+            self.__cache = OrderedDict()
+            self.__last_idx = None
+        self.test_frame_ = None
 
     def get_frame(self, idx):
         """See :class:`Video`."""
-        if idx not in self.__data:
-            self.__data[idx] = self._load_idx(idx)
+        with self.__lock:
+            frame = self._get_cached(idx)
+            future = self.__pending.pop(idx, None)
+            in_order = self.__last_idx is not None and idx == self.__last_idx + 1
+            self.__last_idx = idx
 
-        return self.__data[idx]
+            # Drop frames we decoded ahead if we're no longer reading in order.
+            if not in_order:
+                for future_idx in list(self.__pending.keys()):
+                    self.__pending.pop(future_idx).cancel()
+
+        if frame is None:
+            frame = future.result() if future is not None else self._load_idx(idx)
+            self._add_to_cache(idx, frame)
+
+        if in_order and self.read_ahead > 0:
+            self._start_read_ahead(idx)
+
+        return frame
+
+    def get_frames(self, idxs: Iterable[int]) -> np.ndarray:
+        """
+        Get multiple frames, decoding any which aren't cached in parallel.
+
+        Args:
+            idxs: The indexes of the frames to get.
+
+        Returns:
+            The frames as an array with shape (len(idxs), height, width, channels).
+        """
+        idxs = [int(idx) for idx in idxs]
+        if not idxs:
+            raise ValueError("No frame indexes specified.")
+
+        frames = dict()
+        futures = dict()
+        with self.__lock:
+            for idx in idxs:
+                if idx in frames or idx in futures:
+                    continue
+                frame = self._get_cached(idx)
+                if frame is not None:
+                    frames[idx] = frame
+                elif idx in self.__pending:
+                    futures[idx] = self.__pending.pop(idx)
+
+        missing_idxs = [idx for idx in dict.fromkeys(idxs) if idx not in frames]
+        if len(missing_idxs) > 1:
+            executor = self._get_executor()
+            for idx in missing_idxs:
+                if idx not in futures:
+                    futures[idx] = executor.submit(self._load_idx, idx)
+            for idx in missing_idxs:
+                frames[idx] = futures[idx].result()
+        elif missing_idxs:
+            idx = missing_idxs[0]
+            frames[idx] = (
+                futures[idx].result() if idx in futures else self._load_idx(idx)
+            )
+
+        for idx in missing_idxs:
+            self._add_to_cache(idx, frames[idx])
+
+        return np.stack([frames[idx] for idx in idxs], axis=0)
 
 
 @attr.s(auto_attribs=True, cmp=False)
@@ -972,6 +1456,9 @@ class Video:
         """
         if np.isscalar(idxs):
             idxs = [idxs]
+        if hasattr(self.backend, "get_frames"):
+            # Backend can read multiple frames more efficiently.
+            return self.backend.get_frames(idxs)
         return np.stack([self.get_frame(idx) for idx in idxs], axis=0)
 
     def get_frames_safely(self, idxs: Iterable[int]) -> Tuple[List[int], np.ndarray]:
@@ -1174,12 +1661,17 @@ class Video:
         frame_numbers: List[int] = None,
         format: str = "png",
         index_by_original: bool = True,
+        resume: bool = False,
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
     ) -> "Video":
         """
         Converts frames from arbitrary video backend to ImgStoreVideo.
 
         This should facilitate conversion of any video to a loopbio imgstore.
 
+        Frames are read in batches and, for image formats, encoded in
+        parallel threads before being written to the store in order.
+
         Args:
             path: Filename or directory name to store imgstore.
             frame_numbers: A list of frame numbers from the video to save.
@@ -1195,10 +1687,22 @@ class Video:
                 Default to True so that we can use an ImgStoreVideo in a
                 dataset to replace another video without having to update
                 all the frame indices on :class:`LabeledFrame` objects in the dataset.
+                When True, frames are stored in sorted order (which is much
+                faster to read for most video backends).
+            resume: If True and there's already a complete imgstore at path
+                with the same frames and format, then we use it rather than
+                writing the frames again. Stores which were only partially
+                written are always replaced.
+            progress_callback: Called with (done, total) number of frames
+                written; if it returns -1, the export is cancelled.
+
+        Raises:
+            OperationCancelled: If cancelled by progress callback.
 
         Returns:
             A new Video object that references the imgstore.
         """
+        from sleap.io.format.adaptor import report_progress
 
         # If the user has not provided a list of frames to store, store them all.
         if frame_numbers is None:
@@ -1208,6 +1712,23 @@ class Video:
             # lets use MJPEG by default.
             format = "mjpeg/avi"
 
+        frame_numbers = [int(frame_num) for frame_num in frame_numbers]
+        if index_by_original:
+            frame_numbers.sort()
+
+        imgshape = (self.height, self.width, self.channels)
+
+        # Return an ImgStoreVideo object referencing the imgstore.
+        new_video = self.__class__(
+            backend=ImgStoreVideo(filename=path, index_by_original=index_by_original)
+        )
+
+        # We add a dummy frame to stores without frames (see below).
+        if resume and _is_complete_imgstore(
+            path, frame_numbers or [0], imgshape, format
+        ):
+            return new_video
+
         # Delete the imgstore if it already exists.
         if os.path.exists(path):
             if os.path.isfile(path):
@@ -1220,22 +1741,39 @@ class Video:
         #     new_backend = self.backend.copy_to(path)
         #     return self.__class__(backend=new_backend)
 
-        store = imgstore.new_for_format(
-            format,
+        store_kwargs = dict(
             mode="w",
             basedir=path,
-            imgshape=(self.height, self.width, self.channels),
+            imgshape=imgshape,
             chunksize=1000,
+            metadata=dict(sleap_format=format),
         )
+        if format in IMGSTORE_ENCODED_FORMATS:
+            store = _EncodedDirectoryImgStore(format=format, **store_kwargs)
+
+            def encode(img: np.ndarray) -> bytes:
+                # Encode same as cv2.imwrite in DirectoryImgStore.
+                _, encoded = cv2.imencode("." + format, img)
+                return encoded.tobytes()
+
+        else:
+            store = imgstore.new_for_format(format, **store_kwargs)
+            encode = None
 
         # Write the JSON for the original video object to the metadata
         # of the imgstore for posterity
         store.add_extra_data(source_sleap_video_obj=Video.cattr().unstructure(self))
 
-        import time
+        start_time = time.time()
+        total = len(frame_numbers)
+        report_progress(progress_callback, 0, total)
 
-        for frame_num in frame_numbers:
-            store.add_image(self.get_frame(frame_num), frame_num, time.time())
+        for i, (frame_num, img) in enumerate(
+            zip(frame_numbers, _iter_export_frames(self, frame_numbers, encode))
+        ):
+            store.add_image(img, frame_num, time.time())
+            if (i + 1) % EXPORT_BATCH_SIZE == 0:
+                report_progress(progress_callback, i + 1, total)
 
         # If there are no frames to save for this video, add a dummy frame
         # since we can't save an empty imgstore.
@@ -1246,11 +1784,15 @@ class Video:
 
         store.close()
 
-        # Return an ImgStoreVideo object referencing this new imgstore.
-        return self.__class__(
-            backend=ImgStoreVideo(filename=path, index_by_original=index_by_original)
+        report_progress(progress_callback, total, total)
+        elapsed = time.time() - start_time
+        logger.info(
+            f"Wrote {total} frames to {path} in {elapsed:.1f} s "
+            f"({total / max(elapsed, 1e-6):.1f} frames/s)."
         )
 
+        return new_video
+
     def to_hdf5(
         self,
         path: str,
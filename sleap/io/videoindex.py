@@ -0,0 +1,353 @@
+"""
+Index of frames in media video files, for exact random access.
+
+OpenCV seeks by frame number using the frame rate, so seeking can land on the
+wrong frame in variable frame rate videos (or videos with long groups of
+pictures), and the frame count it reports can be wrong.
+
+We can make a one-time indexing pass which decodes every frame (without
+converting to images) to get the exact frame count and the timestamp of each
+frame. We also record where it's fast to seek to: keyframes (read from the
+sync sample table of MP4/MOV files, or from OpenCV if it can tell us which
+frames these are) or else frames at regular intervals. To read a frame, we
+seek, use the timestamp to find which frame we actually landed on, and then
+decode forward to the frame (going back to earlier seek points if we landed
+after it).
+
+The index is saved in a "sidecar" file next to the video (or in the user's
+~/.sleap/video_index/ directory if we can't write there), and is only used
+while the size and modification time of the video file match. ::
+
+   python -m sleap.io.videoindex video1.mp4 video2.mp4
+"""
+
+import hashlib
+import os
+import struct
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+import attr
+import cv2
+import numpy as np
+
+# Version of index file format.
+INDEX_VERSION = 1
+
+# Number of frames between seek points if we can't find keyframes.
+SEEK_INTERVAL = 100
+
+# Timestamps (in ms) closer than this are treated as the same.
+TIMESTAMP_TOLERANCE = 1e-3
+
+# Number of frames to index between progress reports.
+PROGRESS_INTERVAL = 1000
+
+# MP4/MOV boxes which contain the boxes we need to find keyframes.
+MP4_CONTAINER_BOXES = (b"moov", b"trak", b"mdia", b"minf", b"stbl")
+
+
+def _iter_mp4_boxes(
+    f: BinaryIO, start: int, end: int
+) -> Iterator[Tuple[bytes, int, int]]:
+    """Yields (type, start, end) of contents for each box in range of file."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size:
+            return
+        yield box_type, pos + header_size, pos + size
+        pos += size
+
+
+def read_mp4_keyframes(filename: str) -> Optional[np.ndarray]:
+    """
+    Reads keyframes of video track from sync sample table of MP4/MOV file.
+
+    Args:
+        filename: Path to the video file.
+
+    Returns:
+        Sorted indexes of keyframes, or None if file isn't MP4/MOV, the video
+        track doesn't have a sync sample table (i.e., all frames are
+        keyframes), or the file can't be parsed.
+    """
+    try:
+        with open(filename, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            for box_type, start, end in _iter_mp4_boxes(f, 0, file_size):
+                if box_type == b"moov":
+                    return _read_moov_keyframes(f, start, end)
+    except (OSError, struct.error):
+        pass
+    return None
+
+
+def _read_moov_keyframes(f: BinaryIO, start: int, end: int) -> Optional[np.ndarray]:
+    for box_type, trak_start, trak_end in _iter_mp4_boxes(f, start, end):
+        if box_type != b"trak":
+            continue
+
+        # Find handler type and sync sample table for track.
+        handler_type = None
+        stss = None
+        boxes = list(_iter_mp4_boxes(f, trak_start, trak_end))
+        while boxes:
+            box_type, box_start, box_end = boxes.pop(0)
+            if box_type in MP4_CONTAINER_BOXES:
+                boxes.extend(_iter_mp4_boxes(f, box_start, box_end))
+            elif box_type == b"hdlr":
+                # Skip version/flags and pre-defined fields.
+                f.seek(box_start + 8)
+                handler_type = f.read(4)
+            elif box_type == b"stss":
+                stss = box_start
+
+        if handler_type != b"vide":
+            continue
+        if stss is None:
+            return None
+
+        # Skip version/flags; sample numbers start at 1.
+        f.seek(stss + 4)
+        count = struct.unpack(">I", f.read(4))[0]
+        sample_numbers = np.frombuffer(f.read(4 * count), dtype=">u4")
+        if len(sample_numbers) != count:
+            return None
+        return np.unique(sample_numbers.astype("int64") - 1)
+
+    return None
+
+
+@attr.s(auto_attribs=True, cmp=False)
+class MediaVideoIndex:
+    """
+    Frame count, timestamps and seek points for media video file.
+
+    Attributes:
+        frames: The exact number of frames in video.
+        timestamps: Timestamp (in ms, as reported by OpenCV) of each frame.
+        seek_frames: Sorted indexes of frames to seek to (always includes 0).
+        file_size: Size of video file when indexed.
+        file_mtime: Modification time of video file when indexed.
+    """
+
+    frames: int
+    timestamps: np.ndarray
+    seek_frames: np.ndarray
+    file_size: int = 0
+    file_mtime: float = 0.0
+
+    def __attrs_post_init__(self):
+        # Timestamps can only be used to identify frames if they're distinct.
+        self._has_timestamps = bool(
+            np.all(np.diff(self.timestamps) > TIMESTAMP_TOLERANCE)
+        )
+
+    @property
+    def has_timestamps(self) -> bool:
+        """Whether timestamps can be used to identify frames."""
+        return self._has_timestamps
+
+    def get_seek_frame(self, idx: int) -> int:
+        """Returns nearest seek point at or before frame."""
+        pos = np.searchsorted(self.seek_frames, idx, side="right") - 1
+        return int(self.seek_frames[max(pos, 0)])
+
+    def find_frame(self, timestamp: float) -> Optional[int]:
+        """Returns index of frame with timestamp (or None if not found)."""
+        if not self.has_timestamps:
+            return None
+        idx = int(np.searchsorted(self.timestamps, timestamp - TIMESTAMP_TOLERANCE))
+        if idx < self.frames and abs(self.timestamps[idx] - timestamp) <= (
+            TIMESTAMP_TOLERANCE
+        ):
+            return idx
+        return None
+
+    def matches_file(self, filename: str) -> bool:
+        """Returns whether index is for the current version of file."""
+        stat = os.stat(filename)
+        return stat.st_size == self.file_size and stat.st_mtime == self.file_mtime
+
+    @classmethod
+    def build(
+        cls,
+        filename: str,
+        progress_callback: Optional[Callable[[int, int], Optional[int]]] = None,
+    ) -> "MediaVideoIndex":
+        """
+        Indexes video by decoding every frame.
+
+        Args:
+            filename: Path to the video file.
+            progress_callback: Called with (done, total) number of frames,
+                where total is the (estimated) frame count from OpenCV; if it
+                returns -1, indexing is cancelled.
+
+        Raises:
+            OperationCancelled: If cancelled by progress callback.
+
+        Returns:
+            The index for video.
+        """
+        from sleap.io.format.adaptor import report_progress
+
+        stat = os.stat(filename)
+        reader = cv2.VideoCapture(filename)
+        total = int(reader.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        # Newer versions of OpenCV tell us whether frame is a keyframe.
+        keyframe_prop = getattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME", None)
+
+        timestamps = []
+        keyframes = []
+        try:
+            while reader.grab():
+                if len(timestamps) % PROGRESS_INTERVAL == 0:
+                    report_progress(progress_callback, len(timestamps), total)
+                if keyframe_prop is not None and reader.get(keyframe_prop) > 0:
+                    keyframes.append(len(timestamps))
+                timestamps.append(reader.get(cv2.CAP_PROP_POS_MSEC))
+        finally:
+            reader.release()
+
+        frames = len(timestamps)
+        report_progress(progress_callback, frames, max(total, frames))
+
+        if not keyframes:
+            mp4_keyframes = read_mp4_keyframes(filename)
+            if mp4_keyframes is not None:
+                keyframes = mp4_keyframes[mp4_keyframes < frames].tolist()
+
+        if keyframes:
+            seek_frames = np.unique(np.array([0] + keyframes, dtype="int64"))
+        else:
+            seek_frames = np.arange(0, max(frames, 1), SEEK_INTERVAL, dtype="int64")
+
+        return cls(
+            frames=frames,
+            timestamps=np.array(timestamps, dtype="float64"),
+            seek_frames=seek_frames,
+            file_size=stat.st_size,
+            file_mtime=stat.st_mtime,
+        )
+
+    @staticmethod
+    def get_index_paths(filename: str) -> List[str]:
+        """
+        Returns possible paths for index file of video, in order of preference.
+
+        The first is next to the video, the second is in the user's SLEAP
+        directory (named using a hash of the full path to video).
+        """
+        full_path = os.path.abspath(filename)
+        path_hash = hashlib.sha1(full_path.encode("utf-8")).hexdigest()
+        return [
+            f"{full_path}.sleap_index.npz",
+            os.path.expanduser(f"~/.sleap/video_index/{path_hash}.npz"),
+        ]
+
+    @classmethod
+    def load(cls, filename: str) -> Optional["MediaVideoIndex"]:
+        """
+        Loads index for video file, if there's one for current version of file.
+
+        Args:
+            filename: Path to the video file.
+
+        Returns:
+            The index, or None if there's no index file which matches video.
+        """
+        for index_path in cls.get_index_paths(filename):
+            if not os.path.exists(index_path):
+                continue
+            try:
+                with np.load(index_path) as data:
+                    if int(data["version"]) != INDEX_VERSION:
+                        continue
+                    index = cls(
+                        frames=int(data["frames"]),
+                        timestamps=data["timestamps"],
+                        seek_frames=data["seek_frames"],
+                        file_size=int(data["file_size"]),
+                        file_mtime=float(data["file_mtime"]),
+                    )
+            except (OSError, KeyError, ValueError):
+                continue
+            if index.matches_file(filename):
+                return index
+        return None
+
+    def save(self, filename: str) -> str:
+        """
+        Saves index for video file.
+
+        Args:
+            filename: Path to the video file.
+
+        Raises:
+            OSError: If index can't be saved at any of the possible paths.
+
+        Returns:
+            Path of index file.
+        """
+        error = None
+        for index_path in self.get_index_paths(filename):
+            # Write to temporary file so that readers never see partial file.
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(index_path), exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    np.savez_compressed(
+                        f,
+                        version=INDEX_VERSION,
+                        frames=self.frames,
+                        timestamps=self.timestamps,
+                        seek_frames=self.seek_frames,
+                        file_size=self.file_size,
+                        file_mtime=self.file_mtime,
+                    )
+                os.replace(tmp_path, index_path)
+                return index_path
+            except OSError as e:
+                error = e
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        raise error
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Index media video files for exact random access."
+    )
+    parser.add_argument("video_paths", nargs="+", help="Paths to video files.")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Index videos even if they already have an index.",
+    )
+    args = parser.parse_args()
+
+    for video_path in args.video_paths:
+        if not args.force and MediaVideoIndex.load(video_path) is not None:
+            print(f"{video_path}: already indexed")
+            continue
+        index = MediaVideoIndex.build(video_path)
+        index_path = index.save(video_path)
+        print(
+            f"{video_path}: {index.frames} frames, "
+            f"{len(index.seek_frames)} seek points (saved as {index_path})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -112,11 +112,15 @@ class InstanceCroppingConfig:
             applied around the instance bounding boxes when automatically detecting the
             appropriate crop size from the data. No effect if the `crop_size` is
             already specified.
+        frame_batch_size: Number of frames to crop instances from at a time. Values
+            greater than 1 generate all the crops for a batch of frames in a single
+            operation, which is faster when frames contain many instances.
     """
 
     center_on_part: Optional[Text] = None
     crop_size: Optional[int] = None
     crop_size_detection_padding: int = 16
+    frame_batch_size: int = 8
 
 
 @attr.s(auto_attribs=True)
@@ -214,6 +214,23 @@ class OptimizationConfig:
             mining.
         early_stopping: Configuration options related to early stopping of training on
             plateau/convergence is detected.
+        precision: Floating point precision policy to build the model with. This can be
+            "float32" (default), "mixed_float16" or "mixed_bfloat16". The mixed policies
+            compute activations in 16-bit floats while keeping the model weights and
+            outputs in float32, which can considerably speed up training on hardware
+            with native half precision support (e.g., GPUs with tensor cores or CPUs
+            with bfloat16 instructions). Dynamic loss scaling is applied automatically
+            with "mixed_float16" to prevent gradient underflow.
+        xla: If True, TensorFlow graphs will be JIT compiled with XLA during training.
+            This fuses operations in the backbone and heads and can reduce memory
+            bandwidth requirements, at the cost of a longer start up time.
+        distribution_strategy: Name of the `tf.distribute` strategy to train with. If
+            None or "default", the model will be trained on a single device. Set to
+            "mirrored" to train with synchronous data parallelism across all the local
+            GPUs, or "multi_worker_mirrored" to train across multiple workers specified
+            in the `TF_CONFIG` environment variable. When training with more than one
+            replica, `batch_size` is the number of examples per replica, so the
+            effective (global) batch size is scaled by the number of replicas.
     """
 
     preload_data: bool = True
@@ -236,3 +253,6 @@ class OptimizationConfig:
         factory=HardKeypointMiningConfig
     )
     early_stopping: EarlyStoppingConfig = attr.ib(factory=EarlyStoppingConfig)
+    precision: Text = "float32"
+    xla: bool = False
+    distribution_strategy: Optional[Text] = None
@@ -372,3 +372,47 @@ class LambdaFilter:
         ds_output = ds_input.filter(self.filter_fn)
 
         return ds_output
+
+
+@attr.s(auto_attribs=True)
+class Sharder:
+    """Sharding transformer for splitting a dataset across workers.
+
+    Each worker keeps only every `num_shards`-th element of the input dataset, starting
+    from `shard_index`. This should be applied as close as possible to the data provider
+    so that the examples that are discarded are never loaded or processed.
+
+    Attributes:
+        num_shards: Number of shards to split the dataset into, typically the number of
+            workers in a distributed training cluster. If 1, returns the input dataset
+            unmodified.
+        shard_index: Index of the shard to keep, typically the index of the worker.
+    """
+
+    num_shards: int = 1
+    shard_index: int = 0
+
+    @property
+    def input_keys(self) -> List[Text]:
+        """Return the keys that incoming elements are expected to have."""
+        return []
+
+    @property
+    def output_keys(self) -> List[Text]:
+        """Return the keys that outgoing elements will have."""
+        return []
+
+    def transform_dataset(self, ds_input: tf.data.Dataset) -> tf.data.Dataset:
+        """Create a dataset with a subset of the elements for this shard.
+
+        Args:
+            ds_input: Any dataset.
+
+        Returns:
+            A `tf.data.Dataset` with elements containing the same keys, but with
+            approximately `1 / num_shards` of the elements.
+        """
+        if self.num_shards > 1:
+            return ds_input.shard(self.num_shards, self.shard_index)
+        else:
+            return ds_input
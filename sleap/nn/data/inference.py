@@ -11,7 +11,16 @@ from sleap.nn.data.instance_cropping import make_centered_bboxes, normalize_bbox
 
 @attr.s(auto_attribs=True)
 class KerasModelPredictor:
-    """Transformer for performing tf.keras model inference."""
+    """Transformer for performing tf.keras model inference.
+
+    Attributes:
+        keras_model: The `tf.keras.Model` to run inference with.
+        model_input_keys: Example keys to feed to the model inputs.
+        model_output_keys: Example keys to store the model outputs in.
+        device_name: Name of the device to run the model on. If None, the best logical
+            device will be used.
+        jit_compile: If True, the forward pass of the model will be compiled with XLA.
+    """
 
     keras_model: tf.keras.Model
     model_input_keys: Text = attr.ib(default="instance_image", converter=ensure_list)
@@ -19,6 +28,7 @@ class KerasModelPredictor:
         default="predicted_instance_confidence_maps", converter=ensure_list
     )
     device_name: Optional[Text] = None
+    jit_compile: bool = False
 
     @property
     def input_keys(self) -> List[Text]:
@@ -33,6 +43,10 @@ class KerasModelPredictor:
         if device_name is None:
             device_name = best_logical_device_name()
 
+        model_fn = self.keras_model
+        if self.jit_compile:
+            model_fn = tf.function(self.keras_model, experimental_compile=True)
+
         def predict(example):
             with tf.device(device_name):
                 X = []
@@ -42,7 +56,7 @@ class KerasModelPredictor:
                         expand_to_rank(example[input_key], target_rank=4, prepend=True)
                     )
 
-                Y = self.keras_model(X)
+                Y = model_fn(X)
                 if not isinstance(Y, list):
                     Y = [Y]
 
@@ -3,7 +3,7 @@
 import tensorflow as tf
 import numpy as np
 import attr
-from typing import Optional, List, Text
+from typing import Dict, Optional, List, Text
 import sleap
 from sleap.nn.config import InstanceCroppingConfig
 
@@ -31,12 +31,17 @@ def find_instance_crop_size(
 
         This accounts for stride, padding and scaling when ensuring divisibility.
     """
+    # Stack all instance points into a single array so the extents of every instance
+    # can be computed in one pass.
+    points = [inst.points_array for inst in labels.user_instances]
     max_length = 0.0
-    for inst in labels.user_instances:
-        pts = inst.points_array
-        pts *= input_scaling
-        max_length = np.maximum(max_length, np.nanmax(pts[:, 0]) - np.nanmin(pts[:, 0]))
-        max_length = np.maximum(max_length, np.nanmax(pts[:, 1]) - np.nanmin(pts[:, 1]))
+    if len(points) > 0:
+        offsets = np.cumsum([0] + [len(pts) for pts in points[:-1]])
+        pts = np.concatenate(points, axis=0) * input_scaling
+        extents = np.fmax.reduceat(pts, offsets, axis=0) - np.fmin.reduceat(
+            pts, offsets, axis=0
+        )  # (n_instances, 2)
+        max_length = np.max(extents[np.isfinite(extents)], initial=max_length)
 
     max_length += float(padding)
     crop_size = np.math.ceil(max_length / float(maximum_stride)) * maximum_stride
@@ -155,7 +160,9 @@ def make_centered_bboxes(
     return bboxes
 
 
-def crop_bboxes(image: tf.Tensor, bboxes: tf.Tensor) -> tf.Tensor:
+def crop_bboxes(
+    image: tf.Tensor, bboxes: tf.Tensor, sample_inds: Optional[tf.Tensor] = None
+) -> tf.Tensor:
     """Crop bounding boxes from an image.
 
     This method serves as a convenience method for specifying the arguments of
@@ -163,10 +170,15 @@ def crop_bboxes(image: tf.Tensor, bboxes: tf.Tensor) -> tf.Tensor:
     bounding boxes with a single image and no resizing.
 
     Args:
-        image: Tensor of shape (height, width, channels) of a single image.
+        image: Tensor of shape (height, width, channels) of a single image, or of shape
+            (n_samples, height, width, channels) if `sample_inds` are specified.
         bboxes: Tensor of shape (n_bboxes, 4) and dtype tf.float32, where the last axis
             corresponds to (y1, x1, y2, x2) coordinates of the bounding boxes. This can
             be generated from centroids using `make_centered_bboxes`.
+        sample_inds: If not None, a tf.int32 tensor of shape (n_bboxes,) specifying the
+            index of the sample in a batch of images that each bounding box should be
+            cropped from. This allows all the crops for a batch of images to be
+            generated in a single operation.
 
     Returns:
         A tensor of shape (n_bboxes, crop_height, crop_width, channels) of the same
@@ -190,17 +202,22 @@ def crop_bboxes(image: tf.Tensor, bboxes: tf.Tensor) -> tf.Tensor:
     box_size = tf.cast(tf.math.round((y2x2 - y1x1) + 1), tf.int32)  # (height, width)
 
     # Normalize bounding boxes.
-    image_height = tf.shape(image)[0]
-    image_width = tf.shape(image)[1]
+    image_height = tf.shape(image)[-3]
+    image_width = tf.shape(image)[-2]
     normalized_bboxes = normalize_bboxes(
         bboxes, image_height=image_height, image_width=image_width
     )
 
+    if sample_inds is None:
+        # Crop all boxes from the single image.
+        image = tf.expand_dims(image, axis=0)
+        sample_inds = tf.zeros([tf.shape(bboxes)[0]], dtype=tf.int32)
+
     # Crop.
     crops = tf.image.crop_and_resize(
-        image=tf.expand_dims(image, axis=0),
+        image=image,
         boxes=normalized_bboxes,
-        box_indices=tf.zeros([tf.shape(bboxes)[0]], dtype=tf.int32),
+        box_indices=sample_inds,
         crop_size=box_size,
         method="bilinear",
     )
@@ -210,6 +227,79 @@ def crop_bboxes(image: tf.Tensor, bboxes: tf.Tensor) -> tf.Tensor:
     return crops
 
 
+UNPADDED_SHAPE_SUFFIX = "_unpadded_shape"
+
+
+def pad_batch_frames(
+    input_ds: tf.data.Dataset, batch_size: int, keys: List[Text]
+) -> tf.data.Dataset:
+    """Group frame-level examples into padded batches while tracking their shapes.
+
+    Args:
+        input_ds: A dataset with frame-level examples containing at least `keys`.
+        batch_size: Number of frames to group into each batch.
+        keys: List of keys to keep in the batched examples. Other keys are dropped.
+
+    Returns:
+        A dataset of batched examples. Each key in `keys` is stacked along a new first
+        axis and zero-padded to the largest shape in the batch. The shape of each
+        unpadded element is stored in the key "{key}_unpadded_shape" as a tf.int32
+        tensor of shape (n_frames, rank).
+
+    See also: unpad_examples
+    """
+
+    def add_shapes(frame_data):
+        """Local processing function for dataset mapping."""
+        example = {}
+        for key in keys:
+            example[key] = frame_data[key]
+            example[key + UNPADDED_SHAPE_SUFFIX] = tf.shape(frame_data[key])
+        return example
+
+    output_ds = input_ds.map(
+        add_shapes, num_parallel_calls=tf.data.experimental.AUTOTUNE
+    )
+    output_ds = output_ds.padded_batch(
+        batch_size, padded_shapes=tf.compat.v1.data.get_output_shapes(output_ds)
+    )
+    return output_ds
+
+
+def unpad_examples(
+    input_ds: tf.data.Dataset, shapes: Dict[Text, tf.TensorShape]
+) -> tf.data.Dataset:
+    """Remove the padding from examples that were generated from padded batches.
+
+    Args:
+        input_ds: A dataset with examples containing the keys in `shapes` and their
+            corresponding "{key}_unpadded_shape" keys.
+        shapes: A dictionary mapping the keys to unpad to their static shapes before
+            padding. These may be partially unknown and are used to restore the static
+            shape information of the unpadded tensors.
+
+    Returns:
+        A dataset with the same examples with padding removed from the specified keys
+        and without the "{key}_unpadded_shape" keys.
+
+    See also: pad_batch_frames
+    """
+    if len(shapes) == 0:
+        return input_ds
+
+    def unpad(example):
+        """Local processing function for dataset mapping."""
+        for key, shape in shapes.items():
+            unpadded_shape = example.pop(key + UNPADDED_SHAPE_SUFFIX)
+            example[key] = tf.slice(
+                example[key], tf.zeros_like(unpadded_shape), unpadded_shape
+            )
+            example[key].set_shape(shape)
+        return example
+
+    return input_ds.map(unpad, num_parallel_calls=tf.data.experimental.AUTOTUNE)
+
+
 @attr.s(auto_attribs=True)
 class InstanceCropper:
     """Data transformer to crop and generate individual examples for instances.
@@ -226,12 +316,17 @@ class InstanceCropper:
             performance of large pipelines if the full images are no longer required.
         mock_centroid_confidence: If True, add confidence keys for compatibility with 
             predicted instance cropping.
+        frame_batch_size: Number of frames to crop instances from at a time. If greater
+            than 1, frames are grouped into padded batches and all the crops in the
+            batch are generated in a single operation. This reduces the per-frame
+            overhead when cropping frames with many instances.
     """
 
     crop_width: int
     crop_height: int
     keep_full_image: bool = False
     mock_centroid_confidence: bool = False
+    frame_batch_size: int = 1
 
     @classmethod
     def from_config(
@@ -260,7 +355,12 @@ class InstanceCropper:
                 "Crop size not specified in config and not provided in the arguments."
             )
 
-        return cls(crop_width=crop_size, crop_height=crop_size, keep_full_image=False)
+        return cls(
+            crop_width=crop_size,
+            crop_height=crop_size,
+            keep_full_image=False,
+            frame_batch_size=config.frame_batch_size,
+        )
 
     @property
     def input_keys(self) -> List[Text]:
@@ -348,6 +448,9 @@ class InstanceCropper:
         if self.keep_full_image:
             keys_to_expand.append("image")
 
+        if self.frame_batch_size > 1:
+            return self._transform_frame_batches(input_ds, keys_to_expand)
+
         def crop_instances(frame_data):
             """Local processing function for dataset mapping."""
             # Make bounding boxes from centroids.
@@ -415,6 +518,107 @@ class InstanceCropper:
 
         return output_ds
 
+    def _transform_frame_batches(
+        self, input_ds: tf.data.Dataset, keys_to_expand: List[Text]
+    ) -> tf.data.Dataset:
+        """Create a dataset that contains instance cropped data from batches of frames.
+
+        This produces the same examples as `transform_dataset`, but crops all the
+        instances in a batch of `frame_batch_size` frames at once.
+        """
+        frame_shapes = tf.compat.v1.data.get_output_shapes(input_ds)
+        padded_keys = [
+            key for key in keys_to_expand if not frame_shapes[key].is_fully_defined()
+        ]
+        batch_keys = self.input_keys + [
+            key for key in keys_to_expand if key not in self.input_keys
+        ]
+        batched_ds = pad_batch_frames(
+            input_ds, batch_size=self.frame_batch_size, keys=batch_keys
+        )
+
+        def crop_instances(frames_data):
+            """Local processing function for dataset mapping."""
+            # Find the (sample, instance) indices of the instances in the batch.
+            n_instances = frames_data["centroids" + UNPADDED_SHAPE_SUFFIX][:, 0]
+            max_instances = tf.shape(frames_data["centroids"])[1]
+            inds = tf.cast(
+                tf.where(tf.sequence_mask(n_instances, maxlen=max_instances)), tf.int32
+            )
+            sample_inds = inds[:, 0]
+            center_instance_inds = inds[:, 1]
+
+            # Make bounding boxes from centroids.
+            centroids = tf.gather_nd(frames_data["centroids"], inds)
+            bboxes = make_centered_bboxes(
+                centroids, box_height=self.crop_height, box_width=self.crop_width
+            )
+
+            # Crop all images in the batch from bounding boxes.
+            instance_images = crop_bboxes(
+                frames_data["image"], bboxes, sample_inds=sample_inds
+            )
+
+            # Pull out the bbox offsets as (n_crops, 2) in xy order.
+            bboxes_x1y1 = tf.gather(bboxes, [1, 0], axis=1)
+
+            # Gather the instances in the frame of each crop as
+            # (n_crops, max_instances, n_nodes, 2) relative to the crop offsets.
+            n_crops = tf.shape(bboxes)[0]
+            all_instances = tf.gather(
+                frames_data["instances"], sample_inds
+            ) - tf.reshape(bboxes_x1y1, [n_crops, 1, 1, 2])
+
+            # Pull out the centered instance for each crop as (n_crops, n_nodes, 2).
+            center_instances = tf.gather_nd(
+                all_instances,
+                tf.stack([tf.range(n_crops), center_instance_inds], axis=1),
+            )
+
+            image_shapes = tf.gather(
+                frames_data["image" + UNPADDED_SHAPE_SUFFIX], sample_inds
+            )
+            instances_data = {
+                "instance_image": instance_images,
+                "bbox": bboxes,
+                "center_instance": center_instances,
+                "center_instance_ind": center_instance_inds,
+                "all_instances": all_instances,
+                "all_instances"
+                + UNPADDED_SHAPE_SUFFIX: tf.gather(
+                    frames_data["instances" + UNPADDED_SHAPE_SUFFIX], sample_inds
+                ),
+                "centroid": centroids,
+                "full_image_height": image_shapes[:, 0],
+                "full_image_width": image_shapes[:, 1],
+            }
+            if self.mock_centroid_confidence:
+                instances_data["centroid_confidence"] = tf.ones(
+                    [n_crops], dtype=tf.float32
+                )  # (n_crops,)
+            for key in keys_to_expand:
+                instances_data[key] = tf.gather(frames_data[key], sample_inds)
+            for key in padded_keys:
+                instances_data[key + UNPADDED_SHAPE_SUFFIX] = tf.gather(
+                    frames_data[key + UNPADDED_SHAPE_SUFFIX], sample_inds
+                )
+            return instances_data
+
+        # Map the main processing function to each batch of frames.
+        output_ds = batched_ds.map(
+            crop_instances, num_parallel_calls=tf.data.experimental.AUTOTUNE
+        )
+
+        # Unbatch to split batch-level examples into individual instance-level examples.
+        output_ds = output_ds.unbatch()
+
+        # Remove the padding from the keys that were replicated from variable size data.
+        unpad_shapes = {"all_instances": frame_shapes["instances"]}
+        unpad_shapes.update({key: frame_shapes[key] for key in padded_keys})
+        output_ds = unpad_examples(output_ds, unpad_shapes)
+
+        return output_ds
+
 
 @attr.s(auto_attribs=True)
 class PredictedInstanceCropper:
@@ -427,6 +631,7 @@ class PredictedInstanceCropper:
     full_image_scale_key: Text = "full_image_scale"
     other_keys_to_keep: List[Text] = attr.ib(factory=list)
     keep_instances_gt: bool = False
+    frame_batch_size: int = 1
 
     @property
     def input_keys(self) -> List[Text]:
@@ -473,6 +678,9 @@ class PredictedInstanceCropper:
         if self.keep_instances_gt:
             keys_to_expand.append("instances")
 
+        if self.frame_batch_size > 1:
+            return self._transform_frame_batches(input_ds, keys_to_expand)
+
         def crop_instances(frame_data):
             """Local processing function for dataset mapping."""
             # Make bounding boxes from centroids.
@@ -517,3 +725,93 @@ class PredictedInstanceCropper:
         output_ds = output_ds.unbatch()
 
         return output_ds
+
+    def _transform_frame_batches(
+        self, input_ds: tf.data.Dataset, keys_to_expand: List[Text]
+    ) -> tf.data.Dataset:
+        """Create a dataset that contains instance cropped data from batches of frames.
+
+        This produces the same examples as `transform_dataset`, but crops all the
+        instances in a batch of `frame_batch_size` frames at once.
+        """
+        frame_shapes = tf.compat.v1.data.get_output_shapes(input_ds)
+        keys_to_expand = [key for key in keys_to_expand if key != "scale"]
+        padded_keys = [
+            key for key in keys_to_expand if not frame_shapes[key].is_fully_defined()
+        ]
+        batch_keys = [
+            self.full_image_key,
+            self.full_image_scale_key,
+            self.centroids_key,
+            self.centroid_confidences_key,
+            "scale",
+        ]
+        batch_keys += [key for key in keys_to_expand if key not in batch_keys]
+        batched_ds = pad_batch_frames(
+            input_ds, batch_size=self.frame_batch_size, keys=batch_keys
+        )
+
+        def crop_instances(frames_data):
+            """Local processing function for dataset mapping."""
+            # Find the (sample, instance) indices of the centroids in the batch.
+            n_instances = frames_data[self.centroids_key + UNPADDED_SHAPE_SUFFIX][:, 0]
+            max_instances = tf.shape(frames_data[self.centroids_key])[1]
+            inds = tf.cast(
+                tf.where(tf.sequence_mask(n_instances, maxlen=max_instances)), tf.int32
+            )
+            sample_inds = inds[:, 0]
+
+            # Make bounding boxes from centroids.
+            full_image_scale = tf.gather(
+                frames_data[self.full_image_scale_key], sample_inds
+            )
+            full_centroids = tf.gather_nd(
+                frames_data[self.centroids_key], inds
+            ) / tf.gather(frames_data["scale"], sample_inds)
+            full_centroids = full_centroids * full_image_scale
+            bboxes = make_centered_bboxes(
+                full_centroids, box_height=self.crop_height, box_width=self.crop_width
+            )
+
+            # Crop all images in the batch from bounding boxes.
+            instance_images = crop_bboxes(
+                frames_data[self.full_image_key], bboxes, sample_inds=sample_inds
+            )
+
+            full_image_shapes = tf.gather(
+                frames_data[self.full_image_key + UNPADDED_SHAPE_SUFFIX], sample_inds
+            )
+            instances_data = {
+                "instance_image": instance_images,
+                "bbox": bboxes,
+                "center_instance_ind": inds[:, 1],
+                "centroid": full_centroids,
+                "centroid_confidence": tf.gather_nd(
+                    frames_data[self.centroid_confidences_key], inds
+                ),
+                "full_image_height": full_image_shapes[:, 0],
+                "full_image_width": full_image_shapes[:, 1],
+                "scale": full_image_scale,
+            }
+            for key in keys_to_expand:
+                instances_data[key] = tf.gather(frames_data[key], sample_inds)
+            for key in padded_keys:
+                instances_data[key + UNPADDED_SHAPE_SUFFIX] = tf.gather(
+                    frames_data[key + UNPADDED_SHAPE_SUFFIX], sample_inds
+                )
+            return instances_data
+
+        # Map the main processing function to each batch of frames.
+        output_ds = batched_ds.map(
+            crop_instances, num_parallel_calls=tf.data.experimental.AUTOTUNE
+        )
+
+        # Unbatch to split batch-level examples into individual instance-level examples.
+        output_ds = output_ds.unbatch()
+
+        # Remove the padding from the keys that were replicated from variable size data.
+        output_ds = unpad_examples(
+            output_ds, {key: frame_shapes[key] for key in padded_keys}
+        )
+
+        return output_ds
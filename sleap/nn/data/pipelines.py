@@ -13,7 +13,7 @@ import attr
 from typing import Sequence, Text, Optional, List, Tuple, Union, TypeVar
 
 import sleap
-from sleap.nn.data.providers import LabelsReader, VideoReader
+from sleap.nn.data.providers import LabelsReader, VideoReader, TFRecordReader
 from sleap.nn.data.augmentation import AugmentationConfig, ImgaugAugmenter
 from sleap.nn.data.normalization import Normalizer
 from sleap.nn.data.resizing import Resizer, PointsRescaler
@@ -33,6 +33,7 @@ from sleap.nn.data.dataset_ops import (
     Prefetcher,
     Preloader,
     LambdaFilter,
+    Sharder,
 )
 from sleap.nn.data.training import KeyMapper
 from sleap.nn.data.general import KeyFilter, KeyRenamer, KeyDeviceMover
@@ -56,7 +57,7 @@ from sleap.nn.heads import (
 )
 
 
-PROVIDERS = (LabelsReader, VideoReader)
+PROVIDERS = (LabelsReader, VideoReader, TFRecordReader)
 TRANSFORMERS = (
     ImgaugAugmenter,
     Normalizer,
@@ -74,6 +75,7 @@ TRANSFORMERS = (
     Prefetcher,
     Preloader,
     LambdaFilter,
+    Sharder,
     KeyMapper,
     KerasModelPredictor,
     GlobalPeakFinder,
@@ -279,12 +281,27 @@ class BottomUpPipeline:
         optimization_config: Optimization-related configuration.
         confmaps_head: Instantiated head describing the output confidence maps tensor.
         pafs_head: Instantiated head describing the output PAFs tensor.
+        num_replicas: Number of replicas that each batch will be split across during
+            distributed training. The batch size in the optimization configuration is
+            the per-replica batch size, so batches will contain
+            `batch_size * num_replicas` examples.
+        num_workers: Number of workers in a multi-worker cluster. If greater than 1,
+            the data will be sharded so that each worker generates distinct examples.
+        worker_index: Index of this worker in the cluster.
     """
 
     data_config: DataConfig
     optimization_config: OptimizationConfig
     confmaps_head: MultiInstanceConfmapsHead
     pafs_head: PartAffinityFieldsHead
+    num_replicas: int = 1
+    num_workers: int = 1
+    worker_index: int = 0
+
+    @property
+    def global_batch_size(self) -> int:
+        """Return the number of examples per batch across all replicas."""
+        return self.optimization_config.batch_size * self.num_replicas
 
     def make_base_pipeline(self, data_provider: Provider) -> Pipeline:
         """Create base pipeline with input data only.
@@ -317,6 +334,7 @@ class BottomUpPipeline:
             with the appropriate format for the instantiated `tf.keras.Model`.
         """
         pipeline = Pipeline(providers=data_provider)
+        pipeline += Sharder(num_shards=self.num_workers, shard_index=self.worker_index)
 
         if self.optimization_config.preload_data:
             pipeline += Preloader()
@@ -342,20 +360,16 @@ class BottomUpPipeline:
             flatten_channels=True,
         )
 
-        if len(data_provider) >= self.optimization_config.batch_size:
+        if len(data_provider) // self.num_workers >= self.global_batch_size:
             # Batching before repeating is preferred since it preserves epoch boundaries
             # such that no sample is repeated within the epoch. But this breaks if there
             # are fewer samples than the batch size.
-            pipeline += Batcher(
-                batch_size=self.optimization_config.batch_size, drop_remainder=True
-            )
+            pipeline += Batcher(batch_size=self.global_batch_size, drop_remainder=True)
             pipeline += Repeater()
 
         else:
             pipeline += Repeater()
-            pipeline += Batcher(
-                batch_size=self.optimization_config.batch_size, drop_remainder=True
-            )
+            pipeline += Batcher(batch_size=self.global_batch_size, drop_remainder=True)
 
         if self.optimization_config.prefetch:
             pipeline += Prefetcher()
@@ -409,11 +423,26 @@ class CentroidConfmapsPipeline:
         optimization_config: Optimization-related configuration.
         centroid_confmap_head: Instantiated head describing the output centroid
             confidence maps tensor.
+        num_replicas: Number of replicas that each batch will be split across during
+            distributed training. The batch size in the optimization configuration is
+            the per-replica batch size, so batches will contain
+            `batch_size * num_replicas` examples.
+        num_workers: Number of workers in a multi-worker cluster. If greater than 1,
+            the data will be sharded so that each worker generates distinct examples.
+        worker_index: Index of this worker in the cluster.
     """
 
     data_config: DataConfig
     optimization_config: OptimizationConfig
     centroid_confmap_head: CentroidConfmapsHead
+    num_replicas: int = 1
+    num_workers: int = 1
+    worker_index: int = 0
+
+    @property
+    def global_batch_size(self) -> int:
+        """Return the number of examples per batch across all replicas."""
+        return self.optimization_config.batch_size * self.num_replicas
 
     def make_base_pipeline(self, data_provider: Provider) -> Pipeline:
         """Create base pipeline with input data only.
@@ -450,6 +479,7 @@ class CentroidConfmapsPipeline:
             with the appropriate format for the instantiated `tf.keras.Model`.
         """
         pipeline = Pipeline(providers=data_provider)
+        pipeline += Sharder(num_shards=self.num_workers, shard_index=self.worker_index)
 
         if self.optimization_config.preload_data:
             pipeline += Preloader()
@@ -473,20 +503,16 @@ class CentroidConfmapsPipeline:
             centroids=True,
         )
 
-        if len(data_provider) >= self.optimization_config.batch_size:
+        if len(data_provider) // self.num_workers >= self.global_batch_size:
             # Batching before repeating is preferred since it preserves epoch boundaries
             # such that no sample is repeated within the epoch. But this breaks if there
             # are fewer samples than the batch size.
-            pipeline += Batcher(
-                batch_size=self.optimization_config.batch_size, drop_remainder=True
-            )
+            pipeline += Batcher(batch_size=self.global_batch_size, drop_remainder=True)
             pipeline += Repeater()
 
         else:
             pipeline += Repeater()
-            pipeline += Batcher(
-                batch_size=self.optimization_config.batch_size, drop_remainder=True
-            )
+            pipeline += Batcher(batch_size=self.global_batch_size, drop_remainder=True)
 
         if self.optimization_config.prefetch:
             pipeline += Prefetcher()
@@ -536,11 +562,26 @@ class TopdownConfmapsPipeline:
         optimization_config: Optimization-related configuration.
         instance_confmap_head: Instantiated head describing the output centered
             confidence maps tensor.
+        num_replicas: Number of replicas that each batch will be split across during
+            distributed training. The batch size in the optimization configuration is
+            the per-replica batch size, so batches will contain
+            `batch_size * num_replicas` examples.
+        num_workers: Number of workers in a multi-worker cluster. If greater than 1,
+            the data will be sharded so that each worker generates distinct examples.
+        worker_index: Index of this worker in the cluster.
     """
 
     data_config: DataConfig
     optimization_config: OptimizationConfig
     instance_confmap_head: CenteredInstanceConfmapsHead
+    num_replicas: int = 1
+    num_workers: int = 1
+    worker_index: int = 0
+
+    @property
+    def global_batch_size(self) -> int:
+        """Return the number of examples per batch across all replicas."""
+        return self.optimization_config.batch_size * self.num_replicas
 
     def make_base_pipeline(self, data_provider: Provider) -> Pipeline:
         """Create base pipeline with input data only.
@@ -578,6 +619,7 @@ class TopdownConfmapsPipeline:
             with the appropriate format for the instantiated `tf.keras.Model`.
         """
         pipeline = Pipeline(providers=data_provider)
+        pipeline += Sharder(num_shards=self.num_workers, shard_index=self.worker_index)
 
         if self.optimization_config.preload_data:
             pipeline += Preloader()
@@ -602,20 +644,16 @@ class TopdownConfmapsPipeline:
             all_instances=False,
         )
 
-        if len(data_provider) >= self.optimization_config.batch_size:
+        if len(data_provider) // self.num_workers >= self.global_batch_size:
             # Batching before repeating is preferred since it preserves epoch boundaries
             # such that no sample is repeated within the epoch. But this breaks if there
             # are fewer samples than the batch size.
-            pipeline += Batcher(
-                batch_size=self.optimization_config.batch_size, drop_remainder=True
-            )
+            pipeline += Batcher(batch_size=self.global_batch_size, drop_remainder=True)
             pipeline += Repeater()
 
         else:
             pipeline += Repeater()
-            pipeline += Batcher(
-                batch_size=self.optimization_config.batch_size, drop_remainder=True
-            )
+            pipeline += Batcher(batch_size=self.global_batch_size, drop_remainder=True)
 
         if self.optimization_config.prefetch:
             pipeline += Prefetcher()
@@ -662,11 +700,26 @@ class SingleInstanceConfmapsPipeline:
         optimization_config: Optimization-related configuration.
         single_instance_confmap_head: Instantiated head describing the output confidence
             maps tensor.
+        num_replicas: Number of replicas that each batch will be split across during
+            distributed training. The batch size in the optimization configuration is
+            the per-replica batch size, so batches will contain
+            `batch_size * num_replicas` examples.
+        num_workers: Number of workers in a multi-worker cluster. If greater than 1,
+            the data will be sharded so that each worker generates distinct examples.
+        worker_index: Index of this worker in the cluster.
     """
 
     data_config: DataConfig
     optimization_config: OptimizationConfig
     single_instance_confmap_head: SingleInstanceConfmapsHead
+    num_replicas: int = 1
+    num_workers: int = 1
+    worker_index: int = 0
+
+    @property
+    def global_batch_size(self) -> int:
+        """Return the number of examples per batch across all replicas."""
+        return self.optimization_config.batch_size * self.num_replicas
 
     def make_base_pipeline(self, data_provider: Provider) -> Pipeline:
         """Create base pipeline with input data only.
@@ -699,6 +752,7 @@ class SingleInstanceConfmapsPipeline:
             with the appropriate format for the instantiated `tf.keras.Model`.
         """
         pipeline = Pipeline(providers=data_provider)
+        pipeline += Sharder(num_shards=self.num_workers, shard_index=self.worker_index)
 
         if self.optimization_config.preload_data:
             pipeline += Preloader()
@@ -717,20 +771,16 @@ class SingleInstanceConfmapsPipeline:
             output_stride=self.single_instance_confmap_head.output_stride,
         )
 
-        if len(data_provider) >= self.optimization_config.batch_size:
+        if len(data_provider) // self.num_workers >= self.global_batch_size:
             # Batching before repeating is preferred since it preserves epoch boundaries
             # such that no sample is repeated within the epoch. But this breaks if there
             # are fewer samples than the batch size.
-            pipeline += Batcher(
-                batch_size=self.optimization_config.batch_size, drop_remainder=True
-            )
+            pipeline += Batcher(batch_size=self.global_batch_size, drop_remainder=True)
             pipeline += Repeater()
 
         else:
             pipeline += Repeater()
-            pipeline += Batcher(
-                batch_size=self.optimization_config.batch_size, drop_remainder=True
-            )
+            pipeline += Batcher(batch_size=self.global_batch_size, drop_remainder=True)
 
         if self.optimization_config.prefetch:
             pipeline += Prefetcher()
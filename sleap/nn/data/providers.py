@@ -1,9 +1,11 @@
 """Data providers for pipeline I/O."""
 
+import json
+import os
 import numpy as np
 import tensorflow as tf
 import attr
-from typing import Text, Optional, List, Sequence, Union
+from typing import Text, Optional, List, Sequence, Union, Dict, Any
 import sleap
 
 
@@ -314,3 +316,270 @@ class VideoReader:
         ds_reader = ds_index.map(fetch_frame)
 
         return ds_reader
+
+
+TFRECORD_IMAGE_FORMATS = ("png", "jpg", "raw")
+
+
+def _bytes_feature(value: bytes) -> tf.train.Feature:
+    """Return a `tf.train.Feature` with a single bytes value."""
+    return tf.train.Feature(bytes_list=tf.train.BytesList(value=[value]))
+
+
+def _int64_feature(values: Sequence[int]) -> tf.train.Feature:
+    """Return a `tf.train.Feature` with a list of int64 values."""
+    return tf.train.Feature(int64_list=tf.train.Int64List(value=list(values)))
+
+
+def encode_tfrecord_example(
+    example: Dict[Text, tf.Tensor], image_format: Text = "png"
+) -> bytes:
+    """Serialize an example generated by `LabelsReader` into a `tf.train.Example`.
+
+    Args:
+        example: A dictionary with the keys produced by `LabelsReader.make_dataset`.
+        image_format: Encoding of the image data. One of "png" (lossless), "jpg"
+            (lossy, only for uint8 images with 1 or 3 channels) or "raw" (no
+            compression).
+
+    Returns:
+        The serialized `tf.train.Example` protocol buffer as a bytes string.
+    """
+    image = example["image"]
+    if image_format == "png":
+        image_bytes = tf.image.encode_png(image)
+    elif image_format == "jpg":
+        image_bytes = tf.io.encode_jpeg(image)
+    elif image_format == "raw":
+        image_bytes = tf.io.serialize_tensor(image)
+    else:
+        raise ValueError(
+            f"Unrecognized image format: {image_format} "
+            f"(must be one of {TFRECORD_IMAGE_FORMATS})."
+        )
+
+    features = {
+        "image": _bytes_feature(image_bytes.numpy()),
+        "raw_image_size": _int64_feature(example["raw_image_size"].numpy()),
+        "example_ind": _int64_feature([example["example_ind"].numpy()]),
+        "video_ind": _int64_feature([example["video_ind"].numpy()]),
+        "frame_ind": _int64_feature([example["frame_ind"].numpy()]),
+        "instances": _bytes_feature(
+            tf.io.serialize_tensor(example["instances"]).numpy()
+        ),
+        "skeleton_inds": _int64_feature(example["skeleton_inds"].numpy()),
+    }
+    return tf.train.Example(
+        features=tf.train.Features(feature=features)
+    ).SerializeToString()
+
+
+def write_tfrecords(
+    labels: sleap.Labels,
+    filename_prefix: Text,
+    n_shards: int = 8,
+    image_format: Text = "png",
+    user_instances: bool = True,
+) -> Text:
+    """Export the frames and instances in a set of labels to sharded TFRecord files.
+
+    Args:
+        labels: A `sleap.Labels` instance to export.
+        filename_prefix: Path prefix for the output files. Shards will be saved to
+            `{filename_prefix}-{shard:05d}-of-{n_shards:05d}.tfrecord` and the metadata
+            required to read them back will be saved to `{filename_prefix}.json`.
+        n_shards: Number of files to split the examples across. Examples are assigned
+            to the shards in a round robin order. More shards allow for higher reader
+            parallelism and finer grained sharding across workers.
+        image_format: Encoding of the image data. One of "png" (lossless), "jpg"
+            (lossy) or "raw" (no compression).
+        user_instances: If True, only labeled frames with user instances will be
+            exported (see `LabelsReader.from_user_instances`).
+
+    Returns:
+        The path to the metadata JSON file that can be used with
+        `TFRecordReader.from_metadata`.
+    """
+    if user_instances:
+        labels_reader = LabelsReader.from_user_instances(labels)
+    else:
+        labels_reader = LabelsReader(labels=labels)
+
+    shard_filenames = [
+        f"{filename_prefix}-{shard:05d}-of-{n_shards:05d}.tfrecord"
+        for shard in range(n_shards)
+    ]
+    writers = [tf.io.TFRecordWriter(filename) for filename in shard_filenames]
+    n_examples = 0
+    image_dtype, image_channels = None, None
+    try:
+        for i, example in enumerate(labels_reader.make_dataset()):
+            image_dtype = example["image"].dtype.name
+            image_channels = int(example["image"].shape[-1])
+            writers[i % n_shards].write(
+                encode_tfrecord_example(example, image_format=image_format)
+            )
+            n_examples += 1
+    finally:
+        for writer in writers:
+            writer.close()
+
+    metadata = {
+        "shards": [os.path.basename(filename) for filename in shard_filenames],
+        "n_examples": n_examples,
+        "image_format": image_format,
+        "image_dtype": image_dtype,
+        "image_channels": image_channels,
+        "videos": [video.filename for video in labels_reader.videos],
+    }
+    metadata_path = f"{filename_prefix}.json"
+    with open(metadata_path, "w") as f:
+        json.dump(metadata, f)
+
+    return metadata_path
+
+
+@attr.s(auto_attribs=True)
+class TFRecordReader:
+    """Data provider from sharded TFRecord files exported with `write_tfrecords`.
+
+    This generates the same examples as `LabelsReader`, but reads and decodes the data
+    entirely within TensorFlow (i.e., without calling into Python), so the throughput
+    scales with the number of parallel readers. This is particularly useful when the
+    training data are stored on network file systems.
+
+    Attributes:
+        filenames: List of paths to the TFRecord shards.
+        n_examples: Total number of examples across all the shards.
+        image_format: Encoding of the image data. One of "png", "jpg" or "raw".
+        image_dtype: Name of the dtype of the decoded images, e.g., "uint8".
+        image_channels: Number of channels in the decoded images.
+        video_filenames: Paths to the videos that `video_ind` in examples refer to.
+        num_parallel_reads: Number of shards to read from in parallel. If None, this
+            will be tuned automatically.
+    """
+
+    filenames: List[Text]
+    n_examples: int
+    image_format: Text = "png"
+    image_dtype: Text = "uint8"
+    image_channels: int = 1
+    video_filenames: List[Text] = attr.ib(factory=list)
+    num_parallel_reads: Optional[int] = None
+
+    @classmethod
+    def from_metadata(
+        cls, metadata_path: Text, num_parallel_reads: Optional[int] = None
+    ) -> "TFRecordReader":
+        """Create a `TFRecordReader` from the metadata saved by `write_tfrecords`.
+
+        Args:
+            metadata_path: Path to the metadata JSON file. The shards are expected to be
+                in the same folder as the metadata file.
+            num_parallel_reads: Number of shards to read from in parallel. If None,
+                this will be tuned automatically.
+
+        Returns:
+            A `TFRecordReader` instance that can create a dataset for pipelining.
+        """
+        with open(metadata_path, "r") as f:
+            metadata = json.load(f)
+        base_dir = os.path.dirname(metadata_path)
+        return cls(
+            filenames=[os.path.join(base_dir, shard) for shard in metadata["shards"]],
+            n_examples=metadata["n_examples"],
+            image_format=metadata["image_format"],
+            image_dtype=metadata["image_dtype"],
+            image_channels=metadata["image_channels"],
+            video_filenames=metadata["videos"],
+            num_parallel_reads=num_parallel_reads,
+        )
+
+    def __len__(self) -> int:
+        """Return the number of elements in the dataset."""
+        return self.n_examples
+
+    @property
+    def output_keys(self) -> List[Text]:
+        """Return the output keys that the dataset will produce."""
+        return [
+            "image",
+            "raw_image_size",
+            "example_ind",
+            "video_ind",
+            "frame_ind",
+            "scale",
+            "instances",
+            "skeleton_inds",
+        ]
+
+    def make_dataset(self) -> tf.data.Dataset:
+        """Return a `tf.data.Dataset` whose elements are data from the TFRecords.
+
+        Returns:
+            A dataset whose elements are dictionaries with the same keys and dtypes as
+            the ones produced by `LabelsReader.make_dataset`.
+
+        Notes:
+            The shards are interleaved in parallel, so the order of the examples is not
+            guaranteed to match the order of the original labeled frames. The
+            "example_ind" key can be used to recover the original ordering.
+        """
+        image_dtype = tf.as_dtype(self.image_dtype)
+        feature_description = {
+            "image": tf.io.FixedLenFeature([], tf.string),
+            "raw_image_size": tf.io.FixedLenFeature([3], tf.int64),
+            "example_ind": tf.io.FixedLenFeature([], tf.int64),
+            "video_ind": tf.io.FixedLenFeature([], tf.int64),
+            "frame_ind": tf.io.FixedLenFeature([], tf.int64),
+            "instances": tf.io.FixedLenFeature([], tf.string),
+            "skeleton_inds": tf.io.VarLenFeature(tf.int64),
+        }
+
+        def parse_example(serialized):
+            """Local function that decodes a serialized example."""
+            example = tf.io.parse_single_example(serialized, feature_description)
+
+            if self.image_format == "png":
+                image = tf.io.decode_png(
+                    example["image"], channels=self.image_channels, dtype=image_dtype
+                )
+            elif self.image_format == "jpg":
+                image = tf.io.decode_jpeg(
+                    example["image"], channels=self.image_channels
+                )
+            else:
+                image = tf.io.parse_tensor(example["image"], out_type=image_dtype)
+                image = tf.ensure_shape(image, [None, None, self.image_channels])
+
+            instances = tf.io.parse_tensor(example["instances"], out_type=tf.float32)
+            instances = tf.ensure_shape(instances, [None, None, 2])
+
+            return {
+                "image": image,
+                "raw_image_size": tf.cast(example["raw_image_size"], tf.int32),
+                "example_ind": example["example_ind"],
+                "video_ind": tf.cast(example["video_ind"], tf.int32),
+                "frame_ind": example["frame_ind"],
+                "scale": tf.ones([2], dtype=tf.float32),
+                "instances": instances,
+                "skeleton_inds": tf.cast(
+                    tf.sparse.to_dense(example["skeleton_inds"]), tf.int32
+                ),
+            }
+
+        num_parallel_reads = self.num_parallel_reads
+        if num_parallel_reads is None:
+            num_parallel_reads = tf.data.experimental.AUTOTUNE
+
+        ds_files = tf.data.Dataset.from_tensor_slices(self.filenames)
+        ds_records = ds_files.interleave(
+            tf.data.TFRecordDataset,
+            cycle_length=len(self.filenames),
+            num_parallel_calls=num_parallel_reads,
+        )
+        ds_reader = ds_records.map(
+            parse_example, num_parallel_calls=tf.data.experimental.AUTOTUNE
+        )
+
+        return ds_reader
@@ -5,7 +5,7 @@ import logging
 import os
 import time
 from abc import ABC, abstractmethod
-from typing import Text, Optional, List, Dict
+from typing import Text, Optional, List, Dict, Tuple
 
 import tensorflow as tf
 import numpy as np
@@ -160,6 +160,29 @@ def get_keras_model_path(path: Text) -> Text:
     return os.path.join(path, "best_model.h5")
 
 
+def load_trained_model(model_path: Text) -> Tuple[TrainingJobConfig, Model]:
+    """Load a trained model and its training configuration.
+
+    Args:
+        model_path: Path to the model folder or its training configuration JSON file.
+
+    Returns:
+        A tuple of `(config, model)` with the loaded `TrainingJobConfig` and `Model`
+        with its `keras_model` attribute set.
+
+        If a mixed precision policy is enabled (see
+        `sleap.nn.system.set_precision_policy`), the model will be rebuilt to compute
+        in that precision.
+    """
+    config = TrainingJobConfig.load_json(model_path)
+    keras_model_path = get_keras_model_path(model_path)
+    model = Model.from_config(config.model)
+    model.keras_model = tf.keras.models.load_model(keras_model_path, compile=False)
+    if sleap.nn.system.is_mixed_precision():
+        model.rebuild_keras_model()
+    return config, model
+
+
 @attr.s(auto_attribs=True)
 class Predictor(ABC):
     """Base interface class for predictors."""
@@ -238,13 +261,11 @@ class VisualPredictor(Predictor):
     config: TrainingJobConfig
     model: Model
     pipeline: Optional[Pipeline] = attr.ib(default=None, init=False)
+    jit_compile: bool = False
 
     @classmethod
     def from_trained_models(cls, model_path: Text) -> "VisualPredictor":
-        cfg = TrainingJobConfig.load_json(model_path)
-        keras_model_path = get_keras_model_path(model_path)
-        model = Model.from_config(cfg.model)
-        model.keras_model = tf.keras.models.load_model(keras_model_path, compile=False)
+        cfg, model = load_trained_model(model_path)
 
         return cls(config=cfg, model=model)
 
@@ -294,6 +315,7 @@ class VisualPredictor(Predictor):
             keras_model=self.model.keras_model,
             model_input_keys="image",
             model_output_keys=self.head_specific_output_keys(),
+            jit_compile=self.jit_compile,
         )
 
         self.pipeline = pipeline
@@ -326,6 +348,9 @@ class TopdownPredictor(Predictor):
     peak_threshold: float = 0.2
     integral_refinement: bool = True
     integral_patch_size: int = 7
+    jit_compile: bool = False
+    centroid_peak_threshold: float = 0.2
+    centroid_input_scale: Optional[float] = None
 
     @classmethod
     def from_trained_models(
@@ -335,12 +360,25 @@ class TopdownPredictor(Predictor):
         peak_threshold: float = 0.2,
         integral_refinement: bool = True,
         integral_patch_size: int = 7,
+        centroid_peak_threshold: float = 0.2,
+        centroid_input_scale: Optional[float] = None,
     ) -> "TopdownPredictor":
         """Create predictor from saved models.
 
         Args:
             centroid_model_path: Path to centroid model folder.
             confmap_model_path: Path to topdown confidence map model folder.
+            peak_threshold: Minimum confidence map value for instance peaks.
+            integral_refinement: If True, refine instance peaks with integral
+                regression.
+            integral_patch_size: Size of the patches used for integral refinement.
+            centroid_peak_threshold: Minimum confidence map value for centroid peaks.
+                Frames with no centroids above this threshold skip the confidence map
+                model entirely.
+            centroid_input_scale: If not None, scale at which the full images are
+                resized before running the centroid model, overriding the input scaling
+                that the model was trained with. Lower values run faster at the cost of
+                centroid localization accuracy.
         
         Returns:
             An instance of TopdownPredictor with the loaded models.
@@ -355,24 +393,14 @@ class TopdownPredictor(Predictor):
 
         if centroid_model_path is not None:
             # Load centroid model.
-            centroid_config = TrainingJobConfig.load_json(centroid_model_path)
-            centroid_keras_model_path = get_keras_model_path(centroid_model_path)
-            centroid_model = Model.from_config(centroid_config.model)
-            centroid_model.keras_model = tf.keras.models.load_model(
-                centroid_keras_model_path, compile=False
-            )
+            centroid_config, centroid_model = load_trained_model(centroid_model_path)
         else:
             centroid_config = None
             centroid_model = None
 
         if confmap_model_path is not None:
             # Load confmap model.
-            confmap_config = TrainingJobConfig.load_json(confmap_model_path)
-            confmap_keras_model_path = get_keras_model_path(confmap_model_path)
-            confmap_model = Model.from_config(confmap_config.model)
-            confmap_model.keras_model = tf.keras.models.load_model(
-                confmap_keras_model_path, compile=False
-            )
+            confmap_config, confmap_model = load_trained_model(confmap_model_path)
         else:
             confmap_config = None
             confmap_model = None
@@ -385,6 +413,8 @@ class TopdownPredictor(Predictor):
             peak_threshold=peak_threshold,
             integral_refinement=integral_refinement,
             integral_patch_size=integral_patch_size,
+            centroid_peak_threshold=centroid_peak_threshold,
+            centroid_input_scale=centroid_input_scale,
         )
 
     def make_pipeline(self, data_provider: Optional[Provider] = None) -> Pipeline:
@@ -422,17 +452,20 @@ class TopdownPredictor(Predictor):
                 else:
                     self.confmap_config.data.preprocessing.ensure_rgb = True
 
-            pipeline += Normalizer.from_config(
-                self.confmap_config.data.preprocessing, image_key="full_image"
-            )
-
             points_key = "instances" if self.centroid_model is None else None
-            pipeline += Resizer.from_config(
-                self.confmap_config.data.preprocessing,
-                points_key=points_key,
-                image_key="full_image",
-                scale_key="full_image_scale",
-            )
+            confmap_preprocessing = [
+                Normalizer.from_config(
+                    self.confmap_config.data.preprocessing, image_key="full_image"
+                ),
+                Resizer.from_config(
+                    self.confmap_config.data.preprocessing,
+                    points_key=points_key,
+                    image_key="full_image",
+                    scale_key="full_image_scale",
+                ),
+            ]
+        else:
+            confmap_preprocessing = []
 
         if self.centroid_model is not None:
             # Infer colorspace preprocessing if not explicit.
@@ -448,20 +481,24 @@ class TopdownPredictor(Predictor):
             pipeline += Normalizer.from_config(
                 self.centroid_config.data.preprocessing, image_key="image"
             )
-            pipeline += Resizer.from_config(
+            centroid_resizer = Resizer.from_config(
                 self.centroid_config.data.preprocessing, points_key=None,
             )
+            if self.centroid_input_scale is not None:
+                centroid_resizer.scale = self.centroid_input_scale
+            pipeline += centroid_resizer
 
             # Predict centroids using model.
             pipeline += KerasModelPredictor(
                 keras_model=self.centroid_model.keras_model,
                 model_input_keys="image",
                 model_output_keys="predicted_centroid_confidence_maps",
+                jit_compile=self.jit_compile,
             )
 
             pipeline += LocalPeakFinder(
                 confmaps_stride=self.centroid_model.heads[0].output_stride,
-                peak_threshold=0.2,
+                peak_threshold=self.centroid_peak_threshold,
                 confmaps_key="predicted_centroid_confidence_maps",
                 peaks_key="predicted_centroids",
                 peak_vals_key="predicted_centroid_confidences",
@@ -470,16 +507,26 @@ class TopdownPredictor(Predictor):
                 keep_confmaps=False,
             )
 
+            # Drop frames without any centroids so they skip the rest of the pipeline.
             pipeline += LambdaFilter(
                 filter_fn=lambda ex: len(ex["predicted_centroids"]) > 0
             )
 
+            # Preprocess full images only for the frames that have instances to crop.
+            pipeline += confmap_preprocessing
+
             if self.confmap_config is not None:
                 crop_size = self.confmap_config.data.instance_cropping.crop_size
+                frame_batch_size = (
+                    self.confmap_config.data.instance_cropping.frame_batch_size
+                )
             else:
                 crop_size = sleap.nn.data.instance_cropping.find_instance_crop_size(
                     data_provider.labels
                 )
+                frame_batch_size = (
+                    self.centroid_config.data.instance_cropping.frame_batch_size
+                )
 
             pipeline += PredictedInstanceCropper(
                 crop_width=crop_size,
@@ -490,11 +537,14 @@ class TopdownPredictor(Predictor):
                 full_image_scale_key="full_image_scale",
                 keep_instances_gt=self.confmap_model is None,
                 other_keys_to_keep=["original_image"] if keep_original_image else None,
+                frame_batch_size=frame_batch_size,
             )
             if keep_original_image:
                 pipeline += KeyDeviceMover(["original_image"])
 
         else:
+            pipeline += confmap_preprocessing
+
             # Generate ground truth centroids and crops.
             anchor_part = self.confmap_config.data.instance_cropping.center_on_part
             pipeline += InstanceCentroidFinder(
@@ -511,6 +561,7 @@ class TopdownPredictor(Predictor):
                 crop_width=self.confmap_config.data.instance_cropping.crop_size,
                 crop_height=self.confmap_config.data.instance_cropping.crop_size,
                 mock_centroid_confidence=True,
+                frame_batch_size=self.confmap_config.data.instance_cropping.frame_batch_size,
             )
 
         if self.confmap_model is not None:
@@ -519,6 +570,7 @@ class TopdownPredictor(Predictor):
                 keras_model=self.confmap_model.keras_model,
                 model_input_keys="instance_image",
                 model_output_keys="predicted_instance_confidence_maps",
+                jit_compile=self.jit_compile,
             )
             pipeline += GlobalPeakFinder(
                 confmaps_key="predicted_instance_confidence_maps",
@@ -639,17 +691,13 @@ class BottomupPredictor(Predictor):
     bottomup_model: Model
     pipeline: Optional[Pipeline] = attr.ib(default=None, init=False)
     tracker: Optional[Tracker] = attr.ib(default=None, init=False)
+    jit_compile: bool = False
 
     @classmethod
     def from_trained_models(cls, bottomup_model_path: Text) -> "BottomupPredictor":
         """Create predictor from saved models."""
         # Load bottomup model.
-        bottomup_config = TrainingJobConfig.load_json(bottomup_model_path)
-        bottomup_keras_model_path = get_keras_model_path(bottomup_model_path)
-        bottomup_model = Model.from_config(bottomup_config.model)
-        bottomup_model.keras_model = tf.keras.models.load_model(
-            bottomup_keras_model_path, compile=False
-        )
+        bottomup_config, bottomup_model = load_trained_model(bottomup_model_path)
 
         return cls(bottomup_config=bottomup_config, bottomup_model=bottomup_model)
 
@@ -684,6 +732,7 @@ class BottomupPredictor(Predictor):
                 "predicted_confidence_maps",
                 "predicted_part_affinity_fields",
             ],
+            jit_compile=self.jit_compile,
         )
         pipeline += LocalPeakFinder(
             confmaps_stride=self.bottomup_model.heads[0].output_stride,
@@ -799,6 +848,7 @@ class SingleInstancePredictor(Predictor):
     peak_threshold: float = 0.2
     integral_refinement: bool = True
     integral_patch_size: int = 7
+    jit_compile: bool = False
 
     @classmethod
     def from_trained_models(
@@ -810,12 +860,7 @@ class SingleInstancePredictor(Predictor):
     ) -> "SingleInstancePredictor":
         """Create predictor from saved models."""
         # Load confmap model.
-        confmap_config = TrainingJobConfig.load_json(confmap_model_path)
-        confmap_keras_model_path = get_keras_model_path(confmap_model_path)
-        confmap_model = Model.from_config(confmap_config.model)
-        confmap_model.keras_model = tf.keras.models.load_model(
-            confmap_keras_model_path, compile=False
-        )
+        confmap_config, confmap_model = load_trained_model(confmap_model_path)
 
         return cls(
             confmap_config=confmap_config,
@@ -852,6 +897,7 @@ class SingleInstancePredictor(Predictor):
             keras_model=self.confmap_model.keras_model,
             model_input_keys="image",
             model_output_keys="predicted_instance_confidence_maps",
+            jit_compile=self.jit_compile,
         )
         pipeline += GlobalPeakFinder(
             confmaps_key="predicted_instance_confidence_maps",
@@ -1022,6 +1068,22 @@ def make_cli_parser():
         "--gpu", type=int, default=0, help="Run inference on the i-th GPU specified."
     )
 
+    parser.add_argument(
+        "--precision",
+        type=str,
+        default="float32",
+        choices=sleap.nn.system.PRECISION_POLICIES,
+        help="Floating point precision to run the models in. Mixed precision policies "
+        "compute in 16-bit floats, which is faster on hardware with native support "
+        "(mixed_float16 for GPUs, mixed_bfloat16 for CPUs). (default: float32)",
+    )
+    parser.add_argument(
+        "--xla",
+        action="store_true",
+        default=False,
+        help="Compile the models with XLA for faster inference.",
+    )
+
     # Add args for each predictor class
     for predictor_name, predictor_class in CLI_PREDICTORS.items():
         if "peak_threshold" in attr.fields_dict(predictor_class):
@@ -1037,6 +1099,26 @@ def make_cli_parser():
                 help=f"Threshold to use when finding peaks in {predictor_class.__name__} (default: {default_val}).",
             )
 
+        if "centroid_peak_threshold" in attr.fields_dict(predictor_class):
+            default_val = attr.fields_dict(predictor_class)[
+                "centroid_peak_threshold"
+            ].default
+
+            parser.add_argument(
+                f"--{predictor_name}.centroid_peak_threshold",
+                type=float,
+                default=None,
+                help=f"Threshold to use when finding centroids in {predictor_class.__name__}. Frames without centroids above this threshold skip the rest of the inference pipeline (default: {default_val}).",
+            )
+
+        if "centroid_input_scale" in attr.fields_dict(predictor_class):
+            parser.add_argument(
+                f"--{predictor_name}.centroid_input_scale",
+                type=float,
+                default=None,
+                help=f"Scale to resize full images to before finding centroids in {predictor_class.__name__}. Lower values are faster but less accurate (default: the input scaling the centroid model was trained with).",
+            )
+
     # Add args for tracking
     Tracker.add_cli_parser_args(parser, arg_scope="tracking")
 
@@ -1210,6 +1292,7 @@ def main():
         else:
             sleap.nn.system.use_gpu(args.gpu)
     sleap.nn.system.disable_preallocation()
+    sleap.nn.system.set_precision_policy(args.precision)
 
     print("System:")
     sleap.nn.system.summary()
@@ -1231,6 +1314,9 @@ def main():
     tracker = make_tracker_from_cli(policy_args)
     predictor.tracker = tracker
 
+    if hasattr(predictor, "jit_compile"):
+        predictor.jit_compile = args.xla
+
     if args.test_pipeline:
         print()
 
@@ -1268,6 +1354,7 @@ def main():
         for key, val in policy_args[scope].items():
             prediction_metadata[f"{scope}.{key}"] = val
     prediction_metadata["video.path"] = args.video_path
+    prediction_metadata["precision"] = args.precision
     prediction_metadata["sleap.version"] = sleap.__version__
 
     save_predictions_from_cli(args, predicted_frames, prediction_metadata)
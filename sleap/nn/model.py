@@ -180,6 +180,12 @@ class Model:
             
         Returns:
             An instantiated `tf.keras.Model`.
+
+        Notes:
+            The layers are created with the current global precision policy (see
+            `sleap.nn.system.set_precision_policy`). The output layers of the heads are
+            always computed in float32 so that the losses and peak finding remain
+            numerically stable when the backbone runs in mixed precision.
         """
         # Create input layer.
         x_in = tf.keras.layers.Input(input_shape, name="input")
@@ -208,6 +214,7 @@ class Model:
                             strides=1,
                             padding="same",
                             name=f"{type(output).__name__}_{i}",
+                            dtype="float32",
                         )(x)
                     )
 
@@ -225,6 +232,7 @@ class Model:
                                     strides=1,
                                     padding="same",
                                     name=f"{type(output).__name__}_{i}",
+                                    dtype="float32",
                                 )(feat.tensor)
                             )
                         break
@@ -240,3 +248,24 @@ class Model:
         # Create model.
         self.keras_model = tf.keras.Model(inputs=x_in, outputs=x_outs)
         return self.keras_model
+
+    def rebuild_keras_model(self) -> tf.keras.Model:
+        """Rebuild the current Keras model with the global precision policy.
+
+        This is useful for running a model that was trained (and saved) in float32
+        with a mixed precision policy, or vice versa. The weights of the current model
+        are transferred to the new model, which replaces `keras_model`.
+
+        Returns:
+            The rebuilt `tf.keras.Model`.
+
+        Raises:
+            ValueError: If the Keras model has not been created or loaded yet.
+        """
+        if self.keras_model is None:
+            raise ValueError("Keras model must be created before it can be rebuilt.")
+        weights = self.keras_model.get_weights()
+        input_shape = tuple(self.keras_model.inputs[0].shape[1:])
+        self.make_model(input_shape)
+        self.keras_model.set_weights(weights)
+        return self.keras_model
@@ -4,8 +4,10 @@ This module mostly provides convenience functions for changing the state of the
 environment by wrapping `tf.config` module functions.
 """
 
+import json
+import os
 import tensorflow as tf
-from typing import List, Optional, Text
+from typing import List, Optional, Text, Dict, Any
 
 
 def get_all_gpus() -> List[tf.config.PhysicalDevice]:
@@ -183,3 +185,160 @@ def best_logical_device_name() -> Text:
         cpus = tf.config.list_logical_devices("CPU")
         device_name = cpus[0].name
     return device_name
+
+
+PRECISION_POLICIES = ["float32", "mixed_float16", "mixed_bfloat16"]
+
+
+def get_precision_policy() -> Text:
+    """Return the name of the current global Keras precision policy."""
+    return tf.keras.mixed_precision.experimental.global_policy().name
+
+
+def set_precision_policy(policy_name: Optional[Text] = "float32"):
+    """Set the global Keras precision policy used when building layers.
+
+    Args:
+        policy_name: One of "float32" (default), "mixed_float16" or "mixed_bfloat16".
+            The mixed policies compute in 16-bit floating point while keeping the
+            variables in float32. If None, the policy is reset to "float32".
+
+    Notes:
+        This only affects layers created after the policy is set. Models that were
+        already built (or loaded from disk) keep the precision they were built with.
+
+        "mixed_float16" is recommended on GPUs with tensor cores, while
+        "mixed_bfloat16" is better suited for CPUs and TPUs with bfloat16 support.
+
+    Raises:
+        ValueError: If the policy name is not one of the supported policies.
+    """
+    if policy_name is None:
+        policy_name = "float32"
+    if policy_name not in PRECISION_POLICIES:
+        raise ValueError(
+            f"Unrecognized precision policy: {policy_name} "
+            f"(must be one of {PRECISION_POLICIES})."
+        )
+    tf.keras.mixed_precision.experimental.set_policy(policy_name)
+
+
+def is_mixed_precision() -> bool:
+    """Return True if the global precision policy computes in 16-bit floats."""
+    return get_precision_policy() != "float32"
+
+
+def enable_xla(enabled: bool = True):
+    """Enable or disable XLA JIT compilation of TensorFlow graphs.
+
+    This turns on XLA auto-clustering for all graphs executed by TensorFlow, including
+    the `tf.keras` training and evaluation loops.
+
+    Args:
+        enabled: If True, XLA auto-clustering will be enabled. If False, it will be
+            disabled.
+    """
+    tf.config.optimizer.set_jit(enabled)
+
+
+DISTRIBUTION_STRATEGIES = ["default", "mirrored", "multi_worker_mirrored"]
+
+
+def get_tf_config() -> Dict[Text, Any]:
+    """Return the cluster configuration from the `TF_CONFIG` environment variable.
+
+    Returns:
+        A dictionary with the parsed JSON contents of `TF_CONFIG`, typically with the
+        `"cluster"` and `"task"` keys. If the variable is not set, an empty dictionary
+        is returned.
+    """
+    return json.loads(os.environ.get("TF_CONFIG", "{}"))
+
+
+def make_tf_config(worker_addresses: List[Text], worker_index: int) -> Text:
+    """Make a `TF_CONFIG` specification for a cluster of workers.
+
+    Args:
+        worker_addresses: List of `"host:port"` strings for each worker in the cluster.
+        worker_index: Index of the worker in `worker_addresses` that the configuration
+            will be used for.
+
+    Returns:
+        The JSON-encoded cluster specification that can be set as the `TF_CONFIG`
+        environment variable before creating a multi-worker distribution strategy.
+
+    Notes:
+        This is useful for running multiple workers on the same machine, e.g., with
+        `worker_addresses=["localhost:12345", "localhost:12346"]`.
+    """
+    return json.dumps(
+        {
+            "cluster": {"worker": list(worker_addresses)},
+            "task": {"type": "worker", "index": worker_index},
+        }
+    )
+
+
+def get_num_workers() -> int:
+    """Return the number of workers in the cluster specified by `TF_CONFIG`."""
+    cluster = get_tf_config().get("cluster", {})
+    return max(len(cluster.get("chief", [])) + len(cluster.get("worker", [])), 1)
+
+
+def get_worker_index() -> int:
+    """Return the index of this worker among all workers in the cluster.
+
+    The chief (if specified in the cluster) is always index 0, followed by the workers.
+    """
+    tf_config = get_tf_config()
+    task = tf_config.get("task", {})
+    n_chief = len(tf_config.get("cluster", {}).get("chief", []))
+    if task.get("type", "worker") == "chief":
+        return 0
+    return n_chief + task.get("index", 0)
+
+
+def is_chief() -> bool:
+    """Return True if this worker is the chief worker in the cluster.
+
+    The chief is responsible for tasks that should only be done once, such as saving
+    checkpoints and logs. This is always True when not running in a cluster.
+    """
+    return get_worker_index() == 0
+
+
+def make_distribution_strategy(
+    name: Optional[Text] = None, devices: Optional[List[Text]] = None
+) -> tf.distribute.Strategy:
+    """Create a distribution strategy for training across devices.
+
+    Args:
+        name: Name of the strategy to create. One of:
+            "default" or None: No distribution, i.e., the default strategy that places
+                operations on a single device.
+            "mirrored": Synchronous data-parallel training across all the available
+                devices on this machine (see `tf.distribute.MirroredStrategy`).
+            "multi_worker_mirrored": Synchronous data-parallel training across all the
+                devices of multiple workers. The cluster must be specified in the
+                `TF_CONFIG` environment variable (see `make_tf_config`) and the
+                strategy must be created before any other TensorFlow operations run.
+        devices: List of device names to replicate the model on when using the
+            "mirrored" strategy. If None, all the available GPUs will be used (or the
+            CPU if there are none).
+
+    Returns:
+        The instantiated `tf.distribute.Strategy`.
+
+    Raises:
+        ValueError: If the strategy name is not recognized.
+    """
+    if name is None or name == "default":
+        return tf.distribute.get_strategy()
+    elif name == "mirrored":
+        return tf.distribute.MirroredStrategy(devices=devices)
+    elif name == "multi_worker_mirrored":
+        return tf.distribute.experimental.MultiWorkerMirroredStrategy()
+    raise ValueError(
+        f"Unrecognized distribution strategy: {name} "
+        f"(must be one of {DISTRIBUTION_STRATEGIES})."
+    )
@@ -195,9 +195,25 @@ def setup_optimizer(config: OptimizationConfig) -> tf.keras.optimizers.Optimizer
     else:
         # TODO: explicit lookup
         optimizer = config.optimizer
+
+    if config.precision == "mixed_float16":
+        # Scale the loss dynamically to prevent float16 gradients from underflowing.
+        optimizer = tf.keras.mixed_precision.experimental.LossScaleOptimizer(
+            tf.keras.optimizers.get(optimizer), loss_scale="dynamic"
+        )
+        logger.info("  Dynamic loss scaling enabled.")
     return optimizer
 
 
+def setup_precision(config: OptimizationConfig):
+    """Set up the model precision policy and XLA compilation from config."""
+    sleap.nn.system.set_precision_policy(config.precision)
+    logger.info(f"  Precision policy: {config.precision}")
+
+    sleap.nn.system.enable_xla(config.xla)
+    logger.info(f"  XLA: {config.xla}")
+
+
 def setup_losses(config: OptimizationConfig) -> Callable[[tf.Tensor], tf.Tensor]:
     """Set up model loss function from config."""
     losses = [tf.keras.losses.MeanSquaredError()]
@@ -496,6 +512,8 @@ class Trainer(ABC):
         output_callbacks: Keras callbacks related to outputs.
         visualization_callbacks: Keras callbacks related to visualization.
         run_path: The path to the run folder that will contain training results, if any.
+        strategy: The `tf.distribute.Strategy` that the model will be created and
+            trained with.
     """
 
     data_readers: DataReaders
@@ -520,6 +538,7 @@ class Trainer(ABC):
     )
 
     run_path: Optional[Text] = attr.ib(default=None, init=False)
+    strategy: Optional[tf.distribute.Strategy] = attr.ib(default=None, init=False)
 
     @classmethod
     def from_config(
@@ -585,6 +604,20 @@ class Trainer(ABC):
             model=model,
         )
 
+    def _setup_strategy(self):
+        """Set up the distribution strategy."""
+        self.strategy = sleap.nn.system.make_distribution_strategy(
+            self.config.optimization.distribution_strategy
+        )
+        logger.info(f"  Distribution strategy: {type(self.strategy).__name__}")
+        logger.info(f"  Replicas: {self.strategy.num_replicas_in_sync}")
+        logger.info(f"  Global batch size: {self.global_batch_size}")
+
+    @property
+    def global_batch_size(self) -> int:
+        """Return the number of examples per batch across all replicas."""
+        return self.config.optimization.batch_size * self.strategy.num_replicas_in_sync
+
     @abstractmethod
     def _update_config(self):
         """Implement in subclasses."""
@@ -626,8 +659,12 @@ class Trainer(ABC):
         logger.info(f"Loaded test example. [{time() - t0:.3f}s]")
         logger.info(f"  Input shape: {input_shape}")
 
+        # Set the precision policy before any layers are created.
+        setup_precision(self.config.optimization)
+
         # Create the tf.keras.Model instance.
-        self.model.make_model(input_shape)
+        with self.strategy.scope():
+            self.model.make_model(input_shape)
         logger.info("Created Keras model.")
         logger.info(f"  Backbone: {self.model.backbone}")
         logger.info(f"  Max stride: {self.model.maximum_stride}")
@@ -692,20 +729,26 @@ class Trainer(ABC):
             self.config.optimization
         )
 
-        self.keras_model.compile(
-            optimizer=optimizer,
-            loss=loss_fn,
-            metrics=metrics,
-            loss_weights={
-                output_name: head.loss_weight
-                for output_name, head in zip(
-                    self.keras_model.output_names, self.model.heads
-                )
-            },
-        )
+        with self.strategy.scope():
+            self.keras_model.compile(
+                optimizer=optimizer,
+                loss=loss_fn,
+                metrics=metrics,
+                loss_weights={
+                    output_name: head.loss_weight
+                    for output_name, head in zip(
+                        self.keras_model.output_names, self.model.heads
+                    )
+                },
+            )
 
     def _setup_outputs(self):
         """Set up output-related functionality."""
+        if not sleap.nn.system.is_chief():
+            # Only the chief worker saves outputs in multi-worker training.
+            self.config.outputs.save_outputs = False
+            self.config.outputs.zmq.publish_updates = False
+
         if self.config.outputs.save_outputs:
             # Build path to run folder.
             self.run_path = setup_new_run_folder(
@@ -768,6 +811,8 @@ class Trainer(ABC):
         """Set up data pipeline and model for training."""
         logger.info(f"Setting up for training...")
         t0 = time()
+        logger.info(f"Setting up distribution strategy...")
+        self._setup_strategy()
         self._update_config()
         logger.info(f"Setting up pipeline builders...")
         self._setup_pipeline_builder()
@@ -792,6 +837,14 @@ class Trainer(ABC):
         t0 = time()
         training_ds = self.training_pipeline.make_dataset()
         validation_ds = self.validation_pipeline.make_dataset()
+        if self.strategy.num_replicas_in_sync > 1:
+            # Data are explicitly sharded across workers in the pipelines.
+            options = tf.data.Options()
+            options.experimental_distribute.auto_shard_policy = (
+                tf.data.experimental.AutoShardPolicy.OFF
+            )
+            training_ds = training_ds.with_options(options)
+            validation_ds = validation_ds.with_options(options)
         logger.info(f"Finished creating training datasets. [{time() - t0:.1f}s]")
 
         logger.info(f"Starting training loop...")
@@ -821,18 +874,14 @@ class CentroidConfmapsModelTrainer(Trainer):
 
         if self.config.optimization.batches_per_epoch is None:
             n_training_examples = len(self.data_readers.training_labels)
-            n_training_batches = (
-                n_training_examples // self.config.optimization.batch_size
-            )
+            n_training_batches = n_training_examples // self.global_batch_size
             self.config.optimization.batches_per_epoch = max(
                 self.config.optimization.min_batches_per_epoch, n_training_batches
             )
 
         if self.config.optimization.val_batches_per_epoch is None:
             n_validation_examples = len(self.data_readers.validation_labels)
-            n_validation_batches = (
-                n_validation_examples // self.config.optimization.batch_size
-            )
+            n_validation_batches = n_validation_examples // self.global_batch_size
             self.config.optimization.val_batches_per_epoch = max(
                 self.config.optimization.min_val_batches_per_epoch, n_validation_batches
             )
@@ -843,6 +892,9 @@ class CentroidConfmapsModelTrainer(Trainer):
             data_config=self.config.data,
             optimization_config=self.config.optimization,
             centroid_confmap_head=self.model.heads[0],
+            num_replicas=self.strategy.num_replicas_in_sync,
+            num_workers=sleap.nn.system.get_num_workers(),
+            worker_index=sleap.nn.system.get_worker_index(),
         )
 
     @property
@@ -918,9 +970,7 @@ class SingleInstanceModelTrainer(Trainer):
             n_training_examples = len(
                 self.data_readers.training_labels_reader.labels.user_instances
             )
-            n_training_batches = (
-                n_training_examples // self.config.optimization.batch_size
-            )
+            n_training_batches = n_training_examples // self.global_batch_size
             self.config.optimization.batches_per_epoch = max(
                 self.config.optimization.min_batches_per_epoch, n_training_batches
             )
@@ -929,9 +979,7 @@ class SingleInstanceModelTrainer(Trainer):
             n_validation_examples = len(
                 self.data_readers.validation_labels_reader.labels.user_instances
             )
-            n_validation_batches = (
-                n_validation_examples // self.config.optimization.batch_size
-            )
+            n_validation_batches = n_validation_examples // self.global_batch_size
             self.config.optimization.val_batches_per_epoch = max(
                 self.config.optimization.min_val_batches_per_epoch, n_validation_batches
             )
@@ -942,6 +990,9 @@ class SingleInstanceModelTrainer(Trainer):
             data_config=self.config.data,
             optimization_config=self.config.optimization,
             single_instance_confmap_head=self.model.heads[0],
+            num_replicas=self.strategy.num_replicas_in_sync,
+            num_workers=sleap.nn.system.get_num_workers(),
+            worker_index=sleap.nn.system.get_worker_index(),
         )
 
     @property
@@ -1025,9 +1076,7 @@ class TopdownConfmapsModelTrainer(Trainer):
             n_training_examples = len(
                 self.data_readers.training_labels_reader.labels.user_instances
             )
-            n_training_batches = (
-                n_training_examples // self.config.optimization.batch_size
-            )
+            n_training_batches = n_training_examples // self.global_batch_size
             self.config.optimization.batches_per_epoch = max(
                 self.config.optimization.min_batches_per_epoch, n_training_batches
             )
@@ -1036,9 +1085,7 @@ class TopdownConfmapsModelTrainer(Trainer):
             n_validation_examples = len(
                 self.data_readers.validation_labels_reader.labels.user_instances
             )
-            n_validation_batches = (
-                n_validation_examples // self.config.optimization.batch_size
-            )
+            n_validation_batches = n_validation_examples // self.global_batch_size
             self.config.optimization.val_batches_per_epoch = max(
                 self.config.optimization.min_val_batches_per_epoch, n_validation_batches
             )
@@ -1049,6 +1096,9 @@ class TopdownConfmapsModelTrainer(Trainer):
             data_config=self.config.data,
             optimization_config=self.config.optimization,
             instance_confmap_head=self.model.heads[0],
+            num_replicas=self.strategy.num_replicas_in_sync,
+            num_workers=sleap.nn.system.get_num_workers(),
+            worker_index=sleap.nn.system.get_worker_index(),
         )
 
     @property
@@ -1122,18 +1172,14 @@ class BottomUpModelTrainer(Trainer):
 
         if self.config.optimization.batches_per_epoch is None:
             n_training_examples = len(self.data_readers.training_labels)
-            n_training_batches = (
-                n_training_examples // self.config.optimization.batch_size
-            )
+            n_training_batches = n_training_examples // self.global_batch_size
             self.config.optimization.batches_per_epoch = max(
                 self.config.optimization.min_batches_per_epoch, n_training_batches
             )
 
         if self.config.optimization.val_batches_per_epoch is None:
             n_validation_examples = len(self.data_readers.validation_labels)
-            n_validation_batches = (
-                n_validation_examples // self.config.optimization.batch_size
-            )
+            n_validation_batches = n_validation_examples // self.global_batch_size
             self.config.optimization.val_batches_per_epoch = max(
                 self.config.optimization.min_val_batches_per_epoch, n_validation_batches
             )
@@ -1145,6 +1191,9 @@ class BottomUpModelTrainer(Trainer):
             optimization_config=self.config.optimization,
             confmaps_head=self.model.heads[0],
             pafs_head=self.model.heads[1],
+            num_replicas=self.strategy.num_replicas_in_sync,
+            num_workers=sleap.nn.system.get_num_workers(),
+            worker_index=sleap.nn.system.get_worker_index(),
         )
 
     @property
@@ -1287,6 +1336,15 @@ def main():
     )
     parser.add_argument("--prefix", default="", help="Prefix to prepend to run name.")
     parser.add_argument("--suffix", default="", help="Suffix to append to run name.")
+    parser.add_argument(
+        "--distribution_strategy",
+        default=None,
+        choices=sleap.nn.system.DISTRIBUTION_STRATEGIES,
+        help="Distribution strategy for data-parallel training across multiple "
+        "devices (overrides training job setting if set). Use 'mirrored' for all "
+        "local devices or 'multi_worker_mirrored' for a cluster specified in the "
+        "TF_CONFIG environment variable.",
+    )
 
     args, _ = parser.parse_known_args()
 
@@ -1315,6 +1373,8 @@ def main():
     if args.suffix != "":
         job_config.outputs.run_name_suffix = args.suffix
     job_config.outputs.save_visualizations = args.save_viz
+    if args.distribution_strategy is not None:
+        job_config.optimization.distribution_strategy = args.distribution_strategy
 
     logger.info(f"Training labels file: {args.labels_path}")
     logger.info(f"Training profile: {job_filename}")
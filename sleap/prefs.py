@@ -16,6 +16,10 @@ class Preferences(object):
         "hide skeleton dock": False,
         "hide instances dock": False,
         "hide labeling suggestions dock": False,
+        "prefetch frames ahead": 16,
+        "prefetch frames behind": 4,
+        "frame cache size (MB)": 512,
+        "frame loading threads": 2,
     }
     _filename = "preferences.yaml"
 
@@ -3,6 +3,7 @@ A miscellaneous set of utility functions. Try not to put things in here
 unless they really have no other place.
 """
 
+import contextlib
 import os
 import re
 import subprocess
@@ -20,7 +21,7 @@ import json
 import rapidjson
 import yaml
 
-from typing import Any, Dict, Hashable, Iterable, List, Optional
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional
 
 from sleap.io import pathutils
 
@@ -392,3 +393,27 @@ def open_file(filename):
     else:
         opener = "open" if sys.platform == "darwin" else "xdg-open"
         subprocess.call([opener, filename])
+
+
+@contextlib.contextmanager
+def replace_file_when_done(filename: str) -> Iterator[str]:
+    """
+    Yields temporary path (in same directory) which then replaces file.
+
+    If an exception is raised (e.g., if writing is cancelled), the temporary
+    file is removed and the original file is left as it was.
+
+    Example: ::
+
+       >>> with replace_file_when_done("labels.slp") as tmp_filename:
+       ...     Labels.save_file(labels, tmp_filename)
+
+    """
+    directory, basename = os.path.split(os.path.abspath(filename))
+    tmp_filename = os.path.join(directory, f".tmp_{os.getpid()}_{basename}")
+    try:
+        yield tmp_filename
+        os.replace(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
@@ -1,4 +1,5 @@
-from sleap.gui.commands import CommandContext
+from sleap.gui.commands import CommandContext, DeleteFramePredictions, UpdateTopic
+from sleap.instance import Track
 
 
 def test_delete_user_dialog(centered_pair_predictions):
@@ -15,3 +16,136 @@ def test_delete_user_dialog(centered_pair_predictions):
 
     # Make sure we now have user instances
     assert len(context.state["labeled_frame"].user_instances) == 2
+
+
+def test_undo_redo_add_instances(centered_pair_predictions):
+    labels = centered_pair_predictions
+    video = labels.videos[0]
+    context = CommandContext.from_labels(labels)
+    lf = labels.find(video, frame_idx=123)[0]
+    context.state["labeled_frame"] = lf
+
+    context.addUserInstancesFromPredictions()
+    assert len(lf.user_instances) == 2
+    assert context.state["has_changes"]
+    assert context.changed_frames() == {(video, 123)}
+
+    context.undo()
+    assert len(lf.user_instances) == 0
+    assert len(lf.predicted_instances) == 2
+    assert not context.state["has_changes"]
+    assert context.can_redo
+
+    context.redo()
+    assert len(lf.user_instances) == 2
+    assert context.state["has_changes"]
+
+    # Move point
+    instance = lf.user_instances[0]
+    node = instance.skeleton.nodes[0]
+    old_x, old_y = instance[node].x, instance[node].y
+    context.setPointLocations(instance, {node: (1.0, 2.0)})
+    assert (instance[node].x, instance[node].y) == (1.0, 2.0)
+
+    context.changestack_savepoint()
+    assert context.changed_frames() == set()
+
+    context.undo()
+    assert (instance[node].x, instance[node].y) == (old_x, old_y)
+    assert context.changed_frames() == {(video, 123)}
+
+    context.redo()
+    assert (instance[node].x, instance[node].y) == (1.0, 2.0)
+    assert not context.state["has_changes"]
+
+
+def test_undo_mark_points_complete(min_labels_slp):
+    labels = min_labels_slp
+    video = labels.videos[0]
+    context = CommandContext.from_labels(labels)
+    instance = labels[0].instances[0]
+    node = instance.skeleton.nodes[0]
+    instance[node].complete = False
+
+    # Marking node complete (without moving it) is recorded as a change
+    x, y = instance[node].x, instance[node].y
+    context.setPointLocations(instance, {node: (x, y)}, complete_nodes=[node])
+    assert instance[node].complete
+    assert context.state["has_changes"]
+    assert context.changed_frames() == {(video, 0)}
+
+    # Undoing change to frame which isn't the current frame updates everything
+    # for project (not just current frame).
+    updates = []
+    context.update_callback = updates.append
+    context.state["video"] = video
+    context.state["frame_idx"] = 1
+
+    context.undo()
+    assert not instance[node].complete
+    assert (instance[node].x, instance[node].y) == (x, y)
+    assert UpdateTopic.project_instances in updates[-1]
+    assert UpdateTopic.frame not in updates[-1]
+
+    context.state["frame_idx"] = 0
+    context.redo()
+    assert instance[node].complete
+    assert UpdateTopic.frame in updates[-1]
+
+
+def test_undo_delete_instance_track_keeps_order(min_labels_slp):
+    labels = min_labels_slp
+    video = labels.videos[0]
+    lf = labels[0]
+    track = Track(spawned_on=0, name="track")
+    labels.add_track(video, track)
+    for inst in lf.instances:
+        inst.track = track
+    instances = list(lf.instances)
+
+    context = CommandContext.from_labels(labels)
+    context.state["video"] = video
+    context.state["frame_idx"] = 0
+    context.state["labeled_frame"] = lf
+    context.state["instance"] = instances[0]
+
+    context.deleteSelectedInstanceTrack()
+    assert lf.instances == []
+
+    # Instances are restored in their original order
+    context.undo()
+    assert lf.instances == instances
+
+
+def test_undo_delete_and_track_changes(centered_pair_predictions):
+    labels = centered_pair_predictions
+    video = labels.videos[0]
+    context = CommandContext.from_labels(labels)
+    context.state["video"] = video
+    context.state["frame_idx"] = 123
+    context.state["has_frame_range"] = False
+
+    lf = labels.find(video, frame_idx=123)[0]
+    context.state["labeled_frame"] = lf
+    instances = list(lf.instances)
+    old_tracks = [inst.track for inst in instances]
+
+    context.execute(DeleteFramePredictions)
+    assert len(labels.find(video, frame_idx=123)) == 0
+
+    context.undo()
+    assert labels.find(video, frame_idx=123)[0] is lf
+    assert lf.instances == instances
+
+    # Swap tracks for current and subsequent frames
+    context.state["instance"] = instances[0]
+    context.setInstanceTrack(old_tracks[1])
+    assert [inst.track for inst in instances] == old_tracks[::-1]
+
+    context.undo()
+    assert [inst.track for inst in instances] == old_tracks
+
+    # Changes which we don't record can't be undone
+    context.changestack_push("other")
+    assert not context.can_undo
+    assert context.changed_frames() is None
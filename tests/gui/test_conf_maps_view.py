@@ -1,15 +1,42 @@
+import numpy as np
+
 from sleap.gui.widgets.video import QtVideoPlayer
-from sleap.gui.overlays.confmaps import ConfMapsPlot
+from sleap.gui.overlays.confmaps import ConfMapsPlot, colorize_confmaps
 
 
 def test_gui_conf_maps(qtbot, hdf5_confmaps):
 
     vp = QtVideoPlayer()
     vp.show()
-    conf_maps = ConfMapsPlot(hdf5_confmaps.get_frame(1), show_box=False)
+    frame = hdf5_confmaps.get_frame(1)
+    conf_maps = ConfMapsPlot(frame, show_box=False)
     vp.view.scene.addItem(conf_maps)
 
-    # make sure we're showing all the channels
-    assert len(conf_maps.childItems()) == 6
+    # make sure we're showing all the channels in a single image
+    assert len(conf_maps.childItems()) == 1
+    pixmap = conf_maps.childItems()[0].pixmap()
+    assert pixmap.width() == frame.shape[1]
+    assert pixmap.height() == frame.shape[0]
 
     assert vp.close()
+
+
+def test_colorize_confmaps():
+    confmaps = np.zeros((4, 5, 2), dtype=np.float32)
+    confmaps[1, 1, 0] = 1.0
+    confmaps[1, 1, 1] = 0.5
+    confmaps[2, 3, 1] = 0.5
+
+    image = colorize_confmaps(confmaps, [[200, 0, 0], [0, 100, 0]])
+
+    assert image.shape == (4, 5, 4)
+    assert image.dtype == np.uint8
+
+    # No confidence, so transparent
+    assert image[0, 0, 3] == 0
+
+    # Single channel has color scaled by confidence
+    assert tuple(image[2, 3]) == (0, 50, 0, 127)
+
+    # Second channel is drawn over first
+    assert tuple(image[1, 1]) == (100, 25, 0, 255)
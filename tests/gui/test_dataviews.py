@@ -82,3 +82,73 @@ def test_table_sort_string(qtbot):
     # Make sure we can sort with both numbers and strings (i.e., "")
     table.model().sort(0)
     table.model().sort(1)
+
+
+def test_table_fetch_more(qtbot):
+    items = [dict(a=i, b=str(i % 3)) for i in range(25)]
+    table_model = GenericTableModel(items=items, properties=["a", "b"])
+    table_model.fetch_batch_size = 10
+    table_model.items = items
+
+    assert table_model.rowCount() == 10
+    assert table_model.canFetchMore()
+
+    table_model.fetchMore()
+    assert table_model.rowCount() == 20
+
+    # Enabling sorting sorts by first column (descending)
+    table = GenericTableView(is_sortable=True, model=table_model)
+    assert table_model.original_items[0] == items[24]
+
+    # Selecting a row loads rows up to it
+    table.selectRowItem(items[2])
+    assert table_model.rowCount() >= 23
+    assert table.getSelectedRowItem() == items[2]
+
+    # Sort is stable, in both directions
+    table_model.sort(0)
+    table_model.sort(1, QtCore.Qt.SortOrder.DescendingOrder)
+    assert [item["a"] for item in table_model.original_items[:3]] == [2, 5, 8]
+    table_model.sort(1)
+    assert [item["a"] for item in table_model.original_items[:3]] == [0, 3, 6]
+    assert table_model.get_item_row(items[1]) == 9
+
+
+def test_table_update_rows(qtbot):
+    class CountTableModel(GenericTableModel):
+        properties = ("name", "count")
+
+        def item_to_data(self, obj, item):
+            return dict(name=item["name"], count=item["count"])
+
+    items = [dict(name="a", count=1), dict(name="b", count=2)]
+    table_model = CountTableModel(items=items)
+    table = GenericTableView(model=table_model)
+
+    assert table_model.data(table_model.index(1, 1)) == 2
+
+    items[1]["count"] = 5
+    # Row data is cached until we update it
+    assert table_model.data(table_model.index(1, 1)) == 2
+
+    with qtbot.waitSignal(table_model.dataChanged):
+        assert table_model.update_items(lambda item: item["name"] == "b") == 1
+    assert table_model.data(table_model.index(1, 1)) == 5
+
+
+def test_table_items_lazy(qtbot):
+    class NameTableModel(GenericTableModel):
+        properties = ("name",)
+
+        def item_to_data(self, obj, item):
+            return dict(name=item["name"].upper())
+
+    items = [dict(name=name) for name in "abc"]
+    table_model = NameTableModel(items=items)
+
+    # Getting items doesn't build data for rows which haven't been shown
+    assert table_model.items == items
+    assert table_model._item_data == [None, None, None]
+
+    assert table_model.data(table_model.index(1, 0)) == "B"
+    assert table_model.items == items
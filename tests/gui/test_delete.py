@@ -1,4 +1,4 @@
-from sleap.gui.commands import CommandContext
+from sleap.gui.commands import CommandContext, UpdateTopic
 from sleap.gui.dialogs.delete import DeleteDialog
 
 
@@ -65,3 +65,40 @@ def test_delete_all(centered_pair_predictions, qtbot):
 
     # Make sure the all empty frames were also deleted
     assert centered_pair_predictions.labeled_frames == []
+
+
+def test_delete_dialog_command_undo(min_labels_slp, qtbot, monkeypatch):
+    labels = min_labels_slp
+    video = labels.videos[0]
+    lf = labels[0]
+    instances = list(lf.instances)
+
+    context = CommandContext.from_labels(labels)
+    context.state["frame_idx"] = 0
+    context.state["video"] = video
+    context.state["labeled_frame"] = lf
+    context.state["has_frame_range"] = False
+
+    def accept_dialog(dialog):
+        dialog.instance_type_menu.setCurrentText("user instances")
+        dialog.accept()
+        return True
+
+    monkeypatch.setattr(DeleteDialog, "exec_", accept_dialog)
+    updates = []
+    context.update_callback = updates.append
+
+    context.deleteDialog()
+    assert labels.labeled_frames == []
+    assert context.state["has_changes"]
+    assert context.can_undo
+    assert context._change_stack.undo_name == "DeleteDialogCommand"
+
+    context.undo()
+    assert labels.labeled_frames == [lf]
+    assert lf.instances == instances
+    assert UpdateTopic.project_instances in updates[-1]
+    assert not context.state["has_changes"]
+
+    context.redo()
+    assert labels.labeled_frames == []
@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+from PySide2 import QtCore, QtWidgets
+
+from sleap.gui.dialogs.progress import run_with_progress
+from sleap.io.format.adaptor import OperationCancelled, report_progress
+
+
+def test_run_with_progress(qtbot):
+    main_thread = threading.current_thread()
+    callback_threads = []
+
+    def main_thread_callback(x):
+        callback_threads.append(threading.current_thread())
+        return x * 2
+
+    def work(a, callback, progress_callback):
+        assert threading.current_thread() is not main_thread
+        for i in range(3):
+            report_progress(progress_callback, i, 3)
+        return callback(a)
+
+    result = run_with_progress(
+        work,
+        message="Working...",
+        kwargs=dict(a=5),
+        main_thread_kwargs=dict(callback=main_thread_callback),
+    )
+    assert result == 10
+    assert callback_threads == [main_thread]
+
+
+def test_run_with_progress_exception(qtbot):
+    def work(progress_callback):
+        raise OperationCancelled()
+
+    with pytest.raises(OperationCancelled):
+        run_with_progress(work, message="Working...")
+
+
+def test_run_with_progress_excludes_user_input(qtbot, monkeypatch):
+    process_events_flags = []
+    process_events = QtWidgets.QApplication.processEvents
+
+    def spy_process_events(*args):
+        process_events_flags.append(args[0] if args else None)
+        return process_events(*args)
+
+    monkeypatch.setattr(
+        QtWidgets.QApplication, "processEvents", staticmethod(spy_process_events)
+    )
+
+    def work(progress_callback):
+        time.sleep(0.2)
+        return True
+
+    assert run_with_progress(work, message="Working...")
+
+    # Dialog isn't shown yet, so user input (e.g., edits) must wait.
+    assert process_events_flags
+    assert all(
+        flags == QtCore.QEventLoop.ExcludeUserInputEvents
+        for flags in process_events_flags
+    )
@@ -1,4 +1,13 @@
-from sleap.gui.widgets.slider import VideoSlider, set_slider_marks_from_labels
+import numpy as np
+
+from sleap.gui.widgets.slider import (
+    SliderMark,
+    VideoSlider,
+    downsample_series,
+    get_series_arrays,
+    set_slider_marks_from_labels,
+    update_slider_marks_for_frame,
+)
 
 
 def test_slider(qtbot, centered_pair_predictions):
@@ -39,3 +48,89 @@ def test_slider(qtbot, centered_pair_predictions):
 
     slider.setEnabled(True)
     assert slider.enabled()
+
+
+def test_slider_marks_image(qtbot):
+    slider = VideoSlider(min=0, max=1000, val=0)
+    slider.setMarks(
+        [SliderMark("simple", 10), SliderMark("track", 20, end_val=500, row=0)]
+    )
+
+    # Only tick marks get their own scene items
+    assert all(mark.type == "tick" for mark in slider._mark_items.keys())
+    assert not slider._marks_image.pixmap().isNull()
+
+    assert [mark.val for mark in slider.getMarksAtVal(10)] == [10]
+    assert [mark.val for mark in slider.getMarksAtVal(100)] == [20]
+    assert slider.getMarksAtVal(600) == []
+
+    mark = SliderMark("filled", 600)
+    slider.addMark(mark)
+    assert slider.getMarksAtVal(600) == [mark]
+    slider.removeMarks([mark])
+    assert slider.getMarksAtVal(600) == []
+    assert mark not in slider.getMarks()
+
+
+def test_slider_thin_marks_image(qtbot):
+    import qimage2ndarray
+
+    slider = VideoSlider(min=0, max=1000, val=0)
+    slider.setMarks([SliderMark("simple_thin", 500)])
+
+    image = slider._marks_image.pixmap().toImage()
+    pixels = qimage2ndarray.byte_view(image)
+
+    # Thin marks have no visual width but are still drawn as a 1-px line
+    assert np.count_nonzero(pixels.any(axis=(0, 2))) == 1
+
+
+def test_update_slider_marks_for_frame(qtbot, centered_pair_predictions):
+    labels = centered_pair_predictions
+    video = labels.videos[0]
+
+    def mark_keys(slider):
+        return sorted(
+            (mark.type, mark.val, mark.end_val or 0, mark.row or 0)
+            for mark in slider.getMarks()
+            if mark.type != "tick"
+        )
+
+    slider = VideoSlider(min=0, max=video.last_frame_idx)
+    set_slider_marks_from_labels(slider, labels, video)
+
+    # Remove an instance from the middle of a track
+    lf = labels.find(video, 100)[0]
+    labels.remove_instance(lf, lf.instances[0])
+    update_slider_marks_for_frame(slider, labels, video, 100)
+
+    expected_slider = VideoSlider(min=0, max=video.last_frame_idx)
+    set_slider_marks_from_labels(expected_slider, labels, video)
+
+    assert mark_keys(slider) == mark_keys(expected_slider)
+
+
+def test_downsample_series():
+    frame_idxs, vals = get_series_arrays({7: 2.0, 0: -1.0, 1: -3.0, 4: 5.0})
+    assert list(frame_idxs) == [0, 1, 4, 7]
+    assert list(vals) == [-1.0, -3.0, 5.0, 2.0]
+
+    # Missing frames count as zero
+    bin_idxs, sampled = downsample_series(frame_idxs, vals, step=2)
+    assert list(bin_idxs) == [0, 2, 4, 6]
+    assert list(sampled) == [-1.0, 0.0, 5.0, 2.0]
+
+    frame_idxs, vals = get_series_arrays(np.array([3.0, 1.0, 4.0, 1.0, 5.0]))
+    bin_idxs, sampled = downsample_series(frame_idxs, vals, step=3)
+    assert list(bin_idxs) == [0, 3]
+    assert list(sampled) == [4.0, 5.0]
+
+
+def test_slider_header(qtbot):
+    slider = VideoSlider(min=0, max=1000, val=0)
+    slider.setHeaderSeries((np.arange(0, 1000, 2), np.ones(500)))
+    assert not slider.poly.path().isEmpty()
+
+    slider.clearHeader()
+    slider.setHeaderSeries()
+    assert slider.poly.path().isEmpty()
@@ -1,4 +1,7 @@
+import pytest
+
 from sleap.gui.suggestions import VideoFrameSuggestions
+from sleap.io.format.adaptor import OperationCancelled
 
 
 def test_velocity_suggestions(centered_pair_predictions):
@@ -9,3 +12,37 @@ def test_velocity_suggestions(centered_pair_predictions):
     assert len(suggestions) == 45
     assert suggestions[0].frame_idx == 21
     assert suggestions[1].frame_idx == 45
+
+
+def test_suggest_by_video(centered_pair_predictions):
+    labels = centered_pair_predictions
+    params = dict(method="sample", per_video=5, sampling_method="stride")
+
+    results = []
+    progress = []
+
+    def progress_callback(done, total):
+        progress.append((done, total))
+
+    suggestions = VideoFrameSuggestions.suggest_by_video(
+        params=params,
+        labels=labels,
+        results_callback=results.append,
+        progress_callback=progress_callback,
+    )
+
+    n_videos = len(labels.videos)
+    assert len(suggestions) == 5 * n_videos
+    assert len(results) == n_videos
+    assert results[-1] == suggestions
+    assert progress[-1] == (n_videos, n_videos)
+
+    # Cancel before any results
+    with pytest.raises(OperationCancelled):
+        VideoFrameSuggestions.suggest_by_video(
+            params=params,
+            labels=labels,
+            results_callback=results.append,
+            progress_callback=lambda done, total: -1,
+        )
+    assert len(results) == n_videos
@@ -36,3 +36,24 @@ def test_track_trails(centered_pair_predictions):
     ]
 
     assert test_trail in trails
+
+
+def test_track_trails_reuses_frames(centered_pair_predictions):
+    labels = centered_pair_predictions
+    video = labels.videos[0]
+    trail_manager = TrackTrailOverlay(labels, player=None, trail_length=6)
+
+    trails = trail_manager.get_track_trails(
+        trail_manager.get_frame_selection(video, 27)
+    )
+
+    # Stepping forward gives same trails as computing them from scratch
+    frames = trail_manager.get_frame_selection(video, 28)
+    assert frames[0].frame_idx == 23
+    trails = trail_manager.get_track_trails(frames)
+
+    new_trail_manager = TrackTrailOverlay(labels, player=None, trail_length=6)
+    assert trails == new_trail_manager.get_track_trails(frames)
+
+    trail_manager.clear_cache()
+    assert trails == trail_manager.get_track_trails(frames)
@@ -1,6 +1,7 @@
-from sleap.gui.widgets.video import QtVideoPlayer
+from sleap.gui.widgets.video import QtVideoPlayer, FrameImageCache, LoadImageWorker
 
 import PySide2.QtCore as QtCore
+from PySide2.QtGui import QImage
 
 
 def test_gui_video(qtbot):
@@ -77,3 +78,136 @@ def test_gui_video_instances(qtbot, small_robot_mp4_vid, centered_pair_labels):
     assert cb.args[0] == [inst_1, inst_0]
 
     assert vp.close()
+
+
+def test_gui_video_instances_layer(
+    qtbot, small_robot_mp4_vid, centered_pair_predictions
+):
+    vp = QtVideoPlayer(small_robot_mp4_vid)
+    qtbot.addWidget(vp)
+
+    labeled_frame = centered_pair_predictions.labeled_frames[0]
+
+    def plot_instances(vp, idx):
+        for instance in labeled_frame.instances:
+            vp.addInstance(instance=instance)
+
+    vp.changedPlot.connect(plot_instances)
+
+    vp.show()
+    vp.plot()
+
+    # Nodes and edges for predicted instances are drawn by single item
+    layer = vp.view.instances_layer
+    assert len(vp.predicted_instances) == len(labeled_frame.instances)
+    assert len(layer.instances) == len(labeled_frame.instances)
+    assert all(inst.in_layer and not inst.nodes for inst in vp.predicted_instances)
+    assert not layer.boundingRect().isEmpty()
+    vp.grab()
+
+    # Selected instance gets items for nodes and edges
+    vp.view.selectInstance(0)
+    selected = vp.predicted_instances[0]
+    assert not selected.in_layer
+    assert len(selected.nodes) == len(selected.instance.nodes)
+    assert selected not in layer.instances
+    assert vp.view.getSelectionInstance() == selected.instance
+    vp.grab()
+
+    # and goes back to layer when unselected
+    vp.view.selectInstance(None)
+    assert selected.in_layer
+    assert not selected.nodes
+    assert len(layer.instances) == len(labeled_frame.instances)
+
+    assert vp.close()
+
+
+def test_frame_image_cache():
+    qimage = QImage(10, 10, QImage.Format_RGB32)
+    size = qimage.byteCount()
+    cache = FrameImageCache(max_bytes=size * 2)
+
+    cache.put(("video", 0), qimage)
+    cache.put(("video", 1), QImage(qimage))
+    assert len(cache) == 2
+    assert cache.n_bytes == size * 2
+
+    # Access frame 0 so that frame 1 is the least recently used
+    assert cache.get(("video", 0)) is qimage
+    cache.put(("video", 2), QImage(qimage))
+    assert len(cache) == 2
+    assert ("video", 0) in cache
+    assert ("video", 1) not in cache
+    assert ("video", 2) in cache
+    assert cache.get(("video", 1)) is None
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.n_bytes == 0
+
+
+def test_load_image_worker_prefetch(qtbot, small_robot_mp4_vid):
+    worker = LoadImageWorker()
+    worker.prefetch_ahead = 3
+    worker.prefetch_behind = 1
+    worker.video = small_robot_mp4_vid
+
+    with qtbot.waitSignal(worker.result, timeout=5000) as blocker:
+        worker.request(10)
+        worker.doProcessing()
+    assert blocker.args[0].width() == small_robot_mp4_vid.width
+    assert (small_robot_mp4_vid, 10) in worker.cache
+
+    # Wait for the frames around the requested frame to be prefetched
+    for future in list(worker._prefetching.values()):
+        future.result()
+    for frame_idx in (9, 11, 12, 13):
+        assert (small_robot_mp4_vid, frame_idx) in worker.cache
+
+    # Moving backwards prefetches in the other direction
+    worker.request(9)
+    worker.doProcessing()
+    for future in list(worker._prefetching.values()):
+        future.result()
+    for frame_idx in (6, 7, 8):
+        assert (small_robot_mp4_vid, frame_idx) in worker.cache
+
+    worker.shutdown()
+
+
+def test_load_image_worker_paused(qtbot, small_robot_mp4_vid):
+    worker = LoadImageWorker()
+    worker.prefetch_ahead = 3
+    worker.prefetch_behind = 1
+    worker.video = small_robot_mp4_vid
+
+    worker.request(10)
+    worker.doProcessing()
+    assert (small_robot_mp4_vid, 10) in worker.cache
+
+    # Pausing waits for prefetching to finish and clears the cache, so that
+    # nothing is loaded from the video backend while it's replaced.
+    with worker.paused():
+        assert not worker._prefetching
+        assert len(worker.cache) == 0
+    assert len(worker.cache) == 0
+
+    worker.request(10)
+    worker.doProcessing()
+    worker.clear_cache()
+    assert not worker._prefetching
+    assert len(worker.cache) == 0
+
+    worker.shutdown()
+
+
+def test_load_video_clears_frame_cache(qtbot, small_robot_mp4_vid):
+    vp = QtVideoPlayer(small_robot_mp4_vid)
+    worker = vp._video_image_loader
+    worker.cache.put((small_robot_mp4_vid, 0), QImage(10, 10, QImage.Format_RGB32))
+
+    vp.load_video(small_robot_mp4_vid, plot=False)
+    assert (small_robot_mp4_vid, 0) not in worker.cache
+
+    assert vp.close()
@@ -0,0 +1,22 @@
+from sleap.info.benchmark_io import benchmark_json_load, benchmark_save, make_labels
+
+
+def test_make_labels():
+    labels = make_labels(num_frames=5, num_instances=3, num_nodes=4)
+    assert len(labels) == 5
+    assert len(labels.all_instances) == 15
+    assert len(labels.tracks) == 3
+    assert len(labels.skeletons[0].nodes) == 4
+
+
+def test_benchmark_save():
+    results = benchmark_save([10, 20], repeats=1)
+    assert [result["frames"] for result in results] == [10, 20]
+    assert all(result["save"] > 0 for result in results)
+
+
+def test_benchmark_json_load():
+    results = benchmark_json_load([10], repeats=1)
+    assert results[0]["frames"] == 10
+    assert results[0]["load"] > 0
+    assert results[0]["load_cattr"] > 0
@@ -1,10 +1,13 @@
 import numpy as np
+import pytest
 
+from sleap.info import feature_suggestions
 from sleap.info.feature_suggestions import (
     FrameItem,
     FrameGroupSet,
     ItemStack,
     FeatureSuggestionPipeline,
+    clear_stage_cache,
 )
 
 
@@ -137,3 +140,63 @@ def test_feature_suggestion_pipeline(centered_pair_vid):
     suggestions = pipeline.get_suggestion_frames(videos)
 
     assert len(suggestions) == 2
+
+
+def test_feature_suggestion_pipeline_cache(centered_pair_vid, monkeypatch):
+    clear_stage_cache()
+    videos = [centered_pair_vid]
+
+    def make_pipeline(**kwargs):
+        return FeatureSuggestionPipeline(
+            per_video=5,
+            scale=0.1,
+            sample_method="stride",
+            feature_type="raw",
+            n_components=3,
+            per_cluster=1,
+            **kwargs,
+        )
+
+    suggestions = make_pipeline(n_clusters=2).get_suggestion_frames(videos)
+    assert len(suggestions) == 2
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Frame images should have been cached.")
+
+    # Changing clustering params shouldn't require reloading frames.
+    monkeypatch.setattr(ItemStack, "get_raw_images", fail)
+    suggestions = make_pipeline(n_clusters=3).get_suggestion_frames(videos)
+    assert len(suggestions) == 3
+
+    # Unless we don't want to use cached results.
+    with pytest.raises(AssertionError):
+        make_pipeline(n_clusters=3, use_cache=False).get_suggestion_frames(videos)
+
+    clear_stage_cache()
+    with pytest.raises(AssertionError):
+        make_pipeline(n_clusters=2).get_suggestion_frames(videos)
+
+
+def test_feature_suggestion_pipeline_cache_limits(centered_pair_vid, monkeypatch):
+    clear_stage_cache()
+    videos = [centered_pair_vid]
+
+    def make_pipeline(**kwargs):
+        return FeatureSuggestionPipeline(
+            per_video=5,
+            scale=0.1,
+            feature_type="raw",
+            n_components=3,
+            n_clusters=2,
+            per_cluster=1,
+            **kwargs,
+        )
+
+    # Random samples aren't cached, so we get a new sample each time.
+    make_pipeline(sample_method="random").get_suggestion_frames(videos)
+    assert not feature_suggestions._stage_cache
+
+    # Results which would use too much memory aren't cached.
+    monkeypatch.setattr(feature_suggestions, "STAGE_CACHE_MAX_BYTES", 10)
+    make_pipeline(sample_method="stride").get_suggestion_frames(videos)
+    assert not feature_suggestions._stage_cache
@@ -6,8 +6,11 @@ import numpy as np
 from sleap.info.write_tracking_h5 import (
     get_tracks_as_np_strings,
     get_occupancy_and_points_matrices,
+    get_video_analysis_kwargs,
+    get_video_output_path,
     remove_empty_tracks_from_matrices,
     write_occupancy_file,
+    write_streamed_analysis_file,
 )
 
 
@@ -87,3 +90,28 @@ def test_hdf5_tranposed_saving(tmpdir):
 
     with h5py.File(path, "r") as f:
         assert f["x"].shape == np.transpose(x).shape
+
+
+def test_streamed_analysis_file(tmpdir, centered_pair_predictions):
+    labels = centered_pair_predictions
+    video = labels.videos[0]
+    path = os.path.join(tmpdir, "streamed.analysis.h5")
+
+    occupancy, points = get_occupancy_and_points_matrices(labels, all_frames=True)
+    assert points.dtype == np.float32
+
+    # Use small blocks so file is written in many blocks.
+    kwargs = get_video_analysis_kwargs(labels, video, path, all_frames=True)
+    write_streamed_analysis_file(chunk_bytes=1024 * 1024, **kwargs)
+
+    with h5py.File(path, "r") as f:
+        assert np.all(f["track_occupancy"][:] == np.transpose(occupancy))
+        assert np.allclose(f["tracks"][:], np.transpose(points), equal_nan=True)
+        assert len(f["track_names"]) == 27
+
+
+def test_video_output_path(centered_pair_vid):
+    assert (
+        get_video_output_path("tmp/labels.analysis.h5", 2, centered_pair_vid)
+        == "tmp/labels.002_centered_pair_small.analysis.h5"
+    )
@@ -1,3 +1,5 @@
+import numpy as np
+
 from sleap.info.summary import StatisticSeries
 
 
@@ -40,3 +42,64 @@ def test_frame_statistics(simple_predictions):
     assert len(x) == 2
     assert x[0] == 0
     assert x[1] == 18.0
+
+
+def test_frame_statistics_update_frames(simple_predictions):
+    labels = simple_predictions
+    video = labels.videos[0]
+    stats = StatisticSeries(labels)
+
+    frame_idxs, vals = stats.get_series_arrays(video, "instance_score", "sum")
+    assert list(frame_idxs) == [0, 1]
+    assert list(vals) == [7, 9]
+
+    # Cached statistics are only changed for frames we say were updated
+    labels[1].instances.pop(0)
+    assert stats.get_instance_score_series(video, "sum")[1] == 9
+
+    stats.update_frames(video, [1])
+    assert stats.get_instance_score_series(video, "sum") == {0: 7, 1: 6}
+    assert stats.get_point_count_series(video) == {0: 4, 1: 2}
+    assert stats.get_point_displacement_series(video, "max") == {0: 0, 1: 13.0}
+
+    labels.remove(labels[1])
+    stats.update_frames(video, [1])
+    assert stats.get_instance_score_series(video, "sum") == {0: 7}
+
+    stats.invalidate()
+    assert stats.get_point_count_series(video) == {0: 4}
+
+
+def test_frame_statistics_update_frames_columns(monkeypatch):
+    from sleap.info.benchmark_io import make_labels
+    from sleap.instance import LabeledFrame
+
+    labels = make_labels(num_frames=30, num_instances=2, num_nodes=3)
+    video = labels.videos[0]
+    stats = StatisticSeries(labels)
+    stats.get_columns(video)
+
+    table_sizes = []
+    get_instance_table = stats._get_instance_table
+
+    def spy(video, frame_idxs=None):
+        table_sizes.append(None if frame_idxs is None else len(frame_idxs))
+        return get_instance_table(video, frame_idxs)
+
+    monkeypatch.setattr(stats, "_get_instance_table", spy)
+
+    labels[5].instances[0].points[0].x += 10
+    labels[12].instances[1].track = None
+    labels.remove(labels[20])
+    lf = LabeledFrame(video=video, frame_idx=40, instances=labels[3].instances[:1])
+    labels.append(lf)
+    stats.update_frames(video, [5, 12, 20, 40, 41])
+
+    # Only changed frames and their neighbours are tabulated again.
+    assert table_sizes == [10]
+
+    expected = StatisticSeries(labels).get_columns(video)
+    columns = stats.get_columns(video)
+    assert columns.keys() == expected.keys()
+    for key in expected:
+        np.testing.assert_array_equal(columns[key], expected[key])
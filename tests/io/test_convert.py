@@ -0,0 +1,87 @@
+import os
+import shutil
+
+import h5py
+import numpy as np
+
+from sleap.info.write_tracking_h5 import get_occupancy_and_points_matrices
+from sleap.io.convert import (
+    convert_file,
+    convert_files,
+    get_default_output_path,
+    get_input_paths,
+)
+from sleap.io.dataset import Labels
+
+
+def test_default_output_path():
+    assert get_default_output_path("a/b.slp") == "a/b.slp.slp"
+    assert get_default_output_path("a/b.slp", "json") == "a/b.slp.json"
+    assert get_default_output_path("a/b.slp", "analysis") == "a/b.analysis.h5"
+    assert get_default_output_path("b.json.zip", "analysis") == "b.analysis.h5"
+
+
+def test_convert_slp_to_analysis(tmpdir, min_labels_slp):
+    input_path = os.path.join(tmpdir, "labels.slp")
+    Labels.save_file(min_labels_slp, input_path)
+
+    # Analysis file is written straight from the .slp file.
+    output_paths = convert_file(input_path, format="analysis")
+    assert output_paths == [os.path.join(tmpdir, "labels.analysis.h5")]
+
+    occupancy, points = get_occupancy_and_points_matrices(
+        min_labels_slp, all_frames=True
+    )
+    with h5py.File(output_paths[0], "r") as f:
+        assert np.all(f["track_occupancy"][:] == np.transpose(occupancy))
+        assert np.allclose(f["tracks"][:], np.transpose(points), equal_nan=True)
+
+
+def test_get_input_paths(tmpdir):
+    for name in ("a.slp", "b.slp", "c.json"):
+        open(os.path.join(tmpdir, name), "w").close()
+
+    manifest_path = os.path.join(tmpdir, "manifest.txt")
+    with open(manifest_path, "w") as f:
+        f.write("# comment\nc.json\n\nb.slp\n")
+
+    input_paths = get_input_paths([os.path.join(tmpdir, "*.slp")], manifest_path)
+    assert input_paths == [
+        os.path.join(tmpdir, "a.slp"),
+        os.path.join(tmpdir, "b.slp"),
+        os.path.join(tmpdir, "c.json"),
+    ]
+
+
+def test_convert_files(tmpdir, min_labels_slp):
+    input_paths = [os.path.join(tmpdir, f"{i}.slp") for i in range(3)]
+    Labels.save_file(min_labels_slp, input_paths[0])
+    for input_path in input_paths[1:]:
+        shutil.copy(input_paths[0], input_path)
+
+    bad_path = os.path.join(tmpdir, "bad.slp")
+    with open(bad_path, "w") as f:
+        f.write("not a labels file")
+
+    output_dir = os.path.join(tmpdir, "out")
+    os.mkdir(output_dir)
+
+    results = convert_files(
+        input_paths + [bad_path], format="analysis", output_dir=output_dir, jobs=2
+    )
+    results = {input_path: (outputs, error) for input_path, outputs, error in results}
+    for i, input_path in enumerate(input_paths):
+        assert results[input_path] == (
+            [os.path.join(output_dir, f"{i}.analysis.h5")],
+            None,
+        )
+    assert results[bad_path][1] is not None
+
+    # Outputs which are up to date are skipped.
+    results = convert_files(input_paths, format="analysis", output_dir=output_dir)
+    assert all(outputs == [] and error is None for _, outputs, error in results)
+
+    results = convert_files(
+        input_paths[:1], format="analysis", output_dir=output_dir, overwrite=True
+    )
+    assert results[0][1] == [os.path.join(output_dir, "0.analysis.h5")]
@@ -1,4 +1,5 @@
 import os
+import h5py
 import pytest
 import numpy as np
 
@@ -290,6 +291,29 @@ def test_label_mutability():
     assert len(labels.find(dummy_video)) == 0
 
 
+def test_find_frames_up_to():
+    video = Video(backend=MediaVideo)
+    labels = Labels()
+    for frame_idx in (8, 2, 5, 20):
+        labels.append(LabeledFrame(video, frame_idx=frame_idx))
+
+    def frame_idxs(*args, **kwargs):
+        return [lf.frame_idx for lf in labels.find_frames_up_to(video, *args, **kwargs)]
+
+    assert frame_idxs(10) == [2, 5, 8]
+    assert frame_idxs(10, count=2) == [5, 8]
+    assert frame_idxs(8, count=1) == [8]
+    assert frame_idxs(1) == []
+
+    # Sorted index is kept up to date as frames are added and removed
+    labels.append(LabeledFrame(video, frame_idx=6))
+    labels.remove(labels.find(video, 5)[0])
+    assert frame_idxs(10) == [2, 6, 8]
+    assert frame_idxs(100, count=3) == [6, 8, 20]
+
+    assert Labels().find_frames_up_to(video, 10) == []
+
+
 def test_labels_merge():
     dummy_video = Video(backend=MediaVideo)
     dummy_skeleton = Skeleton()
@@ -857,3 +881,75 @@ def test_provenance(tmpdir):
     labels = Labels.load_file(filename)
     print(labels.provenance)
     assert labels.provenance["source"] == "test_provenance"
+
+
+def test_save_changed_frames_hdf5(centered_pair_predictions, tmpdir):
+    from sleap.io.format.hdf5 import LabelsV1Adaptor
+
+    labels = centered_pair_predictions
+    filename = os.path.join(tmpdir, "test.slp")
+    Labels.save_file(labels, filename)
+
+    video = labels.videos[0]
+    changed_frames = set()
+
+    # Move points (same layout, so rows are overwritten)
+    lf = labels.labeled_frames[0]
+    lf.instances[0].get_points_array(copy=False, full=True)["x"] = 3.0
+    changed_frames.add((video, lf.frame_idx))
+
+    # Add user instance from prediction (rows are appended)
+    lf = labels.labeled_frames[1]
+    predicted = lf.instances[0]
+    instance = Instance(
+        skeleton=predicted.skeleton, track=predicted.track, from_predicted=predicted
+    )
+    instance[predicted.skeleton.nodes[0]] = Point(x=1.0, y=2.0)
+    labels.add_instance(lf, instance)
+    changed_frames.add((video, lf.frame_idx))
+
+    # Remove frame
+    lf = labels.labeled_frames[2]
+    labels.remove(lf)
+    changed_frames.add((video, lf.frame_idx))
+
+    size = os.path.getsize(filename)
+    assert LabelsV1Adaptor.write_changed_frames(filename, labels, changed_frames)
+
+    # Rows for removed frames are removed, not just marked as deleted.
+    with h5py.File(filename, "r") as f:
+        assert len(f["frames"]) == len(labels)
+        assert np.all(f["frames"]["video"] < len(labels.videos))
+
+    def check_matches(loaded_labels):
+        assert len(loaded_labels) == len(labels)
+        for lf in labels:
+            loaded_lf = loaded_labels.find(loaded_labels.videos[0], lf.frame_idx)[0]
+            assert len(loaded_lf.instances) == len(lf.instances)
+            for inst, loaded_inst in zip(lf.instances, loaded_lf.instances):
+                assert inst.matches(loaded_inst)
+            if instance in lf.instances:
+                loaded_inst = loaded_lf.instances[lf.instances.index(instance)]
+                assert loaded_inst.from_predicted.matches(predicted)
+
+    check_matches(Labels.load_file(filename))
+
+    # Unused instance and point rows are kept until file is compacted.
+    LabelsV1Adaptor.compact(filename)
+    check_matches(Labels.load_file(filename))
+    assert os.path.getsize(filename) < size + 10000
+
+
+def test_cancelled_save_keeps_file(min_labels_slp, tmpdir):
+    from sleap.io.format.adaptor import OperationCancelled
+
+    filename = os.path.join(tmpdir, "test.slp")
+    Labels.save_file(min_labels_slp, filename)
+    size = os.path.getsize(filename)
+
+    with pytest.raises(OperationCancelled):
+        Labels.save_file(Labels(), filename, progress_callback=lambda done, total: -1)
+
+    assert os.path.getsize(filename) == size
+    assert len(Labels.load_file(filename)) == len(min_labels_slp)
+    assert os.listdir(tmpdir) == ["test.slp"]
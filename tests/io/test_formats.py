@@ -1,4 +1,7 @@
 from sleap.io.format import read, dispatch, adaptor, text, genericjson, hdf5, filehandle
+from sleap.instance import PredictedInstance
+import json
+import numpy as np
 import pytest
 import os
 
@@ -124,6 +127,43 @@ def test_analysis_hdf5(tmpdir, centered_pair_predictions):
     assert len(labels.all_instances) == len(centered_pair_predictions.all_instances)
 
 
+def test_analysis_hdf5_multiple_videos(tmpdir, min_labels_slp, small_robot_mp4_vid):
+    from sleap.io.format.sleap_analysis import SleapAnalysisAdaptor
+    from sleap.instance import Instance, LabeledFrame, Track
+
+    labels = min_labels_slp
+    instance = Instance.from_pointsarray(
+        labels[0].instances[0].points_array, skeleton=labels.skeletons[0]
+    )
+    labels.append(
+        LabeledFrame(video=small_robot_mp4_vid, frame_idx=3, instances=[instance])
+    )
+    assert len(labels.videos) == 2
+
+    # Analysis file has points by track, so give each instance a track.
+    for inst in labels.all_instances:
+        inst.track = Track(spawned_on=0, name=f"track_{len(labels.tracks)}")
+        labels.tracks.append(inst.track)
+
+    filename = os.path.join(tmpdir, "labels.analysis.h5")
+    output_paths = SleapAnalysisAdaptor.write(filename, labels)
+    assert len(output_paths) == 2
+    assert output_paths[1] == os.path.join(
+        tmpdir, "labels.001_small_robot.analysis.h5"
+    )
+
+    for video, output_path in zip(labels.videos, output_paths):
+        video_labels = read(
+            output_path, for_object="labels", as_format="analysis", video=video
+        )
+        assert [lf.frame_idx for lf in video_labels] == [
+            lf.frame_idx for lf in labels.find(video)
+        ]
+        assert len(video_labels.all_instances) == sum(
+            len(lf.instances) for lf in labels.find(video)
+        )
+
+
 def test_json_v1(tmpdir, centered_pair_labels):
     filename = os.path.join(tmpdir, "test.json")
     disp = dispatch.Dispatch.make_dispatcher(adaptor.SleapObjectType.labels)
@@ -155,3 +195,136 @@ def test_matching_adaptor():
     #     for_object="labels",
     #     as_format="*"
     # )
+
+
+@pytest.mark.parametrize("ext", ["slp", "json"])
+def test_labels_progress_callback(tmpdir, centered_pair_predictions, ext):
+    filename = os.path.join(tmpdir, f"test.{ext}")
+    disp = dispatch.Dispatch.make_dispatcher(adaptor.SleapObjectType.labels)
+
+    progress = []
+    disp.write(
+        filename,
+        centered_pair_predictions,
+        progress_callback=lambda done, total: progress.append((done, total)),
+    )
+    assert progress[0][0] == 0
+    assert progress[-1][0] == progress[-1][1]
+
+    progress = []
+    labels = disp.read(
+        filename, progress_callback=lambda done, total: progress.append((done, total))
+    )
+    assert len(labels) == len(centered_pair_predictions)
+    assert progress[-1][0] == progress[-1][1]
+
+    # Returning -1 from callback cancels
+    with pytest.raises(adaptor.OperationCancelled):
+        disp.read(filename, progress_callback=lambda done, total: -1)
+
+
+def test_labels_json_bulk_read(tmpdir, min_labels):
+    from sleap.info.benchmark_io import make_labels
+    from sleap.instance import Instance, Point
+    from sleap.io.format.labels_json import LabelsJsonAdaptor
+    from sleap.util import json_loads
+
+    labels = make_labels(num_frames=20, num_instances=2, num_nodes=4)
+    labels.labeled_frames[0].instances[0].track = None
+    for lf in labels.labeled_frames[::2]:
+        predicted = lf.instances[0]
+        instance = Instance(skeleton=predicted.skeleton, from_predicted=predicted)
+        instance["node1"] = Point(x=lf.frame_idx, y=2.0, visible=False)
+        lf.instances.append(instance)
+
+    for original in (labels, min_labels):
+        filename = os.path.join(tmpdir, "test.json")
+        disp = dispatch.Dispatch.make_dispatcher(adaptor.SleapObjectType.labels)
+        disp.write(filename, original)
+
+        with open(filename, "r") as f:
+            dicts = json_loads(f.read())
+
+        # Frames created in bulk should match those structured one by one.
+        expected = LabelsJsonAdaptor.from_json_data(dicts, bulk=False)
+        for loaded in (LabelsJsonAdaptor.from_json_data(dicts), disp.read(filename)):
+            assert len(loaded) == len(expected)
+            for lf, expected_lf in zip(loaded, expected):
+                assert lf.frame_idx == expected_lf.frame_idx
+                assert len(lf.instances) == len(expected_lf.instances)
+                for inst, expected_inst in zip(lf.instances, expected_lf.instances):
+                    assert type(inst) == type(expected_inst)
+                    assert inst.skeleton.matches(expected_inst.skeleton)
+                    assert getattr(inst.track, "name", None) == getattr(
+                        expected_inst.track, "name", None
+                    )
+                    np.testing.assert_array_equal(
+                        inst.points_array, expected_inst.points_array
+                    )
+                    if isinstance(inst, PredictedInstance):
+                        assert inst.score == expected_inst.score
+                        np.testing.assert_array_equal(
+                            inst.points_and_scores_array,
+                            expected_inst.points_and_scores_array,
+                        )
+                    elif expected_inst.from_predicted is not None:
+                        assert inst.from_predicted.score == pytest.approx(
+                            expected_inst.from_predicted.score
+                        )
+
+
+def test_parse_json_stream():
+    from sleap.io.format.labels_json import LabeledFrameBuilder, parse_json_stream
+
+    frame_builder = LabeledFrameBuilder()
+    dicts = parse_json_stream(
+        ' { "version": "2.0.0", "labels": [ {"video": 0, "frame_idx": 3} ] } ',
+        frame_builder,
+    )
+    assert dicts == {"version": "2.0.0"}
+    assert frame_builder.frame_idxs == [3]
+
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_stream('{"labels": [{"video": 0, "frame_idx": 3}', frame_builder)
+
+
+def test_parse_json_stream_from_file(tmpdir, min_labels, monkeypatch):
+    from sleap.io.format import labels_json
+    from sleap.io.format.labels_json import LabeledFrameBuilder, parse_json_stream
+    from sleap.util import json_loads
+
+    filename = os.path.join(tmpdir, "test.json")
+    labels_json.LabelsJsonAdaptor.write(filename, min_labels)
+    with open(filename, "r") as f:
+        expected = json_loads(f.read())
+
+    # Read a few characters at a time so values span many chunks.
+    monkeypatch.setattr(labels_json, "JSON_CHUNK_SIZE", 7)
+    frame_builder = LabeledFrameBuilder()
+    with open(filename, "r") as f:
+        dicts = parse_json_stream(f, frame_builder)
+
+    assert len(frame_builder) == len(expected["labels"])
+    del expected["labels"]
+    assert dicts == expected
+
+    labels = read(filename, for_object="labels")
+    assert len(labels.all_instances) == len(min_labels.all_instances)
+
+    # Numbers at the end of a chunk may continue in the next chunk.
+    monkeypatch.setattr(labels_json, "JSON_CHUNK_SIZE", 3)
+    dicts = parse_json_stream('{"a": 12345, "labels": []}', LabeledFrameBuilder())
+    assert dicts == {"a": 12345}
+
+
+def test_labels_json_format_id(tmpdir, min_labels):
+    from sleap.io.format.labels_json import LabelsJsonAdaptor
+
+    filename = os.path.join(tmpdir, "test.json")
+    LabelsJsonAdaptor.write(filename, min_labels)
+    assert LabelsJsonAdaptor().can_read_file(filehandle.FileHandle(filename))
+
+    for text in ('{"format_id": 3, "labels": []}', '{"labels": [], "format_id": 3}'):
+        with open(filename, "w") as f:
+            f.write(text)
+        assert not LabelsJsonAdaptor().can_read_file(filehandle.FileHandle(filename))
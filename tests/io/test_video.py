@@ -1,5 +1,7 @@
 import pytest
 import os
+import shutil
+import cv2
 import h5py
 
 import numpy as np
@@ -211,6 +213,37 @@ def test_imgstore_single_channel(centered_pair_vid, tmpdir):
     assert vid.channels == 1
 
 
+def test_imgstore_export_resume(small_robot_mp4_vid, tmpdir):
+    path = os.path.join(tmpdir, "test_imgstore")
+    frame_indices = [40, 15, 20]
+
+    progress = []
+    vid = small_robot_mp4_vid.to_imgstore(
+        path,
+        frame_numbers=frame_indices,
+        progress_callback=lambda done, total: progress.append((done, total)),
+    )
+    assert progress[0] == (0, 3)
+    assert progress[-1] == (3, 3)
+
+    assert vid.frames == 3
+    for idx in frame_indices:
+        assert np.all(vid.get_frame(idx) == small_robot_mp4_vid.get_frame(idx))
+    vid.close()
+
+    # Complete imgstore with same frames isn't written again.
+    metadata_path = os.path.join(path, "metadata.yaml")
+    os.utime(metadata_path, (0, 0))
+    small_robot_mp4_vid.to_imgstore(path, frame_numbers=frame_indices, resume=True)
+    assert os.path.getmtime(metadata_path) == 0
+
+    # Partially written imgstore is replaced.
+    open(os.path.join(path, ".lock"), "w").close()
+    small_robot_mp4_vid.to_imgstore(path, frame_numbers=frame_indices, resume=True)
+    assert os.path.getmtime(metadata_path) != 0
+    assert not os.path.exists(os.path.join(path, ".lock"))
+
+
 def test_imgstore_no_frames(small_robot_mp4_vid, tmpdir):
     path = os.path.join(tmpdir, "test_imgstore")
     frame_indices = []
@@ -249,6 +282,14 @@ def test_hdf5_inline_video(small_robot_mp4_vid, tmpdir, format):
     # Try loading a frame from the source video that's not in the inline video
     assert hdf5_vid.get_frame(3).shape == (320, 560, 3)
 
+    # Batched reads (in any order, and with frames from source video) should
+    # match reading individual frames.
+    batch_indices = [5, 3, 0, 1, 5]
+    frames = hdf5_vid.get_frames(batch_indices)
+    assert frames.shape == (len(batch_indices), 320, 560, 3)
+    for frame, i in zip(frames, batch_indices):
+        assert np.all(frame == hdf5_vid.get_frame(i))
+
     # Check the image data is exactly the same when lossless is used.
     if format in ("", "png"):
         assert np.allclose(
@@ -338,6 +379,32 @@ def test_images_video():
     assert vid[0].shape == (1, 320, 560, 3)
 
 
+def test_images_video_get_frames(tmpdir):
+    filenames = [f"tests/data/videos/robot{i}.jpg" for i in range(3)]
+
+    # Write one image as (grayscale) PNG.
+    png_filename = os.path.join(tmpdir, "robot.png")
+    cv2.imwrite(png_filename, cv2.imread(filenames[0], cv2.IMREAD_GRAYSCALE))
+    filenames.append(png_filename)
+
+    vid = Video.from_image_filenames(filenames)
+
+    # Shape is read from image headers, without loading frames.
+    assert vid.shape == (4, 320, 560, 3)
+    assert vid.backend.test_frame_ is None
+
+    expected = [cv2.imread(filename)[..., ::-1] for filename in filenames]
+
+    frames = vid.get_frames([3, 1, 3, 0])
+    assert frames.shape == (4, 320, 560, 3)
+    for frame, idx in zip(frames, [3, 1, 3, 0]):
+        assert np.all(frame == expected[idx])
+
+    # Frames are read in order (decoding ahead) and from cache.
+    for idx in [0, 1, 2, 3, 2]:
+        assert np.all(vid.get_frame(idx) == expected[idx])
+
+
 def test_imgstore_from_filenames(tmpdir):
     temp_filename = os.path.join(tmpdir, "test_imgstore")
     filenames = [f"tests/data/videos/robot{i}.jpg" for i in range(3)]
@@ -364,3 +431,32 @@ def test_safe_frame_loading(small_robot_mp4_vid):
 
     assert idxs == [1, 2]
     assert len(frames) == 2
+
+
+def test_mp4_index(tmpdir):
+    filename = os.path.join(tmpdir, "small_robot.mp4")
+    shutil.copy(TEST_SMALL_ROBOT_MP4_FILE, filename)
+
+    vid = Video.from_filename(filename, grayscale=False)
+    assert vid.backend.index is None
+    expected = {idx: vid.get_frame(idx) for idx in (0, 1, 50, 165)}
+
+    index = vid.backend.build_index()
+    assert index.frames == 166
+    assert list(index.seek_frames) == [0]
+    assert os.path.exists(f"{filename}.sleap_index.npz")
+
+    # Index is used when video is opened again.
+    vid = Video.from_filename(filename, grayscale=False)
+    assert vid.backend.index is not None
+    assert vid.frames == 166
+    for idx in (165, 1, 50, 0, 1):
+        assert np.all(vid.get_frame(idx) == expected[idx])
+
+    with pytest.raises(KeyError):
+        vid.get_frame(166)
+
+    # Index isn't used once video file has changed.
+    os.utime(filename, (0, 0))
+    vid = Video.from_filename(filename)
+    assert vid.backend.index is None
@@ -43,3 +43,17 @@ def test_preloader():
 
     np.testing.assert_array_equal(preloader.examples, [{"a": 0}, {"a": 1}, {"a": 2}])
     np.testing.assert_array_equal(list(iter(ds)), [{"a": 0}, {"a": 1}, {"a": 2}])
+
+
+def test_sharder():
+    ds = tf.data.Dataset.range(5).map(lambda i: {"a": i})
+
+    shards = [
+        [ex["a"].numpy() for ex in dataset_ops.Sharder(2, i).transform_dataset(ds)]
+        for i in range(2)
+    ]
+    assert shards[0] == [0, 2, 4]
+    assert shards[1] == [1, 3]
+
+    examples = list(iter(dataset_ops.Sharder(1, 0).transform_dataset(ds)))
+    assert len(examples) == 5
@@ -160,3 +160,109 @@ def test_instance_cropper_from_config():
             config=InstanceCroppingConfig(crop_size=None),
             crop_size=None,
         )
+
+
+def test_find_instance_crop_size(min_labels):
+    max_length = 0
+    for inst in min_labels.user_instances:
+        pts = inst.points_array
+        max_length = max(max_length, np.ptp(pts[:, 0]), np.ptp(pts[:, 1]))
+
+    crop_size = instance_cropping.find_instance_crop_size(
+        min_labels, padding=0, maximum_stride=1
+    )
+    assert crop_size == np.ceil(max_length)
+
+    crop_size = instance_cropping.find_instance_crop_size(
+        min_labels, padding=16, maximum_stride=32, input_scaling=0.5
+    )
+    assert crop_size == np.ceil((max_length * 0.5 + 16) / 32) * 32
+
+
+def make_frames_dataset():
+    rng = np.random.RandomState(0)
+    frames = []
+    for frame_ind, (n_instances, size) in enumerate([(2, 32), (1, 24), (3, 32)]):
+        instances = rng.uniform(4, size - 4, size=(n_instances, 3, 2))
+        frames.append(
+            {
+                "image": rng.randint(0, 255, size=(size, size, 1)).astype("uint8"),
+                "instances": instances.astype("float32"),
+                "centroids": instances.mean(axis=1).astype("float32"),
+                "frame_ind": np.int64(frame_ind),
+                "skeleton_inds": np.zeros(n_instances, dtype="int32"),
+            }
+        )
+
+    return tf.data.Dataset.from_generator(
+        lambda: iter(frames),
+        output_types={
+            "image": tf.uint8,
+            "instances": tf.float32,
+            "centroids": tf.float32,
+            "frame_ind": tf.int64,
+            "skeleton_inds": tf.int32,
+        },
+        output_shapes={
+            "image": (None, None, 1),
+            "instances": (None, 3, 2),
+            "centroids": (None, 2),
+            "frame_ind": (),
+            "skeleton_inds": (None,),
+        },
+    )
+
+
+def test_instance_cropper_frame_batches():
+    ds = make_frames_dataset()
+    examples = list(
+        instance_cropping.InstanceCropper(
+            crop_width=8, crop_height=8, keep_full_image=True
+        ).transform_dataset(ds)
+    )
+    batched_ds = instance_cropping.InstanceCropper(
+        crop_width=8, crop_height=8, keep_full_image=True, frame_batch_size=2
+    ).transform_dataset(ds)
+    batched_examples = list(batched_ds)
+
+    assert len(examples) == 6
+    assert len(batched_examples) == 6
+    assert batched_ds.element_spec["all_instances"].shape.as_list() == [None, 3, 2]
+    for example, batched_example in zip(examples, batched_examples):
+        assert example.keys() == batched_example.keys()
+        for key in example:
+            assert example[key].dtype == batched_example[key].dtype
+            np.testing.assert_array_equal(example[key], batched_example[key])
+
+
+def test_predicted_instance_cropper_frame_batches():
+    def add_predicted_centroids(frame_data):
+        frame_data["full_image"] = frame_data["image"]
+        frame_data["full_image_scale"] = tf.ones([2], tf.float32)
+        frame_data["scale"] = tf.ones([2], tf.float32) * 0.5
+        frame_data["predicted_centroids"] = frame_data["centroids"] * 0.5
+        frame_data["predicted_centroid_confidences"] = tf.ones(
+            [tf.shape(frame_data["centroids"])[0]], tf.float32
+        )
+        frame_data["video_ind"] = tf.constant(0, tf.int32)
+        return frame_data
+
+    ds = make_frames_dataset().map(add_predicted_centroids)
+    examples = list(
+        instance_cropping.PredictedInstanceCropper(
+            crop_width=8, crop_height=8, keep_instances_gt=True
+        ).transform_dataset(ds)
+    )
+    batched_examples = list(
+        instance_cropping.PredictedInstanceCropper(
+            crop_width=8, crop_height=8, keep_instances_gt=True, frame_batch_size=2
+        ).transform_dataset(ds)
+    )
+
+    assert len(examples) == 6
+    assert len(batched_examples) == 6
+    for example, batched_example in zip(examples, batched_examples):
+        assert example.keys() == batched_example.keys()
+        for key in example:
+            assert example[key].dtype == batched_example[key].dtype
+            np.testing.assert_array_equal(example[key], batched_example[key])
@@ -134,3 +134,39 @@ def test_video_reader_hdf5():
 
     assert example["raw_image_size"].dtype == tf.int32
     np.testing.assert_array_equal(example["raw_image_size"], (512, 512, 1))
+
+
+def test_tfrecord_reader(min_labels, tmpdir):
+    filename_prefix = str(tmpdir.join("min_labels"))
+    metadata_path = min_labels.export_training_data_tfrecords(
+        filename_prefix, n_shards=2
+    )
+
+    tfrecord_reader = providers.TFRecordReader.from_metadata(metadata_path)
+    assert len(tfrecord_reader) == 1
+    assert len(tfrecord_reader.filenames) == 2
+
+    example = next(iter(tfrecord_reader.make_dataset()))
+    labels_reader = providers.LabelsReader.from_user_instances(min_labels)
+    example_gt = next(iter(labels_reader.make_dataset()))
+
+    assert set(example.keys()) == set(tfrecord_reader.output_keys)
+    for key in tfrecord_reader.output_keys:
+        assert example[key].dtype == example_gt[key].dtype
+        np.testing.assert_array_equal(example[key], example_gt[key])
+
+
+def test_tfrecord_reader_raw_format(min_labels, tmpdir):
+    labels = sleap.Labels([min_labels[0], min_labels[0], min_labels[0]])
+    metadata_path = providers.write_tfrecords(
+        labels, str(tmpdir.join("labels")), n_shards=2, image_format="raw"
+    )
+
+    tfrecord_reader = providers.TFRecordReader.from_metadata(metadata_path)
+    assert len(tfrecord_reader) == 3
+
+    examples = list(iter(tfrecord_reader.make_dataset()))
+    assert sorted([int(ex["example_ind"]) for ex in examples]) == [0, 1, 2]
+    for example in examples:
+        assert example["image"].shape == (384, 384, 1)
+        assert example["instances"].shape == (2, 2, 2)
@@ -0,0 +1,183 @@
+import os
+
+import numpy as np
+import tensorflow as tf
+from sleap.nn.system import use_cpu_only; use_cpu_only()  # hide GPUs for test
+
+from sleap import util
+from sleap.nn.config import (
+    TrainingJobConfig,
+    ModelConfig,
+    BackboneConfig,
+    UNetConfig,
+    HeadsConfig,
+    CentroidsHeadConfig,
+    CenteredInstanceConfmapsHeadConfig,
+)
+from sleap.nn.data.dataset_ops import LambdaFilter
+from sleap.nn.data.inference import LocalPeakFinder
+from sleap.nn.data.resizing import Resizer
+from sleap.nn.model import Model
+from sleap.nn.inference import (
+    TopdownPredictor,
+    make_cli_parser,
+    find_heads_for_model_paths,
+    make_predictor_from_models,
+)
+
+
+def make_trained_model(heads: HeadsConfig, input_shape):
+    config = TrainingJobConfig(
+        model=ModelConfig(
+            backbone=BackboneConfig(
+                unet=UNetConfig(filters=8, max_stride=4, output_stride=2)
+            ),
+            heads=heads,
+        )
+    )
+    config.data.preprocessing.pad_to_stride = 4
+    config.data.instance_cropping.crop_size = 16
+    model = Model.from_config(config.model)
+    model.make_model(input_shape=input_shape)
+    return config, model
+
+
+def make_topdown_predictor(**kwargs):
+    centroid_config, centroid_model = make_trained_model(
+        HeadsConfig(centroid=CentroidsHeadConfig(output_stride=2)), (32, 32, 1)
+    )
+    confmap_config, confmap_model = make_trained_model(
+        HeadsConfig(
+            centered_instance=CenteredInstanceConfmapsHeadConfig(
+                part_names=["a", "b"], output_stride=2
+            )
+        ),
+        (16, 16, 1),
+    )
+    return TopdownPredictor(
+        centroid_config=centroid_config,
+        centroid_model=centroid_model,
+        confmap_config=confmap_config,
+        confmap_model=confmap_model,
+        **kwargs,
+    )
+
+
+def get_transformers(pipeline, transformer_class):
+    return [t for t in pipeline.transformers if isinstance(t, transformer_class)]
+
+
+def test_topdown_centroid_peak_threshold():
+    predictor = make_topdown_predictor(centroid_peak_threshold=0.5)
+    pipeline = predictor.make_pipeline()
+
+    peak_finder = get_transformers(pipeline, LocalPeakFinder)[0]
+    assert peak_finder.peak_threshold == 0.5
+    assert predictor.peak_threshold == 0.2
+
+    # Run the centroid peak finding and empty frame filtering stages on one frame
+    # with a confident centroid and one frame with only a weak centroid.
+    ind = pipeline.transformers.index(peak_finder)
+    centroid_filter = pipeline.transformers[ind + 1]
+    assert isinstance(centroid_filter, LambdaFilter)
+
+    confmaps = np.zeros((2, 16, 16, 1), dtype="float32")
+    confmaps[0, 4, 4, 0] = 0.9
+    confmaps[0, 10, 10, 0] = 0.3
+    confmaps[1, 8, 8, 0] = 0.3
+    ds = tf.data.Dataset.from_tensor_slices(
+        {
+            "predicted_centroid_confidence_maps": confmaps,
+            "frame_ind": np.arange(2),
+        }
+    )
+    ds = centroid_filter.transform_dataset(peak_finder.transform_dataset(ds))
+    examples = list(ds)
+
+    assert len(examples) == 1
+    assert examples[0]["frame_ind"].numpy() == 0
+    np.testing.assert_allclose(
+        examples[0]["predicted_centroid_confidences"].numpy(), [0.9]
+    )
+
+
+def test_topdown_centroid_input_scale():
+    predictor = make_topdown_predictor()
+    resizers = get_transformers(predictor.make_pipeline(), Resizer)
+    assert [r.image_key for r in resizers] == ["image", "full_image"]
+    assert [r.scale for r in resizers] == [1.0, 1.0]
+
+    predictor = make_topdown_predictor(centroid_input_scale=0.5)
+    pipeline = predictor.make_pipeline()
+    centroid_resizer, confmap_resizer = get_transformers(pipeline, Resizer)
+    assert centroid_resizer.image_key == "image"
+    assert centroid_resizer.scale == 0.5
+    assert confmap_resizer.image_key == "full_image"
+    assert confmap_resizer.scale == 1.0
+
+    # The option must not leak into the stored training configuration.
+    assert predictor.centroid_config.data.preprocessing.input_scaling == 1.0
+
+
+def test_topdown_centroid_cli_args(tmpdir):
+    model_paths = []
+    for name, (config, model) in [
+        (
+            "centroid",
+            make_trained_model(
+                HeadsConfig(centroid=CentroidsHeadConfig(output_stride=2)),
+                (32, 32, 1),
+            ),
+        ),
+        (
+            "centered_instance",
+            make_trained_model(
+                HeadsConfig(
+                    centered_instance=CenteredInstanceConfmapsHeadConfig(
+                        part_names=["a", "b"], output_stride=2
+                    )
+                ),
+                (16, 16, 1),
+            ),
+        ),
+    ]:
+        model_path = os.path.join(tmpdir, name)
+        os.makedirs(model_path)
+        config.save_json(os.path.join(model_path, "training_config.json"))
+        model.keras_model.save(os.path.join(model_path, "best_model.h5"))
+        model_paths.extend(["--model", model_path])
+
+    parser = make_cli_parser()
+    args, _ = parser.parse_known_args(
+        ["video.mp4"]
+        + model_paths
+        + [
+            "--topdown.centroid_peak_threshold",
+            "0.6",
+            "--topdown.centroid_input_scale",
+            "0.25",
+        ]
+    )
+    policy_args = util.make_scoped_dictionary(vars(args), exclude_nones=True)
+    assert policy_args["topdown"] == {
+        "centroid_peak_threshold": 0.6,
+        "centroid_input_scale": 0.25,
+    }
+
+    predictor = make_predictor_from_models(
+        find_heads_for_model_paths(args.models), policy_args=policy_args
+    )
+    assert isinstance(predictor, TopdownPredictor)
+    assert predictor.centroid_peak_threshold == 0.6
+    assert predictor.centroid_input_scale == 0.25
+    assert predictor.peak_threshold == 0.2
+
+    # Unspecified options keep the predictor defaults.
+    args, _ = parser.parse_known_args(["video.mp4"] + model_paths)
+    policy_args = util.make_scoped_dictionary(vars(args), exclude_nones=True)
+    assert "topdown" not in policy_args
+    predictor = make_predictor_from_models(
+        find_heads_for_model_paths(args.models), policy_args=policy_args
+    )
+    assert predictor.centroid_peak_threshold == 0.2
+    assert predictor.centroid_input_scale is None
@@ -0,0 +1,70 @@
+import numpy as np
+import tensorflow as tf
+from sleap.nn.system import use_cpu_only; use_cpu_only()  # hide GPUs for test
+
+import sleap
+from sleap.nn.model import Model
+from sleap.nn.config import (
+    ModelConfig,
+    BackboneConfig,
+    UNetConfig,
+    HeadsConfig,
+    CentroidsHeadConfig,
+)
+from sleap.nn.data.inference import KerasModelPredictor
+
+
+def make_centroid_model():
+    config = ModelConfig(
+        backbone=BackboneConfig(
+            unet=UNetConfig(filters=8, max_stride=4, output_stride=2)
+        ),
+        heads=HeadsConfig(centroid=CentroidsHeadConfig(output_stride=2)),
+    )
+    model = Model.from_config(config)
+    model.make_model(input_shape=(32, 32, 1))
+    return model
+
+
+def test_rebuild_keras_model_mixed_precision():
+    model = make_centroid_model()
+    x = np.random.RandomState(42).rand(2, 32, 32, 1).astype("float32")
+    # Single output functional models return a list of outputs in TF 2.1.
+    y_float32 = model.keras_model(x)[0].numpy()
+
+    try:
+        sleap.nn.system.set_precision_policy("mixed_bfloat16")
+        assert sleap.nn.system.is_mixed_precision()
+        model.rebuild_keras_model()
+        y_mixed = model.keras_model(x)[0]
+    finally:
+        sleap.nn.system.set_precision_policy("float32")
+
+    # Head outputs stay in float32 even when the backbone computes in bfloat16.
+    assert y_mixed.dtype == tf.float32
+    assert y_mixed.shape == y_float32.shape
+    np.testing.assert_allclose(y_mixed.numpy(), y_float32, atol=5e-2)
+
+
+def test_keras_model_predictor_jit_compile():
+    model = make_centroid_model()
+    x = np.random.RandomState(42).rand(32, 32, 1).astype("float32")
+    ds = tf.data.Dataset.from_tensors({"image": x})
+
+    predictors = [
+        KerasModelPredictor(
+            keras_model=model.keras_model,
+            model_input_keys="image",
+            model_output_keys="predicted_centroid_confidence_maps",
+            jit_compile=jit_compile,
+        )
+        for jit_compile in (False, True)
+    ]
+    y, y_xla = [
+        next(iter(predictor.transform_dataset(ds)))[
+            "predicted_centroid_confidence_maps"
+        ].numpy()
+        for predictor in predictors
+    ]
+    assert y.shape == (16, 16, 1)
+    np.testing.assert_allclose(y_xla, y, atol=1e-5)
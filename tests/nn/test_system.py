@@ -0,0 +1,122 @@
+import json
+import multiprocessing
+import socket
+
+import numpy as np
+import tensorflow as tf
+from sleap.nn.system import use_cpu_only; use_cpu_only()  # hide GPUs for test
+
+from sleap.nn import system
+
+
+def test_tf_config(monkeypatch):
+    monkeypatch.delenv("TF_CONFIG", raising=False)
+    assert system.get_num_workers() == 1
+    assert system.get_worker_index() == 0
+    assert system.is_chief()
+
+    tf_config = system.make_tf_config(["localhost:1", "localhost:2"], worker_index=1)
+    assert json.loads(tf_config)["task"] == {"type": "worker", "index": 1}
+
+    monkeypatch.setenv("TF_CONFIG", tf_config)
+    assert system.get_num_workers() == 2
+    assert system.get_worker_index() == 1
+    assert not system.is_chief()
+
+
+def test_make_distribution_strategy():
+    assert system.make_distribution_strategy(None).num_replicas_in_sync == 1
+    assert system.make_distribution_strategy("default").num_replicas_in_sync == 1
+
+
+def _get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def _train_worker(tf_config, strategy_name, queue):
+    """Train a tiny model in a fresh process and report the final weights."""
+    import os
+
+    os.environ["TF_CONFIG"] = tf_config
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+    import tensorflow as tf
+    from sleap.nn import system
+    from sleap.nn.data.dataset_ops import Sharder
+
+    devices = None
+    if strategy_name == "mirrored":
+        # Split the CPU into two logical devices to get multiple local replicas.
+        cpu = tf.config.list_physical_devices("CPU")[0]
+        tf.config.experimental.set_virtual_device_configuration(
+            cpu, [tf.config.experimental.VirtualDeviceConfiguration()] * 2
+        )
+        devices = ["/cpu:0", "/cpu:1"]
+    strategy = system.make_distribution_strategy(strategy_name, devices=devices)
+
+    x = np.linspace(-1, 1, 64, dtype="float32").reshape(-1, 1)
+    y = 3 * x + 1
+    ds = tf.data.Dataset.from_tensor_slices((x, y))
+    sharder = Sharder(system.get_num_workers(), system.get_worker_index())
+    ds = sharder.transform_dataset(ds)
+    ds = ds.batch(4 * strategy.num_replicas_in_sync, drop_remainder=True).repeat()
+    options = tf.data.Options()
+    options.experimental_distribute.auto_shard_policy = (
+        tf.data.experimental.AutoShardPolicy.OFF
+    )
+    ds = ds.with_options(options)
+
+    with strategy.scope():
+        model = tf.keras.Sequential(
+            [tf.keras.layers.Dense(1, kernel_initializer="zeros", input_shape=(1,))]
+        )
+        model.compile(optimizer=tf.keras.optimizers.SGD(0.1), loss="mse")
+    model.fit(ds, epochs=1, steps_per_epoch=5, verbose=0)
+
+    queue.put(
+        (
+            system.get_worker_index(),
+            strategy.num_replicas_in_sync,
+            [w.tolist() for w in model.get_weights()],
+        )
+    )
+
+
+def _run_workers(n_workers, strategy_name):
+    """Run a local multi-process cluster and return the results of each worker."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    addresses = [f"localhost:{_get_free_port()}" for _ in range(n_workers)]
+    tf_configs = ["{}"]
+    if strategy_name == "multi_worker_mirrored":
+        tf_configs = [system.make_tf_config(addresses, i) for i in range(n_workers)]
+    procs = [
+        ctx.Process(target=_train_worker, args=(tf_config, strategy_name, queue))
+        for tf_config in tf_configs
+    ]
+    for proc in procs:
+        proc.start()
+    results = [queue.get(timeout=300) for _ in procs]
+    for proc in procs:
+        proc.join(timeout=60)
+    return sorted(results)
+
+
+def test_mirrored_strategy_training():
+    results = _run_workers(1, "mirrored")
+    worker_index, num_replicas, weights = results[0]
+    assert num_replicas == 2
+    assert np.all(np.isfinite(np.concatenate([np.ravel(w) for w in weights])))
+
+
+def test_multi_worker_mirrored_strategy_training():
+    results = _run_workers(2, "multi_worker_mirrored")
+    assert [worker_index for worker_index, _, _ in results] == [0, 1]
+    assert all(num_replicas == 2 for _, num_replicas, _ in results)
+
+    # Weights are synchronized across workers.
+    weights0, weights1 = results[0][2], results[1][2]
+    for w0, w1 in zip(weights0, weights1):
+        np.testing.assert_allclose(w0, w1)
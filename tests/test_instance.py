@@ -11,6 +11,7 @@ from sleap.instance import (
     PredictedInstance,
     Point,
     PredictedPoint,
+    PredictedPointArray,
     LabeledFrame,
 )
 from sleap import Labels
@@ -257,6 +258,47 @@ def test_instance_from_pointsarray(skeleton):
     assert inst[skeleton.nodes[1]].y == 4
 
 
+def test_predicted_instance_from_arrays(skeleton):
+    points = np.array([[1, 2], [np.nan, 4], [5, 6]], dtype="float32")
+    confidences = np.array([0.1, 0.2, 0.3], dtype="float32")
+    inst = PredictedInstance.from_arrays(
+        points=points,
+        point_confidences=confidences,
+        instance_score=0.5,
+        skeleton=skeleton,
+    )
+
+    assert inst.score == 0.5
+    assert inst[skeleton.nodes[0]].x == 1
+    assert inst[skeleton.nodes[0]].score == pytest.approx(0.1)
+    assert inst[skeleton.nodes[2]].y == 6
+
+    # Nodes with missing coordinates (or no row in array) are missing.
+    assert len(inst.points) == 2
+    assert skeleton.nodes[1] not in inst
+    assert skeleton.nodes[3] not in inst
+    assert inst[skeleton.nodes[1]].score == 0
+
+
+def test_points_xy_view(skeleton):
+    buffer = PredictedPointArray.make_default(2 * len(skeleton.nodes))
+    inst = PredictedInstance(skeleton=skeleton, points=buffer[len(skeleton.nodes) :])
+    inst[skeleton.nodes[0]] = PredictedPoint(1, 2, score=0.5)
+
+    # View shares memory with points (and buffer they're part of).
+    xy = inst.get_points_array(copy=False, full=True).get_xy_view()
+    assert xy.shape == (len(skeleton.nodes), 2)
+    assert np.all(xy[0] == [1, 2])
+    xy[0, 0] = 3
+    assert inst[skeleton.nodes[0]].x == 3
+    assert buffer[len(skeleton.nodes)].x == 3
+
+    # Arrays we get by default are copies.
+    points_array = inst.points_array
+    points_array[0, 0] = 4
+    assert inst[skeleton.nodes[0]].x == 3
+
+
 def test_frame_merge_predicted_and_user(skeleton, centered_pair_vid):
     user_inst = Instance(skeleton=skeleton, points={skeleton.nodes[0]: Point(1, 2)},)
     user_frame = LabeledFrame(